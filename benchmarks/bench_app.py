@@ -0,0 +1,29 @@
+"""
+The API with ``scrape_jobs`` replaced by a synthetic stand-in.
+
+Imported by ``bench_requests.py`` for in-process runs, served by gunicorn as
+``bench_app:app`` and by uvicorn as ``bench_app:asgi_app``. The stand-in is
+configured with the ``BENCH_*`` variables read by
+:meth:`synthetic.SyntheticScraper.from_env`; the API's own settings come from
+the environment as usual. When ``SCRAPE_REPLAY_DIR`` is set, the recorded
+fixtures are served instead of synthetic jobs.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# The stand-in replaces scrape_jobs, so jobspy itself is only needed to import
+# the app; fall back to the test mock when it isn't installed
+sys.path.append(str(ROOT / "tests" / "mocks"))
+
+from synthetic import SyntheticScraper  # noqa: E402
+
+import jobscraper.app as api  # noqa: E402
+from jobscraper.asgi import app as asgi_app  # noqa: E402, F401
+
+if api.scrape_replayer is None:
+    api.scrape_jobs = SyntheticScraper.from_env()
+app = api.app
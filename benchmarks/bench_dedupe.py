@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-site deduplication on growing frame sizes.
+
+Time per row should stay roughly flat as the frame grows.
+
+Usage:
+    python benchmarks/bench_dedupe.py
+    python benchmarks/bench_dedupe.py --rows 10000 100000 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from results import write_results  # noqa: E402
+from synthetic import make_jobs_frame  # noqa: E402
+
+from jobscraper.dedupe import dedupe_jobs  # noqa: E402
+
+
+def run(rows_list: list, repeat: int) -> list:
+    """Time ``dedupe_jobs`` for each frame size."""
+    results = []
+    for rows in rows_list:
+        df = make_jobs_frame(rows)
+        timings = []
+        removed = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _, removed = dedupe_jobs(df)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        results.append(
+            {
+                "rows": rows,
+                "median_s": median,
+                "min_s": min(timings),
+                "us_per_row": median / rows * 1e6,
+                "removed": removed,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplication benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Write results as JSON to a file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+
+    print(f"{'rows':>8} {'median (s)':>11} {'us/row':>8} {'removed':>8}")
+    for result in results:
+        print(
+            f"{result['rows']:>8} {result['median_s']:>11.4f} "
+            f"{result['us_per_row']:>8.2f} {result['removed']:>8}"
+        )
+
+    if args.output:
+        params = {name: value for name, value in vars(args).items() if name != "output"}
+        write_results(args.output, "bench_dedupe", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark response formats: encode time, payload size and client decode time.
+
+Compares the current JSON path with Arrow IPC, Parquet and CSV. Arrow and
+Parquet are skipped when pyarrow is not installed.
+
+Usage:
+    python benchmarks/bench_formats.py
+    python benchmarks/bench_formats.py --rows 1000 10000 --repeat 5
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from results import write_results  # noqa: E402
+from synthetic import make_jobs_frame  # noqa: E402
+
+from jobscraper.serialization import (  # noqa: E402
+    dataframe_to_arrow,
+    dataframe_to_csv,
+    dataframe_to_json,
+    dataframe_to_parquet,
+    pa,
+    render_json_payload,
+)
+
+
+def encode_json(df) -> bytes:
+    """Current /scrape JSON body."""
+    return render_json_payload(
+        {"success": True, "count": len(df)}, dataframe_to_json(df)
+    )
+
+
+def decode_json(body: bytes):
+    """How a client loads the JSON body back into pandas."""
+    return pd.DataFrame(json.loads(body)["jobs"])
+
+
+def decode_arrow(body: bytes):
+    return pa.ipc.open_stream(body).read_pandas()
+
+
+def decode_parquet(body: bytes):
+    return pd.read_parquet(io.BytesIO(body))
+
+
+def decode_csv(body: bytes):
+    return pd.read_csv(io.BytesIO(body))
+
+
+FORMATS = {
+    "json": (encode_json, decode_json),
+    "csv": (dataframe_to_csv, decode_csv),
+    "arrow": (dataframe_to_arrow, decode_arrow),
+    "parquet": (dataframe_to_parquet, decode_parquet),
+}
+
+
+def median_time(func, arg, repeat: int) -> tuple:
+    """Median wall-clock time of ``func(arg)`` and its last return value."""
+    timings = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func(arg)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), value
+
+
+def run(rows_list: list, repeat: int) -> list:
+    """Benchmark every available format for each frame size."""
+    results = []
+    for rows in rows_list:
+        df = make_jobs_frame(rows)
+        for name, (encode, decode) in FORMATS.items():
+            if pa is None and name in ("arrow", "parquet"):
+                continue
+            encode_s, body = median_time(encode, df, repeat)
+            decode_s, _ = median_time(decode, body, repeat)
+            results.append(
+                {
+                    "rows": rows,
+                    "format": name,
+                    "encode_s": encode_s,
+                    "decode_s": decode_s,
+                    "bytes": len(body),
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response format benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Write results as JSON to a file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+
+    print(
+        f"{'rows':>8} {'format':>8} {'encode (s)':>11} {'decode (s)':>11} {'bytes':>12}"
+    )
+    for result in results:
+        print(
+            f"{result['rows']:>8} {result['format']:>8} {result['encode_s']:>11.4f} "
+            f"{result['decode_s']:>11.4f} {result['bytes']:>12}"
+        )
+
+    if args.output:
+        params = {name: value for name, value in vars(args).items() if name != "output"}
+        write_results(args.output, "bench_formats", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end /scrape requests against a synthetic jobspy.
+
+``scrape_jobs`` is replaced by :class:`synthetic.SyntheticScraper`, which
+returns realistic frames after a simulated per-site upstream latency, or by
+results recorded from the real job boards with ``--replay``.
+Concurrent clients send a fixed number of requests per scenario and the
+benchmark reports requests/sec and p50/p99 latency:
+
+- ``miss``: every request bypasses the cache, so it waits for the simulated
+  sites and serializes a fresh result
+- ``hit``: the same search every time, served from the result cache
+
+``--server flask`` runs the app in-process behind the Flask test client;
+``--server gunicorn`` starts real gunicorn workers with
+``config/gunicorn.conf.py`` and ``--server uvicorn`` the ASGI serving mode,
+both driven over HTTP. Requests rejected with 429 count as errors.
+Serialization on its own is measured by ``bench_serialization.py``.
+
+Usage:
+    python benchmarks/bench_requests.py
+    python benchmarks/bench_requests.py --server flask gunicorn --concurrency 16
+    python benchmarks/bench_requests.py --server gunicorn uvicorn --concurrency 64
+    python benchmarks/bench_requests.py --latency-ms 300 --site-latency-ms linkedin=900
+    python benchmarks/bench_requests.py --replay fixtures/ --latency-scale 0.5
+"""
+
+import argparse
+import contextlib
+import http.client
+import importlib.util
+import itertools
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from results import write_results
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+BENCH_TOKEN = "bench-token"
+SEARCH = {"search_term": "python developer", "location": "Remote"}
+SCENARIOS = ("miss", "hit")
+SERVER_REQUIREMENTS = {
+    "gunicorn": "requirements/requirements.prod.txt",
+    "uvicorn": "requirements/requirements.asgi.txt",
+}
+
+
+def bench_env(args, state_dir: str) -> dict:
+    """Environment of the API under test, including the stand-in's settings."""
+    env = dict(os.environ)
+    env.update(
+        {
+            "API_ACCESS_TOKEN": BENCH_TOKEN,
+            "STATE_DIR": state_dir,
+            "LOG_LEVEL": "WARNING",
+            "BENCH_ROWS": str(args.rows),
+            "BENCH_LATENCY_MS": str(args.latency_ms),
+            "BENCH_SITE_LATENCY_MS": ",".join(args.site_latency_ms),
+            "BENCH_JITTER": str(args.jitter),
+            "BENCH_DESCRIPTION_LENGTH": str(args.description_length),
+            "BENCH_NULL_FRACTION": str(args.null_fraction),
+        }
+    )
+    if args.replay:
+        env["SCRAPE_REPLAY_DIR"] = str(Path(args.replay).resolve())
+        env["SCRAPE_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+    return env
+
+
+def request_body(scenario: str, sites: list, rows: int) -> dict:
+    """Search sent for a scenario."""
+    body = {**SEARCH, "site_name": sites, "results_wanted": rows}
+    if scenario == "miss":
+        body["cache"] = "bypass"
+    return body
+
+
+def request_headers(accept_encoding: str) -> dict:
+    """Headers of every benchmark request."""
+    headers = {
+        "Authorization": f"Bearer {BENCH_TOKEN}",
+        "Content-Type": "application/json",
+    }
+    if accept_encoding:
+        headers["Accept-Encoding"] = accept_encoding
+    return headers
+
+
+def flask_sender(headers: dict):
+    """Send requests through a Flask test client per thread."""
+    from bench_app import app
+
+    local = threading.local()
+
+    def send(body: dict) -> tuple:
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        # Closing the response runs the metrics middleware like a server would
+        with local.client.post("/scrape", json=body, headers=headers) as response:
+            return response.status_code, len(response.get_data())
+
+    return send
+
+
+def http_sender(port: int, headers: dict):
+    """Send requests over a keep-alive HTTP connection per thread."""
+    local = threading.local()
+
+    def send(body: dict) -> tuple:
+        payload = json.dumps(body).encode("utf-8")
+        for attempt in range(2):
+            if getattr(local, "connection", None) is None:
+                local.connection = http.client.HTTPConnection(
+                    "127.0.0.1", port, timeout=120
+                )
+            try:
+                local.connection.request("POST", "/scrape", payload, headers)
+                response = local.connection.getresponse()
+                return response.status, len(response.read())
+            except (http.client.HTTPException, OSError):
+                # The server closes idle keep-alive connections; reconnect once
+                local.connection.close()
+                local.connection = None
+                if attempt:
+                    raise
+        return None, 0
+
+    return send
+
+
+def run_load(send, body: dict, total: int, concurrency: int) -> dict:
+    """
+    Send ``total`` requests from ``concurrency`` threads.
+
+    Returns:
+        dict: Throughput, latency percentiles of successful requests, errors
+        and mean body size
+    """
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+    sizes = []
+    errors = [0]
+
+    def client():
+        while next(counter) < total:
+            start = time.perf_counter()
+            try:
+                status, size = send(body)
+            except (http.client.HTTPException, OSError):
+                status, size = None, 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed)
+                    sizes.append(size)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    summary = {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors[0],
+        "requests_per_s": len(latencies) / wall,
+        "p50_ms": None,
+        "p99_ms": None,
+        "mean_bytes": statistics.mean(sizes) if sizes else 0,
+    }
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        summary["p50_ms"] = statistics.median(latencies) * 1000
+        summary["p99_ms"] = percentiles[98] * 1000
+    return summary
+
+
+def free_port() -> int:
+    """Port that nothing listens on right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(server: str, port: int, process, timeout: float = 30.0):
+    """Poll /health until the server answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{server} exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise SystemExit(f"{server} did not answer within {timeout:.0f}s")
+
+
+def server_command(server: str, port: int, workers: int, threads: int) -> list:
+    """Command line starting gunicorn or uvicorn on ``bench_app``."""
+    if server == "gunicorn":
+        return [
+            "--config",
+            str(ROOT / "config" / "gunicorn.conf.py"),
+            "--chdir",
+            str(BENCH_DIR),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--access-logfile",
+            os.devnull,
+            "--log-level",
+            "warning",
+            "bench_app:app",
+        ]
+    return [
+        "--app-dir",
+        str(BENCH_DIR),
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--no-access-log",
+        "--log-level",
+        "warning",
+        "bench_app:asgi_app",
+    ]
+
+
+@contextlib.contextmanager
+def server_process(server: str, env: dict, workers: int, threads: int):
+    """Run gunicorn or uvicorn with the synthetic scraper and yield its port."""
+    if importlib.util.find_spec(server) is None:
+        raise SystemExit(
+            f"{server} is not installed, see {SERVER_REQUIREMENTS[server]} "
+            "or run with --server flask"
+        )
+    env = {
+        **env,
+        # Like config/gunicorn.conf.py, share results between workers
+        "RESULT_CACHE_BACKEND": env.get("RESULT_CACHE_BACKEND", "sqlite"),
+        "ASGI_REQUEST_THREADS": str(threads),
+    }
+    port = free_port()
+    command = [sys.executable, "-m", server]
+    command += server_command(server, port, workers, threads)
+    process = subprocess.Popen(command, env=env)
+    try:
+        wait_until_ready(server, port, process)
+        yield port
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def run_scenarios(send, args) -> list:
+    """Warm up and measure every scenario with one sender."""
+    results = []
+    for scenario in args.scenario:
+        body = request_body(scenario, args.sites, args.rows)
+        for _ in range(args.warmup):
+            send(body)
+        summary = run_load(send, body, args.requests, args.concurrency)
+        results.append({"scenario": scenario, **summary})
+    return results
+
+
+def run(args) -> list:
+    """Benchmark every requested server."""
+    results = []
+    headers = request_headers(args.accept_encoding)
+    with tempfile.TemporaryDirectory(prefix="jobscraper-bench-") as state_dir:
+        env = bench_env(args, state_dir)
+        for server in args.server:
+            if server == "flask":
+                os.environ.update(env)
+                for result in run_scenarios(flask_sender(headers), args):
+                    results.append({"server": "flask", **result})
+                continue
+            with server_process(server, env, args.workers, args.threads) as port:
+                for result in run_scenarios(http_sender(port, headers), args):
+                    results.append(
+                        {
+                            "server": server,
+                            "workers": args.workers,
+                            "threads": args.threads,
+                            **result,
+                        }
+                    )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end request benchmark")
+    parser.add_argument(
+        "--server",
+        nargs="+",
+        choices=("flask", "gunicorn", "uvicorn"),
+        default=["flask"],
+    )
+    parser.add_argument(
+        "--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--sites", nargs="+", default=["indeed", "linkedin", "glassdoor"]
+    )
+    parser.add_argument("--rows", type=int, default=50, help="Jobs per site")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=100,
+        help="Simulated upstream latency of every site",
+    )
+    parser.add_argument(
+        "--site-latency-ms",
+        nargs="*",
+        default=[],
+        metavar="SITE=MS",
+        help="Latency of specific sites, e.g. linkedin=900",
+    )
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--description-length", type=int, default=1500)
+    parser.add_argument("--null-fraction", type=float, default=0.2)
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve fixtures recorded with SCRAPE_RECORD_DIR instead of synthetic jobs",
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Factor applied to recorded latencies with --replay",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="gunicorn or uvicorn workers"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="Request threads per worker, ASGI_REQUEST_THREADS under uvicorn",
+    )
+    parser.add_argument(
+        "--accept-encoding", default="gzip", help="Empty for uncompressed bodies"
+    )
+    parser.add_argument("--output", type=str, help="Write results as JSON to a file")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results = run(args)
+
+    print(
+        f"{'server':>9} {'scenario':>9} {'conc':>5} {'req/s':>9} {'p50 (ms)':>9} "
+        f"{'p99 (ms)':>9} {'errors':>7} {'bytes':>10}"
+    )
+    for result in results:
+        p50 = result["p50_ms"] or 0.0
+        p99 = result["p99_ms"] or 0.0
+        print(
+            f"{result['server']:>9} {result['scenario']:>9} "
+            f"{result['concurrency']:>5} {result['requests_per_s']:>9.1f} "
+            f"{p50:>9.1f} {p99:>9.1f} {result['errors']:>7} "
+            f"{result['mean_bytes']:>10.0f}"
+        )
+
+    if args.output:
+        params = {name: value for name, value in vars(args).items() if name != "output"}
+        write_results(args.output, "bench_requests", params, results)
+
+
+if __name__ == "__main__":
+    main()
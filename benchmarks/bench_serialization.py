@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar JSON serializer against the row-by-row conversion.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --rows 1000 10000 --repeat 5
+    python benchmarks/bench_serialization.py --fields id title company job_url
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from results import write_results  # noqa: E402
+from synthetic import make_jobs_frame  # noqa: E402
+
+from jobscraper.serialization import (  # noqa: E402
+    dataframe_to_json,
+    dataframe_to_serializable_dict,
+    render_json_payload,
+)
+
+_json_provider = DefaultJSONProvider(Flask(__name__))
+
+
+def legacy_serialize(df) -> bytes:
+    """Previous response path: list of dicts followed by jsonify's encoder."""
+    jobs = dataframe_to_serializable_dict(df)
+    payload = {"success": True, "count": len(df), "jobs": jobs}
+    return _json_provider.dumps(payload).encode("utf-8")
+
+
+def columnar_serialize(df) -> bytes:
+    """Current response path: columnar encoding spliced into the envelope."""
+    return render_json_payload(
+        {"success": True, "count": len(df)}, dataframe_to_json(df)
+    )
+
+
+def time_call(func, df, repeat: int) -> dict:
+    """Run ``func(df)`` ``repeat`` times and summarise wall-clock timings."""
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func(df))
+        timings.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "bytes": size,
+    }
+
+
+def run(rows_list: list, repeat: int, fields=None) -> list:
+    """Benchmark both serializers for each frame size, optionally projected."""
+    results = []
+    for rows in rows_list:
+        df = make_jobs_frame(rows)
+        if fields:
+            df = df[fields]
+        legacy = time_call(legacy_serialize, df, repeat)
+        columnar = time_call(columnar_serialize, df, repeat)
+        results.append(
+            {
+                "rows": rows,
+                "legacy": legacy,
+                "columnar": columnar,
+                "speedup": legacy["median_s"] / columnar["median_s"],
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--fields", nargs="+", help="Only serialize these columns, like ?fields="
+    )
+    parser.add_argument("--output", type=str, help="Write results as JSON to a file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat, args.fields)
+
+    print(
+        f"{'rows':>8} {'legacy (s)':>12} {'columnar (s)':>13} {'speedup':>8} "
+        f"{'bytes':>12}"
+    )
+    for result in results:
+        print(
+            f"{result['rows']:>8} {result['legacy']['median_s']:>12.4f} "
+            f"{result['columnar']['median_s']:>13.4f} {result['speedup']:>7.1f}x "
+            f"{result['columnar']['bytes']:>12}"
+        )
+
+    if args.output:
+        params = {name: value for name, value in vars(args).items() if name != "output"}
+        write_results(args.output, "bench_serialization", params, results)
+
+
+if __name__ == "__main__":
+    main()
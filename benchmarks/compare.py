@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files, e.g. from two commits.
+
+Cases are matched on their descriptive fields (scenario, format, rows, ...)
+and every numeric measurement is reported with its relative change. Changes
+worse than ``--threshold`` are flagged and make the script exit with status 1.
+
+Usage:
+    python benchmarks/compare.py base.json head.json
+    python benchmarks/compare.py base.json head.json --threshold 5
+"""
+
+import argparse
+import sys
+
+from results import load_results
+
+# Fields that identify a case rather than measure it
+CASE_FIELDS = (
+    "server",
+    "scenario",
+    "format",
+    "rows",
+    "concurrency",
+    "workers",
+    "threads",
+)
+
+# Measurements where a larger value is an improvement
+HIGHER_IS_BETTER = ("requests_per_s", "speedup")
+
+# Measurements that describe a run rather than its speed
+IGNORED = ("requests", "errors", "removed", "bytes", "mean_bytes")
+
+
+def case_label(result: dict) -> str:
+    """Readable identity of a case, such as ``server=flask scenario=hit``."""
+    return " ".join(
+        f"{field}={result[field]}" for field in CASE_FIELDS if field in result
+    )
+
+
+def measurements(result: dict, prefix: str = "") -> dict:
+    """Numeric fields of a case, with nested dicts flattened to ``a.b``."""
+    values = {}
+    for name, value in result.items():
+        if name in CASE_FIELDS or name in IGNORED:
+            continue
+        if isinstance(value, dict):
+            values.update(measurements(value, f"{prefix}{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[f"{prefix}{name}"] = value
+    return values
+
+
+def compare(base: list, head: list, threshold: float) -> list:
+    """
+    Pair up the measurements of both runs.
+
+    Returns:
+        list: ``(case, metric, base, head, change, regressed)`` tuples with the
+        change in percent, positive when the head is better
+    """
+    base_cases = {case_label(result): measurements(result) for result in base}
+    rows = []
+    for result in head:
+        label = case_label(result)
+        if label not in base_cases:
+            continue
+        for metric, value in measurements(result).items():
+            old = base_cases[label].get(metric)
+            if not old:
+                continue
+            change = (value - old) / old * 100
+            if not metric.endswith(HIGHER_IS_BETTER):
+                change = -change
+            rows.append((label, metric, old, value, change, change < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("base", help="Results of the baseline commit")
+    parser.add_argument("head", help="Results of the commit under test")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent a measurement may get worse before it is flagged",
+    )
+    args = parser.parse_args()
+
+    base = load_results(args.base)
+    head = load_results(args.head)
+    print(f"base: {base.get('commit') or args.base}")
+    print(f"head: {head.get('commit') or args.head}")
+
+    rows = compare(base["results"], head["results"], args.threshold)
+    width = max([len(row[0]) for row in rows] + [4])
+    print(f"{'case':<{width}} {'metric':<20} {'base':>12} {'head':>12} {'change':>8}")
+    for label, metric, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{label:<{width}} {metric:<20} {old:>12.4f} {new:>12.4f} "
+            f"{change:>+7.1f}%{flag}"
+        )
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Machine-readable benchmark results.
+
+Every benchmark writes its results with :func:`write_results`, together with
+the commit and environment they were measured on, so files from different
+commits can be compared with ``compare.py``.
+"""
+
+import datetime
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def git_revision() -> dict:
+    """Commit of the working tree and whether it has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": bool(status.strip())}
+
+
+def write_results(path: str, benchmark: str, params: dict, results: list) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        path: Output file
+        benchmark: Name of the benchmark script
+        params: Command-line options the results were measured with
+        results: One dict per measured case
+    """
+    document = {
+        "benchmark": benchmark,
+        **git_revision(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(document, indent=2))
+
+
+def load_results(path: str) -> dict:
+    """
+    Read a results file.
+
+    Files written before results carried their commit hold a bare list.
+    """
+    document = json.loads(Path(path).read_text())
+    if isinstance(document, list):
+        return {"benchmark": None, "commit": None, "results": document}
+    return document
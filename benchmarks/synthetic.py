@@ -0,0 +1,215 @@
+"""
+Synthetic job DataFrames shaped like ``jobspy.scrape_jobs`` output.
+
+Used by the benchmarks so serialization can be measured at realistic sizes
+without touching the network. :class:`SyntheticScraper` stands in for
+``scrape_jobs`` itself, with simulated upstream latency per site.
+"""
+
+import datetime
+import os
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter", "google"]
+TITLES = [
+    "Software Engineer",
+    "Senior Data Scientist",
+    "DevOps Engineer",
+    "Product Manager",
+    "Backend Developer (Python)",
+    "Machine Learning Engineer",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Remote", "Austin, TX", "Toronto, ON"]
+JOB_TYPES = ["fulltime", "parttime", "contract", "internship"]
+
+_WORDS = (
+    "We are looking for an experienced engineer to join our growing team. "
+    "You will design, build and operate services used by millions of people. "
+    "Strong Python, SQL and cloud experience is required; Kubernetes is a plus. "
+    "Benefits include health insurance, equity, flexible hours and remote work. "
+)
+_TEXT = _WORDS * 200
+
+
+def make_jobs_frame(
+    rows: int,
+    description_length: int = 1500,
+    null_fraction: float = 0.2,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Generate a DataFrame with the columns and dtypes jobspy returns.
+
+    Args:
+        rows: Number of job rows to generate
+        description_length: Mean length of the ``description`` column in characters
+        null_fraction: Fraction of nullable cells to blank out with NaN/None
+        seed: Random seed so runs are reproducible
+
+    Returns:
+        pd.DataFrame: Synthetic job listings
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+    def with_nulls(values):
+        values = np.asarray(values, dtype=object)
+        values[rng.random(rows) < null_fraction] = None
+        return values
+
+    ids = np.arange(rows)
+    offsets = rng.integers(0, len(_TEXT) - 2 * description_length, rows)
+    lengths = rng.integers(description_length // 2, description_length * 3 // 2, rows)
+    descriptions = [_TEXT[o : o + n] for o, n in zip(offsets, lengths)]
+
+    today = datetime.date(2024, 6, 1)
+    dates = [today - datetime.timedelta(days=int(d)) for d in rng.integers(0, 30, rows)]
+
+    min_amount = rng.integers(50, 150, rows).astype(float) * 1000
+    min_amount[rng.random(rows) < null_fraction] = np.nan
+    max_amount = min_amount + rng.integers(10, 60, rows) * 1000
+
+    site = pick(SITES)
+    return pd.DataFrame(
+        {
+            "id": [f"{s}-{i}" for s, i in zip(site, ids)],
+            "site": site,
+            "job_url": [f"https://jobs.example.com/view/{i}" for i in ids],
+            "job_url_direct": with_nulls(
+                [f"https://careers.example.com/{i}" for i in ids]
+            ),
+            "title": pick(TITLES),
+            "company": pick(COMPANIES),
+            "location": pick(LOCATIONS),
+            "date_posted": with_nulls(dates),
+            "job_type": with_nulls(pick(JOB_TYPES)),
+            "interval": with_nulls(pick(["yearly", "hourly"])),
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "currency": with_nulls(pick(["USD", "CAD"])),
+            "is_remote": rng.random(rows) < 0.3,
+            "emails": with_nulls(pick(["jobs@example.com", "hr@example.com"])),
+            "description": with_nulls(descriptions),
+            "company_url": with_nulls(pick(["https://example.com/company"])),
+            "company_rating": np.where(
+                rng.random(rows) < null_fraction, np.nan, rng.uniform(1, 5, rows)
+            ),
+            "vacancy_count": pd.array(
+                np.where(rng.random(rows) < 0.5, None, rng.integers(1, 10, rows)),
+                dtype="Int64",
+            ),
+        }
+    )
+
+
+def parse_site_latency(spec: str) -> dict:
+    """
+    Parse per-site latencies such as ``linkedin=1200,indeed=600``.
+
+    Args:
+        spec: Comma-separated ``site=milliseconds`` pairs
+
+    Returns:
+        dict: Seconds per site
+    """
+    latency = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        site, _, ms = pair.partition("=")
+        latency[site.strip()] = float(ms) / 1000
+    return latency
+
+
+class SyntheticScraper:
+    """
+    Stand-in for ``jobspy.scrape_jobs`` that returns synthetic jobs after a delay.
+
+    A call sleeps for the slowest of its sites, since jobspy scrapes the sites
+    of one call concurrently, then returns ``results_wanted`` rows per site.
+    Frames are generated once per site and size so the benchmark measures the
+    API rather than the generator.
+
+    Args:
+        rows: Rows per site when the search doesn't set ``results_wanted``
+        latency: Simulated upstream latency in seconds for every site
+        site_latency: Latency in seconds of specific sites, overriding ``latency``
+        jitter: Fraction of the latency randomly added or removed per call
+        description_length: Mean length of the ``description`` column
+        null_fraction: Fraction of nullable cells left empty
+        seed: Random seed of the frames and the jitter
+    """
+
+    def __init__(
+        self,
+        rows: int = 50,
+        latency: float = 0.5,
+        site_latency: dict = None,
+        jitter: float = 0.2,
+        description_length: int = 1500,
+        null_fraction: float = 0.2,
+        seed: int = 0,
+    ):
+        self.rows = rows
+        self.latency = latency
+        self.site_latency = site_latency or {}
+        self.jitter = jitter
+        self.description_length = description_length
+        self.null_fraction = null_fraction
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SyntheticScraper":
+        """Configure a scraper from ``BENCH_*`` environment variables."""
+        return cls(
+            rows=int(os.environ.get("BENCH_ROWS", "50")),
+            latency=float(os.environ.get("BENCH_LATENCY_MS", "500")) / 1000,
+            site_latency=parse_site_latency(
+                os.environ.get("BENCH_SITE_LATENCY_MS", "")
+            ),
+            jitter=float(os.environ.get("BENCH_JITTER", "0.2")),
+            description_length=int(os.environ.get("BENCH_DESCRIPTION_LENGTH", "1500")),
+            null_fraction=float(os.environ.get("BENCH_NULL_FRACTION", "0.2")),
+        )
+
+    def __call__(self, **kwargs) -> pd.DataFrame:
+        sites = kwargs.get("site_name") or SITES
+        if isinstance(sites, str):
+            sites = [sites]
+        rows = kwargs.get("results_wanted") or self.rows
+
+        latency = max(self.site_latency.get(site, self.latency) for site in sites)
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, latency * factor))
+
+        return pd.concat([self._frame(site, rows) for site in sites], ignore_index=True)
+
+    def _frame(self, site: str, rows: int) -> pd.DataFrame:
+        """Jobs of one site, generated on first use."""
+        key = (site, rows)
+        with self._lock:
+            df = self._frames.get(key)
+        if df is None:
+            df = make_jobs_frame(
+                rows,
+                description_length=self.description_length,
+                null_fraction=self.null_fraction,
+                seed=self.seed + zlib.crc32(site.encode()),
+            )
+            df["site"] = site
+            df["id"] = [f"{site}-{i}" for i in range(rows)]
+            with self._lock:
+                self._frames[key] = df
+        # Callers may modify the frame they get, like a fresh jobspy result
+        return df.copy()
@@ -3,6 +3,7 @@ Gunicorn configuration file for production deployment.
 """
 
 import multiprocessing
+import os
 
 # Server socket
 bind = "0.0.0.0:8080"  # Can be overridden with -b flag
@@ -12,6 +13,9 @@ workers = multiprocessing.cpu_count() * 2 + 1
 worker_class = "gthread"
 threads = 4
 
+# Share the result cache between workers unless configured otherwise
+os.environ.setdefault("RESULT_CACHE_BACKEND", "sqlite")
+
 # Logging
 accesslog = "-"  # stdout
 errorlog = "-"  # stdout
@@ -29,6 +33,8 @@ group = None
 tmp_upload_dir = None
 
 # Worker processes timeout
+# SCRAPE_DEADLINE_MS (25s by default) must stay below this so requests return
+# partial results before the worker is killed
 timeout = 30
 keepalive = 2
 
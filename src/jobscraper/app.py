@@ -1,40 +1,148 @@
+import json
 import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, url_for
 from jobspy import scrape_jobs
-import pandas as pd
-
-from .auth import require_token
-from .config import DEBUG_MODE, LOG_FILE_PATH, LOG_LEVEL_VALUE, LOG_TO_FILE
-
-
-def dataframe_to_serializable_dict(df: pd.DataFrame) -> list:
-    """
-    Convert DataFrame to JSON-serializable dictionary with proper NaN handling.
-    
-    Args:
-        df: Pandas DataFrame to convert
-        
-    Returns:
-        list: List of dictionaries where NaN values are converted to None
-    """
-    # Convert DataFrame to dictionary using orient='records'
-    jobs_data = df.to_dict(orient="records")
-    
-    # Process each job to replace NaN/NaT values with None
-    processed_jobs = []
-    for job in jobs_data:
-        processed_job = {}
-        for key, value in job.items():
-            # Check if value is NaN (float) or NaT (datetime)
-            if pd.isna(value):
-                processed_job[key] = None
-            else:
-                processed_job[key] = value
-        processed_jobs.append(processed_job)
-    
-    return processed_jobs
 
+from .archive import ArchiveWriter, JobArchive, parse_archive_query
+from .auth import require_token, token_valid
+from .background import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    BackgroundJobStore,
+    JobHeartbeat,
+)
+from .batch import group_searches, parse_batch_searches, run_batch
+from .breaker import CircuitOpenError, SiteBreakers
+from .cache import (
+    CACHE_BYPASS,
+    CACHE_REFRESH,
+    ScrapeResult,
+    create_result_cache,
+    parse_cache_mode,
+)
+from .coalesce import HostLockTimeoutError, SingleFlight
+from .compression import (
+    COMPRESSIBLE_MIMETYPES,
+    ZSTD_ENCODING,
+    compress_body,
+    compress_stream,
+    negotiate_encoding,
+)
+from .config import (
+    DEBUG_MODE,
+    JOB_ARCHIVE,
+    JOB_ARCHIVE_BATCH_ROWS,
+    JOB_ARCHIVE_FLUSH_MS,
+    JOB_ARCHIVE_MAX_PENDING,
+    JOB_ARCHIVE_PATH,
+    LOG_FILE_PATH,
+    LOG_LEVEL_VALUE,
+    LOG_TO_FILE,
+    METRICS,
+    METRICS_FLUSH_INTERVAL,
+    METRICS_PATH,
+    PROFILE_ACCESS_TOKEN,
+    PROFILE_DIR,
+    PROFILE_TOP_N,
+    PROXY_POOL,
+    PROXY_POOL_PATH,
+    PROXY_QUARANTINE_FAILURES,
+    PROXY_QUARANTINE_SECONDS,
+    REFRESH_AHEAD,
+    REFRESH_AHEAD_INTERVAL,
+    REFRESH_AHEAD_LEAD_TIME,
+    REFRESH_AHEAD_PATH,
+    REFRESH_AHEAD_SITE_BUDGET,
+    REFRESH_AHEAD_TOP_N,
+    REFRESH_AHEAD_WINDOW,
+    REFRESH_AHEAD_WORKERS,
+    RESPONSE_COMPRESSION,
+    RESPONSE_COMPRESSION_MIN_BYTES,
+    RESPONSE_GZIP_LEVEL,
+    RESPONSE_ZSTD_LEVEL,
+    RESULT_CACHE_BACKEND,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_STALE_TTL,
+    RESULT_CACHE_TTL,
+    SAVED_SEARCH_RETENTION,
+    SAVED_SEARCHES_PATH,
+    SCRAPE_BATCH_MAX_SEARCHES,
+    SCRAPE_BATCH_WORKERS,
+    SCRAPE_COALESCING,
+    SCRAPE_DEADLINE_MS,
+    SCRAPE_JOB_MAX_PENDING,
+    SCRAPE_JOB_RETENTION,
+    SCRAPE_JOB_STALE_AFTER,
+    SCRAPE_JOB_WORKERS,
+    SCRAPE_JOBS_PATH,
+    SCRAPE_LOCK_DIR,
+    SCRAPE_LOCK_TIMEOUT,
+    SCRAPE_MAX_DEADLINE_MS,
+    SCRAPE_RECORD_DIR,
+    SCRAPE_REPLAY_DIR,
+    SCRAPE_REPLAY_LATENCY_SCALE,
+    SCRAPE_SITE_WORKERS,
+    SERVER_TIMING,
+    SITE_BREAKER_COOLDOWN,
+    SITE_BREAKER_FAILURE_RATE,
+    SITE_BREAKER_MIN_CALLS,
+    SITE_BREAKER_WINDOW,
+    SITE_BREAKERS,
+    SITE_BREAKERS_PATH,
+    STREAM_CHUNK_ROWS,
+)
+from .etag import result_etag
+from .metrics import (
+    CONTENT_TYPE,
+    ENDPOINT_ENVIRON_KEY,
+    STAGES_ENVIRON_KEY,
+    Metrics,
+    MetricsMiddleware,
+    timed_stage,
+)
+from .params import (
+    InvalidRequestError,
+    canonical_params,
+    extract_scrape_params,
+    params_key,
+    parse_deadline_ms,
+)
+from .profiling import (
+    PROFILE_ID_HEADER,
+    PROFILE_TOKEN_HEADER,
+    ProfileStore,
+    profile_authorized,
+    server_timing,
+)
+from .proxies import ProxyPool, parse_proxy_list
+from .refresh import Refresher, RefreshScheduler, SearchPopularity
+from .replay import ScrapeRecorder, ScrapeReplayer
+from .saved import SavedSearchRun, SeenJobsIndex, parse_saved_search
+from .scraper import (
+    ScrapeTimeoutError,
+    remaining_seconds,
+    scrape_single,
+    scrape_sites,
+    split_sites,
+)
+from .serialization import (
+    DATAFRAME_ENCODERS,
+    JSON_MIMETYPE,
+    NDJSON_MIMETYPE,
+    dataframe_to_ndjson,
+    format_available,
+    render_json_payload,
+)
+from .stages import apply_stages, parse_stages
 
 app = Flask(__name__)
 
@@ -54,6 +162,499 @@ logger = logging.getLogger(__name__)
 logger.info(f"Logging configured with level: {logging.getLevelName(LOG_LEVEL_VALUE)}")
 logger.info(f"File logging: {LOG_TO_FILE}")
 logger.info(f"Debug mode: {DEBUG_MODE}")
+logger.info(f"Result cache backend: {RESULT_CACHE_BACKEND}")
+
+# Prometheus metrics, summed over every worker when exported
+metrics = Metrics(METRICS_PATH, flush_interval=METRICS_FLUSH_INTERVAL, enabled=METRICS)
+if METRICS:
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+
+# Reports of requests profiled with ?profile=1, shared by every worker
+profile_store = ProfileStore(PROFILE_DIR, top_n=PROFILE_TOP_N)
+
+result_cache = create_result_cache(
+    RESULT_CACHE_BACKEND,
+    RESULT_CACHE_PATH,
+    ttl=RESULT_CACHE_TTL,
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+    stale_ttl=RESULT_CACHE_STALE_TTL,
+)
+
+# Workers only need to lock each other out when they can share results
+single_flight = SingleFlight(SCRAPE_LOCK_DIR if result_cache.shared else None)
+
+# Bounded pool the per-site tasks of multi-site searches run on
+site_executor = ThreadPoolExecutor(
+    max_workers=SCRAPE_SITE_WORKERS, thread_name_prefix="scrape-site"
+)
+
+# Per-site circuit breakers, shared by every worker
+site_breakers = SiteBreakers(
+    SITE_BREAKERS_PATH,
+    failure_threshold=SITE_BREAKER_FAILURE_RATE,
+    min_calls=SITE_BREAKER_MIN_CALLS,
+    window=SITE_BREAKER_WINDOW,
+    cooldown=SITE_BREAKER_COOLDOWN,
+)
+breakers = site_breakers if SITE_BREAKERS else None
+
+# Server-side proxies for searches that do not bring their own
+proxy_pool = ProxyPool(
+    PROXY_POOL_PATH,
+    parse_proxy_list(PROXY_POOL),
+    quarantine_failures=PROXY_QUARANTINE_FAILURES,
+    quarantine_seconds=PROXY_QUARANTINE_SECONDS,
+)
+
+# Real jobspy results saved as fixtures, and replayed in place of jobspy
+scrape_recorder = ScrapeRecorder(SCRAPE_RECORD_DIR)
+scrape_replayer = (
+    ScrapeReplayer(SCRAPE_REPLAY_DIR, latency_scale=SCRAPE_REPLAY_LATENCY_SCALE)
+    if SCRAPE_REPLAY_DIR
+    else None
+)
+if scrape_replayer is not None:
+    logger.info(f"Replaying recorded scrape results from {SCRAPE_REPLAY_DIR}")
+
+# Background scrape jobs run on their own pool, never on HTTP worker threads
+job_store = BackgroundJobStore(
+    SCRAPE_JOBS_PATH,
+    retention=SCRAPE_JOB_RETENTION,
+    stale_after=SCRAPE_JOB_STALE_AFTER,
+)
+job_executor = ThreadPoolExecutor(
+    max_workers=SCRAPE_JOB_WORKERS, thread_name_prefix="scrape-job"
+)
+# The executor's queue is unbounded, so jobs are capped per process here
+job_heartbeat = JobHeartbeat(
+    job_store,
+    interval=SCRAPE_JOB_STALE_AFTER / 3,
+    max_pending=SCRAPE_JOB_MAX_PENDING,
+)
+
+# Jobs already returned by each saved search, shared by every worker
+seen_index = SeenJobsIndex(SAVED_SEARCHES_PATH, retention=SAVED_SEARCH_RETENTION)
+
+# Optional archive of every scraped job, written off the request path
+job_archive = JobArchive(JOB_ARCHIVE_PATH)
+archive_writer = (
+    ArchiveWriter(
+        job_archive,
+        batch_rows=JOB_ARCHIVE_BATCH_ROWS,
+        flush_interval=JOB_ARCHIVE_FLUSH_MS / 1000,
+        max_pending=JOB_ARCHIVE_MAX_PENDING,
+    )
+    if JOB_ARCHIVE
+    else None
+)
+
+# Bounded pool the searches of batch requests run on
+batch_executor = ThreadPoolExecutor(
+    max_workers=SCRAPE_BATCH_WORKERS, thread_name_prefix="scrape-batch"
+)
+
+
+def invalid_body_response():
+    """Error response for a missing or non-JSON request body."""
+    return (
+        jsonify(
+            {
+                "error": "Invalid request",
+                "message": "Request body must be JSON with scraping parameters",
+            }
+        ),
+        400,
+    )
+
+
+def result_summary(result: ScrapeResult) -> dict:
+    """
+    Describe how complete a result is, for the response envelope or trailer.
+
+    Args:
+        result: Result being returned
+
+    Returns:
+        dict: ``partial`` and ``errors``, plus the per-site report when the
+        search was fanned out and the figures of any result stages
+    """
+    summary = {"partial": result.partial, "errors": result.errors}
+    if result.sites:
+        summary["sites"] = result.sites
+    summary.update(result.stages)
+    return summary
+
+
+def render_result(result: ScrapeResult) -> bytes:
+    """
+    Encode a result as the JSON body returned by ``/scrape``.
+
+    Args:
+        result: Result being returned
+
+    Returns:
+        bytes: JSON object with ``success``, ``count``, the summary and ``jobs``
+    """
+    fields = {"success": True, "count": len(result), **result_summary(result)}
+    return render_json_payload(fields, result.jobs_json)
+
+
+def negotiate_mimetype(data: dict) -> str:
+    """
+    Pick the response format from the request body and Accept header.
+
+    JSON is the default. NDJSON streaming is chosen with ``"stream": true`` or
+    by preferring ``application/x-ndjson``; Arrow IPC, Parquet and CSV are
+    chosen through the Accept header only.
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        str: Mimetype of the response
+    """
+    if data.get("stream"):
+        return NDJSON_MIMETYPE
+    best = request.accept_mimetypes.best_match(
+        [JSON_MIMETYPE, NDJSON_MIMETYPE, *DATAFRAME_ENCODERS]
+    )
+    return best or JSON_MIMETYPE
+
+
+def build_scrape_response(result: ScrapeResult, mimetype: str) -> Response:
+    """
+    Encode a result in the negotiated format.
+
+    Args:
+        result: Result being returned
+        mimetype: Output of :func:`negotiate_mimetype`
+
+    Returns:
+        Response: JSON, streamed NDJSON, or a columnar body whose count and
+        partial flag are sent as ``X-Result-Count`` / ``X-Result-Partial``
+    """
+    if mimetype == NDJSON_MIMETYPE:
+        logger.info("Streaming jobs as NDJSON")
+        summary = result_summary(result)
+        stream = dataframe_to_ndjson(result.jobs, summary, STREAM_CHUNK_ROWS)
+        return Response(stream, mimetype=NDJSON_MIMETYPE)
+
+    if mimetype in DATAFRAME_ENCODERS:
+        logger.info(f"Encoding jobs as {mimetype}")
+        body = DATAFRAME_ENCODERS[mimetype](result.jobs)
+        response = Response(body, mimetype=mimetype)
+        response.headers["X-Result-Count"] = str(len(result))
+        response.headers["X-Result-Partial"] = str(result.partial).lower()
+        return response
+
+    # Jobs are encoded column-wise straight to JSON, or reused from cache
+    return Response(render_result(result), mimetype=JSON_MIMETYPE)
+
+
+def respond_with_result(
+    result: ScrapeResult, stages: dict, mimetype: str, saved_search=None
+):
+    """
+    Answer a scrape request, or confirm the client's copy is still current.
+
+    The ETag is derived from the result's digest, so an ``If-None-Match`` hit
+    is answered with ``304 Not Modified`` without applying stages or encoding
+    the jobs. Saved search responses depend on earlier requests and carry no
+    ETag.
+
+    Args:
+        result: Scraped or cached result, before any stage
+        stages: Output of :func:`parse_stages`
+        mimetype: Output of :func:`negotiate_mimetype`
+        saved_search: Saved search the request runs, if any
+
+    Returns:
+        Response: The encoded result, or an empty 304, carrying a weak ETag
+    """
+    if saved_search is not None:
+        with timed_stage("postprocess"):
+            result = apply_stages(result, stages, saved_search)
+        with timed_stage("serialize"):
+            return build_scrape_response(result, mimetype)
+
+    etag = result_etag(result.digest, stages, mimetype, result.partial)
+    if request.if_none_match.contains_weak(etag):
+        logger.info("Result unchanged, responding 304 Not Modified")
+        response = Response(status=304)
+    else:
+        with timed_stage("postprocess"):
+            result = apply_stages(result, stages)
+        with timed_stage("serialize"):
+            response = build_scrape_response(result, mimetype)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def reject_saved_search(data: dict) -> None:
+    """
+    Refuse saved searches outside ``/scrape``.
+
+    Raises:
+        InvalidRequestError: If the request names a saved search
+    """
+    if parse_saved_search(data) is not None:
+        raise InvalidRequestError("saved_search is only supported by /scrape")
+
+
+def run_scrape(scrape_params: dict, deadline=None) -> ScrapeResult:
+    """
+    Call jobspy, fanning multi-site searches out to one task per site.
+
+    A site that fails, misses the deadline or has an open circuit breaker only
+    removes its own jobs; the error is reported on the result instead. If no
+    site succeeds the first error, a CircuitOpenError or a ScrapeTimeoutError
+    is raised.
+
+    Each call goes through a proxy of the pool unless the search passes its
+    own ``proxies``. While recording, calls are saved as fixtures; when
+    replaying, they are answered from fixtures instead of jobspy.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+
+    Returns:
+        ScrapeResult: Merged jobs with per-site timings and errors
+    """
+    scrape_fn = scrape_jobs if scrape_replayer is None else scrape_replayer
+    if scrape_recorder.enabled:
+        scrape_fn = scrape_recorder.wrap(scrape_fn)
+    if len(proxy_pool):
+        scrape_fn = proxy_pool.wrap(scrape_fn)
+    if metrics.enabled:
+        scrape_fn = metrics.wrap(scrape_fn)
+    sites = split_sites(scrape_params)
+    if not sites:
+        jobs = scrape_single(
+            scrape_fn, scrape_params, site_executor, deadline, breakers
+        )
+        return ScrapeResult(jobs)
+
+    logger.info(f"Scraping {len(sites)} sites in parallel: {', '.join(sites)}")
+    jobs, report, errors = scrape_sites(
+        scrape_fn, scrape_params, sites, site_executor, deadline, breakers
+    )
+    for error in errors:
+        logger.warning(f"Partial results, {error['site']} failed: {error['error']}")
+    return ScrapeResult(jobs, sites=report, errors=errors)
+
+
+def scrape_and_cache(
+    scrape_params: dict, key: str, use_cache: bool, recheck: bool, deadline=None
+):
+    """
+    Call jobspy and store the result, once per search across the host.
+
+    Holds the host-wide lock for the search while scraping. Partial results
+    where some sites failed are not stored. A worker that had
+    to wait for the lock first re-checks the shared cache, since the worker
+    holding it has usually just stored the same search. The wait ends at the
+    deadline, or after ``SCRAPE_LOCK_TIMEOUT`` without one; a stale cached
+    result is then served if there is one.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        key: Canonical key of the search
+        use_cache: Whether the result may be stored in the cache
+        recheck: Whether a cached result may be served after waiting
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+
+    Returns:
+        tuple: The ScrapeResult and the cache status
+
+    Raises:
+        ScrapeTimeoutError: If the lock was not free in time and nothing is
+            cached for the search
+    """
+    if not use_cache:
+        return scrape_locked(scrape_params, key, use_cache, recheck, deadline)
+
+    timeout = SCRAPE_LOCK_TIMEOUT if deadline is None else remaining_seconds(deadline)
+    try:
+        with single_flight.host_lock(key, timeout):
+            return scrape_locked(scrape_params, key, use_cache, recheck, deadline)
+    except HostLockTimeoutError as e:
+        result, stale = result_cache.lookup(key)
+        if result is None:
+            raise ScrapeTimeoutError(str(e)) from e
+        logger.warning(f"Serving {len(result)} cached jobs: {str(e)}")
+        return result, "STALE" if stale else "HIT"
+
+
+def scrape_locked(
+    scrape_params: dict, key: str, use_cache: bool, recheck: bool, deadline=None
+):
+    """
+    Body of :func:`scrape_and_cache`, run while holding the search's lock.
+
+    Returns:
+        tuple: The ScrapeResult and the cache status
+    """
+    if recheck and result_cache.shared:
+        result = result_cache.get(key)
+        if result is not None:
+            single_flight.record_host_coalesced()
+            logger.info(f"Serving {len(result)} jobs scraped by another worker")
+            return result, "COALESCED"
+
+    result = run_scrape(scrape_params, deadline)
+    logger.info(f"Successfully scraped {len(result)} jobs")
+    if archive_writer is not None:
+        archive_writer.submit(result.jobs)
+
+    if not use_cache:
+        return result, "BYPASS"
+    # Partial results are served but never cached
+    if not result.partial:
+        result_cache.set(key, result)
+    return result, "MISS"
+
+
+def refresh_search(scrape_params: dict, key: str, recheck: bool) -> ScrapeResult:
+    """
+    Scrape a search into the result cache in the background.
+
+    Refreshes coalesce with concurrent requests like ``/scrape`` does, and hold
+    the host-wide lock, so a search is never scraped twice at once.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        key: Canonical key of the search
+        recheck: Whether a fresh result stored meanwhile by another worker
+            may be kept instead of scraping again
+
+    Returns:
+        ScrapeResult: The refreshed, or already fresh, result
+    """
+    if not SCRAPE_COALESCING:
+        return scrape_and_cache(scrape_params, key, True, recheck)[0]
+
+    flight_key = key if recheck else f"{key}-{CACHE_REFRESH}"
+    (result, _), _ = single_flight.do(
+        flight_key, lambda: scrape_and_cache(scrape_params, key, True, recheck)
+    )
+    return result
+
+
+# Background refreshes of stale entries and, if enabled, popular searches
+refresher = Refresher(refresh_search, workers=REFRESH_AHEAD_WORKERS)
+refresh_scheduler = (
+    RefreshScheduler(
+        SearchPopularity(REFRESH_AHEAD_PATH),
+        result_cache,
+        refresher,
+        lock_path=os.path.join(SCRAPE_LOCK_DIR, "refresh-ahead.lock"),
+        top_n=REFRESH_AHEAD_TOP_N,
+        lead_time=REFRESH_AHEAD_LEAD_TIME,
+        window=REFRESH_AHEAD_WINDOW,
+        interval=REFRESH_AHEAD_INTERVAL,
+        site_budget=REFRESH_AHEAD_SITE_BUDGET,
+    )
+    if REFRESH_AHEAD and result_cache.enabled
+    else None
+)
+
+
+def lookup_or_scrape(scrape_params: dict, cache_mode=None, deadline=None):
+    """
+    Run a scrape, serving repeated searches from the result cache.
+
+    Concurrent requests for the same search are coalesced into one scrape
+    whose result they all share. An expired entry still within its stale
+    period is served immediately while the search is refreshed in the
+    background.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        cache_mode: None, ``"bypass"`` or ``"refresh"``
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+
+    Returns:
+        tuple: The ScrapeResult and the cache status (HIT, STALE, MISS,
+        BYPASS or COALESCED)
+    """
+    key = params_key(scrape_params)
+    use_cache = result_cache.enabled and cache_mode != CACHE_BYPASS
+    recheck = use_cache and cache_mode != CACHE_REFRESH
+
+    if use_cache and refresh_scheduler is not None:
+        refresh_scheduler.track(key, scrape_params)
+
+    if recheck:
+        result, stale = result_cache.lookup(key)
+        if result is not None and stale:
+            refresher.submit(key, scrape_params, recheck=True)
+            logger.info(f"Serving {len(result)} stale jobs while refreshing")
+            return result, "STALE"
+        if result is not None:
+            logger.info(f"Serving {len(result)} jobs from cache")
+            return result, "HIT"
+
+    if not SCRAPE_COALESCING:
+        return scrape_and_cache(scrape_params, key, use_cache, False, deadline)
+
+    # Requests that must not read the cache only coalesce with each other
+    flight_key = key if recheck else f"{key}-{cache_mode}"
+    (result, status), shared = single_flight.do(
+        flight_key,
+        lambda: scrape_and_cache(scrape_params, key, use_cache, recheck, deadline),
+        timeout=remaining_seconds(deadline),
+    )
+    if shared:
+        logger.info(f"Shared {len(result)} jobs from a concurrent identical request")
+        return result, "COALESCED"
+    return result, status
+
+
+def fetch_jobs(scrape_params: dict, cache_mode=None, deadline=None):
+    """
+    Run a search through :func:`lookup_or_scrape` and count its cache status.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        cache_mode: None, ``"bypass"`` or ``"refresh"``
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+
+    Returns:
+        tuple: The ScrapeResult and the cache status
+    """
+    result, status = lookup_or_scrape(scrape_params, cache_mode, deadline)
+    metrics.inc("jobscraper_cache_requests_total", status=status)
+    return result, status
+
+
+def log_scrape_params(scrape_params: dict) -> None:
+    """Log the parameters a scrape request passes to ``scrape_jobs``."""
+    # Debugging: print parameters being passed to scrape_jobs
+    logger.debug(f"Scraping parameters: {scrape_params}")
+
+    # Log info about the scrape request
+    logger.info(f"Starting job scrape with {len(scrape_params)} parameters")
+    if "search_term" in scrape_params:
+        logger.info(f"Search term: {scrape_params['search_term']}")
+    if "location" in scrape_params:
+        logger.info(f"Location: {scrape_params['location']}")
+
+
+def circuit_open_response(error: CircuitOpenError) -> Response:
+    """503 response for a search whose sites are all skipped by breakers."""
+    response = jsonify(
+        {
+            "success": False,
+            "error": str(error),
+            "message": "Site temporarily unavailable",
+            "sites": error.sites,
+        }
+    )
+    response.status_code = 503
+    response.headers["Retry-After"] = str(math.ceil(error.retry_after))
+    return response
 
 
 @app.route("/scrape", methods=["POST"])
@@ -64,90 +665,81 @@ def scrape_jobs_endpoint():
     Accepts POST parameters for scrape_jobs configuration.
     Returns JSON response with job data.
     """
+    # The deadline budget starts when the request arrives
+    request_start = time.monotonic()
+
     try:
         # Get parameters from POST request
-        data = request.get_json()
+        with timed_stage("parse"):
+            data = request.get_json()
+
+        if not data or not isinstance(data, dict):
+            logger.warning("Empty or non-object JSON payload received")
+            return invalid_body_response()
 
-        if not data:
-            logger.warning("Empty JSON payload received")
+        logger.info(f"Received scrape request: {data}")
+
+        # Extract all parameters without any defaults - only pass what's provided
+        scrape_params = extract_scrape_params(data)
+        cache_mode = parse_cache_mode(data)
+        stages = parse_stages(data)
+        saved = parse_saved_search(data)
+        deadline_ms = parse_deadline_ms(
+            data, SCRAPE_DEADLINE_MS, SCRAPE_MAX_DEADLINE_MS
+        )
+        deadline = request_start + deadline_ms / 1000 if deadline_ms else None
+
+        mimetype = negotiate_mimetype(data)
+        if not format_available(mimetype):
+            logger.warning(f"Requested unavailable response format: {mimetype}")
             return (
                 jsonify(
                     {
-                        "error": "Invalid request",
-                        "message": "Request body must be JSON with scraping parameters",
+                        "error": "Not acceptable",
+                        "message": f"{mimetype} responses require pyarrow",
                     }
                 ),
-                400,
+                406,
             )
 
-        logger.info(f"Received scrape request: {data}")
+        log_scrape_params(scrape_params)
 
-        # Extract all parameters without any defaults - only pass what's provided
-        scrape_params = {}
-
-        # List of all possible parameters
-        possible_params = [
-            "site_name",
-            "search_term",
-            "google_search_term",
-            "location",
-            "results_wanted",
-            "hours_old",
-            "country_indeed",
-            "distance",
-            "job_type",
-            "proxies",
-            "is_remote",
-            "easy_apply",
-            "user_agent",
-            "description_format",
-            "offset",
-            "verbose",
-            "linkedin_fetch_description",
-            "linkedin_company_ids",
-            "enforce_annual_salary",
-            "ca_cert",
-        ]
-
-        # Only include parameters that were actually provided
-        for param in possible_params:
-            if param in data:
-                scrape_params[param] = data[param]
-
-        # Debugging: print parameters being passed to scrape_jobs
-        logger.debug(f"Scraping parameters: {scrape_params}")
-
-        # Log info about the scrape request
-        logger.info(f"Starting job scrape with {len(scrape_params)} parameters")
-        if "search_term" in scrape_params:
-            logger.info(f"Search term: {scrape_params['search_term']}")
-        if "location" in scrape_params:
-            logger.info(f"Location: {scrape_params['location']}")
-
-        # Scrape jobs with only the provided parameters
-        jobs = scrape_jobs(**scrape_params)
-
-        logger.info(f"Successfully scraped {len(jobs)} jobs")
-
-        # Convert jobs to JSON-serializable format with proper NaN handling
-        jobs_data = dataframe_to_serializable_dict(jobs)
-
-        return jsonify({"success": True, "count": len(jobs), "jobs": jobs_data})
+        # Scrape jobs with only the provided parameters, or reuse a cached result
+        with timed_stage("scrape"):
+            result, cache_status = fetch_jobs(scrape_params, cache_mode, deadline)
+
+        saved_search = SavedSearchRun(seen_index, *saved) if saved else None
+        response = respond_with_result(result, stages, mimetype, saved_search)
+        response.headers["X-Cache"] = cache_status
+        return response
+
+    except InvalidRequestError as e:
+        logger.warning(f"Invalid scrape request: {str(e)}")
+        return jsonify({"error": "Invalid request", "message": str(e)}), 400
+
+    except CircuitOpenError as e:
+        logger.warning(f"Skipped scrape: {str(e)}")
+        return circuit_open_response(e)
+
+    except TimeoutError as e:
+        logger.error(f"Scrape deadline exceeded: {str(e)}")
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": str(e),
+                    "message": "Scrape deadline exceeded",
+                }
+            ),
+            504,
+        )
 
     except Exception as e:
         logger.error(f"Failed to scrape jobs: {str(e)}", exc_info=True)
 
         # Check if this is a JSON parsing error (BadRequest from Flask/Werkzeug)
         if hasattr(e, "code") and e.code == 400:
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid request",
-                        "message": "Request body must be JSON with scraping parameters",
-                    }
-                ),
-                400,
-            )
+            return invalid_body_response()
 
         return (
             jsonify(
@@ -157,6 +749,405 @@ def scrape_jobs_endpoint():
         )
 
 
+def stream_batch(groups: list, total: int, cache_mode, deadline_ms, stages: dict):
+    """
+    Run the unique searches of a batch and stream one NDJSON line per search.
+
+    Lines are written as searches complete, so they are not in request order;
+    each carries the ``index`` of its search. The last line is a trailer with
+    the number of searches that succeeded and failed.
+
+    Args:
+        groups: Output of :func:`group_searches`
+        total: Number of searches in the request, duplicates included
+        cache_mode: None, ``"bypass"`` or ``"refresh"``
+        deadline_ms: Time budget per search once it starts, or None
+        stages: Result stages applied to every search
+
+    Yields:
+        bytes: NDJSON lines
+    """
+
+    def scrape(scrape_params):
+        deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        result, cache_status = fetch_jobs(scrape_params, cache_mode, deadline)
+        return apply_stages(result, stages), cache_status
+
+    succeeded = 0
+    for indices, outcome, error in run_batch(groups, scrape, batch_executor):
+        if error is not None:
+            logger.warning(f"Batch search {indices[0]} failed: {str(error)}")
+            for index in indices:
+                item = {
+                    "index": index,
+                    "status": JOB_FAILED,
+                    "success": False,
+                    "error": str(error),
+                }
+                yield json.dumps(item).encode("utf-8") + b"\n"
+            continue
+
+        result, cache_status = outcome
+        fields = {
+            "status": JOB_SUCCEEDED,
+            "success": True,
+            "count": len(result),
+            "cache": cache_status,
+            **result_summary(result),
+        }
+        for index in indices:
+            succeeded += 1
+            line = render_json_payload({"index": index, **fields}, result.jobs_json)
+            yield line + b"\n"
+
+    trailer = {
+        "trailer": True,
+        "success": True,
+        "count": total,
+        "succeeded": succeeded,
+        "failed": total - succeeded,
+    }
+    yield json.dumps(trailer).encode("utf-8") + b"\n"
+
+
+@app.route("/scrape/batch", methods=["POST"])
+@require_token
+def scrape_batch_endpoint():
+    """
+    Run many searches in one request, streaming each result as NDJSON.
+    Accepts a "searches" list of /scrape parameter sets.
+    """
+    with timed_stage("parse"):
+        data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        logger.warning("Empty or non-object JSON payload received")
+        return invalid_body_response()
+
+    try:
+        searches = parse_batch_searches(data, SCRAPE_BATCH_MAX_SEARCHES)
+        cache_mode = parse_cache_mode(data)
+        stages = parse_stages(data)
+        reject_saved_search(data)
+        deadline_ms = parse_deadline_ms(
+            data, SCRAPE_DEADLINE_MS, SCRAPE_MAX_DEADLINE_MS
+        )
+    except InvalidRequestError as e:
+        logger.warning(f"Invalid batch request: {str(e)}")
+        return jsonify({"error": "Invalid request", "message": str(e)}), 400
+
+    groups = group_searches(searches)
+    logger.info(f"Received batch of {len(searches)} searches, {len(groups)} unique")
+
+    stream = stream_batch(groups, len(searches), cache_mode, deadline_ms, stages)
+    return Response(stream, mimetype=NDJSON_MIMETYPE)
+
+
+def run_background_job(
+    job_id: str, scrape_params: dict, cache_mode, deadline_ms, stages: dict
+):
+    """
+    Run a queued scrape job and store its outcome.
+
+    Jobs cancelled before they start are skipped, and the result of a job
+    cancelled while it ran is discarded.
+
+    Args:
+        job_id: Job id
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        cache_mode: None, ``"bypass"`` or ``"refresh"``
+        deadline_ms: Time budget once the job starts, or None for no deadline
+        stages: Result stages applied before the result is stored
+    """
+    try:
+        execute_background_job(job_id, scrape_params, cache_mode, deadline_ms, stages)
+    finally:
+        job_heartbeat.discard(job_id)
+
+
+def execute_background_job(
+    job_id: str, scrape_params: dict, cache_mode, deadline_ms, stages: dict
+):
+    """Body of :func:`run_background_job`, run while its heartbeat is sent."""
+    if not job_store.start(job_id):
+        logger.info(f"Skipping cancelled scrape job {job_id}")
+        return
+
+    deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+    try:
+        result, cache_status = fetch_jobs(scrape_params, cache_mode, deadline)
+        result = apply_stages(result, stages)
+    except Exception as e:
+        logger.error(f"Scrape job {job_id} failed: {str(e)}", exc_info=True)
+        job_store.finish(job_id, JOB_FAILED, error=str(e))
+        return
+
+    logger.info(f"Scrape job {job_id} found {len(result)} jobs ({cache_status})")
+    stored = job_store.finish(
+        job_id, JOB_SUCCEEDED, result=render_result(result), count=len(result)
+    )
+    if not stored:
+        logger.info(f"Discarding result of cancelled scrape job {job_id}")
+
+
+def job_not_found_response(job_id: str):
+    """Error response for an unknown or expired scrape job."""
+    return (
+        jsonify({"error": "Not found", "message": f"No scrape job with id {job_id}"}),
+        404,
+    )
+
+
+@app.route("/scrape/jobs", methods=["POST"])
+@require_token
+def create_scrape_job_endpoint():
+    """
+    Queue a scrape in the background and return its job id immediately.
+    Accepts the same parameters as /scrape.
+    """
+    with timed_stage("parse"):
+        data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        logger.warning("Empty or non-object JSON payload received")
+        return invalid_body_response()
+
+    try:
+        scrape_params = extract_scrape_params(data)
+        cache_mode = parse_cache_mode(data)
+        stages = parse_stages(data)
+        reject_saved_search(data)
+        # Jobs hold no connection open, so only a requested deadline applies
+        deadline_ms = parse_deadline_ms(data, 0, 0)
+    except InvalidRequestError as e:
+        logger.warning(f"Invalid scrape job request: {str(e)}")
+        return jsonify({"error": "Invalid request", "message": str(e)}), 400
+
+    if job_heartbeat.full():
+        logger.warning("Rejected scrape job, too many jobs pending")
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Too many requests",
+                    "message": "Too many scrape jobs pending, retry later",
+                }
+            ),
+            429,
+        )
+
+    job_id = job_store.create(canonical_params(scrape_params))
+    job_heartbeat.add(job_id)
+    job_executor.submit(
+        run_background_job, job_id, scrape_params, cache_mode, deadline_ms, stages
+    )
+    logger.info(f"Queued scrape job {job_id}")
+
+    response = jsonify({"success": True, "job_id": job_id, "status": JOB_QUEUED})
+    response.status_code = 202
+    response.headers["Location"] = url_for("scrape_job_endpoint", job_id=job_id)
+    return response
+
+
+@app.route("/scrape/jobs/<job_id>", methods=["GET"])
+@require_token
+def scrape_job_endpoint(job_id):
+    """
+    Report a scrape job's status, including the result once it succeeded.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return job_not_found_response(job_id)
+
+    fields = {
+        name: job[name]
+        for name in ("job_id", "status", "params", "created_at", "updated_at")
+    }
+    if job["status"] == JOB_FAILED:
+        fields["error"] = job["error"]
+    if job["status"] != JOB_SUCCEEDED:
+        return jsonify(fields)
+
+    # The stored /scrape payload is spliced in without decoding it
+    fields["count"] = job["count"]
+    body = render_json_payload(fields, job["result"], "result")
+    return Response(body, mimetype="application/json")
+
+
+@app.route("/scrape/jobs/<job_id>", methods=["DELETE"])
+@require_token
+def delete_scrape_job_endpoint(job_id):
+    """
+    Cancel a queued or running scrape job, or delete a finished one.
+    """
+    if job_store.cancel(job_id):
+        logger.info(f"Cancelled scrape job {job_id}")
+        return jsonify({"success": True, "job_id": job_id, "status": JOB_CANCELLED})
+    if job_store.delete(job_id):
+        logger.info(f"Deleted scrape job {job_id}")
+        return jsonify({"success": True, "job_id": job_id, "status": "deleted"})
+    return job_not_found_response(job_id)
+
+
+def saved_search_not_found_response(name: str):
+    """Error response for an unknown or expired saved search."""
+    return (
+        jsonify({"error": "Not found", "message": f"No saved search named {name}"}),
+        404,
+    )
+
+
+@app.route("/scrape/saved/<name>", methods=["GET"])
+@require_token
+def saved_search_endpoint(name):
+    """
+    Report a saved search's latest cursor and number of remembered jobs.
+    """
+    saved_search = seen_index.get(name)
+    if saved_search is None:
+        return saved_search_not_found_response(name)
+    return jsonify({"success": True, **saved_search})
+
+
+@app.route("/scrape/saved/<name>", methods=["DELETE"])
+@require_token
+def delete_saved_search_endpoint(name):
+    """
+    Forget a saved search, so its next run returns every job again.
+    """
+    if not seen_index.delete(name):
+        return saved_search_not_found_response(name)
+    logger.info(f"Deleted saved search {name}")
+    return jsonify({"success": True, "id": name, "status": "deleted"})
+
+
+@app.route("/jobs", methods=["GET"])
+@require_token
+def archived_jobs_endpoint():
+    """
+    Query the job archive, newest postings first, one page at a time.
+    """
+    if archive_writer is None:
+        return (
+            jsonify({"error": "Not found", "message": "The job archive is disabled"}),
+            404,
+        )
+
+    try:
+        query = parse_archive_query(request.args)
+    except InvalidRequestError as e:
+        logger.warning(f"Invalid archive query: {str(e)}")
+        return jsonify({"error": "Invalid request", "message": str(e)}), 400
+
+    records, next_cursor = job_archive.search(query)
+    fields = {"success": True, "count": len(records), "next_cursor": next_cursor}
+    # Records are stored encoded and returned without decoding them
+    jobs_json = ("[" + ",".join(records) + "]").encode("utf-8")
+    return Response(render_json_payload(fields, jobs_json), mimetype=JSON_MIMETYPE)
+
+
+@app.route("/breakers", methods=["GET"])
+@require_token
+def breakers_endpoint():
+    """
+    Report the circuit breaker state and recent calls of every site.
+    """
+    if breakers is None:
+        return (
+            jsonify({"error": "Not found", "message": "Circuit breakers are disabled"}),
+            404,
+        )
+    return jsonify({"success": True, "sites": breakers.states()})
+
+
+@app.route("/breakers/<site>", methods=["DELETE"])
+@require_token
+def reset_breaker_endpoint(site):
+    """
+    Close a site's circuit breaker so it is called again right away.
+    """
+    if breakers is None or not breakers.reset(site):
+        return (
+            jsonify(
+                {"error": "Not found", "message": f"No circuit breaker for {site}"}
+            ),
+            404,
+        )
+    logger.info(f"Reset circuit breaker of {site}")
+    return jsonify({"success": True, "site": site, "state": "closed"})
+
+
+@app.route("/proxies", methods=["GET"])
+@require_token
+def proxies_endpoint():
+    """
+    Report the health of every proxy of the pool, without credentials.
+    """
+    return jsonify({"success": True, "proxies": proxy_pool.report()})
+
+
+@app.route("/metrics", methods=["GET"])
+@require_token
+def metrics_endpoint():
+    """
+    Export Prometheus metrics summed over every worker process.
+    """
+    if not metrics.enabled:
+        return (
+            jsonify({"error": "Not found", "message": "Metrics are disabled"}),
+            404,
+        )
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+
+@app.route("/profiles/<profile_id>", methods=["GET"])
+@require_token
+def profile_endpoint(profile_id):
+    """
+    Return the report of a request profiled with ?profile=1.
+    Requires the profiling token in addition to the API token.
+    """
+    if not profile_authorized(
+        request.headers.get(PROFILE_TOKEN_HEADER), PROFILE_ACCESS_TOKEN
+    ):
+        return profile_forbidden_response()
+    report = profile_store.report(profile_id)
+    if report is None:
+        return (
+            jsonify(
+                {"error": "Not found", "message": f"No profile with id {profile_id}"}
+            ),
+            404,
+        )
+    return Response(report, mimetype="text/plain")
+
+
+@app.route("/stats")
+@require_token
+def stats_endpoint():
+    """
+    Report cache and request coalescing counters for this worker process.
+    """
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "cache": {
+                "backend": RESULT_CACHE_BACKEND,
+                "entries": len(result_cache),
+                "bytes": result_cache.total_bytes,
+                "hits": result_cache.hits,
+                "stale_hits": result_cache.stale_hits,
+                "misses": result_cache.misses,
+            },
+            "refresh": {
+                **refresher.stats(),
+                "scheduler": refresh_scheduler.stats() if refresh_scheduler else None,
+            },
+            "coalescing": single_flight.stats(),
+            "jobs": job_store.counts(),
+            "archive": archive_writer.stats() if archive_writer else None,
+        }
+    )
+
+
 @app.route("/health")
 def health_check():
     logger.info("Health check endpoint accessed")
@@ -167,6 +1158,131 @@ def health_check():
 def before_request():
     """Log basic request information"""
     logger.debug(f"Request: {request.method} {request.path}")
+    # Metrics are labelled by route, never by the raw path
+    if request.url_rule is not None:
+        request.environ[ENDPOINT_ENVIRON_KEY] = request.url_rule.rule
+    g.request_start = time.perf_counter()
+    if request.args.get("profile") == "1" and api_token_accepted():
+        return start_profile()
+
+
+def api_token_accepted() -> bool:
+    """
+    Check the API token of a request to a protected endpoint before its view.
+
+    Unauthenticated requests are not profiled; they go on to the endpoint,
+    which answers them with its usual 401 or 403.
+    """
+    view = app.view_functions.get(request.endpoint)
+    if not getattr(view, "requires_token", False):
+        return True
+    return token_valid()
+
+
+def profile_forbidden_response():
+    """403 response for profiling without a valid profiling token."""
+    logger.warning("Profiling refused: missing or invalid profiling token")
+    return (
+        jsonify(
+            {
+                "error": "Profiling not allowed",
+                "message": f"Profiling requires a valid {PROFILE_TOKEN_HEADER} header",
+            }
+        ),
+        403,
+    )
+
+
+def start_profile():
+    """
+    Run the current request under the profiler.
+
+    Returns:
+        None to go on with the request, or an error response when the
+        profiling token is invalid or another request is being profiled
+    """
+    if not profile_authorized(
+        request.headers.get(PROFILE_TOKEN_HEADER), PROFILE_ACCESS_TOKEN
+    ):
+        return profile_forbidden_response()
+    g.profiler = profile_store.start()
+    if g.profiler is None:
+        return (
+            jsonify(
+                {
+                    "error": "Conflict",
+                    "message": "Another request is being profiled, try again",
+                }
+            ),
+            409,
+        )
+    logger.info(f"Profiling {request.method} {request.path}")
+    return None
+
+
+# Registered before compress_response, so it runs after it and times it too
+@app.after_request
+def add_timing_headers(response: Response) -> Response:
+    """
+    Save the profile of a profiled request and add the Server-Timing header.
+
+    Streamed bodies are produced after this point, so neither includes them.
+    """
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        description = f"{request.method} {request.full_path} -> {response.status}"
+        response.headers[PROFILE_ID_HEADER] = profile_store.save(profiler, description)
+    if SERVER_TIMING and "request_start" in g:
+        stages = request.environ.get(STAGES_ENVIRON_KEY, {})
+        total = time.perf_counter() - g.request_start
+        response.headers["Server-Timing"] = server_timing(stages, total)
+    return response
+
+
+@app.teardown_request
+def stop_profile(error=None):
+    """Stop the profiler of a request that failed before its response."""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profile_store.stop(profiler)
+
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """
+    Compress successful JSON, NDJSON, Arrow and CSV responses.
+
+    The encoding is negotiated from ``Accept-Encoding``. Buffered bodies below
+    ``RESPONSE_COMPRESSION_MIN_BYTES`` are sent as is; streamed bodies are
+    compressed incrementally, one chunk at a time.
+    """
+    if (
+        not RESPONSE_COMPRESSION
+        or response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    level = RESPONSE_ZSTD_LEVEL if encoding == ZSTD_ENCODING else RESPONSE_GZIP_LEVEL
+
+    if response.is_streamed:
+        # Stream generators yield bytes and are closed by compress_stream
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        with timed_stage("compress"):
+            response.set_data(compress_body(body, encoding, level))
+
+    response.headers["Content-Encoding"] = encoding
+    return response
 
 
 if __name__ == "__main__":
@@ -0,0 +1,468 @@
+"""
+Persistent job archive with an indexed query API.
+
+Every freshly scraped result can be handed to an :class:`ArchiveWriter`, which
+bulk-inserts it into a local SQLite archive from a background thread, so the
+request that scraped it never waits on the write. ``GET /jobs`` queries the
+archive by site, company, location, posting date and full-text search over
+titles and descriptions, and pages through results with a keyset cursor.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+import pandas as pd
+
+from .filters import annual_top_salary
+from .params import InvalidRequestError
+from .serialization import dataframe_to_json_lines
+from .storage import SQLiteStore
+
+archive_logger = logging.getLogger(__name__)
+
+# Page size of GET /jobs when no limit is given, and the largest one allowed
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Indexed columns stored next to the full job record
+_COLUMNS = (
+    "job_key",
+    "site",
+    "title",
+    "company",
+    "location",
+    "date_posted",
+    "is_remote",
+    "annual_salary",
+    "description",
+    "data",
+)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _text_column(jobs: pd.DataFrame, name: str) -> list:
+    """Column values as strings, None where missing or absent."""
+    if name not in jobs:
+        return [None] * len(jobs)
+    values = jobs[name].to_numpy(dtype=object, na_value=None)
+    return [value if value is None else str(value) for value in values]
+
+
+def archive_rows(jobs: pd.DataFrame) -> list:
+    """
+    Convert a jobs DataFrame into archive rows.
+
+    Jobs are keyed by ``id``, falling back to ``job_url``; rows with neither
+    are skipped. ``date_posted`` is stored as an ISO date string, or an empty
+    string when missing so it can take part in keyset pagination. The top of
+    the salary range is stored converted to yearly pay, as the ``/scrape``
+    salary filter sees it, so ``min_salary`` compares like with like.
+
+    Args:
+        jobs: Jobs DataFrame as returned by ``scrape_jobs``
+
+    Returns:
+        list: One tuple of ``_COLUMNS`` values per archived job
+    """
+    if jobs.empty:
+        return []
+
+    keys = _text_column(jobs, "job_url")
+    keys = [
+        key if key is not None else url
+        for key, url in zip(_text_column(jobs, "id"), keys)
+    ]
+    if "date_posted" in jobs:
+        dates = pd.to_datetime(jobs["date_posted"], errors="coerce")
+        dates = dates.dt.strftime("%Y-%m-%d").fillna("").tolist()
+    else:
+        dates = [""] * len(jobs)
+    if "is_remote" in jobs:
+        remote = jobs["is_remote"].to_numpy(dtype=object, na_value=None)
+        remote = [value if value is None else int(bool(value)) for value in remote]
+    else:
+        remote = [None] * len(jobs)
+    salaries = annual_top_salary(jobs).to_numpy(dtype=object, na_value=None)
+
+    columns = zip(
+        keys,
+        _text_column(jobs, "site"),
+        _text_column(jobs, "title"),
+        _text_column(jobs, "company"),
+        _text_column(jobs, "location"),
+        dates,
+        remote,
+        salaries.tolist(),
+        _text_column(jobs, "description"),
+        dataframe_to_json_lines(jobs),
+    )
+    return [row for row in columns if row[0] is not None]
+
+
+def encode_cursor(date_posted: str, rowid: int) -> str:
+    """Encode the position after a row as an opaque pagination cursor."""
+    position = json.dumps([date_posted, rowid], separators=(",", ":"))
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        InvalidRequestError: If the cursor is malformed
+    """
+    try:
+        date_posted, rowid = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidRequestError("Invalid cursor") from None
+    if not isinstance(date_posted, str) or not isinstance(rowid, int):
+        raise InvalidRequestError("Invalid cursor")
+    return date_posted, rowid
+
+
+def _parse_text(value: str, name: str) -> str:
+    """Read a free-text query parameter."""
+    return value.strip()
+
+
+def _parse_match(value: str, name: str) -> str:
+    """Turn search text into an FTS5 query matching every word."""
+    words = _WORD_PATTERN.findall(value)
+    if not words:
+        raise InvalidRequestError(f"{name} must contain at least one word")
+    # Quoted words are matched literally, whatever FTS5 syntax they contain
+    return " ".join(f'"{word}"' for word in words)
+
+
+def _parse_bool(value: str, name: str) -> bool:
+    """Read a true/false query parameter."""
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise InvalidRequestError(f"{name} must be true or false")
+
+
+def _parse_date(value: str, name: str) -> str:
+    """Read a YYYY-MM-DD query parameter."""
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise InvalidRequestError(f"{name} must be a YYYY-MM-DD date") from None
+
+
+def _parse_number(value: str, name: str) -> float:
+    """Read a numeric query parameter."""
+    try:
+        return float(value)
+    except ValueError:
+        raise InvalidRequestError(f"{name} must be a number") from None
+
+
+# Parser of each single-valued query parameter, and the option it sets
+_QUERY_PARAMS = {
+    "q": ("match", _parse_match),
+    "company": ("company", _parse_text),
+    "location": ("location", _parse_text),
+    "posted_since": ("posted_since", _parse_date),
+    "posted_until": ("posted_until", _parse_date),
+    "is_remote": ("is_remote", _parse_bool),
+    "min_salary": ("min_salary", _parse_number),
+    "cursor": ("after", lambda value, name: decode_cursor(value)),
+}
+
+
+def parse_archive_query(args) -> dict:
+    """
+    Read the filters and paging options of a ``GET /jobs`` request.
+
+    Supported parameters are ``q`` (full-text search over title and
+    description), ``site`` (repeatable or comma-separated), ``company``
+    (exact, ignoring case), ``location`` (prefix, ignoring case),
+    ``posted_since`` and ``posted_until`` (``YYYY-MM-DD``), ``is_remote``,
+    ``min_salary``, ``limit`` and ``cursor``.
+
+    Args:
+        args: The request's query parameters
+
+    Returns:
+        dict: Validated options for :meth:`JobArchive.search`
+
+    Raises:
+        InvalidRequestError: If a parameter is invalid
+    """
+    query = {}
+    for name, (option, parse) in _QUERY_PARAMS.items():
+        value = args.get(name, "").strip()
+        if value:
+            query[option] = parse(value, name)
+
+    sites = [
+        site.strip().lower()
+        for value in args.getlist("site")
+        for site in value.split(",")
+        if site.strip()
+    ]
+    if sites:
+        query["sites"] = sites
+
+    limit = args.get("limit", str(DEFAULT_PAGE_SIZE))
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        raise InvalidRequestError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    query["limit"] = int(limit)
+    return query
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so a value is matched as a literal prefix."""
+    return re.sub(r"([%_\\])", r"\\\1", value) + "%"
+
+
+# SQL condition of each single-valued search option, and how its value is bound
+_CONDITIONS = {
+    "match": (
+        "rowid IN (SELECT rowid FROM archived_jobs_fts "
+        "WHERE archived_jobs_fts MATCH ?)",
+        str,
+    ),
+    "company": ("company = ?", str),
+    "location": ("location LIKE ? ESCAPE '\\'", _escape_like),
+    "posted_since": ("date_posted >= ?", str),
+    "posted_until": ("date_posted != '' AND date_posted <= ?", str),
+    "is_remote": ("is_remote = ?", int),
+    "min_salary": ("annual_salary >= ?", float),
+}
+
+
+class JobArchive(SQLiteStore):
+    """
+    Archive of every job scraped on this host, in a SQLite file.
+
+    Jobs are upserted by id, so repeated scrapes refresh a posting instead of
+    duplicating it. The full record is kept as encoded JSON and returned as
+    is; the columns used for filtering are stored and indexed next to it, and
+    an FTS5 index covers titles and descriptions.
+
+    Args:
+        path: SQLite database file, created if missing
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS archived_jobs ("
+        "job_key TEXT NOT NULL UNIQUE, site TEXT, title TEXT, "
+        "company TEXT COLLATE NOCASE, location TEXT COLLATE NOCASE, "
+        "date_posted TEXT NOT NULL, is_remote INTEGER, annual_salary REAL, "
+        "description TEXT, data TEXT NOT NULL, "
+        "first_seen REAL NOT NULL, last_seen REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS archived_jobs_site ON archived_jobs (site)",
+        "CREATE INDEX IF NOT EXISTS archived_jobs_company ON archived_jobs (company)",
+        "CREATE INDEX IF NOT EXISTS archived_jobs_location "
+        "ON archived_jobs (location)",
+        "CREATE INDEX IF NOT EXISTS archived_jobs_date_posted "
+        "ON archived_jobs (date_posted)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS archived_jobs_fts USING fts5("
+        "title, description, content='archived_jobs', content_rowid='rowid')",
+        # Keep the full-text index in step with the table
+        "CREATE TRIGGER IF NOT EXISTS archived_jobs_insert "
+        "AFTER INSERT ON archived_jobs BEGIN "
+        "INSERT INTO archived_jobs_fts (rowid, title, description) "
+        "VALUES (new.rowid, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS archived_jobs_delete "
+        "AFTER DELETE ON archived_jobs BEGIN "
+        "INSERT INTO archived_jobs_fts (archived_jobs_fts, rowid, title, description) "
+        "VALUES ('delete', old.rowid, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS archived_jobs_update "
+        "AFTER UPDATE ON archived_jobs "
+        "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+        "BEGIN "
+        "INSERT INTO archived_jobs_fts (archived_jobs_fts, rowid, title, description) "
+        "VALUES ('delete', old.rowid, old.title, old.description); "
+        "INSERT INTO archived_jobs_fts (rowid, title, description) "
+        "VALUES (new.rowid, new.title, new.description); END",
+    )
+
+    def __len__(self) -> int:
+        query = "SELECT COUNT(*) FROM archived_jobs"
+        return self.connection().execute(query).fetchone()[0]
+
+    def insert(self, rows: list) -> None:
+        """
+        Upsert archive rows in a single transaction.
+
+        Args:
+            rows: Output of :func:`archive_rows`
+        """
+        if not rows:
+            return
+        now = time.time()
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+        with self.transaction() as conn:
+            conn.executemany(
+                f"INSERT INTO archived_jobs ({', '.join(_COLUMNS)}, "
+                f"first_seen, last_seen) "
+                f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))}) "
+                f"ON CONFLICT (job_key) DO UPDATE SET {updates}, "
+                f"last_seen = excluded.last_seen",
+                [(*row, now, now) for row in rows],
+            )
+
+    def search(self, query: dict) -> tuple:
+        """
+        Find archived jobs, newest posting first.
+
+        Args:
+            query: Output of :func:`parse_archive_query`
+
+        Returns:
+            tuple: The matching jobs' encoded JSON records, and the cursor of
+            the next page or None on the last page
+        """
+        conditions = []
+        args = []
+        for option, (condition, bind) in _CONDITIONS.items():
+            if option in query:
+                conditions.append(condition)
+                args.append(bind(query[option]))
+        if "sites" in query:
+            conditions.append(f"site IN ({', '.join('?' * len(query['sites']))})")
+            args.extend(query["sites"])
+        if "after" in query:
+            conditions.append("(date_posted, rowid) < (?, ?)")
+            args.extend(query["after"])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = (
+            self.connection()
+            .execute(
+                f"SELECT rowid, date_posted, data FROM archived_jobs {where} "
+                f"ORDER BY date_posted DESC, rowid DESC LIMIT ?",
+                (*args, query["limit"] + 1),
+            )
+            .fetchall()
+        )
+
+        page = rows[: query["limit"]]
+        next_cursor = None
+        if len(rows) > query["limit"]:
+            rowid, date_posted, _ = page[-1]
+            next_cursor = encode_cursor(date_posted, rowid)
+        return [data for _, _, data in page], next_cursor
+
+    def clear(self) -> None:
+        """Delete every archived job."""
+        self.connection().execute("DELETE FROM archived_jobs")
+
+
+class ArchiveWriter:
+    """
+    Write-behind sink feeding scrape results into a :class:`JobArchive`.
+
+    :meth:`submit` only queues the DataFrame. A background thread, started on
+    first use in each process, converts queued results and inserts them in
+    batches of up to ``batch_rows`` rows, waiting at most ``flush_interval``
+    seconds for a batch to fill. When the queue is full new results are
+    dropped rather than slowing down requests.
+
+    Args:
+        archive: Archive the results are written to
+        batch_rows: Rows collected before a batch is written
+        flush_interval: Seconds a partial batch waits for more results
+        max_pending: Results queued before new ones are dropped
+    """
+
+    def __init__(
+        self,
+        archive: JobArchive,
+        batch_rows: int,
+        flush_interval: float,
+        max_pending: int,
+    ):
+        self.archive = archive
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(self, jobs: pd.DataFrame) -> bool:
+        """
+        Queue a scrape result for archiving without blocking.
+
+        Args:
+            jobs: Jobs DataFrame
+
+        Returns:
+            bool: False if the queue was full and the result was dropped
+        """
+        if jobs.empty:
+            return True
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(jobs)
+        except queue.Full:
+            self.dropped += 1
+            archive_logger.warning(f"Archive queue full, dropped {len(jobs)} jobs")
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Block until every queued result has been written."""
+        self._queue.join()
+
+    def stats(self) -> dict:
+        """Rows written, results dropped and results waiting in this process."""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize(),
+        }
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread, again after a fork."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            thread = threading.Thread(
+                target=self._run, name="archive-writer", daemon=True
+            )
+            thread.start()
+
+    def _run(self) -> None:
+        """Collect queued results into batches and write them."""
+        while True:
+            frames = [self._queue.get()]
+            rows = len(frames[0])
+            deadline = time.monotonic() + self.flush_interval
+            while rows < self.batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    frames.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                rows += len(frames[-1])
+
+            try:
+                batch = [row for frame in frames for row in archive_rows(frame)]
+                self.archive.insert(batch)
+                self.written += len(batch)
+                archive_logger.debug(f"Archived {len(batch)} jobs")
+            except Exception as e:
+                archive_logger.error(f"Failed to archive jobs: {e}", exc_info=True)
+            finally:
+                for _ in frames:
+                    self._queue.task_done()
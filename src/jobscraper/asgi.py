@@ -0,0 +1,287 @@
+"""
+ASGI serving mode with a bounded request executor and backpressure.
+
+Under gunicorn's ``gthread`` workers every request holds a thread for as long
+as its scrape takes, so concurrency is capped at workers times threads and
+further requests wait unseen in the socket backlog. In this mode an ASGI
+server such as uvicorn holds the connections on its event loop, which costs
+little per idle connection, and requests run through the same Flask app on a
+bounded pool of threads. Every endpoint keeps its responses and its
+authentication.
+
+Like ``config/gunicorn.conf.py``, this module defaults
+``RESULT_CACHE_BACKEND`` to ``sqlite`` so uvicorn workers share results. The
+default only applies when this module is imported before ``jobscraper.app``,
+as it is by uvicorn; set the variable explicitly otherwise.
+
+Once every thread is busy and ``queue_size`` requests are waiting for one,
+new requests are rejected right away with ``429 Too Many Requests`` and a
+``Retry-After`` estimate. ``/health`` is answered on the event loop, so it
+responds while the pool is saturated.
+
+Run with::
+
+    uvicorn src.jobscraper.asgi:app --host 0.0.0.0 --port 8080 --workers 4
+"""
+
+import asyncio
+import io
+import json
+import logging
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Share the result cache between workers unless configured otherwise; the
+# config is read when the app is imported below
+os.environ.setdefault("RESULT_CACHE_BACKEND", "sqlite")
+
+from .app import app as flask_app  # noqa: E402
+from .app import metrics  # noqa: E402
+from .config import ASGI_QUEUE_SIZE, ASGI_REQUEST_THREADS  # noqa: E402
+
+asgi_logger = logging.getLogger(__name__)
+
+# Cheap paths answered on the event loop instead of the request threads
+INLINE_PATHS = ("/health",)
+
+# Weight of the newest request in the average request duration
+DURATION_EWMA_ALPHA = 0.2
+
+
+def build_environ(scope: dict, body: bytes) -> dict:
+    """
+    Translate an ASGI HTTP scope into a WSGI environ.
+
+    Args:
+        scope: ASGI connection scope of an ``http`` request
+        body: Complete request body
+
+    Returns:
+        dict: WSGI environ for the request
+    """
+    server = scope.get("server") or ("localhost", None)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI carries paths as bytes decoded with latin-1
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def run_wsgi(wsgi_app, environ: dict, emit) -> None:
+    """
+    Call a WSGI app and pass its response on as ASGI messages.
+
+    The response starts with the first non-empty body chunk, so streamed
+    bodies are sent as they are produced. The body is always closed, which
+    is where the metrics middleware records the request.
+
+    Args:
+        wsgi_app: WSGI application
+        environ: Output of :func:`build_environ`
+        emit: Callable sending one ASGI message, blocking until it is sent
+    """
+    response = {"started": False}
+
+    def start():
+        if not response["started"]:
+            response["started"] = True
+            emit(
+                {
+                    "type": "http.response.start",
+                    "status": response["status"],
+                    "headers": response["headers"],
+                }
+            )
+
+    def write(data: bytes) -> None:
+        if data:
+            start()
+            emit({"type": "http.response.body", "body": data, "more_body": True})
+
+    def start_response(status: str, headers: list, exc_info=None):
+        if exc_info and response["started"]:
+            raise exc_info[1].with_traceback(exc_info[2])
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ]
+        return write
+
+    body = wsgi_app(environ, start_response)
+    try:
+        for chunk in body:
+            write(chunk)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    start()
+    emit({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def read_body(receive):
+    """
+    Read the complete body of a request.
+
+    Returns:
+        bytes or None: The body, or None if the client disconnected
+    """
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+class BoundedAsgiApp:
+    """
+    Serves a WSGI app over ASGI on a bounded pool of threads.
+
+    Args:
+        wsgi_app: WSGI application handling every request
+        threads: Requests run at the same time
+        queue_size: Requests that may wait for a thread before new ones are
+            rejected with 429
+        inline_paths: Paths run on the event loop, for cheap endpoints that
+            must answer under load
+    """
+
+    def __init__(
+        self,
+        wsgi_app,
+        threads: int,
+        queue_size: int,
+        inline_paths=INLINE_PATHS,
+    ):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.queue_size = queue_size
+        self.inline_paths = frozenset(inline_paths)
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="asgi-request"
+        )
+        # Running and waiting requests; only changed on the event loop
+        self.admitted = 0
+        self._duration = 1.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            await send({"type": "websocket.close"})
+
+    def retry_after(self) -> int:
+        """Seconds until a thread is likely free, from the average request."""
+        waiting = max(0, self.admitted - self.threads)
+        return max(1, math.ceil(self._duration * (waiting + 1) / self.threads))
+
+    async def _http(self, scope, receive, send):
+        """Run one request inline or on the pool, or reject it."""
+        if scope["path"] in self.inline_paths:
+            body = await read_body(receive)
+            if body is not None:
+                messages = []
+                run_wsgi(self.wsgi_app, build_environ(scope, body), messages.append)
+                for message in messages:
+                    await send(message)
+            return
+
+        if self.admitted >= self.threads + self.queue_size:
+            await self._reject(send)
+            return
+
+        self.admitted += 1
+        try:
+            body = await read_body(receive)
+            if body is not None:
+                await self._run(build_environ(scope, body), send)
+        finally:
+            self.admitted -= 1
+
+    async def _run(self, environ: dict, send):
+        """Run a request on the pool and track how long requests take."""
+        loop = asyncio.get_running_loop()
+
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def handle():
+            metrics.inc("jobscraper_requests_queued", -1)
+            run_wsgi(self.wsgi_app, environ, emit)
+
+        start = loop.time()
+        metrics.inc("jobscraper_requests_queued")
+        await loop.run_in_executor(self.executor, handle)
+        duration = loop.time() - start
+        self._duration += DURATION_EWMA_ALPHA * (duration - self._duration)
+
+    async def _reject(self, send):
+        """429 response for a request that found the queue full."""
+        retry_after = self.retry_after()
+        metrics.inc("jobscraper_requests_rejected_total")
+        asgi_logger.debug(f"Request queue full, retry after {retry_after}s")
+        body = json.dumps(
+            {
+                "success": False,
+                "error": "Too many requests",
+                "message": "Server is at capacity, retry later",
+            }
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(retry_after).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        """Acknowledge startup and stop the pool on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = BoundedAsgiApp(
+    flask_app, threads=ASGI_REQUEST_THREADS, queue_size=ASGI_QUEUE_SIZE
+)
@@ -4,11 +4,13 @@ Uses environment variable for token configuration.
 """
 
 import logging
+import time
 from functools import wraps
 
 from flask import jsonify, request
 
 from .config import API_ACCESS_TOKEN
+from .metrics import record_stage
 
 # Configure logger for auth module
 auth_logger = logging.getLogger(__name__)
@@ -25,6 +27,20 @@ def get_required_token():
     return API_ACCESS_TOKEN
 
 
+def token_valid() -> bool:
+    """
+    Check the current request's access token without answering it.
+
+    Returns:
+        bool: Whether the Authorization header carries the configured token
+    """
+    try:
+        required_token = get_required_token()
+    except ValueError:
+        return False
+    return request.headers.get("Authorization") == f"Bearer {required_token}"
+
+
 def require_token(f):
     """
     Decorator to require valid access token for API endpoints.
@@ -33,6 +49,7 @@ def require_token(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        start = time.perf_counter()
         try:
             required_token = get_required_token()
             auth_logger.debug(
@@ -98,7 +115,10 @@ def require_token(f):
             )
 
         auth_logger.info("Access token validated successfully")
+        record_stage("auth", time.perf_counter() - start)
         # Token is valid, proceed with the request
         return f(*args, **kwargs)
 
+    # Lets request hooks tell protected endpoints apart
+    decorated_function.requires_token = True
     return decorated_function
@@ -0,0 +1,327 @@
+"""
+Background scrape jobs.
+
+``POST /scrape/jobs`` queues a scrape on a dedicated thread pool and returns a
+job id straight away, so long scrapes no longer hold an HTTP worker thread.
+Job state and finished results live in a SQLite file shared by every worker
+process on the host, so any worker can answer status requests and cancel a
+job queued by another one. Finished jobs are removed after a retention period.
+
+Each worker refreshes the ``updated_at`` of its queued and running jobs with a
+:class:`JobHeartbeat`. Jobs whose worker stopped, and with it the heartbeat,
+are marked failed once they have not been refreshed for ``stale_after``
+seconds.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .storage import SQLiteStore
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_PENDING = (JOB_QUEUED, JOB_RUNNING)
+JOB_FINISHED = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# Error of jobs whose worker stopped before they finished
+JOB_LOST = "Worker stopped before the job finished"
+
+background_logger = logging.getLogger(__name__)
+
+
+class BackgroundJobStore(SQLiteStore):
+    """
+    State and results of background scrape jobs, shared across processes.
+
+    Status changes are conditional updates, so a job cancelled while it runs
+    stays cancelled and its result is discarded when the scrape returns.
+
+    Args:
+        path: SQLite database file, created if missing
+        retention: Seconds finished jobs and their results are kept
+        stale_after: Seconds without a heartbeat after which a queued or
+            running job is marked failed; 0 to never fail them
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+        "count INTEGER, error TEXT, result BLOB)",
+        "CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)",
+    )
+
+    def __init__(self, path: str, retention: float, stale_after: float = 0):
+        super().__init__(path)
+        self.retention = retention
+        self.stale_after = stale_after
+
+    def create(self, params: dict) -> str:
+        """
+        Record a new queued job, fail stale ones and purge expired ones.
+
+        Args:
+            params: Canonical scrape parameters, kept for status responses
+
+        Returns:
+            str: The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, json.dumps(params, default=str), now, now),
+            )
+            self._purge(conn, now)
+        return job_id
+
+    def start(self, job_id: str) -> bool:
+        """
+        Mark a queued job as running.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            bool: False if the job was cancelled or removed before it started
+        """
+        return self._transition(job_id, JOB_QUEUED, JOB_RUNNING)
+
+    def finish(self, job_id: str, status: str, result=None, count=None, error=None):
+        """
+        Record the outcome of a running job.
+
+        Args:
+            job_id: Job id
+            status: ``"succeeded"`` or ``"failed"``
+            result: Encoded JSON result payload of a successful job
+            count: Number of jobs found
+            error: Error message of a failed job
+
+        Returns:
+            bool: False if the job was cancelled while it ran
+        """
+        return self._transition(
+            job_id, JOB_RUNNING, status, result=result, count=count, error=error
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        A running scrape cannot be interrupted; it finishes in the background
+        and its result is discarded.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            bool: False if the job is unknown or already finished
+        """
+        cursor = self.connection().execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE id = ? AND status IN (?, ?)",
+            (JOB_CANCELLED, time.time(), job_id, *JOB_PENDING),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, job_id: str) -> bool:
+        """
+        Remove a job and its result.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            bool: Whether the job existed
+        """
+        cursor = self.connection().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_ids) -> int:
+        """
+        Mark queued or running jobs as still owned by a live worker.
+
+        Args:
+            job_ids: Ids of the jobs this process queued and has not finished
+
+        Returns:
+            int: Number of jobs refreshed
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        placeholders = ", ".join("?" * len(job_ids))
+        cursor = self.connection().execute(
+            "UPDATE jobs SET updated_at = ? "
+            f"WHERE id IN ({placeholders}) AND status IN (?, ?)",
+            (time.time(), *job_ids, *JOB_PENDING),
+        )
+        return cursor.rowcount
+
+    def get(self, job_id: str):
+        """
+        Look up a job that has not expired.
+
+        A queued or running job without a recent heartbeat is reported, and
+        stored, as failed.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            dict or None: ``job_id``, ``status``, ``params``, timestamps,
+            ``count``, ``error`` and the encoded ``result``, or None
+        """
+        conn = self.connection()
+        self._fail_stale(conn, time.time())
+        row = conn.execute(
+            "SELECT status, params, created_at, updated_at, count, error, result "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        status, params, created_at, updated_at, count, error, result = row
+        if status in JOB_FINISHED and updated_at + self.retention <= time.time():
+            return None
+        return {
+            "job_id": job_id,
+            "status": status,
+            "params": json.loads(params),
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "count": count,
+            "error": error,
+            "result": result,
+        }
+
+    def counts(self) -> dict:
+        """
+        Count jobs by status.
+
+        Returns:
+            dict: Number of jobs per status
+        """
+        conn = self.connection()
+        self._fail_stale(conn, time.time())
+        rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(rows.fetchall())
+
+    def clear(self) -> None:
+        """Remove every job."""
+        self.connection().execute("DELETE FROM jobs")
+
+    def _transition(self, job_id: str, current: str, status: str, **fields) -> bool:
+        """Move a job from ``current`` to ``status``, setting extra columns."""
+        columns = "".join(f", {name} = ?" for name in fields)
+        cursor = self.connection().execute(
+            f"UPDATE jobs SET status = ?, updated_at = ?{columns} "
+            "WHERE id = ? AND status = ?",
+            (status, time.time(), *fields.values(), job_id, current),
+        )
+        return cursor.rowcount > 0
+
+    def _fail_stale(self, conn, now: float) -> None:
+        """Fail queued and running jobs whose worker stopped sending heartbeats."""
+        if not self.stale_after:
+            return
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+            "WHERE updated_at <= ? AND status IN (?, ?)",
+            (JOB_FAILED, JOB_LOST, now, now - self.stale_after, *JOB_PENDING),
+        )
+        if cursor.rowcount:
+            background_logger.warning(f"Failed {cursor.rowcount} abandoned jobs")
+
+    def _purge(self, conn, now: float) -> None:
+        """Fail stale jobs and delete finished ones older than the retention."""
+        self._fail_stale(conn, now)
+        conn.execute(
+            "DELETE FROM jobs WHERE updated_at <= ? AND status IN (?, ?, ?)",
+            (now - self.retention, *JOB_FINISHED),
+        )
+
+
+class JobHeartbeat:
+    """
+    Jobs queued by this process, kept alive in the shared store.
+
+    A background thread, started on first use in each process, refreshes the
+    jobs every ``interval`` seconds until they are discarded. The number of
+    tracked jobs also caps how many jobs a process accepts.
+
+    Args:
+        store: Store the jobs are kept in
+        interval: Seconds between heartbeats; below the store's
+            ``stale_after``
+        max_pending: Queued and running jobs this process accepts
+    """
+
+    def __init__(self, store: BackgroundJobStore, interval: float, max_pending: int):
+        self.store = store
+        self.interval = interval
+        self.max_pending = max_pending
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def add(self, job_id: str) -> None:
+        """Start sending heartbeats for a job."""
+        self._ensure_thread()
+        with self._lock:
+            self._jobs.add(job_id)
+
+    def discard(self, job_id: str) -> None:
+        """Stop sending heartbeats for a finished or skipped job."""
+        with self._lock:
+            self._jobs.discard(job_id)
+
+    def full(self) -> bool:
+        """Whether this process has as many pending jobs as it accepts."""
+        with self._lock:
+            return len(self._jobs) >= self.max_pending
+
+    def beat(self) -> int:
+        """
+        Refresh every tracked job once.
+
+        Returns:
+            int: Number of jobs refreshed
+        """
+        with self._lock:
+            job_ids = list(self._jobs)
+        return self.store.heartbeat(job_ids)
+
+    def _ensure_thread(self) -> None:
+        """Start the heartbeat thread, again after a fork."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            # Jobs queued before a fork never run in the child
+            self._thread_pid = os.getpid()
+            self._jobs = set()
+            thread = threading.Thread(
+                target=self._run, name="scrape-job-heartbeat", daemon=True
+            )
+            thread.start()
+
+    def _run(self) -> None:
+        """Send a heartbeat every interval."""
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.beat()
+            except Exception as e:
+                background_logger.error(f"Job heartbeat failed: {e}", exc_info=True)
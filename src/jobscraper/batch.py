@@ -0,0 +1,91 @@
+"""
+Batch scrape requests.
+
+``POST /scrape/batch`` runs many searches in one call. Identical searches in a
+batch are scraped once, and the unique ones run concurrently on a bounded
+pool, yielding each result as soon as it is ready.
+"""
+
+from concurrent.futures import Executor, as_completed
+
+from .params import InvalidRequestError, extract_scrape_params, params_key
+
+
+def parse_batch_searches(data: dict, max_searches: int) -> list:
+    """
+    Read the searches of a batch request.
+
+    Each search is filtered through the same parameter whitelist as ``/scrape``.
+
+    Args:
+        data: Parsed JSON request body
+        max_searches: Maximum number of searches in one batch
+
+    Returns:
+        list: Keyword arguments for ``scrape_jobs``, one dict per search
+
+    Raises:
+        InvalidRequestError: If the body is not an object, ``searches`` is
+            not a non-empty list of objects or holds more than
+            ``max_searches`` entries
+    """
+    if not isinstance(data, dict):
+        raise InvalidRequestError("Request body must be a JSON object")
+    searches = data.get("searches")
+    if not isinstance(searches, list) or not searches:
+        raise InvalidRequestError("searches must be a non-empty list of objects")
+    if not all(isinstance(search, dict) for search in searches):
+        raise InvalidRequestError("searches must be a non-empty list of objects")
+    if len(searches) > max_searches:
+        raise InvalidRequestError(
+            f"A batch may contain at most {max_searches} searches"
+        )
+    return [extract_scrape_params(search) for search in searches]
+
+
+def group_searches(searches: list) -> list:
+    """
+    Group identical searches so each is only scraped once.
+
+    Args:
+        searches: Keyword arguments for ``scrape_jobs``, one dict per search
+
+    Returns:
+        list: ``(params, indices)`` pairs in order of first appearance, where
+        ``indices`` are the positions of every equivalent search
+    """
+    groups = {}
+    for index, params in enumerate(searches):
+        key = params_key(params)
+        if key in groups:
+            groups[key][1].append(index)
+        else:
+            groups[key] = (params, [index])
+    return list(groups.values())
+
+
+def run_batch(groups: list, fn, executor: Executor):
+    """
+    Run one call per unique search and yield outcomes as they complete.
+
+    Calls not yet started are cancelled if the consumer stops early, for
+    example because the client disconnected.
+
+    Args:
+        groups: Output of :func:`group_searches`
+        fn: Called with each unique search's parameters
+        executor: Bounded pool the calls run on
+
+    Yields:
+        tuple: Indices of the searches answered, the return value of ``fn``
+        and None, or None and the exception it raised
+    """
+    futures = {executor.submit(fn, params): indices for params, indices in groups}
+    try:
+        for future in as_completed(futures):
+            error = future.exception()
+            value = None if error is not None else future.result()
+            yield futures[future], value, error
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,244 @@
+"""
+Per-site circuit breakers shared by every worker on the host.
+
+Each job board has a breaker that starts closed. Outcomes of calls to a site
+are recorded in a SQLite file; once at least ``min_calls`` calls were made
+within ``window`` seconds and the share of failures reaches
+``failure_threshold``, the breaker opens and the site is skipped without
+calling it. After ``cooldown`` seconds a single probe call is let through
+(half-open): success closes the breaker, failure opens it for another
+cooldown. Only :data:`UPSTREAM_ERRORS` count as failures; errors caused by
+the search itself, such as an invalid parameter, say nothing about the site.
+"""
+
+import logging
+import time
+
+from .storage import SQLiteStore
+
+breaker_logger = logging.getLogger(__name__)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+CIRCUIT_OPEN = "Circuit open"
+
+# Network, HTTP and timeout errors; requests' exceptions are OSErrors too
+UPSTREAM_ERRORS = (OSError,)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when every site of a search was skipped by an open breaker.
+
+    Args:
+        sites: Sites that were skipped
+        retry_after: Seconds until the first of them accepts a probe call
+    """
+
+    def __init__(self, sites: list, retry_after: float):
+        super().__init__(f"{CIRCUIT_OPEN} for {', '.join(sites)}")
+        self.sites = sites
+        self.retry_after = retry_after
+
+
+class SiteBreakers(SQLiteStore):
+    """
+    Circuit breakers keyed by site name, kept in a SQLite file.
+
+    Args:
+        path: SQLite database file, created if missing
+        failure_threshold: Share of failed calls, between 0 and 1, that opens
+            a breaker
+        min_calls: Calls within the window needed before a breaker can open
+        window: Seconds of call outcomes the failure share is computed over
+        cooldown: Seconds an open breaker rejects calls before a probe
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS site_breakers ("
+        "site TEXT PRIMARY KEY, state TEXT NOT NULL, changed_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS site_calls ("
+        "site TEXT NOT NULL, called_at REAL NOT NULL, failed INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS site_calls_site ON site_calls (site, called_at)",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        failure_threshold: float,
+        min_calls: int,
+        window: float,
+        cooldown: float,
+    ):
+        super().__init__(path)
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+
+    def allow(self, site: str) -> bool:
+        """
+        Check whether a site may be called now.
+
+        A closed breaker always allows the call. Once an open breaker has
+        cooled down, exactly one caller across the host is let through as the
+        probe; a probe that never reports back is replaced after another
+        cooldown.
+
+        Args:
+            site: Site name
+
+        Returns:
+            bool: False if the site must be skipped
+        """
+        conn = self.connection()
+        row = conn.execute(
+            "SELECT state, changed_at FROM site_breakers WHERE site = ?", (site,)
+        ).fetchone()
+        if row is None or row[0] == BREAKER_CLOSED:
+            return True
+
+        state, changed_at = row
+        now = time.time()
+        if now < changed_at + self.cooldown:
+            return False
+        # Only the caller whose update wins becomes the probe
+        claimed = conn.execute(
+            "UPDATE site_breakers SET state = ?, changed_at = ? "
+            "WHERE site = ? AND state = ? AND changed_at = ?",
+            (BREAKER_HALF_OPEN, now, site, state, changed_at),
+        ).rowcount
+        if claimed:
+            breaker_logger.info(f"Probing {site} after its circuit cooled down")
+        return bool(claimed)
+
+    def record(self, site: str, failed: bool) -> str:
+        """
+        Record the outcome of a call and update the site's breaker.
+
+        Args:
+            site: Site name
+            failed: Whether the call raised an error
+
+        Returns:
+            str: The breaker state after the call
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT state FROM site_breakers WHERE site = ?", (site,)
+            ).fetchone()
+            state = BREAKER_CLOSED if row is None else row[0]
+
+            if state == BREAKER_HALF_OPEN:
+                # The probe decides; the failures before it no longer count
+                state = BREAKER_OPEN if failed else BREAKER_CLOSED
+                self._set_state(conn, site, state, now)
+                conn.execute("DELETE FROM site_calls WHERE site = ?", (site,))
+            elif state == BREAKER_CLOSED:
+                conn.execute(
+                    "INSERT INTO site_calls VALUES (?, ?, ?)", (site, now, int(failed))
+                )
+                conn.execute(
+                    "DELETE FROM site_calls WHERE site = ? AND called_at < ?",
+                    (site, now - self.window),
+                )
+                if failed and self._tripped(conn, site):
+                    state = BREAKER_OPEN
+                    self._set_state(conn, site, state, now)
+
+        if failed and state == BREAKER_OPEN:
+            breaker_logger.warning(
+                f"Circuit for {site} is open, skipping it for {self.cooldown}s"
+            )
+        return state
+
+    def retry_after(self, site: str) -> float:
+        """
+        Seconds until an open breaker accepts a probe call.
+
+        Args:
+            site: Site name
+
+        Returns:
+            float: Time left in the cooldown, 0 if calls are allowed
+        """
+        row = (
+            self.connection()
+            .execute(
+                "SELECT state, changed_at FROM site_breakers WHERE site = ?", (site,)
+            )
+            .fetchone()
+        )
+        if row is None or row[0] == BREAKER_CLOSED:
+            return 0.0
+        return max(0.0, row[1] + self.cooldown - time.time())
+
+    def states(self) -> dict:
+        """
+        Describe every site with a breaker or recent calls.
+
+        Returns:
+            dict: Per site, the ``state``, the ``calls`` and ``failures`` within
+            the window and, unless closed, ``retry_after`` seconds
+        """
+        conn = self.connection()
+        report = {}
+        rows = conn.execute(
+            "SELECT site, COUNT(*), SUM(failed) FROM site_calls "
+            "WHERE called_at >= ? GROUP BY site",
+            (time.time() - self.window,),
+        )
+        for site, calls, failures in rows:
+            report[site] = {
+                "state": BREAKER_CLOSED,
+                "calls": calls,
+                "failures": failures,
+            }
+
+        breakers = conn.execute("SELECT site, state FROM site_breakers").fetchall()
+        for site, state in breakers:
+            entry = report.setdefault(site, {"calls": 0, "failures": 0})
+            entry["state"] = state
+            if state != BREAKER_CLOSED:
+                entry["retry_after"] = round(self.retry_after(site), 1)
+        return dict(sorted(report.items()))
+
+    def reset(self, site: str) -> bool:
+        """
+        Close a site's breaker and forget its recent calls.
+
+        Args:
+            site: Site name
+
+        Returns:
+            bool: False if nothing was known about the site
+        """
+        with self.transaction() as conn:
+            calls = conn.execute("DELETE FROM site_calls WHERE site = ?", (site,))
+            breakers = conn.execute("DELETE FROM site_breakers WHERE site = ?", (site,))
+        return calls.rowcount > 0 or breakers.rowcount > 0
+
+    def clear(self) -> None:
+        """Close every breaker."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM site_calls")
+            conn.execute("DELETE FROM site_breakers")
+
+    def _tripped(self, conn, site: str) -> bool:
+        """Whether the failures within the window should open the breaker."""
+        calls, failures = conn.execute(
+            "SELECT COUNT(*), SUM(failed) FROM site_calls WHERE site = ?", (site,)
+        ).fetchone()
+        return calls >= self.min_calls and failures >= self.failure_threshold * calls
+
+    @staticmethod
+    def _set_state(conn, site: str, state: str, now: float) -> None:
+        """Store a breaker's new state; the caller holds a transaction."""
+        conn.execute(
+            "INSERT INTO site_breakers VALUES (?, ?, ?) ON CONFLICT (site) "
+            "DO UPDATE SET state = excluded.state, changed_at = excluded.changed_at",
+            (site, state, now),
+        )
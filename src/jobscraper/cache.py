@@ -0,0 +1,544 @@
+"""
+Result cache for scrape requests.
+
+Repeated searches within the TTL are served from cache instead of calling
+jobspy again. Two backends are available: an in-process memory cache and a
+SQLite file store shared by every gunicorn worker on the host. Both evict
+least-recently-used entries once either the entry count or the byte budget is
+exceeded.
+
+Expired entries can be kept for a further ``stale_ttl`` seconds, during which
+:meth:`ResultCache.lookup` still returns them flagged as stale so the caller
+can serve them while a fresh result is scraped in the background.
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from .etag import content_digest
+from .params import InvalidRequestError
+from .serialization import dataframe_to_json
+from .storage import SQLiteStore
+
+cache_logger = logging.getLogger(__name__)
+
+# Per-request cache options accepted in the "cache" body key
+CACHE_BYPASS = "bypass"
+CACHE_REFRESH = "refresh"
+CACHE_MODES = (CACHE_BYPASS, CACHE_REFRESH)
+
+# Available cache backends
+CACHE_BACKEND_MEMORY = "memory"
+CACHE_BACKEND_SQLITE = "sqlite"
+
+
+def parse_cache_mode(data: dict):
+    """
+    Read the per-request cache option from a request body.
+
+    ``bypass`` neither reads nor writes the cache, ``refresh`` skips the lookup
+    but stores the fresh result.
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        str or None: One of ``CACHE_MODES``, or None for normal caching
+
+    Raises:
+        InvalidRequestError: If the option is not a known mode
+    """
+    mode = data.get("cache")
+    if mode is None or mode in CACHE_MODES:
+        return mode
+    raise InvalidRequestError(
+        f"Invalid cache option {mode!r}, expected one of: {', '.join(CACHE_MODES)}"
+    )
+
+
+def dataframe_nbytes(df: pd.DataFrame) -> int:
+    """
+    Estimate the memory held by a DataFrame, including string contents.
+
+    Args:
+        df: DataFrame to measure
+
+    Returns:
+        int: Size in bytes
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ScrapeResult:
+    """
+    Outcome of a scrape, held as a DataFrame, as encoded JSON, or both.
+
+    Results loaded from the shared cache start out as bytes: the JSON encoding
+    is served as-is and the DataFrame is only unpickled when a caller needs it.
+    Fresh results encode their JSON and compute their digest at most once.
+
+    Args:
+        jobs: Jobs DataFrame, if already available
+        jobs_json: Encoded jobs array from :func:`dataframe_to_json`
+        frame_blob: Pickled jobs DataFrame
+        count: Number of jobs; derived from ``jobs`` when omitted
+        digest: :func:`jobscraper.etag.content_digest` of the jobs
+        sites: Per-site timing and error report of a fanned-out scrape
+        errors: Errors of sites that failed, if the result is partial
+        stages: Figures reported by response stages, such as the number of
+            duplicates removed
+    """
+
+    def __init__(
+        self,
+        jobs=None,
+        jobs_json=None,
+        frame_blob=None,
+        count=None,
+        sites=None,
+        errors=None,
+        stages=None,
+        digest=None,
+    ):
+        self._jobs = jobs
+        self._jobs_json = jobs_json
+        self._frame_blob = frame_blob
+        self._digest = digest
+        self.count = len(jobs) if count is None else count
+        self.sites = sites or {}
+        self.errors = errors or []
+        self.stages = stages or {}
+
+    @property
+    def partial(self) -> bool:
+        """Whether some sites failed and their jobs are missing."""
+        return bool(self.errors)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def jobs(self) -> pd.DataFrame:
+        """The jobs DataFrame, unpickled on first access if needed."""
+        if self._jobs is None:
+            self._jobs = pickle.loads(self._frame_blob)
+        return self._jobs
+
+    @property
+    def jobs_json(self) -> bytes:
+        """The encoded jobs array, computed on first access if needed."""
+        if self._jobs_json is None:
+            self._jobs_json = dataframe_to_json(self.jobs)
+        return self._jobs_json
+
+    @property
+    def digest(self) -> str:
+        """Digest of the jobs' ids and key fields, computed on first access."""
+        if self._digest is None:
+            self._digest = content_digest(self.jobs)
+        return self._digest
+
+    @property
+    def frame_blob(self) -> bytes:
+        """The pickled jobs DataFrame, computed on first access if needed."""
+        if self._frame_blob is None:
+            self._frame_blob = pickle.dumps(self._jobs, pickle.HIGHEST_PROTOCOL)
+        return self._frame_blob
+
+
+class ResultCache:
+    """
+    Thread-safe in-process LRU cache with a TTL and entry/byte limits.
+
+    Args:
+        ttl: Seconds an entry stays fresh; 0 disables the cache
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of all entries
+        stale_ttl: Seconds an expired entry is still returned as stale
+    """
+
+    # Entries are only visible to this process
+    shared = False
+
+    def __init__(
+        self, ttl: float, max_entries: int, max_bytes: int, stale_ttl: float = 0
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.ttl > 0 and self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Combined size of all cached entries."""
+        return self._total_bytes
+
+    def get(self, key: str):
+        """
+        Look up a fresh entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            ScrapeResult or None: The cached result, or None on a miss
+        """
+        return self.lookup(key, stale_ok=False)[0]
+
+    def lookup(self, key: str, stale_ok: bool = True) -> tuple:
+        """
+        Look up an entry, fresh or within its stale period.
+
+        Args:
+            key: Cache key
+            stale_ok: Whether an expired entry may be returned
+
+        Returns:
+            tuple: The cached result or None on a miss, and whether it is stale
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            value, size, expires_at = entry
+            now = time.monotonic()
+            if expires_at + self.stale_ttl <= now:
+                self._remove(key)
+                self.misses += 1
+                return None, False
+            stale = expires_at <= now
+            if stale and not stale_ok:
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return value, stale
+
+    def expires_in(self, key: str):
+        """
+        Time left until an entry goes stale, without marking it as used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            float or None: Seconds left, negative once stale, or None if the
+            entry is missing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[2] - time.monotonic()
+
+    def set(self, key: str, result: ScrapeResult) -> None:
+        """
+        Store a result, evicting least-recently-used entries to make room.
+
+        The JSON encoding and digest are computed up front so hits skip both.
+        Results larger than the whole byte budget are not cached.
+
+        Args:
+            key: Cache key
+            result: Result to store
+        """
+        if not self.enabled:
+            return
+
+        jobs_json = result.jobs_json
+        result.digest  # Memoized on the result, which is what hits return
+        size = dataframe_nbytes(result.jobs) + len(jobs_json)
+        if size > self.max_bytes:
+            cache_logger.debug(f"Not caching {size} byte result over the size limit")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (result, size, time.monotonic() + self.ttl)
+            self._total_bytes += size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._total_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; the caller must hold the lock."""
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+
+class SQLiteResultCache(SQLiteStore):
+    """
+    Result cache in a SQLite file shared by all worker processes on a host.
+
+    Entries hold the encoded JSON payload, the pickled DataFrame and the
+    content digest, so a hit skips both the scrape and the DataFrame conversion
+    and conditional requests are answered without unpickling anything. Expiry
+    uses wall-clock time so every process agrees on it.
+
+    The file must only be writable by the service, since entries are unpickled.
+
+    Args:
+        path: SQLite database file, created if missing
+        ttl: Seconds an entry stays fresh; 0 disables the cache
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total payload size of all entries
+        stale_ttl: Seconds an expired entry is still returned as stale
+    """
+
+    SCHEMA = (
+        # Entries of older versions lack the digest and are simply dropped
+        "DROP TABLE IF EXISTS results",
+        "CREATE TABLE IF NOT EXISTS scrape_results ("
+        "key TEXT PRIMARY KEY, jobs_json BLOB NOT NULL, frame BLOB NOT NULL, "
+        "count INTEGER NOT NULL, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+        "expires_at REAL NOT NULL, last_access REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS scrape_results_last_access "
+        "ON scrape_results (last_access)",
+    )
+
+    # Entries are visible to every process on the host
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_entries: int,
+        max_bytes: int,
+        stale_ttl: float = 0,
+    ):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.ttl > 0 and self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return (
+            self.connection()
+            .execute("SELECT COUNT(*) FROM scrape_results")
+            .fetchone()[0]
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        """Combined size of all cached entries."""
+        query = "SELECT COALESCE(SUM(size), 0) FROM scrape_results"
+        return self.connection().execute(query).fetchone()[0]
+
+    def get(self, key: str):
+        """
+        Look up a fresh entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            ScrapeResult or None: The cached result, or None on a miss
+        """
+        return self.lookup(key, stale_ok=False)[0]
+
+    def lookup(self, key: str, stale_ok: bool = True) -> tuple:
+        """
+        Look up an entry, fresh or within its stale period.
+
+        Args:
+            key: Cache key
+            stale_ok: Whether an expired entry may be returned
+
+        Returns:
+            tuple: The cached result or None on a miss, and whether it is stale
+        """
+        conn = self.connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT jobs_json, frame, count, digest, expires_at "
+            "FROM scrape_results WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None or row[4] + self.stale_ttl <= now:
+            if row is not None:
+                conn.execute("DELETE FROM scrape_results WHERE key = ?", (key,))
+            self.misses += 1
+            return None, False
+        stale = row[4] <= now
+        if stale and not stale_ok:
+            self.misses += 1
+            return None, False
+
+        conn.execute(
+            "UPDATE scrape_results SET last_access = ? WHERE key = ?", (now, key)
+        )
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        jobs_json, frame_blob, count, digest, _ = row
+        result = ScrapeResult(
+            jobs_json=jobs_json, frame_blob=frame_blob, count=count, digest=digest
+        )
+        return result, stale
+
+    def expires_in(self, key: str):
+        """
+        Time left until an entry goes stale, without marking it as used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            float or None: Seconds left, negative once stale, or None if the
+            entry is missing
+        """
+        row = (
+            self.connection()
+            .execute("SELECT expires_at FROM scrape_results WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return None if row is None else row[0] - time.time()
+
+    def set(self, key: str, result: ScrapeResult) -> None:
+        """
+        Store a result and evict expired and least-recently-used entries.
+
+        Args:
+            key: Cache key
+            result: Result to store
+        """
+        if not self.enabled:
+            return
+
+        jobs_json = result.jobs_json
+        frame_blob = result.frame_blob
+        size = len(jobs_json) + len(frame_blob)
+        if size > self.max_bytes:
+            cache_logger.debug(f"Not caching {size} byte result over the size limit")
+            return
+
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_results "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    jobs_json,
+                    frame_blob,
+                    len(result),
+                    result.digest,
+                    size,
+                    now + self.ttl,
+                    now,
+                ),
+            )
+            conn.execute(
+                "DELETE FROM scrape_results WHERE expires_at <= ?",
+                (now - self.stale_ttl,),
+            )
+            # Keep the most recently used entries that fit within both limits
+            conn.execute(
+                "DELETE FROM scrape_results WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key,"
+                "   SUM(size) OVER (ORDER BY last_access DESC) AS running_size,"
+                "   ROW_NUMBER() OVER (ORDER BY last_access DESC) AS position"
+                "  FROM scrape_results)"
+                " WHERE running_size > ? OR position > ?)",
+                (self.max_bytes, self.max_entries),
+            )
+
+    def clear(self) -> None:
+        """Drop every entry and reset this process's statistics."""
+        self.connection().execute("DELETE FROM scrape_results")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+
+def create_result_cache(
+    backend: str,
+    path: str,
+    ttl: float,
+    max_entries: int,
+    max_bytes: int,
+    stale_ttl: float = 0,
+):
+    """
+    Build the configured result cache backend.
+
+    Args:
+        backend: ``"memory"`` or ``"sqlite"``
+        path: SQLite file used by the shared backend
+        ttl: Seconds an entry stays fresh
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of all entries
+        stale_ttl: Seconds an expired entry is still returned as stale
+
+    Returns:
+        ResultCache or SQLiteResultCache: The cache instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == CACHE_BACKEND_MEMORY:
+        return ResultCache(
+            ttl=ttl, max_entries=max_entries, max_bytes=max_bytes, stale_ttl=stale_ttl
+        )
+    if backend == CACHE_BACKEND_SQLITE:
+        return SQLiteResultCache(
+            path,
+            ttl=ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            stale_ttl=stale_ttl,
+        )
+    raise ValueError(f"Unknown result cache backend: {backend}")
@@ -0,0 +1,177 @@
+"""
+Single-flight coalescing of identical concurrent scrapes.
+
+Concurrent requests for the same search wait on one in-flight scrape and share
+its result instead of each calling the job boards. Within a worker this uses
+an in-memory table of in-flight calls; across gunicorn workers on the same
+host the leader additionally holds a per-search file lock, so other workers
+block until it finishes and can then read its result from the shared cache.
+Workers waiting for the file lock give up once their request deadline passes.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+coalesce_logger = logging.getLogger(__name__)
+
+# How often a worker waiting with a timeout retries the host lock
+HOST_LOCK_POLL_SECONDS = 0.05
+
+
+class HostLockTimeoutError(TimeoutError):
+    """Raised when another process held the host lock past the timeout."""
+
+
+def _acquire_before(lock_file, deadline: float) -> None:
+    """
+    Take an exclusive lock on a file, retrying until a monotonic deadline.
+
+    Raises:
+        HostLockTimeoutError: If the lock is still held at the deadline
+    """
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise HostLockTimeoutError(
+                    "Timed out waiting for another worker scraping the same search"
+                )
+            time.sleep(min(HOST_LOCK_POLL_SECONDS, remaining))
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into a single execution.
+
+    Args:
+        lock_dir: Directory for cross-process lock files, or None to only
+            coalesce within this process
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self.executions = 0
+        self.coalesced = 0
+        self.host_coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn, timeout=None):
+        """
+        Run ``fn`` once for all concurrent callers using ``key``.
+
+        The first caller executes ``fn``; callers arriving while it runs wait
+        and receive the same return value, or the same exception.
+
+        Args:
+            key: Identifies equivalent calls
+            fn: Zero-argument callable to execute
+            timeout: Seconds a waiting caller waits before giving up
+
+        Returns:
+            tuple: The return value of ``fn`` and whether it was shared with
+            another caller's execution
+
+        Raises:
+            TimeoutError: If a waiting caller's timeout expired first
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            coalesce_logger.debug(f"Waiting on in-flight call for {key[:12]}")
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for an identical request")
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def record_host_coalesced(self) -> None:
+        """Count a call answered by another process's execution."""
+        with self._lock:
+            self.host_coalesced += 1
+
+    @contextmanager
+    def host_lock(self, key: str, timeout=None):
+        """
+        Hold an exclusive per-key lock shared by all processes on the host.
+
+        Does nothing when no lock directory is configured or file locking is
+        unavailable on this platform. With a timeout the lock is polled
+        without blocking until it is acquired or the time runs out.
+
+        Args:
+            key: Identifies equivalent calls; must be safe to use as a filename
+            timeout: Seconds to wait for the lock, or None to wait until free
+
+        Raises:
+            HostLockTimeoutError: If the lock was not acquired within timeout
+        """
+        if self.lock_dir is None or fcntl is None:
+            yield
+            return
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = os.path.join(self.lock_dir, f"{key}.lock")
+        with open(path, "a") as lock_file:
+            if timeout is None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                _acquire_before(lock_file, time.monotonic() + timeout)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        """
+        Report coalescing counters for this process.
+
+        Returns:
+            dict: Executions, in-process coalesced calls and calls answered by
+            another worker
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "host_coalesced": self.host_coalesced,
+                "in_flight": len(self._calls),
+            }
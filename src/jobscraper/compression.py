@@ -0,0 +1,110 @@
+"""
+Response compression negotiated through ``Accept-Encoding``.
+
+Job descriptions make responses large but very repetitive, so they compress
+well. Buffered bodies are compressed in one call; streamed bodies go through an
+incremental compressor that is flushed after every chunk, so clients still
+receive each chunk as soon as it is produced. zstd needs the optional
+``zstandard`` package; gzip is always available.
+"""
+
+import gzip
+import zlib
+from typing import Iterable, Iterator
+
+from .serialization import (
+    ARROW_STREAM_MIMETYPE,
+    CSV_MIMETYPE,
+    JSON_MIMETYPE,
+    NDJSON_MIMETYPE,
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+GZIP_ENCODING = "gzip"
+ZSTD_ENCODING = "zstd"
+
+# Mimetypes worth compressing; Parquet bodies are already compressed
+COMPRESSIBLE_MIMETYPES = frozenset(
+    (JSON_MIMETYPE, NDJSON_MIMETYPE, ARROW_STREAM_MIMETYPE, CSV_MIMETYPE)
+)
+
+
+def available_encodings() -> list:
+    """
+    List the supported content encodings, most preferred first.
+
+    Returns:
+        list: ``zstd`` when ``zstandard`` is installed, then ``gzip``
+    """
+    if zstandard is None:
+        return [GZIP_ENCODING]
+    return [ZSTD_ENCODING, GZIP_ENCODING]
+
+
+def negotiate_encoding(accept_encodings) -> str:
+    """
+    Pick the content encoding of a response.
+
+    Args:
+        accept_encodings: The request's parsed ``Accept-Encoding`` header
+
+    Returns:
+        str or None: The encoding to use, or None to send the body as is
+    """
+    return accept_encodings.best_match(available_encodings())
+
+
+def compress_body(body: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a complete response body.
+
+    Args:
+        body: Encoded response body
+        encoding: Output of :func:`negotiate_encoding`
+        level: Compression level of the chosen encoding
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == ZSTD_ENCODING:
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def compress_stream(
+    chunks: Iterable[bytes], encoding: str, level: int
+) -> Iterator[bytes]:
+    """
+    Compress a streamed response body chunk by chunk.
+
+    The compressor is flushed after every chunk so the client can decode each
+    one on arrival; memory use stays bounded by the chunk size. ``chunks`` is
+    closed when the stream ends or the client disconnects.
+
+    Args:
+        chunks: Encoded chunks of the response body
+        encoding: Output of :func:`negotiate_encoding`
+        level: Compression level of the chosen encoding
+
+    Yields:
+        bytes: Compressed data for each chunk, then the end of the stream
+    """
+    if encoding == ZSTD_ENCODING:
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        flush_mode = zlib.Z_SYNC_FLUSH
+
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(flush_mode)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -4,6 +4,7 @@ In production, use environment variables or a proper config management solution.
 """
 
 import os
+import tempfile
 
 # API Access Token - set this via environment variable
 # export API_ACCESS_TOKEN="your-secret-token-here"
@@ -27,4 +28,178 @@ elif LOG_LEVEL == "ERROR":
 else:
     LOG_LEVEL_VALUE = 20  # Default to INFO
 
+# Directory for state shared between worker processes on the same host
+STATE_DIR = os.environ.get(
+    "STATE_DIR", os.path.join(tempfile.gettempdir(), "jobscraper")
+)
+
+# Streaming Configuration
+# Number of DataFrame rows encoded per chunk when streaming NDJSON responses
+STREAM_CHUNK_ROWS = int(os.environ.get("STREAM_CHUNK_ROWS", "500"))
+
+# Result Cache Configuration
+# "memory" keeps a cache per worker process, "sqlite" shares one file per host
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "memory").lower()
+RESULT_CACHE_PATH = os.environ.get(
+    "RESULT_CACHE_PATH", os.path.join(STATE_DIR, "result-cache.sqlite3")
+)
+# Seconds a scrape result is served from cache; 0 disables caching
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_MAX_BYTES = int(
+    os.environ.get("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+# Seconds an expired result is still served while it is scraped again in the
+# background; 0 makes requests for expired searches wait for a fresh scrape
+RESULT_CACHE_STALE_TTL = int(os.environ.get("RESULT_CACHE_STALE_TTL", "0"))
+
+# Scrape Fan-out Configuration
+# Threads per worker process for scraping the sites of multi-site searches
+SCRAPE_SITE_WORKERS = int(os.environ.get("SCRAPE_SITE_WORKERS", "8"))
+
+# Site Circuit Breaker Configuration
+# Skip a site without calling it once too many of its recent calls failed
+SITE_BREAKERS = os.environ.get("SITE_BREAKERS", "True").lower() == "true"
+SITE_BREAKERS_PATH = os.environ.get(
+    "SITE_BREAKERS_PATH", os.path.join(STATE_DIR, "site-breakers.sqlite3")
+)
+# Share of failed calls within the window that opens a site's breaker, once
+# at least the minimum number of calls was made
+SITE_BREAKER_FAILURE_RATE = float(os.environ.get("SITE_BREAKER_FAILURE_RATE", "0.5"))
+SITE_BREAKER_MIN_CALLS = int(os.environ.get("SITE_BREAKER_MIN_CALLS", "5"))
+SITE_BREAKER_WINDOW = int(os.environ.get("SITE_BREAKER_WINDOW", "300"))
+# Seconds an open breaker skips its site before a single probe call
+SITE_BREAKER_COOLDOWN = int(os.environ.get("SITE_BREAKER_COOLDOWN", "120"))
+
+# Proxy Pool Configuration
+# Comma-separated proxies handed out to searches that pass no "proxies" of
+# their own, e.g. "user:pass@host:port,host2:port"; empty disables the pool
+PROXY_POOL = os.environ.get("PROXY_POOL", "")
+PROXY_POOL_PATH = os.environ.get(
+    "PROXY_POOL_PATH", os.path.join(STATE_DIR, "proxy-pool.sqlite3")
+)
+# Consecutive failures that quarantine a proxy for a site, and for how long
+PROXY_QUARANTINE_FAILURES = int(os.environ.get("PROXY_QUARANTINE_FAILURES", "3"))
+PROXY_QUARANTINE_SECONDS = int(os.environ.get("PROXY_QUARANTINE_SECONDS", "300"))
+
+# Record/Replay Configuration
+# Save every successful scrape_jobs call as a Parquet fixture in this
+# directory; empty disables recording
+SCRAPE_RECORD_DIR = os.environ.get("SCRAPE_RECORD_DIR", "")
+# Answer scrape_jobs calls from the fixtures in this directory instead of the
+# job boards, for offline load tests and profiling; empty uses jobspy
+SCRAPE_REPLAY_DIR = os.environ.get("SCRAPE_REPLAY_DIR", "")
+# Factor applied to the recorded durations when replaying; 0 for no delay
+SCRAPE_REPLAY_LATENCY_SCALE = float(
+    os.environ.get("SCRAPE_REPLAY_LATENCY_SCALE", "1.0")
+)
+
+# Metrics Configuration
+# Export Prometheus metrics on GET /metrics, summed over every worker process
+METRICS = os.environ.get("METRICS", "True").lower() == "true"
+METRICS_PATH = os.environ.get(
+    "METRICS_PATH", os.path.join(STATE_DIR, "metrics.sqlite3")
+)
+# Seconds between the snapshots each worker writes to the shared metrics file
+METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+
+# Request Timing and Profiling Configuration
+# Send a Server-Timing header with the time spent in each stage of a request
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "True").lower() == "true"
+# Separate token that allows ?profile=1; profiling is disabled when empty
+PROFILE_ACCESS_TOKEN = os.environ.get("PROFILE_ACCESS_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(STATE_DIR, "profiles"))
+# Functions listed in each profile report
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", "30"))
+
+# Scrape Deadline Configuration
+# Default time budget per /scrape request; keep it well below the gunicorn
+# worker timeout so partial results are returned before the worker is killed
+SCRAPE_DEADLINE_MS = int(os.environ.get("SCRAPE_DEADLINE_MS", "25000"))
+# Upper bound for client-supplied deadline_ms values; 0 for no bound
+SCRAPE_MAX_DEADLINE_MS = int(os.environ.get("SCRAPE_MAX_DEADLINE_MS", "25000"))
+
+# Request Coalescing Configuration
+# Concurrent identical searches share one scrape; across workers when the
+# result cache backend is shared
+SCRAPE_COALESCING = os.environ.get("SCRAPE_COALESCING", "True").lower() == "true"
+SCRAPE_LOCK_DIR = os.environ.get("SCRAPE_LOCK_DIR", os.path.join(STATE_DIR, "locks"))
+# Seconds a scrape without a deadline waits for another worker's lock
+SCRAPE_LOCK_TIMEOUT = float(os.environ.get("SCRAPE_LOCK_TIMEOUT", "300"))
+
+# Background Scrape Jobs Configuration
+# Threads per worker process running jobs queued with POST /scrape/jobs
+SCRAPE_JOB_WORKERS = int(os.environ.get("SCRAPE_JOB_WORKERS", "4"))
+# Seconds finished jobs and their results are kept
+SCRAPE_JOB_RETENTION = int(os.environ.get("SCRAPE_JOB_RETENTION", "3600"))
+# Queued and running jobs a worker process accepts before answering 429
+SCRAPE_JOB_MAX_PENDING = int(os.environ.get("SCRAPE_JOB_MAX_PENDING", "100"))
+# Seconds without a heartbeat after which a pending job is marked failed
+SCRAPE_JOB_STALE_AFTER = int(os.environ.get("SCRAPE_JOB_STALE_AFTER", "300"))
+SCRAPE_JOBS_PATH = os.environ.get(
+    "SCRAPE_JOBS_PATH", os.path.join(STATE_DIR, "scrape-jobs.sqlite3")
+)
+
+# Batch Scrape Configuration
+# Threads per worker process running the searches of POST /scrape/batch
+SCRAPE_BATCH_WORKERS = int(os.environ.get("SCRAPE_BATCH_WORKERS", "4"))
+SCRAPE_BATCH_MAX_SEARCHES = int(os.environ.get("SCRAPE_BATCH_MAX_SEARCHES", "500"))
+
+# Saved Searches Configuration
+# Index of the jobs each saved search has already returned
+SAVED_SEARCHES_PATH = os.environ.get(
+    "SAVED_SEARCHES_PATH", os.path.join(STATE_DIR, "saved-searches.sqlite3")
+)
+# Seconds a job, or a whole saved search, is remembered after it last appeared
+SAVED_SEARCH_RETENTION = int(
+    os.environ.get("SAVED_SEARCH_RETENTION", str(30 * 24 * 3600))
+)
+
+# Job Archive Configuration
+# Keep every scraped job in a local SQLite archive queried through GET /jobs
+JOB_ARCHIVE = os.environ.get("JOB_ARCHIVE", "False").lower() == "true"
+JOB_ARCHIVE_PATH = os.environ.get(
+    "JOB_ARCHIVE_PATH", os.path.join(STATE_DIR, "job-archive.sqlite3")
+)
+# Rows written per batch, and how long a partial batch waits for more results
+JOB_ARCHIVE_BATCH_ROWS = int(os.environ.get("JOB_ARCHIVE_BATCH_ROWS", "5000"))
+JOB_ARCHIVE_FLUSH_MS = int(os.environ.get("JOB_ARCHIVE_FLUSH_MS", "1000"))
+# Scrape results waiting to be written before new ones are dropped
+JOB_ARCHIVE_MAX_PENDING = int(os.environ.get("JOB_ARCHIVE_MAX_PENDING", "64"))
+
+# Response Compression Configuration
+# Compress responses for clients sending Accept-Encoding: zstd or gzip
+RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "True").lower() == "true"
+# Buffered bodies smaller than this are sent uncompressed
+RESPONSE_COMPRESSION_MIN_BYTES = int(
+    os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024")
+)
+RESPONSE_GZIP_LEVEL = int(os.environ.get("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_ZSTD_LEVEL = int(os.environ.get("RESPONSE_ZSTD_LEVEL", "3"))
+
+# Refresh-Ahead Configuration
+# Re-scrape the most requested searches into the result cache before they
+# expire; one worker per host schedules the refreshes
+REFRESH_AHEAD = os.environ.get("REFRESH_AHEAD", "False").lower() == "true"
+REFRESH_AHEAD_PATH = os.environ.get(
+    "REFRESH_AHEAD_PATH", os.path.join(STATE_DIR, "search-popularity.sqlite3")
+)
+# Number of most requested searches kept warm, ranked over the window
+REFRESH_AHEAD_TOP_N = int(os.environ.get("REFRESH_AHEAD_TOP_N", "20"))
+REFRESH_AHEAD_WINDOW = int(os.environ.get("REFRESH_AHEAD_WINDOW", "3600"))
+# Seconds before expiry an entry is refreshed, and between scheduling rounds
+REFRESH_AHEAD_LEAD_TIME = int(os.environ.get("REFRESH_AHEAD_LEAD_TIME", "60"))
+REFRESH_AHEAD_INTERVAL = int(os.environ.get("REFRESH_AHEAD_INTERVAL", "15"))
+# Threads per worker process running refreshes, also used for stale entries
+REFRESH_AHEAD_WORKERS = int(os.environ.get("REFRESH_AHEAD_WORKERS", "2"))
+# Refresh scrapes per site and hour; 0 for no limit
+REFRESH_AHEAD_SITE_BUDGET = int(os.environ.get("REFRESH_AHEAD_SITE_BUDGET", "60"))
+
+# ASGI Serving Configuration
+# Threads per ASGI worker process that run requests through the app; a slow
+# scrape holds one of them, idle connections hold none
+ASGI_REQUEST_THREADS = int(os.environ.get("ASGI_REQUEST_THREADS", "16"))
+# Requests that may wait for a thread before new ones are rejected with 429
+ASGI_QUEUE_SIZE = int(os.environ.get("ASGI_QUEUE_SIZE", "64"))
+
 # You can add other configuration settings here as needed
@@ -0,0 +1,136 @@
+"""
+Cross-site job deduplication.
+
+Multi-site searches often return the same posting from several job boards.
+Rows are matched on a normalized title, company and location, and separately
+on a normalized job URL. Keys are hashed column-wise with pandas and grouped,
+and the matches of both keys are merged with a vectorized union-find, so the
+whole stage stays close to linear in the number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Column added to deduplicated results listing every site a job was found on
+SITES_COLUMN = "sites"
+
+_POSTING_COLUMNS = ("title", "company", "location")
+
+
+def _normalize_text(values: pd.Series) -> pd.Series:
+    """Lowercase text and collapse punctuation and whitespace to single spaces."""
+    text = values.astype("string").str.lower()
+    text = text.str.replace(r"[\W_]+", " ", regex=True).str.strip()
+    return text.fillna("")
+
+
+def _normalize_url(values: pd.Series) -> pd.Series:
+    """Lowercase a URL and drop its scheme, ``www.``, fragment and trailing slash."""
+    url = values.astype("string").str.strip().str.lower()
+    url = url.str.replace(r"^[a-z][a-z0-9+.-]*://(www\.)?", "", regex=True)
+    url = url.str.replace(r"#.*$", "", regex=True).str.rstrip("/")
+    return url.fillna("")
+
+
+def _first_positions(keys: pd.Series, valid: np.ndarray) -> np.ndarray:
+    """Position of the first valid row sharing each row's key, or its own."""
+    positions = np.arange(len(keys))
+    if valid.any():
+        valid_keys = keys.to_numpy()[valid]
+        firsts = pd.Series(positions[valid]).groupby(valid_keys).transform("min")
+        positions[valid] = firsts.to_numpy()
+    return positions
+
+
+def _key_links(keys: pd.Series, valid: np.ndarray) -> tuple:
+    """Link every valid row to the first valid row sharing its key."""
+    firsts = _first_positions(keys, valid)
+    linked = np.flatnonzero(firsts != np.arange(len(keys)))
+    return linked, firsts[linked]
+
+
+def _components(rows: int, links: list) -> np.ndarray:
+    """
+    Find the connected components of rows with a vectorized union-find.
+
+    Args:
+        rows: Number of rows
+        links: ``(rows, other_rows)`` array pairs, each linking two rows
+
+    Returns:
+        np.ndarray: The smallest position in each row's component
+    """
+    parent = np.arange(rows)
+    if not links:
+        return parent
+    sources = np.concatenate([source for source, _ in links])
+    targets = np.concatenate([target for _, target in links])
+    while True:
+        # Path compression: point every row straight at its root
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        source_roots, target_roots = parent[sources], parent[targets]
+        apart = source_roots != target_roots
+        if not apart.any():
+            return parent
+        # Union: hang the larger root of every link under the smaller one
+        source_roots, target_roots = source_roots[apart], target_roots[apart]
+        np.minimum.at(
+            parent,
+            np.maximum(source_roots, target_roots),
+            np.minimum(source_roots, target_roots),
+        )
+
+
+def dedupe_jobs(jobs: pd.DataFrame) -> tuple:
+    """
+    Collapse rows describing the same posting into the first one seen.
+
+    Two rows are duplicates when their normalized title, company and location
+    match (title and company must be present), or when their normalized job
+    URLs match. Matching is transitive across both keys: rows linked through
+    other duplicates collapse together, whichever key links them. The kept row
+    gets a ``sites`` column listing every site the posting appeared on, in
+    order of first appearance.
+
+    Args:
+        jobs: Jobs DataFrame as returned by ``scrape_jobs``
+
+    Returns:
+        tuple: The deduplicated DataFrame with a fresh index, and the number
+        of rows removed
+    """
+    rows = len(jobs)
+    links = []
+
+    if "title" in jobs and "company" in jobs:
+        columns = [column for column in _POSTING_COLUMNS if column in jobs]
+        posting = pd.DataFrame({c: _normalize_text(jobs[c]) for c in columns})
+        valid = ((posting["title"] != "") & (posting["company"] != "")).to_numpy()
+        keys = pd.util.hash_pandas_object(posting, index=False)
+        links.append(_key_links(keys, valid))
+
+    if "job_url" in jobs:
+        urls = _normalize_url(jobs["job_url"])
+        valid = (urls != "").to_numpy()
+        keys = pd.util.hash_pandas_object(urls, index=False)
+        links.append(_key_links(keys, valid))
+
+    # Rows linked through any chain of matches on either key are one posting
+    representative = _components(rows, links)
+
+    keep = representative == np.arange(rows)
+    removed = int(rows - keep.sum())
+    deduped = jobs.iloc[keep] if removed else jobs
+
+    if "site" in jobs:
+        deduped = deduped.copy()
+        sites = jobs["site"].groupby(representative, sort=True).unique()
+        deduped[SITES_COLUMN] = [
+            [site for site in found if pd.notna(site)] for found in sites
+        ]
+
+    return deduped.reset_index(drop=True), removed
@@ -0,0 +1,70 @@
+"""
+Entity tags for conditional ``/scrape`` requests.
+
+A scrape result is summarized by a digest over its job ids and the fields a
+poller cares about, computed once when the result is scraped and stored next
+to it in the result cache. The ETag of a response combines that digest with
+the options that shape the body, so a matching ``If-None-Match`` can be
+answered from the cache without applying result stages or encoding anything.
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+# Fields whose changes make a result count as modified
+ETAG_FIELDS = (
+    "id",
+    "site",
+    "job_url",
+    "title",
+    "company",
+    "location",
+    "date_posted",
+    "job_type",
+    "interval",
+    "min_amount",
+    "max_amount",
+    "is_remote",
+)
+
+
+def content_digest(jobs: pd.DataFrame) -> str:
+    """
+    Hash the ids and key fields of every job, in order.
+
+    Args:
+        jobs: Jobs DataFrame as returned by ``scrape_jobs``
+
+    Returns:
+        str: Hex digest that changes when any job's key fields change or jobs
+        are added, removed or reordered
+    """
+    columns = [column for column in ETAG_FIELDS if column in jobs]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(columns).encode("utf-8"))
+    if columns and len(jobs):
+        rows = pd.util.hash_pandas_object(jobs[columns], index=False)
+        digest.update(rows.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def result_etag(digest: str, stages: dict, mimetype: str, partial: bool) -> str:
+    """
+    Compute the entity tag of a ``/scrape`` response.
+
+    Args:
+        digest: :func:`content_digest` of the result before any stage
+        stages: Output of :func:`jobscraper.stages.parse_stages`
+        mimetype: Negotiated response format
+        partial: Whether some sites failed
+
+    Returns:
+        str: Opaque tag, sent as a weak ETag since it identifies the content
+        rather than the exact bytes
+    """
+    variant = json.dumps(
+        [digest, stages, mimetype, partial], sort_keys=True, default=str
+    )
+    return hashlib.blake2b(variant.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,217 @@
+"""
+Declarative server-side filters for scrape results.
+
+Filters are evaluated as vectorized pandas operations over the whole result,
+so clients no longer download rows only to drop them. Keyword lists are
+compiled into a single regular expression per list, reused across requests,
+and only run over rows that passed the cheaper filters.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .params import InvalidRequestError
+
+# Columns keyword filters search in
+KEYWORD_COLUMNS = ("title", "description")
+
+_KEYWORD_FILTERS = ("keywords", "exclude_keywords")
+
+# Pay periods per year for each jobspy ``interval``, as jobspy's own
+# ``enforce_annual_salary`` counts them (40-hour weeks, 52 weeks a year)
+ANNUAL_MULTIPLIERS = {
+    "yearly": 1,
+    "monthly": 12,
+    "weekly": 52,
+    "daily": 260,
+    "hourly": 2080,
+}
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: tuple) -> re.Pattern:
+    """
+    Compile keywords into one whole-word pattern for lowercased text.
+
+    Each alternative starts with the keyword itself and checks the word
+    boundary before it with a lookbehind afterwards, which lets the regex
+    engine scan for the literal instead of testing every position.
+
+    Args:
+        keywords: Keywords to match; special characters are matched literally
+
+    Returns:
+        re.Pattern: Pattern matching any of the keywords in lowercased text
+    """
+    alternatives = "|".join(
+        rf"{escaped}(?<!\w{escaped})"
+        for escaped in (re.escape(keyword.lower()) for keyword in keywords)
+    )
+    return re.compile(rf"(?:{alternatives})(?!\w)")
+
+
+def _parse_min_salary(value):
+    """Validate a salary floor."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise InvalidRequestError("filters.min_salary must be a non-negative number")
+    return value
+
+
+def _parse_string_list(value, name: str) -> list:
+    """Validate a non-empty list of non-empty strings."""
+    if (
+        not isinstance(value, list)
+        or not value
+        or not all(isinstance(item, str) and item.strip() for item in value)
+    ):
+        raise InvalidRequestError(f"filters.{name} must be a non-empty list of strings")
+    return [item.strip() for item in value]
+
+
+def _parse_companies(value) -> list:
+    """Validate company names and fold their case for comparison."""
+    companies = _parse_string_list(value, "exclude_companies")
+    return [company.casefold() for company in companies]
+
+
+def _parse_remote(value) -> bool:
+    """Validate the remote flag."""
+    if not isinstance(value, bool):
+        raise InvalidRequestError("filters.remote must be true or false")
+    return value
+
+
+# Validator of each supported filter
+_FILTERS = {
+    "min_salary": _parse_min_salary,
+    "exclude_companies": _parse_companies,
+    "keywords": lambda value: _parse_string_list(value, "keywords"),
+    "exclude_keywords": lambda value: _parse_string_list(value, "exclude_keywords"),
+    "remote": _parse_remote,
+}
+
+
+def parse_filters(data: dict):
+    """
+    Read the ``filters`` section of a request body.
+
+    Supported filters are ``min_salary`` (number), ``exclude_companies``,
+    ``keywords`` and ``exclude_keywords`` (lists of strings) and ``remote``
+    (bool).
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        dict or None: Validated filters, or None if none were given
+
+    Raises:
+        InvalidRequestError: If the section or one of its filters is invalid
+    """
+    filters = data.get("filters")
+    if filters is None:
+        return None
+    if not isinstance(filters, dict):
+        raise InvalidRequestError("filters must be an object")
+
+    unknown = sorted(set(filters) - set(_FILTERS))
+    if unknown:
+        raise InvalidRequestError(f"Unknown filters: {', '.join(unknown)}")
+
+    parsed = {name: _FILTERS[name](value) for name, value in filters.items()}
+    return parsed or None
+
+
+def _column(jobs: pd.DataFrame, name: str) -> pd.Series:
+    """Return a column, or an all-missing column if the result lacks it."""
+    if name in jobs:
+        return jobs[name]
+    return pd.Series(pd.NA, index=jobs.index, dtype="object")
+
+
+def annual_top_salary(jobs: pd.DataFrame) -> pd.Series:
+    """Top of each row's salary range converted to yearly pay."""
+    max_amount = pd.to_numeric(_column(jobs, "max_amount"), errors="coerce")
+    min_amount = pd.to_numeric(_column(jobs, "min_amount"), errors="coerce")
+    top = max_amount.fillna(min_amount)
+    if "interval" not in jobs:
+        return top
+    interval = jobs["interval"].astype("string").str.strip().str.lower()
+    multiplier = pd.to_numeric(interval.map(ANNUAL_MULTIPLIERS), errors="coerce")
+    # Amounts without an interval are taken as yearly; unknown intervals as none
+    return top * multiplier.where(interval.notna(), 1)
+
+
+def _mentions(texts: list, pattern: re.Pattern, rows: np.ndarray) -> np.ndarray:
+    """
+    Check which of ``rows`` mention ``pattern`` in any text column.
+
+    Later columns are only searched for rows the earlier ones did not match.
+    """
+    found = np.zeros(len(rows), dtype=bool)
+    for text in texts:
+        pending = np.flatnonzero(~found)
+        if not len(pending):
+            break
+        matches = text.iloc[rows[pending]].str.contains(pattern, na=False)
+        found[pending] = matches.to_numpy(dtype=bool)
+    return found
+
+
+def filter_jobs(jobs: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """
+    Keep the rows matching every filter.
+
+    ``min_salary`` is a yearly floor. The top of each job's salary range
+    (``max_amount``, else ``min_amount``) is converted to yearly pay using its
+    ``interval`` with :data:`ANNUAL_MULTIPLIERS`, so an hourly wage counts 2080
+    times; amounts without an interval are taken as yearly. Jobs without a
+    salary, or with an unknown interval, are dropped.
+    ``keywords`` must all appear in the title or description, none of the
+    ``exclude_keywords`` may. Company names are compared case-insensitively.
+
+    Args:
+        jobs: Jobs DataFrame
+        filters: Output of :func:`parse_filters`
+
+    Returns:
+        pd.DataFrame: Matching rows, in their original order
+    """
+    keep = pd.Series(True, index=jobs.index)
+
+    if "min_salary" in filters:
+        keep &= annual_top_salary(jobs).ge(filters["min_salary"])
+
+    if "exclude_companies" in filters:
+        company = _column(jobs, "company").astype("string").str.strip()
+        excluded = company.str.casefold().isin(filters["exclude_companies"])
+        keep &= ~excluded.fillna(False).astype(bool)
+
+    if "remote" in filters:
+        is_remote = _column(jobs, "is_remote").eq(True)
+        keep &= is_remote if filters["remote"] else ~is_remote
+
+    keep = keep.to_numpy(dtype=bool, copy=True)
+    if any(name in filters for name in _KEYWORD_FILTERS):
+        # Text is lowercased once, for the rows the cheaper filters kept, and
+        # each keyword pass only searches rows that are still kept
+        candidates = np.flatnonzero(keep)
+        texts = [
+            jobs[column].iloc[candidates].astype("string").str.lower()
+            for column in KEYWORD_COLUMNS
+            if column in jobs
+        ]
+        matched = np.ones(len(candidates), dtype=bool)
+        for keyword in filters.get("keywords", ()):
+            rows = np.flatnonzero(matched)
+            matched[rows] = _mentions(texts, compile_keywords((keyword,)), rows)
+        if "exclude_keywords" in filters:
+            rows = np.flatnonzero(matched)
+            pattern = compile_keywords(tuple(filters["exclude_keywords"]))
+            matched[rows] = ~_mentions(texts, pattern, rows)
+        keep[candidates] = matched
+
+    return jobs[keep]
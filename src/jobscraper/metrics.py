@@ -0,0 +1,544 @@
+"""
+Prometheus metrics aggregated across worker processes.
+
+Each worker keeps its counters, gauges and histograms in memory and writes a
+snapshot of them to a SQLite file shared by every worker on the host, every
+``flush_interval`` seconds and whenever ``/metrics`` is served. The endpoint
+sums the snapshots of all processes, so it reports the same totals whichever
+worker answers. Counters and histograms of workers that exited are folded into
+one row per series and keep counting; their gauges are dropped.
+
+Stages of a request are timed with :func:`timed_stage` in the request thread.
+:class:`MetricsMiddleware` times whole requests and their response write, and
+counts requests in flight and body bytes.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+
+from .scraper import single_site
+from .storage import SQLiteStore
+
+metrics_logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from token checks to slow upstream scrapes
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+_BUCKET_LABELS = [repr(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+
+# Type and help text of every metric family, in the order they are exported
+METRIC_FAMILIES = {
+    "jobscraper_requests_total": (
+        COUNTER,
+        "HTTP requests by endpoint, method and status code",
+    ),
+    "jobscraper_request_duration_seconds": (
+        HISTOGRAM,
+        "Time from receiving a request to the end of its response body",
+    ),
+    "jobscraper_requests_in_flight": (GAUGE, "Requests being handled"),
+    "jobscraper_stage_duration_seconds": (
+        HISTOGRAM,
+        "Time spent in each stage of handling a request",
+    ),
+    "jobscraper_response_bytes_total": (
+        COUNTER,
+        "Response body bytes sent, after compression, by endpoint",
+    ),
+    "jobscraper_scrape_duration_seconds": (
+        HISTOGRAM,
+        "Duration of upstream jobspy calls by site",
+    ),
+    "jobscraper_scrape_rows_total": (
+        COUNTER,
+        "Jobs returned by upstream jobspy calls by site",
+    ),
+    "jobscraper_scrape_errors_total": (
+        COUNTER,
+        "Failed upstream jobspy calls by site and exception type",
+    ),
+    "jobscraper_cache_requests_total": (
+        COUNTER,
+        "Scrape requests by result cache status",
+    ),
+    "jobscraper_requests_queued": (
+        GAUGE,
+        "Requests waiting for a thread in the ASGI serving mode",
+    ),
+    "jobscraper_requests_rejected_total": (
+        COUNTER,
+        "Requests rejected with 429 because the ASGI request queue was full",
+    ),
+}
+
+# Site label values; anything else a client sends is reported as "other"
+SITE_LABELS = frozenset(
+    {
+        "all",
+        "bayt",
+        "bdjobs",
+        "glassdoor",
+        "google",
+        "indeed",
+        "linkedin",
+        "naukri",
+        "zip_recruiter",
+    }
+)
+
+# Endpoint label of requests that matched no route
+UNMATCHED_ENDPOINT = "unmatched"
+_METHODS = frozenset({"DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT"})
+
+# WSGI environ keys carrying the stage timings and route of a request
+STAGES_ENVIRON_KEY = "jobscraper.stages"
+ENDPOINT_ENVIRON_KEY = "jobscraper.endpoint"
+
+
+def site_label(scrape_params: dict) -> str:
+    """
+    Name the site of a jobspy call for use as a label value.
+
+    Args:
+        scrape_params: Keyword arguments of the call
+
+    Returns:
+        str: The site, ``"all"`` for calls covering several or every site, or
+        ``"other"`` for names jobspy does not know
+    """
+    site = str(single_site(scrape_params) or "all").lower()
+    return site if site in SITE_LABELS else "other"
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Add time spent in a stage to the timings of the current request.
+
+    Outside of a request, e.g. in a background thread, nothing is recorded.
+
+    Args:
+        stage: Stage name such as ``"auth"`` or ``"serialize"``
+        seconds: Time spent
+    """
+    if has_request_context():
+        stages = request.environ.setdefault(STAGES_ENVIRON_KEY, {})
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """
+    Time the enclosed block as a stage of the current request.
+
+    Args:
+        stage: Stage name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def _label_key(labels: dict) -> tuple:
+    """Hashable, order-independent form of a label set."""
+    return tuple(sorted(labels.items()))
+
+
+def _render_labels(labels: tuple) -> str:
+    """Label pairs in exposition format, without the braces."""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return ",".join(pairs)
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, without a fraction for whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this id is still running on the host."""
+    if pid == os.getpid() or os.name == "nt":
+        # On Windows os.kill would terminate the process instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metrics(SQLiteStore):
+    """
+    Counters, gauges and histograms shared by every worker on the host.
+
+    Args:
+        path: SQLite database file, created if missing
+        flush_interval: Seconds between snapshots written by each worker
+        enabled: When False, nothing is recorded
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS metric_samples ("
+        "process TEXT NOT NULL, pid INTEGER NOT NULL, kind TEXT NOT NULL, "
+        "family TEXT NOT NULL, sample TEXT NOT NULL, labels TEXT NOT NULL, "
+        "le TEXT NOT NULL, value REAL NOT NULL, "
+        "PRIMARY KEY (process, sample, labels, le)) WITHOUT ROWID",
+    )
+
+    def __init__(self, path: str, flush_interval: float, enabled: bool = True):
+        super().__init__(path)
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._process = None
+        self._values = {}
+        self._histograms = {}
+        self._dirty = False
+        if enabled:
+            atexit.register(self.flush)
+
+    def inc(self, family: str, amount: float = 1.0, **labels) -> None:
+        """
+        Add to a counter, or to a gauge when ``amount`` may be negative.
+
+        Args:
+            family: Name listed in ``METRIC_FAMILIES``
+            amount: Value to add
+            **labels: Label values of the series
+        """
+        if not self.enabled:
+            return
+        key = (family, _label_key(labels))
+        with self._lock:
+            self._own_process()
+            self._values[key] = self._values.get(key, 0.0) + amount
+            self._dirty = True
+
+    def observe(self, family: str, seconds: float, **labels) -> None:
+        """
+        Record a duration in a histogram.
+
+        Args:
+            family: Name listed in ``METRIC_FAMILIES``
+            seconds: Observed duration
+            **labels: Label values of the series
+        """
+        if not self.enabled:
+            return
+        key = (family, _label_key(labels))
+        with self._lock:
+            self._own_process()
+            counts = self._histograms.get(key)
+            if counts is None:
+                # One count per bucket, one for +Inf, then the sum
+                counts = self._histograms[key] = [0] * len(_BUCKET_LABELS) + [0.0]
+            counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            counts[-1] += seconds
+            self._dirty = True
+
+    def wrap(self, scrape_fn):
+        """
+        Time each call of ``scrape_fn`` and count its rows and errors.
+
+        Args:
+            scrape_fn: ``scrape_jobs`` or a compatible callable
+
+        Returns:
+            callable: Same signature as ``scrape_fn``
+        """
+
+        def scrape_with_metrics(**scrape_params):
+            site = site_label(scrape_params)
+            start = time.perf_counter()
+            try:
+                jobs = scrape_fn(**scrape_params)
+            except Exception as e:
+                self.inc(
+                    "jobscraper_scrape_errors_total",
+                    site=site,
+                    exception=type(e).__name__,
+                )
+                raise
+            finally:
+                self.observe(
+                    "jobscraper_scrape_duration_seconds",
+                    time.perf_counter() - start,
+                    site=site,
+                )
+            self.inc("jobscraper_scrape_rows_total", len(jobs), site=site)
+            return jobs
+
+        return scrape_with_metrics
+
+    def flush(self) -> None:
+        """Write this process's values to the shared file if they changed."""
+        if not self.enabled:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty or self._pid != os.getpid():
+                    return
+                rows = self._snapshot()
+                self._dirty = False
+            try:
+                with self.transaction() as conn:
+                    # Gauges of an exited process whose pid was reused
+                    conn.execute(
+                        "DELETE FROM metric_samples "
+                        "WHERE pid = ? AND process != ? AND kind = ?",
+                        (self._pid, self._process, GAUGE),
+                    )
+                    conn.executemany(
+                        "INSERT INTO metric_samples VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (process, sample, labels, le) "
+                        "DO UPDATE SET value = excluded.value",
+                        rows,
+                    )
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def render(self) -> str:
+        """
+        Export the totals of every process in Prometheus text format.
+
+        Returns:
+            str: Exposition format body for ``/metrics``
+        """
+        self.flush()
+        self._collect_exited()
+        rows = self.connection().execute(
+            "SELECT family, sample, labels, le, SUM(value) FROM metric_samples "
+            "GROUP BY family, sample, labels, le"
+        )
+        samples = {}
+        for family, sample, labels, le, value in rows:
+            samples.setdefault(family, []).append((sample, labels, le, value))
+
+        lines = []
+        for family, (kind, help_text) in METRIC_FAMILIES.items():
+            if family not in samples:
+                continue
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            ordered = sorted(
+                samples[family],
+                key=lambda s: (s[1], s[0], float(s[2].replace("+Inf", "inf") or 0)),
+            )
+            for sample, labels, le, value in ordered:
+                if le:
+                    labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                series = f"{sample}{{{labels}}}" if labels else sample
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every metric, in this process and in the shared file."""
+        with self._flush_lock:
+            with self._lock:
+                self._values.clear()
+                self._histograms.clear()
+                self._dirty = False
+            self.connection().execute("DELETE FROM metric_samples")
+
+    def _own_process(self) -> None:
+        """Start afresh after a fork; the caller holds ``_lock``."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        self._process = f"{pid}-{time.time_ns()}"
+        self._values = {}
+        self._histograms = {}
+        if self.flush_interval > 0:
+            thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+            thread.start()
+
+    def _run(self) -> None:
+        """Write snapshots until the process exits."""
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                metrics_logger.exception("Writing metrics failed")
+
+    def _snapshot(self) -> list:
+        """Rows of this process's values; the caller holds ``_lock``."""
+        own = (self._process, self._pid)
+        rows = []
+        for (family, labels), value in self._values.items():
+            kind = METRIC_FAMILIES[family][0]
+            rows.append((*own, kind, family, family, _render_labels(labels), "", value))
+        for (family, labels), counts in self._histograms.items():
+            rendered = _render_labels(labels)
+            total = 0
+            for le, count in zip(_BUCKET_LABELS, counts):
+                total += count
+                rows.append(
+                    (*own, HISTOGRAM, family, f"{family}_bucket", rendered, le, total)
+                )
+            rows.append(
+                (*own, HISTOGRAM, family, f"{family}_count", rendered, "", total)
+            )
+            rows.append(
+                (*own, HISTOGRAM, family, f"{family}_sum", rendered, "", counts[-1])
+            )
+        return rows
+
+    def _collect_exited(self) -> None:
+        """Fold the series of exited processes into one row each, minus gauges."""
+        conn = self.connection()
+        processes = conn.execute(
+            "SELECT DISTINCT process, pid FROM metric_samples WHERE pid != 0"
+        ).fetchall()
+        exited = [process for process, pid in processes if not _process_alive(pid)]
+        if not exited:
+            return
+
+        marks = ", ".join("?" * len(exited))
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO metric_samples "
+                "SELECT '', 0, kind, family, sample, labels, le, SUM(value) "
+                f"FROM metric_samples WHERE process IN ({marks}) AND kind != ? "
+                "GROUP BY sample, labels, le "
+                "ON CONFLICT (process, sample, labels, le) "
+                "DO UPDATE SET value = value + excluded.value",
+                (*exited, GAUGE),
+            )
+            conn.execute(
+                f"DELETE FROM metric_samples WHERE process IN ({marks})", exited
+            )
+
+
+class _MeteredBody:
+    """Response body that counts its bytes and reports when it is closed."""
+
+    def __init__(self, body, on_close):
+        self._body = body
+        self._on_close = on_close
+        self._closed = False
+        self.bytes = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self._body, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close(self)
+
+
+class MetricsMiddleware:
+    """
+    WSGI middleware recording request counts, durations and body sizes.
+
+    The ``write`` stage runs from the application returning its response to
+    the server closing the body, so for streamed responses it includes
+    encoding each chunk.
+
+    Args:
+        wsgi_app: Application to wrap, usually ``app.wsgi_app``
+        metrics: Registry to record into
+    """
+
+    def __init__(self, wsgi_app, metrics: Metrics):
+        self.wsgi_app = wsgi_app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        status = {}
+
+        def capture_status(status_line, headers, exc_info=None):
+            status["code"] = status_line.split(" ", 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        self.metrics.inc("jobscraper_requests_in_flight")
+        try:
+            body = self.wsgi_app(environ, capture_status)
+        except BaseException:
+            self.metrics.inc("jobscraper_requests_in_flight", -1)
+            raise
+
+        write_start = time.perf_counter()
+
+        def record(metered: _MeteredBody) -> None:
+            end = time.perf_counter()
+            self._record(environ, status.get("code", "500"), metered.bytes)
+            self.metrics.observe(
+                "jobscraper_request_duration_seconds",
+                end - start,
+                endpoint=environ.get(ENDPOINT_ENVIRON_KEY, UNMATCHED_ENDPOINT),
+            )
+            self.metrics.observe(
+                "jobscraper_stage_duration_seconds", end - write_start, stage="write"
+            )
+
+        return _MeteredBody(body, record)
+
+    def _record(self, environ, status: str, body_bytes: int) -> None:
+        """Record a finished request, apart from its durations."""
+        endpoint = environ.get(ENDPOINT_ENVIRON_KEY, UNMATCHED_ENDPOINT)
+        method = environ.get("REQUEST_METHOD", "")
+        self.metrics.inc("jobscraper_requests_in_flight", -1)
+        self.metrics.inc(
+            "jobscraper_requests_total",
+            endpoint=endpoint,
+            method=method if method in _METHODS else "other",
+            status=status,
+        )
+        self.metrics.inc(
+            "jobscraper_response_bytes_total", body_bytes, endpoint=endpoint
+        )
+        for stage, seconds in environ.get(STAGES_ENVIRON_KEY, {}).items():
+            self.metrics.observe(
+                "jobscraper_stage_duration_seconds", seconds, stage=stage
+            )
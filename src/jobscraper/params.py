@@ -0,0 +1,160 @@
+"""
+Request parameter handling for scrape requests.
+
+Defines the whitelist of parameters forwarded to ``jobspy.scrape_jobs`` and a
+canonical form of them that identifies equivalent searches.
+"""
+
+import hashlib
+import json
+
+# All parameters accepted by jobspy.scrape_jobs that clients may pass through
+SCRAPE_PARAMS = [
+    "site_name",
+    "search_term",
+    "google_search_term",
+    "location",
+    "results_wanted",
+    "hours_old",
+    "country_indeed",
+    "distance",
+    "job_type",
+    "proxies",
+    "is_remote",
+    "easy_apply",
+    "user_agent",
+    "description_format",
+    "offset",
+    "verbose",
+    "linkedin_fetch_description",
+    "linkedin_company_ids",
+    "enforce_annual_salary",
+    "ca_cert",
+]
+
+# jobspy defaults; passing these explicitly yields the same search as omitting them
+SCRAPE_DEFAULTS = {
+    "distance": 50,
+    "is_remote": False,
+    "results_wanted": 15,
+    "country_indeed": "usa",
+    "description_format": "markdown",
+    "linkedin_fetch_description": False,
+    "offset": 0,
+    "enforce_annual_salary": False,
+}
+
+# Parameters that never change which jobs are returned, or are secrets that must
+# not end up in cache keys, logs or on disk
+NON_KEY_PARAMS = {"proxies", "ca_cert", "verbose"}
+
+# Parameters whose list values are order-insensitive
+_UNORDERED_PARAMS = {"site_name", "linkedin_company_ids"}
+
+# Parameters compared case-insensitively
+_CASE_INSENSITIVE_PARAMS = {"site_name", "country_indeed", "job_type"}
+
+
+class InvalidRequestError(ValueError):
+    """Raised when a request contains invalid options."""
+
+
+def extract_scrape_params(data: dict) -> dict:
+    """
+    Pick the whitelisted jobspy parameters out of a request body.
+
+    Only parameters that were actually provided are included, so jobspy's own
+    defaults apply to everything else.
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        dict: Keyword arguments for ``scrape_jobs``
+    """
+    return {param: data[param] for param in SCRAPE_PARAMS if param in data}
+
+
+def parse_deadline_ms(data: dict, default_ms: int, max_ms: int):
+    """
+    Read the request deadline in milliseconds.
+
+    Args:
+        data: Parsed JSON request body
+        default_ms: Deadline used when the request sets none; 0 for no deadline
+        max_ms: Upper bound for requested deadlines; 0 for no bound
+
+    Returns:
+        int or None: Deadline in milliseconds, or None for no deadline
+
+    Raises:
+        InvalidRequestError: If ``deadline_ms`` is not a positive integer
+    """
+    deadline_ms = data.get("deadline_ms")
+    if deadline_ms is None:
+        deadline_ms = default_ms or None
+    elif (
+        isinstance(deadline_ms, bool)
+        or not isinstance(deadline_ms, int)
+        or deadline_ms <= 0
+    ):
+        raise InvalidRequestError("deadline_ms must be a positive integer")
+
+    if deadline_ms is not None and max_ms:
+        deadline_ms = min(deadline_ms, max_ms)
+    return deadline_ms
+
+
+def _canonical_value(param: str, value):
+    """Normalize a single parameter value for comparison."""
+    if param in _CASE_INSENSITIVE_PARAMS:
+        if isinstance(value, str):
+            value = value.lower()
+        elif isinstance(value, list):
+            value = [v.lower() if isinstance(v, str) else v for v in value]
+
+    if param == "site_name" and isinstance(value, str):
+        value = [value]
+
+    if param in _UNORDERED_PARAMS and isinstance(value, list):
+        value = sorted(set(value), key=str)
+
+    return value
+
+
+def canonical_params(params: dict) -> dict:
+    """
+    Reduce scrape parameters to a canonical form.
+
+    List order is normalized, values equal to jobspy's defaults are dropped and
+    secrets or output-only options such as ``proxies`` and ``ca_cert`` are removed.
+
+    Args:
+        params: Keyword arguments for ``scrape_jobs``
+
+    Returns:
+        dict: Canonical parameters, equal for equivalent searches
+    """
+    canonical = {}
+    for param, value in params.items():
+        if param in NON_KEY_PARAMS or value is None:
+            continue
+        value = _canonical_value(param, value)
+        if param in SCRAPE_DEFAULTS and value == SCRAPE_DEFAULTS[param]:
+            continue
+        canonical[param] = value
+    return canonical
+
+
+def params_key(params: dict) -> str:
+    """
+    Compute a stable key identifying a search.
+
+    Args:
+        params: Keyword arguments for ``scrape_jobs``
+
+    Returns:
+        str: Hex digest of the canonical parameters
+    """
+    encoded = json.dumps(canonical_params(params), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -0,0 +1,161 @@
+"""
+Server-Timing headers and opt-in profiling of single requests.
+
+Every response can carry a ``Server-Timing`` header built from the stages
+timed with :func:`jobscraper.metrics.timed_stage`. A request sent with
+``?profile=1`` and the separate profiling token runs under cProfile; the
+report of its hottest functions is written to disk, where any worker can serve
+it. Requests without the flag never touch the profiler.
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import secrets
+import threading
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Profiles kept on disk; the oldest are deleted first
+MAX_PROFILES = 50
+
+_PROFILE_ID = re.compile(r"[0-9a-f]{16}")
+
+
+def server_timing(stages: dict, total: float) -> str:
+    """
+    Format stage timings as a ``Server-Timing`` header value.
+
+    Args:
+        stages: Seconds spent per stage, in the order they ran
+        total: Seconds since the request arrived
+
+    Returns:
+        str: Value such as ``parse;dur=0.2, scrape;dur=812.4, total;dur=815.0``
+        with durations in milliseconds
+    """
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def profile_authorized(provided, required: str) -> bool:
+    """
+    Check the token of a profiling request.
+
+    Args:
+        provided: Value of the ``X-Profile-Token`` header, or None
+        required: Configured profiling token; empty disables profiling
+
+    Returns:
+        bool: Whether the request may be profiled
+    """
+    if not required or provided is None:
+        return False
+    return hmac.compare_digest(provided.encode("utf-8"), required.encode("utf-8"))
+
+
+class ProfileStore:
+    """
+    Runs profiles and keeps their reports in a directory.
+
+    Only one request per process is profiled at a time, since the interpreter
+    supports a single active profiler.
+
+    Args:
+        directory: Directory for ``<id>.prof`` stats and ``<id>.txt`` reports,
+            created if missing
+        top_n: Functions listed in each report
+    """
+
+    def __init__(self, directory: str, top_n: int):
+        self.directory = directory
+        self.top_n = top_n
+        self._busy = threading.Lock()
+
+    def start(self):
+        """
+        Start profiling the calling thread.
+
+        Returns:
+            cProfile.Profile or None: The running profiler, or None if another
+            request is being profiled
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile) -> None:
+        """Stop a profiler without saving it."""
+        profiler.disable()
+        self._busy.release()
+
+    def save(self, profiler: cProfile.Profile, description: str) -> str:
+        """
+        Stop a profiler and store its stats and report.
+
+        Args:
+            profiler: Output of :meth:`start`
+            description: First line of the report, e.g. the request line
+
+        Returns:
+            str: Id to fetch the report with
+        """
+        self.stop(profiler)
+        profile_id = secrets.token_hex(8)
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self._path(profile_id, "prof"))
+
+        report = io.StringIO()
+        report.write(f"{description}\n\n")
+        stats = pstats.Stats(profiler, stream=report).strip_dirs()
+        # Functions that took longest themselves, then including their callees
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        with open(self._path(profile_id, "txt"), "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+
+        self._prune()
+        return profile_id
+
+    def report(self, profile_id: str):
+        """
+        Read the report of a profile.
+
+        Args:
+            profile_id: Output of :meth:`save`
+
+        Returns:
+            str or None: The report, or None if unknown or deleted
+        """
+        if not _PROFILE_ID.fullmatch(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, "txt"), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        """File of a profile."""
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond ``MAX_PROFILES``."""
+        reports = [
+            entry for entry in os.scandir(self.directory) if entry.name.endswith(".txt")
+        ]
+        reports.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in reports[: max(0, len(reports) - MAX_PROFILES)]:
+            profile_id = entry.name[: -len(".txt")]
+            for extension in ("txt", "prof"):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,273 @@
+"""
+Server-side proxy pool with per-site health scoring.
+
+Searches that do not bring their own ``proxies`` are given one proxy from the
+pool for each ``scrape_jobs`` call, so every outcome can be attributed to the
+proxy that produced it. Latency and failure rate are tracked per proxy and
+site as exponentially weighted averages in a SQLite file shared by every
+worker, so all of them learn from each call. Proxies are picked with the
+power of two choices: two random healthy candidates are compared and the one
+with the lower expected time to a successful scrape wins, which favours fast
+proxies without sending every request to the same one. A proxy that fails
+several times in a row is quarantined for a while. As for the circuit
+breakers, only network, HTTP and timeout errors count against a proxy.
+
+Proxy URLs may hold credentials, so only a hash of each is stored.
+"""
+
+import hashlib
+import logging
+import random
+import time
+
+from .breaker import UPSTREAM_ERRORS
+from .scraper import single_site
+from .storage import SQLiteStore
+
+proxy_logger = logging.getLogger(__name__)
+
+# Weight of the newest call in the latency and failure rate averages
+EWMA_ALPHA = 0.2
+
+# Health key of calls covering several sites, or all of them
+ALL_SITES = "all"
+
+# Failure rates are capped below 1 so scores stay finite
+_MAX_FAILURE_RATE = 0.95
+
+
+def parse_proxy_list(value: str) -> list:
+    """
+    Split a comma- or newline-separated proxy list.
+
+    Args:
+        value: Proxies as accepted by jobspy, e.g. ``user:pass@host:port``
+
+    Returns:
+        list: Unique proxies in their original order
+    """
+    proxies = [proxy.strip() for proxy in value.replace("\n", ",").split(",")]
+    return list(dict.fromkeys(proxy for proxy in proxies if proxy))
+
+
+def proxy_id(proxy: str) -> str:
+    """
+    Identify a proxy without storing its credentials.
+
+    Args:
+        proxy: Proxy URL
+
+    Returns:
+        str: Short hex digest of the URL
+    """
+    return hashlib.blake2b(proxy.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def proxy_label(proxy: str) -> str:
+    """
+    Describe a proxy for reports, with any credentials removed.
+
+    Args:
+        proxy: Proxy URL
+
+    Returns:
+        str: The URL without its ``user:password@`` part
+    """
+    scheme, separator, address = proxy.rpartition("://")
+    address = address.rpartition("@")[2]
+    return f"{scheme}{separator}{address}"
+
+
+class ProxyPool(SQLiteStore):
+    """
+    Pool of proxies with health shared by every worker on the host.
+
+    Args:
+        path: SQLite database file, created if missing
+        proxies: Proxy URLs as accepted by jobspy
+        quarantine_failures: Consecutive failures that quarantine a proxy
+        quarantine_seconds: Seconds a quarantined proxy is not used
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS proxy_health ("
+        "proxy TEXT NOT NULL, site TEXT NOT NULL, calls INTEGER NOT NULL, "
+        "failures INTEGER NOT NULL, latency REAL NOT NULL, "
+        "failure_rate REAL NOT NULL, consecutive_failures INTEGER NOT NULL, "
+        "quarantined_until REAL NOT NULL, last_used REAL NOT NULL, "
+        "PRIMARY KEY (proxy, site)) WITHOUT ROWID",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        proxies: list,
+        quarantine_failures: int,
+        quarantine_seconds: float,
+    ):
+        super().__init__(path)
+        self.proxies = list(proxies)
+        self.quarantine_failures = quarantine_failures
+        self.quarantine_seconds = quarantine_seconds
+        self._ids = {proxy: proxy_id(proxy) for proxy in self.proxies}
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def acquire(self, site: str) -> str:
+        """
+        Pick a proxy for a call to a site.
+
+        Proxies without any calls to the site yet score best, so each one is
+        tried. When every proxy is quarantined, the one released first is used.
+
+        Args:
+            site: Site name, or ``"all"``
+
+        Returns:
+            str: Proxy URL
+        """
+        health = self._health(site)
+        now = time.time()
+        healthy = [
+            proxy
+            for proxy in self.proxies
+            if health.get(self._ids[proxy], (0.0, 0.0, 0.0))[2] <= now
+        ]
+        if not healthy:
+            return min(self.proxies, key=lambda proxy: health[self._ids[proxy]][2])
+
+        candidates = random.sample(healthy, min(2, len(healthy)))
+        return min(candidates, key=lambda proxy: self._score(health, proxy))
+
+    def record(self, proxy: str, site: str, failed: bool, latency: float) -> None:
+        """
+        Update a proxy's health with the outcome of a call.
+
+        Args:
+            proxy: Proxy URL the call used
+            site: Site name, or ``"all"``
+            failed: Whether the call raised an error
+            latency: Seconds the call took
+        """
+        now = time.time()
+        row = (
+            self.connection()
+            .execute(
+                "INSERT INTO proxy_health VALUES (:proxy, :site, 1, :failed, "
+                ":latency, :failed, :failed, 0, :now) "
+                "ON CONFLICT (proxy, site) DO UPDATE SET "
+                "calls = calls + 1, failures = failures + :failed, "
+                "latency = latency + :alpha * (:latency - latency), "
+                "failure_rate = failure_rate + :alpha * (:failed - failure_rate), "
+                "consecutive_failures = CASE WHEN :failed "
+                "THEN consecutive_failures + 1 ELSE 0 END, "
+                "quarantined_until = CASE WHEN :failed "
+                "AND consecutive_failures + 1 >= :threshold "
+                "THEN :now + :quarantine ELSE quarantined_until END, "
+                "last_used = :now "
+                "RETURNING consecutive_failures",
+                {
+                    "proxy": self._ids[proxy],
+                    "site": site,
+                    "failed": int(failed),
+                    "latency": latency,
+                    "now": now,
+                    "alpha": EWMA_ALPHA,
+                    "threshold": self.quarantine_failures,
+                    "quarantine": self.quarantine_seconds,
+                },
+            )
+            .fetchone()
+        )
+        (consecutive_failures,) = row
+        if failed and consecutive_failures == self.quarantine_failures:
+            proxy_logger.warning(
+                f"Quarantining proxy {proxy_label(proxy)} for {site} after "
+                f"{consecutive_failures} failures in a row"
+            )
+
+    def wrap(self, scrape_fn):
+        """
+        Give each call of ``scrape_fn`` a proxy from the pool.
+
+        Calls that already carry ``proxies`` are passed through unchanged.
+        Errors other than :data:`jobscraper.breaker.UPSTREAM_ERRORS`, such as
+        invalid search parameters, are raised without being recorded.
+
+        Args:
+            scrape_fn: ``scrape_jobs`` or a compatible callable
+
+        Returns:
+            callable: Same signature as ``scrape_fn``
+        """
+
+        def scrape_with_proxy(**scrape_params):
+            if scrape_params.get("proxies"):
+                return scrape_fn(**scrape_params)
+
+            site = single_site(scrape_params) or ALL_SITES
+            proxy = self.acquire(site)
+            start = time.perf_counter()
+            try:
+                jobs = scrape_fn(**{**scrape_params, "proxies": [proxy]})
+            except UPSTREAM_ERRORS:
+                self.record(proxy, site, True, time.perf_counter() - start)
+                raise
+            self.record(proxy, site, False, time.perf_counter() - start)
+            return jobs
+
+        return scrape_with_proxy
+
+    def report(self) -> list:
+        """
+        Describe the health of every proxy of the pool.
+
+        Returns:
+            list: One entry per proxy with its ``id``, credential-free
+            ``label`` and per-site ``calls``, ``failures``, ``latency_ms``,
+            ``failure_rate`` and ``quarantined`` flag
+        """
+        now = time.time()
+        sites = {}
+        for row in self.connection().execute(
+            "SELECT proxy, site, calls, failures, latency, failure_rate, "
+            "quarantined_until FROM proxy_health ORDER BY site"
+        ):
+            pid, site, calls, failures, latency, failure_rate, until = row
+            sites.setdefault(pid, {})[site] = {
+                "calls": calls,
+                "failures": failures,
+                "latency_ms": round(latency * 1000, 1),
+                "failure_rate": round(failure_rate, 3),
+                "quarantined": until > now,
+            }
+        return [
+            {
+                "id": self._ids[proxy],
+                "label": proxy_label(proxy),
+                "sites": sites.get(self._ids[proxy], {}),
+            }
+            for proxy in self.proxies
+        ]
+
+    def clear(self) -> None:
+        """Forget the health of every proxy."""
+        self.connection().execute("DELETE FROM proxy_health")
+
+    def _health(self, site: str) -> dict:
+        """Latency, failure rate and quarantine end per proxy id for a site."""
+        rows = self.connection().execute(
+            "SELECT proxy, latency, failure_rate, quarantined_until "
+            "FROM proxy_health WHERE site = ?",
+            (site,),
+        )
+        return {pid: (latency, rate, until) for pid, latency, rate, until in rows}
+
+    def _score(self, health: dict, proxy: str) -> float:
+        """Expected seconds to a successful call; 0 for untried proxies."""
+        entry = health.get(self._ids[proxy])
+        if entry is None:
+            return 0.0
+        latency, failure_rate, _ = entry
+        return latency / (1 - min(failure_rate, _MAX_FAILURE_RATE))
@@ -0,0 +1,385 @@
+"""
+Refresh-ahead of popular searches and stale-while-revalidate.
+
+Every worker counts the canonical searches it serves and periodically adds the
+counts to a SQLite file shared by the host. One worker per host, the holder of
+a file lock, ranks the searches requested within the popularity window and
+re-scrapes the most popular ones into the result cache shortly before their
+entries expire, so their clients keep getting cache hits. Refreshes run on a
+small bounded pool and each site has an hourly budget of refresh scrapes.
+
+Entries that did expire can still be served as stale for a grace period, while
+a :class:`Refresher` scrapes the search again in the background.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .params import canonical_params
+from .storage import SQLiteStore
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+refresh_logger = logging.getLogger(__name__)
+
+# Width of the buckets request counts are aggregated in, in seconds
+BUCKET_SECONDS = 60
+
+# Budget shared by searches without site_name, which jobspy runs on every site
+ALL_SITES = "all"
+
+# Period the per-site refresh budget applies to, in seconds
+SITE_BUDGET_PERIOD = 3600
+
+
+def search_sites(params: dict) -> list:
+    """
+    List the sites whose budgets a refresh of a search uses up.
+
+    Args:
+        params: Canonical scrape parameters
+
+    Returns:
+        list: The requested sites, or ``["all"]`` when none were named
+    """
+    return params.get("site_name") or [ALL_SITES]
+
+
+class SearchPopularity(SQLiteStore):
+    """
+    Request counts per search and minute, shared by every worker on the host.
+
+    Args:
+        path: SQLite database file, created if missing
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS popular_searches ("
+        "key TEXT PRIMARY KEY, params TEXT NOT NULL, last_requested REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS search_requests ("
+        "key TEXT NOT NULL, bucket INTEGER NOT NULL, requests INTEGER NOT NULL, "
+        "PRIMARY KEY (key, bucket)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS search_requests_bucket "
+        "ON search_requests (bucket)",
+    )
+
+    def add(self, counts: dict, searches: dict, now: float) -> None:
+        """
+        Add request counts to the current bucket.
+
+        Args:
+            counts: Requests per search key
+            searches: Canonical scrape parameters per search key
+            now: Time the requests were counted
+        """
+        if not counts:
+            return
+        bucket = int(now // BUCKET_SECONDS)
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO popular_searches VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "params = excluded.params, last_requested = excluded.last_requested",
+                [(key, json.dumps(searches[key]), now) for key in counts],
+            )
+            conn.executemany(
+                "INSERT INTO search_requests VALUES (?, ?, ?) "
+                "ON CONFLICT (key, bucket) DO UPDATE SET "
+                "requests = requests + excluded.requests",
+                [(key, bucket, count) for key, count in counts.items()],
+            )
+
+    def top(self, limit: int, since: float) -> list:
+        """
+        Rank the searches by their requests since a point in time.
+
+        Args:
+            limit: Number of searches returned
+            since: Start of the popularity window
+
+        Returns:
+            list: ``(key, params, requests)`` tuples, most requested first
+        """
+        rows = self.connection().execute(
+            "SELECT key, params, SUM(requests) AS total FROM search_requests "
+            "JOIN popular_searches USING (key) WHERE bucket >= ? "
+            "GROUP BY key ORDER BY total DESC, last_requested DESC LIMIT ?",
+            (int(since // BUCKET_SECONDS), limit),
+        )
+        return [(key, json.loads(params), total) for key, params, total in rows]
+
+    def purge(self, before: float) -> None:
+        """Delete counts, and searches not requested, since a point in time."""
+        with self.transaction() as conn:
+            conn.execute(
+                "DELETE FROM search_requests WHERE bucket < ?",
+                (int(before // BUCKET_SECONDS),),
+            )
+            conn.execute(
+                "DELETE FROM popular_searches WHERE last_requested < ?", (before,)
+            )
+
+    def clear(self) -> None:
+        """Forget every search."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM search_requests")
+            conn.execute("DELETE FROM popular_searches")
+
+
+class Refresher:
+    """
+    Re-scrape searches into the result cache on a bounded background pool.
+
+    A search already being refreshed by this process is not queued again.
+
+    Args:
+        refresh: Callable taking the scrape parameters, the cache key and
+            whether a result cached meanwhile by another worker may be kept
+        workers: Threads running refreshes
+    """
+
+    def __init__(self, refresh, workers: int):
+        self.refresh = refresh
+        self.workers = workers
+        self.refreshed = 0
+        self.failed = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def submit(self, key: str, scrape_params: dict, recheck: bool) -> bool:
+        """
+        Queue a refresh of a search unless one is already pending.
+
+        Args:
+            key: Canonical key of the search
+            scrape_params: Keyword arguments for ``scrape_jobs``
+            recheck: Whether a fresh result stored meanwhile may be kept
+
+        Returns:
+            bool: False if the search was already being refreshed
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # Pool threads and their refreshes do not survive a fork
+                self._pid = os.getpid()
+                self._pending = set()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="cache-refresh"
+                )
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._run, key, scrape_params, recheck)
+        return True
+
+    def stats(self) -> dict:
+        """Refreshes completed, failed and pending in this process."""
+        with self._lock:
+            return {
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }
+
+    def _run(self, key: str, scrape_params: dict, recheck: bool) -> None:
+        """Refresh one search and log any failure."""
+        try:
+            self.refresh(scrape_params, key, recheck)
+            failed = False
+        except Exception as e:
+            refresh_logger.warning(f"Refreshing search {key[:12]} failed: {e}")
+            failed = True
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.refreshed += 1
+            self._pending.discard(key)
+
+
+class RefreshScheduler:
+    """
+    Keep the most popular searches in the result cache before they expire.
+
+    :meth:`track` only counts a request in memory. A background thread,
+    started on first use in each process, adds the counts to the shared
+    popularity store every ``interval`` seconds; the process holding the
+    host-wide scheduler lock then refreshes popular searches whose entries
+    expire within ``lead_time`` seconds, or are missing.
+
+    Args:
+        popularity: Shared request counts
+        cache: Result cache the searches are refreshed into
+        refresher: Pool running the refreshes
+        lock_path: File locked by the scheduling process
+        top_n: Number of most requested searches kept warm
+        lead_time: Seconds before expiry an entry is refreshed
+        window: Seconds of requests the popularity ranking covers
+        interval: Seconds between scheduling rounds
+        site_budget: Refreshes per site and hour; 0 for no limit
+    """
+
+    def __init__(
+        self,
+        popularity: SearchPopularity,
+        cache,
+        refresher: Refresher,
+        lock_path: str,
+        top_n: int,
+        lead_time: float,
+        window: float,
+        interval: float,
+        site_budget: int,
+    ):
+        self.popularity = popularity
+        self.cache = cache
+        self.refresher = refresher
+        self.lock_path = lock_path
+        self.top_n = top_n
+        self.lead_time = lead_time
+        self.window = window
+        self.interval = interval
+        self.site_budget = site_budget
+        self.scheduled = 0
+        self.over_budget = 0
+        self._counts = Counter()
+        self._searches = {}
+        self._refreshes = {}
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._leader_pid = None
+        self._thread_pid = None
+
+    @property
+    def leader(self) -> bool:
+        """Whether this process runs the refreshes for the host."""
+        return self._leader_pid == os.getpid()
+
+    def track(self, key: str, scrape_params: dict) -> None:
+        """
+        Count a request for a search.
+
+        Args:
+            key: Canonical key of the search
+            scrape_params: Keyword arguments for ``scrape_jobs``
+        """
+        self._ensure_thread()
+        with self._lock:
+            self._counts[key] += 1
+            if key not in self._searches:
+                # Secrets such as proxies are not part of the canonical form
+                self._searches[key] = canonical_params(scrape_params)
+
+    def run_once(self, now=None) -> int:
+        """
+        Publish this process's counts and, on the leader, schedule refreshes.
+
+        Args:
+            now: Current wall-clock time; defaults to ``time.time()``
+
+        Returns:
+            int: Number of refreshes queued
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            searches, self._searches = self._searches, {}
+        self.popularity.add(counts, searches, now)
+
+        if not self._acquire_leadership():
+            return 0
+        self.popularity.purge(now - self.window)
+
+        queued = 0
+        for key, params, _ in self.popularity.top(self.top_n, now - self.window):
+            expires_in = self.cache.expires_in(key)
+            if expires_in is not None and expires_in > self.lead_time:
+                continue
+            if not self._charge_budget(search_sites(params), now):
+                self.over_budget += 1
+                refresh_logger.debug(f"Site budget exhausted for search {key[:12]}")
+                continue
+            # The entry is still fresh, so it must not satisfy the refresh
+            if self.refresher.submit(key, params, recheck=False):
+                queued += 1
+        self.scheduled += queued
+        return queued
+
+    def stats(self) -> dict:
+        """Scheduling counters and leadership of this process."""
+        return {
+            "leader": self.leader,
+            "scheduled": self.scheduled,
+            "over_budget": self.over_budget,
+        }
+
+    def _charge_budget(self, sites: list, now: float) -> bool:
+        """Use up one refresh of every site's budget, if all have one left."""
+        if not self.site_budget:
+            return True
+        recent = []
+        for site in sites:
+            refreshes = self._refreshes.setdefault(site, deque())
+            while refreshes and refreshes[0] <= now - SITE_BUDGET_PERIOD:
+                refreshes.popleft()
+            if len(refreshes) >= self.site_budget:
+                return False
+            recent.append(refreshes)
+        for refreshes in recent:
+            refreshes.append(now)
+        return True
+
+    def _acquire_leadership(self) -> bool:
+        """Try to take the host-wide scheduler lock without blocking."""
+        if self.leader:
+            return True
+        if self._lock_file is not None:
+            # Inherited from the parent; would keep the lock alive after it exits
+            self._lock_file.close()
+            self._lock_file = None
+        if fcntl is None:
+            # Without file locks there is no way to tell workers apart
+            self._leader_pid = os.getpid()
+            return True
+
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held until the process exits, when the next worker takes over
+        self._lock_file, self._leader_pid = lock_file, os.getpid()
+        refresh_logger.info(f"Process {self._leader_pid} now schedules cache refreshes")
+        return True
+
+    def _ensure_thread(self) -> None:
+        """Start the scheduling thread, again after a fork."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            thread = threading.Thread(
+                target=self._run, name="refresh-scheduler", daemon=True
+            )
+            thread.start()
+
+    def _run(self) -> None:
+        """Run a scheduling round every interval."""
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                refresh_logger.error(f"Refresh scheduling failed: {e}", exc_info=True)
@@ -0,0 +1,279 @@
+"""
+Record real ``scrape_jobs`` results and replay them without the network.
+
+While recording, every successful jobspy call is written to a Parquet fixture
+holding the returned DataFrame, with the canonical parameters, the time the
+call took and the row count in the file's metadata. Object columns Arrow
+cannot type, such as columns mixing strings and numbers, are stored as JSON
+text and decoded again on replay, so odd shapes survive the round trip.
+
+In replay mode a :class:`ScrapeReplayer` takes the place of ``scrape_jobs``:
+each call is answered from a fixture of the same search, or else of the same
+sites, after sleeping the recorded duration times a scale factor. This lets
+the service be load-tested and profiled offline against production-shaped
+data.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+import pandas as pd
+
+from .params import canonical_params, params_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+replay_logger = logging.getLogger(__name__)
+
+FIXTURE_SUFFIX = ".parquet"
+
+# Parquet metadata entry describing the recorded call
+METADATA_KEY = b"jobscraper.recording"
+
+
+class ReplayMissError(LookupError):
+    """Raised when no fixture matches the search or the sites of a call."""
+
+
+def _sites_key(params: dict) -> str:
+    """Key of the canonical sites of a search; all sites when none are given."""
+    return json.dumps(params.get("site_name"))
+
+
+def _encode_cell(value):
+    """JSON text of a cell, or None if it is missing."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return json.dumps(value, default=str)
+
+
+def _decode_cell(value):
+    """Inverse of :func:`_encode_cell`."""
+    if not isinstance(value, str):
+        return None
+    return json.loads(value)
+
+
+def write_fixture(path: str, df: pd.DataFrame, metadata: dict) -> None:
+    """
+    Write a DataFrame and the description of its call to a Parquet file.
+
+    Args:
+        path: Fixture file
+        df: Result of the call
+        metadata: JSON-serializable description of the call
+    """
+    df = df.reset_index(drop=True)
+    json_columns = []
+    for column in df.columns:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[column] = df[column].astype(object).map(_encode_cell)
+            json_columns.append(column)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    description = json.dumps({**metadata, "json_columns": json_columns})
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), METADATA_KEY: description.encode("utf-8")}
+    )
+    # Written under a temporary name so a replayer never reads half a file
+    partial = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, partial)
+    os.replace(partial, path)
+
+
+def read_fixture_metadata(path: str) -> dict:
+    """
+    Read the description of a recorded call without loading its rows.
+
+    Args:
+        path: Fixture file
+
+    Returns:
+        dict: Metadata as written by :func:`write_fixture`
+    """
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata.get(METADATA_KEY, b"{}"))
+
+
+def read_fixture(path: str) -> tuple:
+    """
+    Load a fixture.
+
+    Args:
+        path: Fixture file
+
+    Returns:
+        tuple: The recorded DataFrame and its metadata
+    """
+    table = pq.read_table(path)
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+    df = table.to_pandas()
+    for column in metadata.get("json_columns", []):
+        df[column] = df[column].astype(object).map(_decode_cell)
+    return df, metadata
+
+
+class ScrapeRecorder:
+    """
+    Saves the results of ``scrape_jobs`` calls as Parquet fixtures.
+
+    Args:
+        directory: Directory for the fixtures, created if missing; empty
+            disables recording
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        """Whether calls are recorded."""
+        return bool(self.directory)
+
+    def save(self, params: dict, df: pd.DataFrame, duration: float) -> str:
+        """
+        Write one call to a new fixture.
+
+        Args:
+            params: Keyword arguments of the call
+            df: DataFrame the call returned
+            duration: Seconds the call took
+
+        Returns:
+            str: Path of the fixture
+        """
+        if pq is None:
+            raise RuntimeError("pyarrow is required to record scrape results")
+
+        key = params_key(params)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(
+            self.directory, f"{key[:16]}-{secrets.token_hex(4)}{FIXTURE_SUFFIX}"
+        )
+        metadata = {
+            "key": key,
+            "params": canonical_params(params),
+            "duration": duration,
+            "rows": len(df),
+            "recorded_at": time.time(),
+        }
+        write_fixture(path, df, metadata)
+        return path
+
+    def wrap(self, scrape_fn):
+        """
+        Record each successful call of ``scrape_fn``.
+
+        A fixture that cannot be written is logged and the result is returned
+        regardless.
+
+        Args:
+            scrape_fn: ``scrape_jobs`` or a compatible callable
+
+        Returns:
+            callable: Same signature as ``scrape_fn``
+        """
+
+        @functools.wraps(scrape_fn)
+        def recorded(**scrape_params):
+            start = time.monotonic()
+            jobs = scrape_fn(**scrape_params)
+            duration = time.monotonic() - start
+            try:
+                self.save(scrape_params, jobs, duration)
+            except Exception as e:
+                replay_logger.warning(f"Could not record scrape result: {e}")
+            return jobs
+
+        return recorded
+
+
+class ScrapeReplayer:
+    """
+    Stand-in for ``scrape_jobs`` that serves recorded fixtures.
+
+    A call is answered from a fixture of the same canonical search if there
+    is one, else from a fixture recorded for the same sites. Several
+    matching fixtures are served in turn. Fixtures are indexed on the first
+    call and kept in memory once loaded; every call gets its own copy.
+
+    Args:
+        directory: Directory the fixtures were recorded to
+        latency_scale: Factor applied to the recorded durations; 0 answers
+            immediately
+    """
+
+    def __init__(self, directory: str, latency_scale: float = 1.0):
+        if pq is None:
+            raise RuntimeError("pyarrow is required to replay scrape results")
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self._by_key = None
+        self._by_sites = None
+        self._frames = {}
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._index()
+        return sum(len(paths) for paths in self._by_key.values())
+
+    def __call__(self, **scrape_params) -> pd.DataFrame:
+        path = self._pick(scrape_params)
+        df, metadata = self._load(path)
+        time.sleep(metadata.get("duration", 0.0) * self.latency_scale)
+        return df.copy()
+
+    def _index(self) -> None:
+        """Group the fixture files by search and by sites."""
+        with self._lock:
+            if self._by_key is not None:
+                return
+            by_key, by_sites = {}, {}
+            names = [
+                name
+                for name in sorted(os.listdir(self.directory))
+                if name.endswith(FIXTURE_SUFFIX)
+            ]
+            for name in names:
+                path = os.path.join(self.directory, name)
+                metadata = read_fixture_metadata(path)
+                by_key.setdefault(metadata.get("key"), []).append(path)
+                sites = _sites_key(metadata.get("params", {}))
+                by_sites.setdefault(sites, []).append(path)
+            self._by_key, self._by_sites = by_key, by_sites
+        replay_logger.info(f"Replaying {len(names)} fixtures from {self.directory}")
+
+    def _pick(self, scrape_params: dict) -> str:
+        """Choose the fixture answering a call."""
+        self._index()
+        sites = _sites_key(canonical_params(scrape_params))
+        paths = self._by_key.get(params_key(scrape_params)) or self._by_sites.get(sites)
+        if not paths:
+            raise ReplayMissError(f"No recorded scrape for the sites {sites}")
+        with self._lock:
+            turns = self._turns.setdefault(id(paths), itertools.count())
+            return paths[next(turns) % len(paths)]
+
+    def _load(self, path: str) -> tuple:
+        """Fixture contents, read from disk on first use."""
+        with self._lock:
+            cached = self._frames.get(path)
+        if cached is None:
+            cached = read_fixture(path)
+            with self._lock:
+                self._frames[path] = cached
+        return cached
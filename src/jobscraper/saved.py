@@ -0,0 +1,246 @@
+"""
+Saved searches that only return jobs not delivered before.
+
+``/scrape`` requests naming a ``saved_search`` are checked against an index of
+the job ids already returned for that name, kept in a SQLite file shared by
+every worker process on the host. Lookups and updates are one set-based query
+per request over the whole id column, and ids not seen in any result for the
+retention period are pruned so the index stays bounded.
+
+Each run that returns jobs advances the saved search's cursor. Clients that
+pass back the last cursor they processed as ``since`` get jobs first returned
+by later runs again, so a lost response does not lose jobs.
+"""
+
+import json
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from .params import InvalidRequestError
+from .storage import SQLiteStore
+
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9_.:-]{1,128}")
+
+
+def parse_saved_search(data: dict):
+    """
+    Read the ``saved_search`` and ``since`` options of a request body.
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        tuple or None: The saved search name and the cursor to report new jobs
+        since (None for the latest), or None if no saved search was named
+
+    Raises:
+        InvalidRequestError: If the name or cursor is invalid
+    """
+    name = data.get("saved_search")
+    if name is None:
+        if "since" in data:
+            raise InvalidRequestError("since requires saved_search")
+        return None
+    if not isinstance(name, str) or not _NAME_PATTERN.fullmatch(name):
+        raise InvalidRequestError(
+            "saved_search must be 1-128 letters, digits or the characters _ . : -"
+        )
+
+    since = data.get("since")
+    if since is not None and (
+        isinstance(since, bool) or not isinstance(since, int) or since < 0
+    ):
+        raise InvalidRequestError("since must be a non-negative integer")
+    return name, since
+
+
+def job_keys(jobs: pd.DataFrame) -> pd.Series:
+    """
+    Identify jobs by their id, falling back to the job URL.
+
+    Args:
+        jobs: Jobs DataFrame
+
+    Returns:
+        pd.Series: String key per row; missing where a job has neither
+    """
+    keys = pd.Series(pd.NA, index=jobs.index, dtype="string")
+    for column in ("job_url", "id"):
+        if column in jobs:
+            keys = jobs[column].astype("string").where(jobs[column].notna(), keys)
+    return keys
+
+
+class SeenJobsIndex(SQLiteStore):
+    """
+    Job ids already returned for each saved search, shared across processes.
+
+    Args:
+        path: SQLite database file, created if missing
+        retention: Seconds a job id, or a whole saved search, is remembered
+            after it last appeared in a result
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS saved_searches ("
+        "name TEXT PRIMARY KEY, cursor INTEGER NOT NULL, updated_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS seen_jobs ("
+        "search TEXT NOT NULL, job_key TEXT NOT NULL, first_seen INTEGER NOT NULL, "
+        "last_seen REAL NOT NULL, PRIMARY KEY (search, job_key)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS seen_jobs_last_seen ON seen_jobs (last_seen)",
+    )
+
+    def __init__(self, path: str, retention: float):
+        super().__init__(path)
+        self.retention = retention
+
+    def get(self, name: str):
+        """
+        Describe a saved search.
+
+        Args:
+            name: Saved search name
+
+        Returns:
+            dict or None: The name, latest cursor, number of remembered jobs and
+            last run time, or None if the saved search is unknown
+        """
+        row = (
+            self.connection()
+            .execute(
+                "SELECT cursor, updated_at, "
+                "(SELECT COUNT(*) FROM seen_jobs WHERE search = name) "
+                "FROM saved_searches WHERE name = ? AND updated_at >= ?",
+                (name, time.time() - self.retention),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        cursor, updated_at, seen = row
+        return {"id": name, "cursor": cursor, "seen": seen, "updated_at": updated_at}
+
+    def unseen(self, name: str, keys: pd.Series, since=None) -> np.ndarray:
+        """
+        Check which jobs were not returned for a saved search yet.
+
+        Args:
+            name: Saved search name
+            keys: Output of :func:`job_keys`
+            since: Treat jobs first returned after this cursor as unseen; None
+                for the latest cursor
+
+        Returns:
+            np.ndarray: Boolean mask, True for rows to return
+        """
+        present = keys.dropna().unique().tolist()
+        if not present:
+            return np.ones(len(keys), dtype=bool)
+
+        query = (
+            "SELECT job_key FROM seen_jobs WHERE search = ? "
+            "AND job_key IN (SELECT value FROM json_each(?))"
+        )
+        args = [name, json.dumps(present)]
+        if since is not None:
+            query += " AND first_seen <= ?"
+            args.append(since)
+        seen = [key for (key,) in self.connection().execute(query, args)]
+        # Hash-based membership is much faster on object than on string dtype
+        return ~keys.astype(object).isin(seen).to_numpy(dtype=bool)
+
+    def record(self, name: str, returned: pd.Series, present: pd.Series) -> int:
+        """
+        Remember the jobs of a run and prune expired entries.
+
+        Args:
+            name: Saved search name
+            returned: Keys of the jobs returned by this run
+            present: Keys of every job in the result; entries of those returned
+                before are kept alive, the others are left alone
+
+        Returns:
+            int: The cursor of this run; unchanged if no jobs were returned
+        """
+        returned = returned.dropna().unique().tolist()
+        present = present.dropna().unique().tolist()
+        now = time.time()
+        step = 1 if returned else 0
+        with self.transaction() as conn:
+            (cursor,) = conn.execute(
+                "INSERT INTO saved_searches VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET "
+                "cursor = cursor + excluded.cursor, updated_at = excluded.updated_at "
+                "RETURNING cursor",
+                (name, step, now),
+            ).fetchone()
+
+            # New jobs take this run's cursor, known ones keep their first run
+            conn.execute(
+                "INSERT INTO seen_jobs "
+                "SELECT ?, value, ?, ? FROM json_each(?) WHERE true "
+                "ON CONFLICT (search, job_key) DO UPDATE SET "
+                "last_seen = excluded.last_seen",
+                (name, cursor, now, json.dumps(returned)),
+            )
+            conn.execute(
+                "UPDATE seen_jobs SET last_seen = ? WHERE search = ? "
+                "AND job_key IN (SELECT value FROM json_each(?))",
+                (now, name, json.dumps(present)),
+            )
+            self._purge(conn, now)
+        return cursor
+
+    def delete(self, name: str) -> bool:
+        """
+        Forget a saved search and every job returned for it.
+
+        Args:
+            name: Saved search name
+
+        Returns:
+            bool: False if the saved search was unknown
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM seen_jobs WHERE search = ?", (name,))
+            cursor = conn.execute("DELETE FROM saved_searches WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        """Drop every saved search."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM seen_jobs")
+            conn.execute("DELETE FROM saved_searches")
+
+    def _purge(self, conn, now: float) -> None:
+        """Delete entries not seen within the retention period."""
+        cutoff = now - self.retention
+        conn.execute("DELETE FROM seen_jobs WHERE last_seen < ?", (cutoff,))
+        conn.execute("DELETE FROM saved_searches WHERE updated_at < ?", (cutoff,))
+
+
+class SavedSearchRun:
+    """
+    One request's view of a saved search, used by the result stages.
+
+    Args:
+        index: Shared seen-jobs index
+        name: Saved search name
+        since: Cursor to return new jobs since; None for the latest
+    """
+
+    def __init__(self, index: SeenJobsIndex, name: str, since=None):
+        self.index = index
+        self.name = name
+        self.since = since
+
+    def unseen(self, jobs: pd.DataFrame) -> np.ndarray:
+        """Mask of the rows not returned for this saved search yet."""
+        return self.index.unseen(self.name, job_keys(jobs), self.since)
+
+    def record(self, returned: pd.DataFrame, present: pd.DataFrame) -> int:
+        """Remember the returned rows and return this run's cursor."""
+        return self.index.record(self.name, job_keys(returned), job_keys(present))
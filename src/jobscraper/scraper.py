@@ -0,0 +1,258 @@
+"""
+Scrape execution with per-site fan-out.
+
+Multi-site searches are split into one ``scrape_jobs`` call per job board and
+run on a bounded thread pool, so the slowest board no longer serializes the
+others and a failing board only removes its own rows from the result. An
+optional deadline bounds how long a request waits, returning the sites that
+finished in time. Sites whose circuit breaker is open are skipped without
+calling them.
+"""
+
+import logging
+import time
+from concurrent.futures import Executor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+
+import pandas as pd
+
+from .breaker import CIRCUIT_OPEN, UPSTREAM_ERRORS, CircuitOpenError
+
+scraper_logger = logging.getLogger(__name__)
+
+DEADLINE_EXCEEDED = "Deadline exceeded"
+
+
+class ScrapeTimeoutError(TimeoutError):
+    """Raised when no results were ready before the request deadline."""
+
+
+def remaining_seconds(deadline):
+    """
+    Time left until a ``time.monotonic()`` deadline.
+
+    Args:
+        deadline: Absolute monotonic deadline, or None for no deadline
+
+    Returns:
+        float or None: Seconds left (never negative), or None without a deadline
+    """
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def split_sites(scrape_params: dict) -> list:
+    """
+    List the job boards a search should be fanned out to.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+
+    Returns:
+        list: Site names when more than one distinct site was requested,
+        otherwise an empty list meaning the search runs as a single call
+    """
+    sites = scrape_params.get("site_name")
+    if not isinstance(sites, list):
+        return []
+    unique_sites = list(dict.fromkeys(sites))
+    return unique_sites if len(unique_sites) > 1 else []
+
+
+def single_site(scrape_params: dict):
+    """
+    Name the one job board a search that is not fanned out runs on.
+
+    Args:
+        scrape_params: Keyword arguments for ``scrape_jobs``
+
+    Returns:
+        str or None: The site, or None when no site or several were requested
+    """
+    sites = scrape_params.get("site_name")
+    if isinstance(sites, str):
+        return sites
+    if isinstance(sites, list) and len(set(sites)) == 1:
+        return sites[0]
+    return None
+
+
+def _call_site(scrape_fn, scrape_params: dict, site, breakers):
+    """
+    Call ``scrape_fn`` and record the outcome on the site's breaker.
+
+    Other errors than :data:`jobscraper.breaker.UPSTREAM_ERRORS` are raised
+    without being recorded, so bad searches cannot open a site's breaker.
+    """
+    if breakers is None or site is None:
+        return scrape_fn(**scrape_params)
+    try:
+        jobs = scrape_fn(**scrape_params)
+    except UPSTREAM_ERRORS:
+        breakers.record(site, failed=True)
+        raise
+    breakers.record(site, failed=False)
+    return jobs
+
+
+def _scrape_site(scrape_fn, scrape_params: dict, site: str, breakers=None) -> tuple:
+    """Scrape a single site and time the call."""
+    start = time.perf_counter()
+    try:
+        site_params = {**scrape_params, "site_name": site}
+        jobs = _call_site(scrape_fn, site_params, site, breakers)
+        return jobs, None, time.perf_counter() - start
+    except Exception as e:
+        scraper_logger.warning(f"Scraping {site} failed: {str(e)}")
+        return None, e, time.perf_counter() - start
+
+
+def merge_frames(frames: list) -> pd.DataFrame:
+    """
+    Concatenate per-site results into one DataFrame.
+
+    Args:
+        frames: DataFrames returned by each site
+
+    Returns:
+        pd.DataFrame: All rows in site order, with a fresh index
+    """
+    non_empty = [frame for frame in frames if not frame.empty]
+    if not non_empty:
+        return frames[0] if frames else pd.DataFrame()
+    if len(non_empty) == 1:
+        return non_empty[0]
+    return pd.concat(non_empty, ignore_index=True)
+
+
+def scrape_single(
+    scrape_fn, scrape_params: dict, executor: Executor, deadline=None, breakers=None
+):
+    """
+    Run one ``scrape_jobs`` call, giving up at the deadline.
+
+    Without a deadline the call runs on the calling thread. With one it runs on
+    ``executor`` so the caller can stop waiting; a call that overruns keeps its
+    pool thread until jobspy returns, but its result is discarded.
+
+    Args:
+        scrape_fn: ``scrape_jobs`` or a compatible callable
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        executor: Pool to run the call on when a deadline applies
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+        breakers: :class:`jobscraper.breaker.SiteBreakers` guarding searches
+            of a single named site, or None
+
+    Returns:
+        pd.DataFrame: Jobs returned by the call
+
+    Raises:
+        CircuitOpenError: If the site's breaker is open
+        ScrapeTimeoutError: If the call did not finish before the deadline
+    """
+    site = single_site(scrape_params) if breakers is not None else None
+    if site is not None and not breakers.allow(site):
+        raise CircuitOpenError([site], breakers.retry_after(site))
+
+    if deadline is None:
+        return _call_site(scrape_fn, scrape_params, site, breakers)
+
+    future = executor.submit(_call_site, scrape_fn, scrape_params, site, breakers)
+    try:
+        return future.result(timeout=remaining_seconds(deadline))
+    except FutureTimeoutError:
+        future.cancel()
+        raise ScrapeTimeoutError("Scrape did not finish before the deadline")
+
+
+def scrape_sites(
+    scrape_fn,
+    scrape_params: dict,
+    sites: list,
+    executor: Executor,
+    deadline=None,
+    breakers=None,
+):
+    """
+    Scrape several job boards concurrently and merge their results.
+
+    Sites still running when the deadline passes are reported as failed with
+    ``"timed_out": true`` and the results of the sites that finished are used.
+    Sites whose breaker is open are not called and are reported as failed with
+    ``"circuit_open": true``.
+
+    Args:
+        scrape_fn: ``scrape_jobs`` or a compatible callable
+        scrape_params: Keyword arguments for ``scrape_jobs``
+        sites: Site names to scrape, one task each
+        executor: Bounded pool the per-site tasks run on
+        deadline: Absolute ``time.monotonic()`` deadline, or None
+        breakers: :class:`jobscraper.breaker.SiteBreakers`, or None
+
+    Returns:
+        tuple: Merged jobs DataFrame, per-site report keyed by site name with
+        ``count``, ``elapsed_ms`` and ``error``, and the list of errors
+
+    Raises:
+        CircuitOpenError: If the breaker of every site is open
+        Exception: The first site's error if every called site failed
+        ScrapeTimeoutError: If no site finished before the deadline
+    """
+    report = {}
+    errors = []
+    skipped = {}
+    if breakers is not None:
+        for site in sites:
+            if not breakers.allow(site):
+                skipped[site] = breakers.retry_after(site)
+                report[site] = {
+                    "elapsed_ms": 0.0,
+                    "error": CIRCUIT_OPEN,
+                    "circuit_open": True,
+                    "retry_after": round(skipped[site], 1),
+                }
+                errors.append({"site": site, "error": CIRCUIT_OPEN})
+        if len(skipped) == len(sites):
+            raise CircuitOpenError(sites, min(skipped.values()))
+
+    start = time.perf_counter()
+    futures = {
+        site: executor.submit(_scrape_site, scrape_fn, scrape_params, site, breakers)
+        for site in sites
+        if site not in skipped
+    }
+    wait(futures.values(), timeout=remaining_seconds(deadline))
+
+    frames = []
+    first_error = None
+    for site, future in futures.items():
+        if not future.done():
+            # Frees the pool slot if the task has not started yet
+            future.cancel()
+            elapsed = time.perf_counter() - start
+            report[site] = {
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "error": DEADLINE_EXCEEDED,
+                "timed_out": True,
+            }
+            errors.append({"site": site, "error": DEADLINE_EXCEEDED})
+            continue
+
+        jobs, error, elapsed = future.result()
+        report[site] = {"elapsed_ms": round(elapsed * 1000, 1)}
+        if error is None:
+            frames.append(jobs)
+            report[site]["count"] = len(jobs)
+        else:
+            first_error = first_error or error
+            report[site]["error"] = str(error)
+            errors.append({"site": site, "error": str(error)})
+
+    if not frames:
+        if first_error is not None:
+            raise first_error
+        raise ScrapeTimeoutError("No site finished before the deadline")
+
+    return merge_frames(frames), report, errors
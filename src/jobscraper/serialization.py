@@ -0,0 +1,300 @@
+"""
+Serialization helpers for turning scraped job DataFrames into response bodies.
+
+The JSON path works a column at a time: date columns are rendered to ISO
+strings with vectorized conversions and pandas' C encoder writes the records
+array straight from the columns, so no intermediate list of dicts is built.
+Arrow IPC, Parquet and CSV bodies are encoded directly from the DataFrame's
+columns as well; the first two need the optional ``pyarrow`` package.
+"""
+
+import json
+from typing import Iterator
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+# Unregistered name for Parquet that many clients still send
+PARQUET_ALIAS_MIMETYPE = "application/parquet"
+CSV_MIMETYPE = "text/csv"
+
+# Formats that can only be produced when pyarrow is installed
+ARROW_MIMETYPES = (ARROW_STREAM_MIMETYPE, PARQUET_MIMETYPE, PARQUET_ALIAS_MIMETYPE)
+
+# Options shared by every pandas JSON encoding call. Timestamps keep their
+# microseconds, like Python datetimes. 15 is the most digits pandas' encoder
+# writes, so floats needing 16 or 17 significant digits to round-trip (such as
+# 0.1 + 0.2) are rounded, where json.dumps wrote the shortest exact repr.
+_TO_JSON_OPTIONS = {
+    "date_format": "iso",
+    "date_unit": "us",
+    "double_precision": 15,
+    "force_ascii": False,
+}
+
+
+def dataframe_to_serializable_dict(df: pd.DataFrame) -> list:
+    """
+    Convert DataFrame to JSON-serializable dictionary with proper NaN handling.
+
+    This is the original row-by-row conversion. It is kept for callers that need
+    Python objects and as the baseline for the serialization benchmarks; the API
+    responses use :func:`dataframe_to_json` instead.
+
+    Args:
+        df: Pandas DataFrame to convert
+
+    Returns:
+        list: List of dictionaries where NaN values are converted to None
+    """
+    # Convert DataFrame to dictionary using orient='records'
+    jobs_data = df.to_dict(orient="records")
+
+    # Process each job to replace NaN/NaT values with None
+    processed_jobs = []
+    for job in jobs_data:
+        processed_job = {}
+        for key, value in job.items():
+            # Check if value is NaN (float) or NaT (datetime)
+            if pd.isna(value):
+                processed_job[key] = None
+            else:
+                processed_job[key] = value
+        processed_jobs.append(processed_job)
+
+    return processed_jobs
+
+
+def _normalize_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Render object columns holding ``datetime.date`` values as ISO date strings.
+
+    jobspy returns ``date_posted`` as plain ``date`` objects, which pandas' encoder
+    would otherwise widen to midnight timestamps. Each column is converted in one
+    vectorized pass; missing values stay missing and are encoded as null.
+
+    Args:
+        df: DataFrame to normalize
+
+    Returns:
+        pd.DataFrame: The same frame, or a shallow copy with date columns replaced
+    """
+    date_columns = [
+        column
+        for column in df.columns[df.dtypes == object]
+        if pd.api.types.infer_dtype(df[column], skipna=True) == "date"
+    ]
+    if not date_columns:
+        return df
+
+    df = df.copy(deep=False)
+    for column in date_columns:
+        dates = pd.to_datetime(df[column], errors="coerce")
+        df[column] = dates.dt.strftime("%Y-%m-%d")
+    return df
+
+
+def dataframe_to_json(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as a JSON array of job records.
+
+    NaN, NaT, None and infinite values become ``null``, timestamps are written as
+    ISO 8601 strings with microseconds and numpy scalars are emitted as plain
+    JSON numbers, with at most 15 digits after the decimal point.
+
+    Args:
+        df: Pandas DataFrame to encode
+
+    Returns:
+        bytes: UTF-8 encoded JSON array with one object per row
+    """
+    if df.empty and len(df.columns) == 0:
+        return b"[]"
+
+    df = _normalize_date_columns(df)
+    encoded = df.to_json(orient="records", **_TO_JSON_OPTIONS)
+    return encoded.encode("utf-8")
+
+
+def dataframe_to_json_lines(df: pd.DataFrame) -> list:
+    """
+    Encode each row of a DataFrame as its own JSON object.
+
+    Args:
+        df: Pandas DataFrame to encode
+
+    Returns:
+        list: One JSON string per row, encoded like :func:`dataframe_to_json`
+    """
+    if df.empty:
+        return []
+    df = _normalize_date_columns(df)
+    encoded = df.to_json(orient="records", lines=True, **_TO_JSON_OPTIONS)
+    # Newlines inside values are escaped, so each line is exactly one record
+    return encoded.rstrip("\n").split("\n")
+
+
+def dataframe_to_ndjson(
+    df: pd.DataFrame, trailer: dict, chunk_rows: int = 500
+) -> Iterator[bytes]:
+    """
+    Stream a DataFrame as newline-delimited JSON, one job per line.
+
+    Rows are encoded ``chunk_rows`` at a time so only one chunk's worth of JSON
+    is held in memory regardless of the frame size. The last line is a trailer
+    object marked with ``"trailer": true`` that carries ``trailer`` plus the
+    number of rows written. If encoding fails part-way the trailer reports
+    ``"success": false`` and the error instead of raising mid-stream.
+
+    Args:
+        df: Pandas DataFrame to encode
+        trailer: Extra fields for the trailer line, e.g. ``errors``
+        chunk_rows: Number of rows to encode per chunk
+
+    Yields:
+        bytes: Chunks of UTF-8 encoded NDJSON
+    """
+    written = 0
+    error = None
+    try:
+        df = _normalize_date_columns(df)
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start : start + chunk_rows]
+            encoded = chunk.to_json(orient="records", lines=True, **_TO_JSON_OPTIONS)
+            yield encoded.rstrip("\n").encode("utf-8") + b"\n"
+            written += len(chunk)
+    except Exception as e:
+        error = str(e)
+
+    summary = {"trailer": True, "success": error is None, "count": written, **trailer}
+    if error is not None:
+        summary["error"] = error
+    yield json.dumps(summary, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def render_json_payload(fields: dict, jobs_json: bytes, key: str = "jobs") -> bytes:
+    """
+    Build a JSON response body around an already encoded jobs array.
+
+    Args:
+        fields: Top-level envelope fields such as ``success`` and ``count``
+        jobs_json: Output of :func:`dataframe_to_json`, or any encoded JSON value
+        key: Name of the key the encoded value is placed under
+
+    Returns:
+        bytes: JSON object containing ``fields`` plus the encoded value as its
+        last key
+    """
+    head = json.dumps(fields, separators=(",", ":")).encode("utf-8")
+    separator = b"," if fields else b""
+    encoded_key = json.dumps(key).encode("utf-8")
+    return head[:-1] + separator + encoded_key + b":" + jobs_json + b"}"
+
+
+def _arrow_table(df: pd.DataFrame) -> "pa.Table":
+    """
+    Convert a DataFrame to an Arrow table column by column.
+
+    Columns Arrow cannot type, such as object columns mixing strings and
+    numbers, are converted to strings instead of failing the whole response.
+    """
+    df = df.reset_index(drop=True)
+    arrays = []
+    for column in df.columns:
+        try:
+            arrays.append(pa.array(df[column], from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = df[column].astype("string")
+            arrays.append(pa.array(values, from_pandas=True, type=pa.string()))
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
+
+def dataframe_to_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as an Arrow IPC stream.
+
+    Args:
+        df: Pandas DataFrame to encode
+
+    Returns:
+        bytes: Arrow IPC stream with the frame as one record batch
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow responses")
+
+    table = _arrow_table(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def dataframe_to_parquet(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as a Parquet file.
+
+    Args:
+        df: Pandas DataFrame to encode
+
+    Returns:
+        bytes: Parquet file contents, snappy compressed
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    if pq is None:
+        raise RuntimeError("pyarrow is required for Parquet responses")
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(_arrow_table(df), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def dataframe_to_csv(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as CSV with a header row.
+
+    Dates are written as ``YYYY-MM-DD`` and missing values as empty fields.
+
+    Args:
+        df: Pandas DataFrame to encode
+
+    Returns:
+        bytes: UTF-8 encoded CSV
+    """
+    return _normalize_date_columns(df).to_csv(index=False).encode("utf-8")
+
+
+# Encoder for each DataFrame response format other than JSON and NDJSON
+DATAFRAME_ENCODERS = {
+    ARROW_STREAM_MIMETYPE: dataframe_to_arrow,
+    PARQUET_MIMETYPE: dataframe_to_parquet,
+    PARQUET_ALIAS_MIMETYPE: dataframe_to_parquet,
+    CSV_MIMETYPE: dataframe_to_csv,
+}
+
+
+def format_available(mimetype: str) -> bool:
+    """
+    Check whether a response format can be produced in this environment.
+
+    Args:
+        mimetype: Response mimetype
+
+    Returns:
+        bool: False for Arrow-based formats when pyarrow is not installed
+    """
+    return pa is not None or mimetype not in ARROW_MIMETYPES
@@ -0,0 +1,207 @@
+"""
+Optional per-request stages applied to scrape results before serialization.
+
+Stages run in a fixed order: dedupe, filters, the saved search's new-only
+check, sort, limit and finally the ``fields`` / ``exclude_fields`` projection.
+
+Stages run after the result cache, so cached results are shared by requests
+asking for different stages.
+"""
+
+from .cache import ScrapeResult
+from .dedupe import SITES_COLUMN, dedupe_jobs
+from .filters import filter_jobs, parse_filters
+from .params import InvalidRequestError
+
+# Columns of jobspy results, plus those added by result stages
+JOB_FIELDS = [
+    "id",
+    "site",
+    "job_url",
+    "job_url_direct",
+    "title",
+    "company",
+    "location",
+    "date_posted",
+    "job_type",
+    "salary_source",
+    "interval",
+    "min_amount",
+    "max_amount",
+    "currency",
+    "is_remote",
+    "job_level",
+    "job_function",
+    "listing_type",
+    "emails",
+    "description",
+    "company_industry",
+    "company_url",
+    "company_logo",
+    "company_url_direct",
+    "company_addresses",
+    "company_num_employees",
+    "company_revenue",
+    "company_description",
+    "skills",
+    "experience_range",
+    "company_rating",
+    "company_reviews_count",
+    "vacancy_count",
+    "work_from_home_type",
+    SITES_COLUMN,
+]
+
+
+def _parse_field_list(data: dict, option: str):
+    """Read a list of job field names, rejecting unknown ones."""
+    fields = data.get(option)
+    if fields is None:
+        return None
+    if (
+        not isinstance(fields, list)
+        or not fields
+        or not all(isinstance(field, str) for field in fields)
+    ):
+        raise InvalidRequestError(f"{option} must be a non-empty list of field names")
+
+    unknown = [field for field in fields if field not in JOB_FIELDS]
+    if unknown:
+        raise InvalidRequestError(f"Unknown fields in {option}: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def _parse_sort(data: dict):
+    """Read sort keys as ``(field, ascending)`` pairs; ``-field`` sorts descending."""
+    sort = data.get("sort")
+    if sort is None:
+        return None
+    keys = [sort] if isinstance(sort, str) else sort
+    if (
+        not isinstance(keys, list)
+        or not keys
+        or not all(isinstance(key, str) for key in keys)
+    ):
+        raise InvalidRequestError("sort must be a field name or a list of them")
+
+    parsed = []
+    for key in keys:
+        field = key[1:] if key.startswith("-") else key
+        if field not in JOB_FIELDS:
+            raise InvalidRequestError(f"Unknown sort field: {field}")
+        parsed.append((field, not key.startswith("-")))
+    return parsed
+
+
+def _parse_limit(data: dict):
+    """Read the maximum number of jobs to return."""
+    limit = data.get("limit")
+    if limit is None:
+        return None
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0:
+        raise InvalidRequestError("limit must be a positive integer")
+    return limit
+
+
+def _sort_jobs(jobs, sort: list):
+    """Stable multi-key sort with missing values last."""
+    keys = [(field, ascending) for field, ascending in sort if field in jobs]
+    if not keys:
+        return jobs
+    return jobs.sort_values(
+        by=[field for field, _ in keys],
+        ascending=[ascending for _, ascending in keys],
+        na_position="last",
+        kind="stable",
+    )
+
+
+def parse_stages(data: dict) -> dict:
+    """
+    Read the result stages requested in a request body.
+
+    Args:
+        data: Parsed JSON request body
+
+    Returns:
+        dict: Options of the requested stages; empty if none were requested
+
+    Raises:
+        InvalidRequestError: If a stage option is invalid
+    """
+    stages = {}
+
+    dedupe = data.get("dedupe", False)
+    if not isinstance(dedupe, bool):
+        raise InvalidRequestError("dedupe must be true or false")
+    if dedupe:
+        stages["dedupe"] = True
+
+    fields = _parse_field_list(data, "fields")
+    exclude_fields = _parse_field_list(data, "exclude_fields")
+    if fields and exclude_fields:
+        raise InvalidRequestError("Use either fields or exclude_fields, not both")
+    if fields:
+        stages["fields"] = fields
+    if exclude_fields:
+        stages["exclude_fields"] = exclude_fields
+
+    for name, value in (
+        ("filters", parse_filters(data)),
+        ("sort", _parse_sort(data)),
+        ("limit", _parse_limit(data)),
+    ):
+        if value is not None:
+            stages[name] = value
+
+    return stages
+
+
+def apply_stages(result: ScrapeResult, stages: dict, saved_search=None) -> ScrapeResult:
+    """
+    Run the requested stages over a result.
+
+    With a saved search, only jobs it has not returned before are kept, and
+    the jobs left after ``limit`` are recorded as returned.
+
+    Args:
+        result: Result returned by the scrape or the cache
+        stages: Output of :func:`parse_stages`
+        saved_search: :class:`jobscraper.saved.SavedSearchRun` of the request
+
+    Returns:
+        ScrapeResult: ``result`` itself when no stages were requested,
+        otherwise a new result carrying the stages' figures
+    """
+    if not stages and saved_search is None:
+        return result
+
+    jobs = result.jobs
+    report = {}
+    if stages.get("dedupe"):
+        jobs, report["duplicates_removed"] = dedupe_jobs(jobs)
+
+    if "filters" in stages:
+        before = len(jobs)
+        jobs = filter_jobs(jobs, stages["filters"])
+        report["filtered_out"] = before - len(jobs)
+    if saved_search is not None:
+        present = jobs
+        unseen = saved_search.unseen(jobs)
+        jobs = jobs[unseen]
+        report["already_seen"] = len(present) - len(jobs)
+    if "sort" in stages:
+        jobs = _sort_jobs(jobs, stages["sort"])
+    if "limit" in stages:
+        jobs = jobs.head(stages["limit"])
+    if saved_search is not None:
+        report["cursor"] = saved_search.record(jobs, present)
+
+    # Projection runs last so earlier stages can use any column
+    if "fields" in stages:
+        jobs = jobs[[field for field in stages["fields"] if field in jobs]]
+    if "exclude_fields" in stages:
+        jobs = jobs.drop(columns=stages["exclude_fields"], errors="ignore")
+
+    jobs = jobs.reset_index(drop=True)
+    return ScrapeResult(jobs, sites=result.sites, errors=result.errors, stages=report)
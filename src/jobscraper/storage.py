@@ -0,0 +1,69 @@
+"""
+SQLite helpers for state shared between worker processes on the same host.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    """
+    Base class for stores kept in a SQLite file shared by worker processes.
+
+    Each thread of each process gets its own connection, opened lazily and
+    re-opened after a fork. The database runs in WAL mode so readers are not
+    blocked by writers. Subclasses list their ``CREATE`` statements in
+    ``SCHEMA``.
+
+    Args:
+        path: SQLite database file, created along with its directory if missing
+    """
+
+    SCHEMA = ()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: Connection in autocommit mode
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run statements in a write transaction, rolled back on error.
+
+        Yields:
+            sqlite3.Connection: This thread's connection
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
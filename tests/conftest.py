@@ -4,6 +4,7 @@ Test configuration and fixtures for JobScraper API tests.
 
 import os
 import sys
+import tempfile
 from unittest.mock import patch
 
 import pytest
@@ -24,6 +25,10 @@ if not hasattr(werkzeug, "__version__"):
         # Fallback to a default version
         werkzeug.__version__ = "2.3.0"
 
+# Keep state shared between workers, such as background jobs, out of the real
+# state directory
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="jobscraper-tests-")
+
 # Import app after setting up mocks
 # Patch the require_token decorator before importing to avoid import-time execution
 
@@ -37,6 +42,33 @@ with patch("jobscraper.auth.require_token", mock_decorator):
     from jobscraper.app import app as flask_app
 
 
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Start every test with empty caches, stores, archives, breakers and metrics."""
+    from jobscraper.app import (
+        job_archive,
+        job_store,
+        metrics,
+        result_cache,
+        seen_index,
+        site_breakers,
+    )
+
+    result_cache.clear()
+    job_store.clear()
+    seen_index.clear()
+    job_archive.clear()
+    site_breakers.clear()
+    metrics.clear()
+    yield
+    result_cache.clear()
+    job_store.clear()
+    seen_index.clear()
+    job_archive.clear()
+    site_breakers.clear()
+    metrics.clear()
+
+
 @pytest.fixture
 def app():
     """Provide Flask application for testing."""
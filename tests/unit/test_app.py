@@ -3,6 +3,10 @@ Unit tests for Flask application module.
 Uses decorator mocking to bypass authentication.
 """
 
+import gzip
+import json
+import threading
+import time
 from unittest.mock import patch
 
 import pandas as pd
@@ -82,6 +86,21 @@ class TestScrapeEndpoint:
             assert json_data["error"] == "Invalid request"
             assert "Request body must be JSON" in json_data["message"]
 
+    @pytest.mark.parametrize("body", ['["indeed"]', '"software engineer"'])
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_non_object_json(self, mock_scrape_jobs, test_app, body):
+        """Test scrape endpoint rejects JSON bodies that are not objects."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", data=body, content_type="application/json"
+            )
+
+            assert response.status_code == 400
+            json_data = response.get_json()
+            assert json_data["error"] == "Invalid request"
+            assert "Request body must be JSON" in json_data["message"]
+            mock_scrape_jobs.assert_not_called()
+
     @patch("jobscraper.app.scrape_jobs")
     def test_scrape_invalid_json(self, mock_scrape_jobs, test_app):
         """Test scrape endpoint with invalid JSON."""
@@ -160,11 +179,15 @@ class TestScrapeEndpoint:
             assert response.status_code == 200
             json_data = response.get_json()
             assert json_data["success"] is True
-            assert json_data["count"] == 2
-            assert len(json_data["jobs"]) == 2
+            # Each of the two sites is scraped separately and returns both rows
+            assert json_data["count"] == 4
+            assert len(json_data["jobs"]) == 4
+            assert set(json_data["sites"]) == {"indeed", "linkedin"}
 
-            # Verify scrape_jobs was called with correct parameters
-            mock_scrape_jobs.assert_called_once_with(**scrape_data)
+            # Verify scrape_jobs was called once per site with the other parameters
+            assert mock_scrape_jobs.call_count == 2
+            for site in ("indeed", "linkedin"):
+                mock_scrape_jobs.assert_any_call(**{**scrape_data, "site_name": site})
 
     @patch("jobscraper.app.scrape_jobs")
     def test_scrape_only_provided_parameters(self, mock_scrape_jobs, test_app):
@@ -290,6 +313,1653 @@ class TestScrapeEndpoint:
         assert len(all_params.keys()) == 20  # Should match the number in app.py
 
 
+class TestScrapeStreaming:
+    """Test cases for streamed NDJSON responses from /scrape."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_stream_parameter(self, mock_scrape_jobs, test_app):
+        """Test the stream body flag returns NDJSON and is not forwarded."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {"title": ["Engineer", "Analyst"], "company": ["A", "B"]}
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "engineer", "stream": True}
+            )
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.data.splitlines()]
+            assert lines[0] == {"title": "Engineer", "company": "A"}
+            assert lines[1] == {"title": "Analyst", "company": "B"}
+            assert lines[2]["trailer"] is True
+            assert lines[2]["count"] == 2
+            assert lines[2]["errors"] == []
+
+            mock_scrape_jobs.assert_called_once_with(search_term="engineer")
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_stream_accept_header(self, mock_scrape_jobs, test_app):
+        """Test Accept: application/x-ndjson selects the streaming mode."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "engineer"},
+                headers={"Accept": "application/x-ndjson"},
+            )
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            assert len(response.data.splitlines()) == 2
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_default_is_json(self, mock_scrape_jobs, test_app):
+        """Test responses stay buffered JSON without an opt-in."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "engineer"},
+                headers={"Accept": "*/*"},
+            )
+
+            assert response.mimetype == "application/json"
+            assert response.get_json()["count"] == 1
+
+
+class TestScrapeFormats:
+    """Test cases for Accept-based response formats."""
+
+    @pytest.mark.parametrize(
+        "accept",
+        [
+            "application/vnd.apache.arrow.stream",
+            "application/vnd.apache.parquet",
+            "application/parquet",
+        ],
+    )
+    @patch("jobscraper.app.scrape_jobs")
+    def test_arrow_formats(self, mock_scrape_jobs, test_app, accept):
+        """Test Arrow IPC and Parquet bodies load back into pandas."""
+        pytest.importorskip("pyarrow")
+        import io
+
+        import pyarrow as pa
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a"}, headers={"Accept": accept}
+            )
+
+            assert response.status_code == 200
+            assert response.mimetype == accept
+            assert response.headers["X-Result-Count"] == "1"
+            assert response.headers["X-Result-Partial"] == "false"
+            if "arrow" in accept:
+                df = pa.ipc.open_stream(response.data).read_pandas()
+            else:
+                df = pd.read_parquet(io.BytesIO(response.data))
+            assert df["title"].tolist() == ["Engineer"]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_csv_format(self, mock_scrape_jobs, test_app):
+        """Test Accept: text/csv returns CSV."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a"}, headers={"Accept": "text/csv"}
+            )
+
+            assert response.status_code == 200
+            assert response.mimetype == "text/csv"
+            assert response.data == b"title\nEngineer\n"
+
+    @pytest.mark.parametrize("accept", ["*/*", "image/png", "text/csv;q=0.5, */*"])
+    @patch("jobscraper.app.scrape_jobs")
+    def test_json_stays_default(self, mock_scrape_jobs, test_app, accept):
+        """Test JSON is returned unless another format is preferred."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a"}, headers={"Accept": accept}
+            )
+
+            assert response.mimetype == "application/json"
+            assert response.get_json()["count"] == 1
+
+    @patch("jobscraper.serialization.pa", None)
+    @patch("jobscraper.app.scrape_jobs")
+    def test_arrow_without_pyarrow(self, mock_scrape_jobs, test_app):
+        """Test Arrow formats are refused before scraping without pyarrow."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"Accept": "application/vnd.apache.arrow.stream"},
+            )
+
+            assert response.status_code == 406
+        mock_scrape_jobs.assert_not_called()
+
+
+class TestScrapeCompression:
+    """Test cases for Accept-Encoding response compression."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_gzip_json(self, mock_scrape_jobs, test_app):
+        """Test large JSON responses are gzip-compressed when accepted."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"] * 200})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert response.status_code == 200
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert "Accept-Encoding" in response.headers["Vary"]
+            assert json.loads(gzip.decompress(response.data))["count"] == 200
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_small_body_not_compressed(self, mock_scrape_jobs, test_app):
+        """Test bodies below the size threshold are sent as is."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert "Content-Encoding" not in response.headers
+            assert response.get_json()["count"] == 1
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_not_accepted(self, mock_scrape_jobs, test_app):
+        """Test responses are uncompressed without Accept-Encoding."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"] * 200})
+
+        with test_app.test_client() as client:
+            response = client.post("/scrape", json={"search_term": "a"})
+
+            assert "Content-Encoding" not in response.headers
+            assert response.get_json()["count"] == 200
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_gzip_stream(self, mock_scrape_jobs, test_app):
+        """Test streamed NDJSON is compressed incrementally."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a", "stream": True},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert response.is_streamed
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert "Content-Length" not in response.headers
+            lines = gzip.decompress(response.data).splitlines()
+            assert json.loads(lines[0]) == {"title": "Engineer"}
+            assert json.loads(lines[-1])["trailer"] is True
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_zstd(self, mock_scrape_jobs, test_app):
+        """Test zstd is preferred when the client accepts it."""
+        zstandard = pytest.importorskip("zstandard")
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"] * 200})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"Accept-Encoding": "gzip, zstd"},
+            )
+
+            assert response.headers["Content-Encoding"] == "zstd"
+            body = zstandard.ZstdDecompressor().decompress(response.data)
+            assert json.loads(body)["count"] == 200
+
+    @patch("jobscraper.app.RESPONSE_COMPRESSION", False)
+    @patch("jobscraper.app.scrape_jobs")
+    def test_disabled(self, mock_scrape_jobs, test_app):
+        """Test compression can be turned off."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"] * 200})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert "Content-Encoding" not in response.headers
+
+
+class TestScrapeConditional:
+    """Test cases for ETag / If-None-Match on /scrape."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_not_modified(self, mock_scrape_jobs, test_app):
+        """Test a matching If-None-Match gets an empty 304."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            first = client.post("/scrape", json={"search_term": "a"})
+            etag = first.headers["ETag"]
+            assert etag.startswith('W/"')
+
+            response = client.post(
+                "/scrape", json={"search_term": "a"}, headers={"If-None-Match": etag}
+            )
+
+            assert response.status_code == 304
+            assert response.data == b""
+            assert response.headers["ETag"] == etag
+            assert response.headers["X-Cache"] == "HIT"
+
+    @patch("jobscraper.app.apply_stages")
+    @patch("jobscraper.app.scrape_jobs")
+    def test_cache_hit_skips_encoding(
+        self, mock_scrape_jobs, mock_apply_stages, test_app
+    ):
+        """Test a 304 from cache neither applies stages nor encodes jobs."""
+        from jobscraper.app import result_cache
+        from jobscraper.cache import ScrapeResult
+        from jobscraper.etag import content_digest, result_etag
+        from jobscraper.params import params_key
+
+        jobs = pd.DataFrame({"title": ["Engineer"]})
+        result_cache.set(params_key({"search_term": "a"}), ScrapeResult(jobs))
+        etag = result_etag(content_digest(jobs), {}, "application/json", False)
+
+        with (
+            test_app.test_client() as client,
+            patch("jobscraper.cache.dataframe_to_json") as mock_encode,
+        ):
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a"},
+                headers={"If-None-Match": f'W/"{etag}"'},
+            )
+
+            assert response.status_code == 304
+        mock_scrape_jobs.assert_not_called()
+        mock_apply_stages.assert_not_called()
+        mock_encode.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_changed_result(self, mock_scrape_jobs, test_app):
+        """Test a stale ETag gets the full, new result."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            first = client.post("/scrape", json={"search_term": "a"})
+
+            mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Analyst"]})
+            response = client.post(
+                "/scrape",
+                json={"search_term": "a", "cache": "refresh"},
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+
+            assert response.status_code == 200
+            assert response.headers["ETag"] != first.headers["ETag"]
+            assert response.get_json()["jobs"] == [{"title": "Analyst"}]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_etag_varies_with_options(self, mock_scrape_jobs, test_app):
+        """Test result options and format are part of the ETag."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {"title": ["Engineer"], "company": ["Acme"]}
+        )
+
+        with test_app.test_client() as client:
+            etags = {
+                client.post("/scrape", json={"search_term": "a"}).headers["ETag"],
+                client.post(
+                    "/scrape", json={"search_term": "a", "fields": ["title"]}
+                ).headers["ETag"],
+                client.post(
+                    "/scrape",
+                    json={"search_term": "a"},
+                    headers={"Accept": "text/csv"},
+                ).headers["ETag"],
+            }
+
+            assert len(etags) == 3
+
+
+class TestScrapeSavedSearch:
+    """Test cases for saved searches returning only new jobs."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_only_new_jobs(self, mock_scrape_jobs, test_app):
+        """Test repeated runs only return jobs not returned before."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {"id": ["a", "b"], "title": ["Engineer", "Analyst"]}
+        )
+        body = {"search_term": "a", "saved_search": "daily"}
+
+        with test_app.test_client() as client:
+            first = client.post("/scrape", json=body).get_json()
+            assert [job["id"] for job in first["jobs"]] == ["a", "b"]
+            assert first["cursor"] == 1
+            assert first["already_seen"] == 0
+
+            mock_scrape_jobs.return_value = pd.DataFrame(
+                {"id": ["c", "a", "b"], "title": ["Manager", "Engineer", "Analyst"]}
+            )
+            response = client.post("/scrape", json={**body, "cache": "refresh"})
+            second = response.get_json()
+
+            assert [job["id"] for job in second["jobs"]] == ["c"]
+            assert second["count"] == 1
+            assert second["cursor"] == 2
+            assert second["already_seen"] == 2
+            assert "ETag" not in response.headers
+
+            # Clients that lost the last response ask again since their cursor
+            again = client.post("/scrape", json={**body, "since": 1}).get_json()
+            assert [job["id"] for job in again["jobs"]] == ["c"]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_saved_search_status_and_delete(self, mock_scrape_jobs, test_app):
+        """Test a saved search can be inspected and reset."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"id": ["a"]})
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"search_term": "a", "saved_search": "s"})
+
+            status = client.get("/scrape/saved/s").get_json()
+            assert status["cursor"] == 1
+            assert status["seen"] == 1
+
+            assert client.delete("/scrape/saved/s").status_code == 200
+            assert client.get("/scrape/saved/s").status_code == 404
+            assert client.delete("/scrape/saved/s").status_code == 404
+
+            result = client.post(
+                "/scrape", json={"search_term": "a", "saved_search": "s"}
+            ).get_json()
+            assert result["count"] == 1
+
+    @pytest.mark.parametrize("path", ["/scrape/batch", "/scrape/jobs"])
+    def test_only_on_scrape(self, test_app, path):
+        """Test batch and background requests refuse saved searches."""
+        body = {"searches": [{"search_term": "a"}], "search_term": "a"}
+
+        with test_app.test_client() as client:
+            response = client.post(path, json={**body, "saved_search": "s"})
+
+            assert response.status_code == 400
+
+    def test_invalid_saved_search(self, test_app):
+        """Test invalid saved search names are rejected."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a", "saved_search": "a b"}
+            )
+
+            assert response.status_code == 400
+
+
+class TestScrapeFanOut:
+    """Test cases for per-site fan-out of multi-site searches."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_fan_out_merges_sites(self, mock_scrape_jobs, test_app):
+        """Test each site is scraped separately and the rows are merged."""
+        mock_scrape_jobs.side_effect = lambda **kwargs: pd.DataFrame(
+            {"site": [kwargs["site_name"]], "title": ["Engineer"]}
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={"site_name": ["indeed", "linkedin", "google"], "hours_old": 24},
+            )
+
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert [job["site"] for job in json_data["jobs"]] == [
+                "indeed",
+                "linkedin",
+                "google",
+            ]
+            assert json_data["partial"] is False
+            assert json_data["errors"] == []
+            assert json_data["sites"]["google"]["count"] == 1
+            assert "elapsed_ms" in json_data["sites"]["indeed"]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_fan_out_partial_failure(self, mock_scrape_jobs, test_app):
+        """Test one failing site yields partial results instead of a 500."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "linkedin":
+                raise Exception("429 Too Many Requests")
+            return pd.DataFrame({"title": ["Engineer"]})
+
+        mock_scrape_jobs.side_effect = scrape
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"]}
+            )
+            repeated = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"]}
+            )
+
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert json_data["count"] == 1
+            assert json_data["partial"] is True
+            assert json_data["errors"] == [
+                {"site": "linkedin", "error": "429 Too Many Requests"}
+            ]
+            assert json_data["sites"]["linkedin"]["error"] == "429 Too Many Requests"
+            # Partial results are not cached
+            assert repeated.headers["X-Cache"] == "MISS"
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_fan_out_all_sites_fail(self, mock_scrape_jobs, test_app):
+        """Test the request fails when no site returned results."""
+        mock_scrape_jobs.side_effect = Exception("Network error")
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"]}
+            )
+
+            assert response.status_code == 500
+            assert "Network error" in response.get_json()["error"]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_single_site_not_fanned_out(self, mock_scrape_jobs, test_app):
+        """Test single-site searches keep a single scrape_jobs call."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post("/scrape", json={"site_name": ["indeed"]})
+
+            assert "sites" not in response.get_json()
+            mock_scrape_jobs.assert_called_once_with(site_name=["indeed"])
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_dedupe_across_sites(self, mock_scrape_jobs, test_app):
+        """Test the dedupe option collapses the same posting from two sites."""
+        mock_scrape_jobs.side_effect = lambda **kwargs: pd.DataFrame(
+            {
+                "site": [kwargs["site_name"]],
+                "title": ["Engineer"],
+                "company": ["Acme"],
+                "job_url": [f"https://{kwargs['site_name']}/1"],
+            }
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"], "dedupe": True}
+            )
+
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert json_data["count"] == 1
+            assert json_data["duplicates_removed"] == 1
+            assert json_data["jobs"][0]["sites"] == ["indeed", "linkedin"]
+
+    def test_dedupe_invalid(self, test_app):
+        """Test a non-boolean dedupe option is rejected."""
+        with test_app.test_client() as client:
+            response = client.post("/scrape", json={"search_term": "a", "dedupe": 1})
+
+            assert response.status_code == 400
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_fields_projection(self, mock_scrape_jobs, test_app):
+        """Test the fields option prunes columns from the response."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {"id": ["1"], "title": ["Engineer"], "description": ["long text"]}
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a", "fields": ["id", "title"]}
+            )
+
+            assert response.status_code == 200
+            assert response.get_json()["jobs"] == [{"id": "1", "title": "Engineer"}]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_unknown_fields_rejected(self, mock_scrape_jobs, test_app):
+        """Test unknown field names fail before anything is scraped."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a", "fields": ["salary"]}
+            )
+
+            assert response.status_code == 400
+            assert "salary" in response.get_json()["message"]
+        mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_filters_sort_limit(self, mock_scrape_jobs, test_app):
+        """Test filters, sort and limit are applied before serialization."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {
+                "title": ["Python Dev", "Java Dev", "Python Lead"],
+                "company": ["Acme", "Acme", "Globex"],
+                "max_amount": [120000.0, 150000.0, 180000.0],
+            }
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape",
+                json={
+                    "search_term": "dev",
+                    "filters": {"keywords": ["python"], "min_salary": 100000},
+                    "sort": "-max_amount",
+                    "limit": 1,
+                    "fields": ["title"],
+                },
+            )
+
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert json_data["jobs"] == [{"title": "Python Lead"}]
+            assert json_data["count"] == 1
+            assert json_data["filtered_out"] == 1
+
+
+class TestScrapeDeadline:
+    """Test cases for deadline-aware scraping."""
+
+    @pytest.fixture
+    def release(self):
+        """Event that unblocks slow scrapes once the test is done."""
+        event = threading.Event()
+        yield event
+        event.set()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_deadline_returns_partial_results(
+        self, mock_scrape_jobs, test_app, release
+    ):
+        """Test sites finished by the deadline are returned as partial."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "linkedin":
+                release.wait(5)
+            return pd.DataFrame({"site": [kwargs["site_name"]]})
+
+        mock_scrape_jobs.side_effect = scrape
+
+        with test_app.test_client() as client:
+            start = time.monotonic()
+            response = client.post(
+                "/scrape",
+                json={"site_name": ["indeed", "linkedin"], "deadline_ms": 200},
+            )
+
+            assert time.monotonic() - start < 2
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert json_data["partial"] is True
+            assert json_data["jobs"] == [{"site": "indeed"}]
+            assert json_data["sites"]["linkedin"]["timed_out"] is True
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_deadline_nothing_finished(self, mock_scrape_jobs, test_app, release):
+        """Test a 504 is returned when no results were ready in time."""
+        mock_scrape_jobs.side_effect = lambda **kwargs: release.wait(5)
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a", "deadline_ms": 100}
+            )
+
+            assert response.status_code == 504
+            json_data = response.get_json()
+            assert json_data["success"] is False
+            assert json_data["message"] == "Scrape deadline exceeded"
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_invalid_deadline(self, mock_scrape_jobs, test_app):
+        """Test invalid deadline_ms values are rejected with 400."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"search_term": "a", "deadline_ms": "soon"}
+            )
+
+            assert response.status_code == 400
+            mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_deadline_not_forwarded(self, mock_scrape_jobs, test_app):
+        """Test deadline_ms is not passed on to scrape_jobs."""
+        mock_scrape_jobs.return_value = pd.DataFrame()
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"search_term": "a", "deadline_ms": 5000})
+
+            mock_scrape_jobs.assert_called_once_with(search_term="a")
+
+
+class TestSiteBreakers:
+    """Test cases for per-site circuit breakers."""
+
+    @staticmethod
+    def trip(client, mock_scrape_jobs, site="linkedin"):
+        """Fail enough calls to a site to open its breaker."""
+        mock_scrape_jobs.side_effect = ConnectionError("429 Too Many Requests")
+        for _ in range(5):
+            response = client.post("/scrape", json={"site_name": site})
+            assert response.status_code == 500
+        mock_scrape_jobs.reset_mock(side_effect=True)
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_open_circuit_fails_fast(self, mock_scrape_jobs, test_app):
+        """Test a single-site search is rejected with 503 once its site trips."""
+        with test_app.test_client() as client:
+            self.trip(client, mock_scrape_jobs)
+            response = client.post("/scrape", json={"site_name": "linkedin"})
+
+            assert response.status_code == 503
+            assert 0 < int(response.headers["Retry-After"]) <= 120
+            json_data = response.get_json()
+            assert json_data["success"] is False
+            assert json_data["sites"] == ["linkedin"]
+            mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_open_circuit_skips_site(self, mock_scrape_jobs, test_app):
+        """Test multi-site searches skip the tripped site and mark it."""
+        with test_app.test_client() as client:
+            self.trip(client, mock_scrape_jobs)
+            mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+            response = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"]}
+            )
+
+            json_data = response.get_json()
+            assert response.status_code == 200
+            assert json_data["partial"] is True
+            assert json_data["sites"]["linkedin"]["circuit_open"] is True
+            assert json_data["errors"] == [
+                {"site": "linkedin", "error": "Circuit open"}
+            ]
+            mock_scrape_jobs.assert_called_once_with(site_name="indeed")
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_bad_parameters_do_not_trip(self, mock_scrape_jobs, test_app):
+        """Test errors caused by the search leave the site's breaker closed."""
+        mock_scrape_jobs.side_effect = TypeError("unexpected keyword 'pages'")
+        with test_app.test_client() as client:
+            for _ in range(10):
+                response = client.post("/scrape", json={"site_name": "linkedin"})
+                assert response.status_code == 500
+
+            assert client.get("/breakers").get_json()["sites"] == {}
+            assert mock_scrape_jobs.call_count == 10
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_breakers_endpoint(self, mock_scrape_jobs, test_app):
+        """Test breaker states are reported and can be reset."""
+        with test_app.test_client() as client:
+            self.trip(client, mock_scrape_jobs)
+
+            sites = client.get("/breakers").get_json()["sites"]
+            assert sites["linkedin"]["state"] == "open"
+            assert sites["linkedin"]["failures"] == 5
+
+            reset = client.delete("/breakers/linkedin")
+            assert reset.get_json() == {
+                "success": True,
+                "site": "linkedin",
+                "state": "closed",
+            }
+            assert client.get("/breakers").get_json()["sites"] == {}
+            assert client.delete("/breakers/linkedin").status_code == 404
+
+    def test_breakers_disabled(self, test_app):
+        """Test the endpoint is unavailable when breakers are disabled."""
+        with test_app.test_client() as client, patch("jobscraper.app.breakers", None):
+            assert client.get("/breakers").status_code == 404
+
+
+class TestRecordReplay:
+    """Test cases for recording and replaying jobspy results."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrapes_recorded(self, mock_scrape_jobs, test_app, tmp_path):
+        """Test each call is saved as a fixture without its proxies."""
+        pytest.importorskip("pyarrow")
+        from jobscraper.replay import ScrapeRecorder, read_fixture
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+        recorder = ScrapeRecorder(str(tmp_path))
+
+        with patch("jobscraper.app.scrape_recorder", recorder):
+            with test_app.test_client() as client:
+                response = client.post(
+                    "/scrape",
+                    json={"site_name": ["indeed", "linkedin"], "proxies": ["a:1"]},
+                )
+
+        assert response.status_code == 200
+        fixtures = sorted(tmp_path.glob("*.parquet"))
+        assert len(fixtures) == 2
+        df, metadata = read_fixture(str(fixtures[0]))
+        assert df["title"].tolist() == ["Engineer"]
+        assert "proxies" not in metadata["params"]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_replayer_used_instead_of_jobspy(
+        self, mock_scrape_jobs, test_app, tmp_path
+    ):
+        """Test a configured replayer answers in place of jobspy."""
+        pytest.importorskip("pyarrow")
+        from jobscraper.replay import ScrapeRecorder, ScrapeReplayer
+
+        ScrapeRecorder(str(tmp_path)).save(
+            {"site_name": "indeed"}, pd.DataFrame({"title": ["Recorded"]}), 1.0
+        )
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0)
+
+        with patch("jobscraper.app.scrape_replayer", replayer):
+            with test_app.test_client() as client:
+                response = client.post(
+                    "/scrape", json={"site_name": "indeed", "search_term": "a"}
+                )
+
+        assert response.get_json()["jobs"] == [{"title": "Recorded"}]
+        mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_recording_without_pyarrow(self, mock_scrape_jobs, test_app, tmp_path):
+        """Test a recorder without pyarrow only logs and the scrape succeeds."""
+        from jobscraper.replay import ScrapeRecorder
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+        recorder = ScrapeRecorder(str(tmp_path))
+
+        with (
+            patch("jobscraper.replay.pq", None),
+            patch("jobscraper.app.scrape_recorder", recorder),
+            patch("jobscraper.replay.replay_logger") as replay_logger,
+            test_app.test_client() as client,
+        ):
+            response = client.post("/scrape", json={"site_name": "indeed"})
+
+        assert response.status_code == 200
+        assert response.get_json()["jobs"] == [{"title": "Engineer"}]
+        assert list(tmp_path.iterdir()) == []
+        replay_logger.warning.assert_called_once()
+        assert "pyarrow is required" in replay_logger.warning.call_args[0][0]
+
+
+class TestProxyPool:
+    """Test cases for the server-side proxy pool."""
+
+    @pytest.fixture
+    def pool(self, tmp_path):
+        """Install a one-proxy pool for the duration of a test."""
+        from jobscraper.proxies import ProxyPool
+
+        pool = ProxyPool(
+            str(tmp_path / "proxies.sqlite3"), ["user:pw@proxy:8080"], 3, 300
+        )
+        with patch("jobscraper.app.proxy_pool", pool):
+            yield pool
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_uses_pool(self, mock_scrape_jobs, test_app, pool):
+        """Test searches without proxies get one from the pool."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape", json={"site_name": "indeed", "search_term": "a"}
+            )
+
+        assert response.status_code == 200
+        mock_scrape_jobs.assert_called_once_with(
+            site_name="indeed", search_term="a", proxies=["user:pw@proxy:8080"]
+        )
+        assert pool.report()[0]["sites"]["indeed"]["calls"] == 1
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_request_proxies_override_pool(self, mock_scrape_jobs, test_app, pool):
+        """Test proxies sent with the request are used instead of the pool."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"search_term": "a", "proxies": ["mine:1"]})
+
+        mock_scrape_jobs.assert_called_once_with(search_term="a", proxies=["mine:1"])
+        assert pool.report()[0]["sites"] == {}
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_proxies_endpoint(self, mock_scrape_jobs, test_app, pool):
+        """Test proxy health is reported without credentials."""
+        mock_scrape_jobs.side_effect = ConnectionError("Proxy refused the connection")
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"site_name": "indeed"})
+            response = client.get("/proxies")
+
+        proxies = response.get_json()["proxies"]
+        assert response.status_code == 200
+        assert "pw" not in response.get_data(as_text=True)
+        assert proxies[0]["label"] == "proxy:8080"
+        assert proxies[0]["sites"]["indeed"]["failures"] == 1
+
+    def test_proxies_endpoint_without_pool(self, test_app):
+        """Test an empty list is reported when no pool is configured."""
+        with test_app.test_client() as client:
+            assert client.get("/proxies").get_json() == {
+                "success": True,
+                "proxies": [],
+            }
+
+
+class TestMetricsEndpoint:
+    """Test cases for the Prometheus metrics endpoint."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_metrics_after_scrape(self, mock_scrape_jobs, test_app):
+        """Test scrapes, cache lookups and requests are exported."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["A", "B"]})
+
+        with test_app.test_client() as client:
+            for _ in range(2):
+                with client.post("/scrape", json={"site_name": "indeed"}) as response:
+                    assert response.status_code == 200
+            response = client.get("/metrics")
+
+        text = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert 'jobscraper_scrape_rows_total{site="indeed"} 2' in text
+        assert 'jobscraper_cache_requests_total{status="MISS"} 1' in text
+        assert 'jobscraper_cache_requests_total{status="HIT"} 1' in text
+        assert (
+            'jobscraper_requests_total{endpoint="/scrape",method="POST",status="200"} 2'
+            in text
+        )
+        assert 'jobscraper_stage_duration_seconds_count{stage="parse"} 2' in text
+        assert 'jobscraper_stage_duration_seconds_count{stage="serialize"} 2' in text
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_errors_by_site(self, mock_scrape_jobs, test_app):
+        """Test failed upstream calls are exported by site and exception."""
+        mock_scrape_jobs.side_effect = ConnectionError("refused")
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"site_name": "glassdoor"}).close()
+            text = client.get("/metrics").get_data(as_text=True)
+
+        assert (
+            'jobscraper_scrape_errors_total{exception="ConnectionError",'
+            'site="glassdoor"} 1' in text
+        )
+
+    def test_metrics_disabled(self, test_app, tmp_path):
+        """Test the endpoint is unavailable when metrics are disabled."""
+        from jobscraper.metrics import Metrics
+
+        disabled = Metrics(str(tmp_path / "m.sqlite3"), flush_interval=0, enabled=False)
+        with (
+            test_app.test_client() as client,
+            patch("jobscraper.app.metrics", disabled),
+        ):
+            assert client.get("/metrics").status_code == 404
+
+
+class TestRequestTiming:
+    """Test cases for Server-Timing headers and request profiling."""
+
+    @pytest.fixture
+    def profiling(self, tmp_path):
+        """Enable profiling with a token and a temporary profile store."""
+        from jobscraper.profiling import ProfileStore
+
+        store = ProfileStore(str(tmp_path / "profiles"), top_n=10)
+        with (
+            patch("jobscraper.app.PROFILE_ACCESS_TOKEN", "profile-secret"),
+            patch("jobscraper.app.profile_store", store),
+        ):
+            yield store
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_server_timing_header(self, mock_scrape_jobs, test_app):
+        """Test responses break their time down by stage."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post("/scrape", json={"search_term": "a"})
+
+        stages = [
+            entry.split(";")[0]
+            for entry in response.headers["Server-Timing"].split(", ")
+        ]
+        assert stages == ["parse", "scrape", "postprocess", "serialize", "total"]
+        assert "X-Profile-Id" not in response.headers
+
+    def test_server_timing_disabled(self, test_app):
+        """Test the header can be turned off."""
+        with (
+            test_app.test_client() as client,
+            patch("jobscraper.app.SERVER_TIMING", False),
+        ):
+            assert "Server-Timing" not in client.get("/health").headers
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_profiled_request(self, mock_scrape_jobs, test_app, profiling):
+        """Test a profiled request stores a report fetched by its id."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+        headers = {"X-Profile-Token": "profile-secret"}
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape?profile=1", json={"search_term": "a"}, headers=headers
+            )
+            profile_id = response.headers["X-Profile-Id"]
+            report = client.get(f"/profiles/{profile_id}", headers=headers)
+            forbidden = client.get(f"/profiles/{profile_id}")
+
+        assert response.status_code == 200
+        assert report.status_code == 200
+        assert report.get_data(as_text=True).startswith("POST /scrape?profile=1")
+        assert "scrape_jobs_endpoint" in report.get_data(as_text=True)
+        assert forbidden.status_code == 403
+
+    @patch("jobscraper.app.scrape_jobs")
+    @pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}])
+    def test_profiling_needs_token(
+        self, mock_scrape_jobs, test_app, profiling, headers
+    ):
+        """Test profiling is refused without the separate profiling token."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape?profile=1", json={"search_term": "a"}, headers=headers
+            )
+
+        assert response.status_code == 403
+        assert response.get_json()["error"] == "Profiling not allowed"
+        mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    @patch("jobscraper.auth.API_ACCESS_TOKEN", "api-secret")
+    def test_profiling_after_authentication(
+        self, mock_scrape_jobs, test_app, profiling
+    ):
+        """Test unauthenticated requests get the usual 401 and are not profiled."""
+        from jobscraper.auth import require_token
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+        view = test_app.view_functions["scrape_jobs_endpoint"]
+        headers = {"X-Profile-Token": "profile-secret"}
+
+        with (
+            test_app.test_client() as client,
+            patch.dict(
+                test_app.view_functions, scrape_jobs_endpoint=require_token(view)
+            ),
+        ):
+            unauthenticated = client.post(
+                "/scrape?profile=1", json={"search_term": "a"}, headers=headers
+            )
+            authenticated = client.post(
+                "/scrape?profile=1",
+                json={"search_term": "a"},
+                headers={**headers, "Authorization": "Bearer api-secret"},
+            )
+
+        assert unauthenticated.status_code == 401
+        assert "X-Profile-Id" not in unauthenticated.headers
+        assert authenticated.status_code == 200
+        assert "X-Profile-Id" in authenticated.headers
+
+    def test_profiling_disabled_without_token(self, test_app):
+        """Test profiling is refused when no profiling token is configured."""
+        with test_app.test_client() as client:
+            response = client.get("/health?profile=1", headers={"X-Profile-Token": ""})
+
+        assert response.status_code == 403
+
+    def test_one_profile_at_a_time(self, test_app, profiling):
+        """Test a request is refused while another one is profiled."""
+        running = profiling.start()
+        try:
+            with test_app.test_client() as client:
+                response = client.get(
+                    "/health?profile=1", headers={"X-Profile-Token": "profile-secret"}
+                )
+        finally:
+            profiling.stop(running)
+
+        assert response.status_code == 409
+
+    def test_unknown_profile(self, test_app, profiling):
+        """Test unknown profile ids are answered with 404."""
+        with test_app.test_client() as client:
+            response = client.get(
+                "/profiles/0123456789abcdef",
+                headers={"X-Profile-Token": "profile-secret"},
+            )
+
+        assert response.status_code == 404
+
+
+class TestScrapeCache:
+    """Test cases for the /scrape result cache."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_cache_hit(self, mock_scrape_jobs, test_app):
+        """Test an equivalent repeated search is served from cache."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            first = client.post(
+                "/scrape", json={"site_name": ["indeed", "linkedin"], "hours_old": 24}
+            )
+            second = client.post(
+                "/scrape",
+                json={
+                    "site_name": ["linkedin", "indeed"],
+                    "hours_old": 24,
+                    "results_wanted": 15,
+                },
+            )
+
+            assert first.headers["X-Cache"] == "MISS"
+            assert second.headers["X-Cache"] == "HIT"
+            assert second.get_json()["jobs"] == first.get_json()["jobs"]
+            # One call per site for the first request only
+            assert mock_scrape_jobs.call_count == 2
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_cache_bypass(self, mock_scrape_jobs, test_app):
+        """Test cache=bypass neither reads nor writes the cache."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            first = client.post("/scrape", json={"search_term": "a", "cache": "bypass"})
+            second = client.post("/scrape", json={"search_term": "a"})
+
+            assert first.headers["X-Cache"] == "BYPASS"
+            assert second.headers["X-Cache"] == "MISS"
+            assert mock_scrape_jobs.call_count == 2
+            mock_scrape_jobs.assert_called_with(search_term="a")
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_cache_refresh(self, mock_scrape_jobs, test_app):
+        """Test cache=refresh re-scrapes and replaces the cached entry."""
+        mock_scrape_jobs.side_effect = [
+            pd.DataFrame({"title": ["Old"]}),
+            pd.DataFrame({"title": ["New"]}),
+        ]
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"search_term": "a"})
+            refreshed = client.post(
+                "/scrape", json={"search_term": "a", "cache": "refresh"}
+            )
+            cached = client.post("/scrape", json={"search_term": "a"})
+
+            assert refreshed.headers["X-Cache"] == "MISS"
+            assert cached.headers["X-Cache"] == "HIT"
+            assert cached.get_json()["jobs"] == [{"title": "New"}]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_cache_stale_while_revalidate(self, mock_scrape_jobs, test_app):
+        """Test an expired entry is served at once while it is refreshed."""
+        from jobscraper.app import result_cache
+        from jobscraper.params import params_key
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Old"]})
+        body = {"search_term": "a"}
+
+        with (
+            pytest.MonkeyPatch().context() as m,
+            patch("jobscraper.app.refresher") as mock_refresher,
+            test_app.test_client() as client,
+        ):
+            m.setattr(result_cache, "stale_ttl", 600)
+            with patch("jobscraper.cache.time.monotonic", return_value=100.0):
+                client.post("/scrape", json=body)
+            with patch("jobscraper.cache.time.monotonic", return_value=500.0):
+                stale = client.post("/scrape", json=body)
+
+            assert stale.headers["X-Cache"] == "STALE"
+            assert stale.get_json()["jobs"] == [{"title": "Old"}]
+            mock_scrape_jobs.assert_called_once()
+            mock_refresher.submit.assert_called_once_with(
+                params_key(body), body, recheck=True
+            )
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_refresh_search(self, mock_scrape_jobs):
+        """Test a background refresh stores a fresh result."""
+        from jobscraper.app import refresh_search, result_cache
+        from jobscraper.params import params_key
+
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["New"]})
+        key = params_key({"search_term": "a"})
+
+        result = refresh_search({"search_term": "a"}, key, recheck=False)
+
+        assert len(result) == 1
+        assert result_cache.get(key) is result
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_cache_invalid_option(self, mock_scrape_jobs, test_app):
+        """Test unknown cache options are rejected with 400."""
+        with test_app.test_client() as client:
+            response = client.post("/scrape", json={"search_term": "a", "cache": "x"})
+
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Invalid request"
+            mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrape_errors_not_cached(self, mock_scrape_jobs, test_app):
+        """Test failed scrapes are retried rather than cached."""
+        mock_scrape_jobs.side_effect = [
+            Exception("Network error"),
+            pd.DataFrame({"title": ["Engineer"]}),
+        ]
+
+        with test_app.test_client() as client:
+            failed = client.post("/scrape", json={"search_term": "a"})
+            retried = client.post("/scrape", json={"search_term": "a"})
+
+            assert failed.status_code == 500
+            assert retried.status_code == 200
+            assert retried.headers["X-Cache"] == "MISS"
+
+
+class TestScrapeCoalescing:
+    """Test cases for coalescing identical concurrent /scrape requests."""
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_concurrent_identical_requests_share_scrape(
+        self, mock_scrape_jobs, test_app
+    ):
+        """Test a request arriving during an identical scrape shares it."""
+        from jobscraper.app import single_flight
+
+        release = threading.Event()
+        coalesced_before = single_flight.stats()["coalesced"]
+
+        def slow_scrape(**kwargs):
+            release.wait(5)
+            return pd.DataFrame({"title": ["Engineer"]})
+
+        mock_scrape_jobs.side_effect = slow_scrape
+        responses = []
+
+        def send():
+            with test_app.test_client() as client:
+                responses.append(client.post("/scrape", json={"search_term": "a"}))
+
+        threads = [threading.Thread(target=send) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while single_flight.stats()["coalesced"] == coalesced_before:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        mock_scrape_jobs.assert_called_once()
+        assert sorted(r.headers["X-Cache"] for r in responses) == [
+            "COALESCED",
+            "MISS",
+        ]
+        assert all(r.get_json()["count"] == 1 for r in responses)
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_waiting_worker_reuses_shared_result(
+        self, mock_scrape_jobs, test_app, tmp_path
+    ):
+        """Test a worker that waited on the host lock serves the stored result."""
+        from jobscraper.app import scrape_and_cache
+        from jobscraper.cache import ScrapeResult, SQLiteResultCache
+        from jobscraper.coalesce import SingleFlight
+
+        shared_cache = SQLiteResultCache(
+            str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=10, max_bytes=10**6
+        )
+        # Another worker finished the scrape while this one waited for the lock
+        shared_cache.set("key", ScrapeResult(pd.DataFrame({"title": ["Engineer"]})))
+
+        with (
+            patch("jobscraper.app.result_cache", shared_cache),
+            patch("jobscraper.app.single_flight", SingleFlight(str(tmp_path))),
+        ):
+            result, status = scrape_and_cache(
+                {"search_term": "a"}, "key", use_cache=True, recheck=True
+            )
+
+        assert status == "COALESCED"
+        assert len(result) == 1
+        mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_lock_wait_ends_at_deadline(self, mock_scrape_jobs, test_app, tmp_path):
+        """Test a worker stuck behind another's lock serves stale, else times out."""
+        from jobscraper.app import scrape_and_cache
+        from jobscraper.cache import ScrapeResult, SQLiteResultCache
+        from jobscraper.coalesce import SingleFlight
+        from jobscraper.scraper import ScrapeTimeoutError
+
+        shared_cache = SQLiteResultCache(
+            str(tmp_path / "cache.sqlite3"),
+            ttl=0.01,
+            max_entries=10,
+            max_bytes=10**6,
+            stale_ttl=600,
+        )
+        other_worker = SingleFlight(str(tmp_path))
+
+        with (
+            patch("jobscraper.app.result_cache", shared_cache),
+            patch("jobscraper.app.single_flight", SingleFlight(str(tmp_path))),
+            other_worker.host_lock("key"),
+        ):
+            with pytest.raises(ScrapeTimeoutError):
+                scrape_and_cache(
+                    {"search_term": "a"},
+                    "key",
+                    use_cache=True,
+                    recheck=True,
+                    deadline=time.monotonic() + 0.1,
+                )
+
+            shared_cache.set("key", ScrapeResult(pd.DataFrame({"title": ["Old"]})))
+            time.sleep(0.05)
+            result, status = scrape_and_cache(
+                {"search_term": "a"},
+                "key",
+                use_cache=True,
+                recheck=False,
+                deadline=time.monotonic() + 0.1,
+            )
+
+        assert status == "STALE"
+        assert result.jobs["title"].tolist() == ["Old"]
+        mock_scrape_jobs.assert_not_called()
+
+    def test_stats_endpoint(self, test_app):
+        """Test cache and coalescing counters are reported."""
+        with test_app.test_client() as client:
+            response = client.get("/stats")
+
+            assert response.status_code == 200
+            json_data = response.get_json()
+            assert json_data["cache"]["backend"] == "memory"
+            assert json_data["cache"]["stale_hits"] == 0
+            assert json_data["refresh"] == {
+                "refreshed": 0,
+                "failed": 0,
+                "pending": 0,
+                "scheduler": None,
+            }
+            assert set(json_data["coalescing"]) == {
+                "executions",
+                "coalesced",
+                "host_coalesced",
+                "in_flight",
+            }
+
+
+class TestScrapeBatch:
+    """Test cases for batch scrape requests."""
+
+    @staticmethod
+    def read_lines(response):
+        """Split an NDJSON batch response into items and the trailer."""
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        return lines[:-1], lines[-1]
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_batch_success(self, mock_scrape_jobs, test_app):
+        """Test each search gets a line and duplicates are scraped once."""
+        mock_scrape_jobs.side_effect = lambda **kwargs: pd.DataFrame(
+            {"title": [kwargs["search_term"]]}
+        )
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape/batch",
+                json={
+                    "searches": [
+                        {"search_term": "a", "location": "x"},
+                        {"search_term": "b"},
+                        {"location": "x", "search_term": "a", "stream": True},
+                    ]
+                },
+            )
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            items, trailer = self.read_lines(response)
+
+        assert mock_scrape_jobs.call_count == 2
+        by_index = {item["index"]: item for item in items}
+        assert sorted(by_index) == [0, 1, 2]
+        assert by_index[0]["status"] == "succeeded"
+        assert by_index[0]["jobs"] == [{"title": "a"}]
+        assert by_index[2]["jobs"] == [{"title": "a"}]
+        assert by_index[1]["jobs"] == [{"title": "b"}]
+        assert by_index[1]["count"] == 1
+        assert trailer == {
+            "trailer": True,
+            "success": True,
+            "count": 3,
+            "succeeded": 3,
+            "failed": 0,
+        }
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_batch_item_failure(self, mock_scrape_jobs, test_app):
+        """Test a failing search does not fail the rest of the batch."""
+
+        def scrape(**kwargs):
+            if kwargs["search_term"] == "bad":
+                raise Exception("Network error")
+            return pd.DataFrame({"title": ["Engineer"]})
+
+        mock_scrape_jobs.side_effect = scrape
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape/batch",
+                json={"searches": [{"search_term": "good"}, {"search_term": "bad"}]},
+            )
+            items, trailer = self.read_lines(response)
+
+        by_index = {item["index"]: item for item in items}
+        assert by_index[0]["success"] is True
+        assert by_index[1] == {
+            "index": 1,
+            "status": "failed",
+            "success": False,
+            "error": "Network error",
+        }
+        assert trailer["succeeded"] == 1
+        assert trailer["failed"] == 1
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {},
+            ["searches"],
+            "searches",
+            {"searches": []},
+            {"searches": [{"search_term": "a"}], "cache": "sometimes"},
+        ],
+    )
+    @patch("jobscraper.app.scrape_jobs")
+    def test_invalid_batch(self, mock_scrape_jobs, test_app, body):
+        """Test invalid batches are rejected before anything runs."""
+        with test_app.test_client() as client:
+            response = client.post("/scrape/batch", json=body)
+
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Invalid request"
+        mock_scrape_jobs.assert_not_called()
+
+    @patch("jobscraper.app.SCRAPE_BATCH_MAX_SEARCHES", 1)
+    def test_batch_too_large(self, test_app):
+        """Test batches over SCRAPE_BATCH_MAX_SEARCHES are rejected."""
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape/batch", json={"searches": [{"search_term": "a"}] * 2}
+            )
+
+            assert response.status_code == 400
+
+
+class TestScrapeJobs:
+    """Test cases for background scrape jobs."""
+
+    @staticmethod
+    def wait_for_job(client, job_id, statuses=("succeeded", "failed")):
+        """Poll a job until it reaches one of ``statuses``."""
+        deadline = time.monotonic() + 5
+        while True:
+            json_data = client.get(f"/scrape/jobs/{job_id}").get_json()
+            if json_data["status"] in statuses:
+                return json_data
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_job_succeeds(self, mock_scrape_jobs, test_app):
+        """Test a queued job returns its id at once and its result later."""
+        mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+
+        with test_app.test_client() as client:
+            response = client.post(
+                "/scrape/jobs", json={"search_term": "python", "proxies": ["p"]}
+            )
+
+            assert response.status_code == 202
+            json_data = response.get_json()
+            assert json_data["status"] == "queued"
+            job_id = json_data["job_id"]
+            assert response.headers["Location"].endswith(f"/scrape/jobs/{job_id}")
+
+            job = self.wait_for_job(client, job_id)
+
+        assert job["status"] == "succeeded"
+        assert job["count"] == 1
+        assert job["params"] == {"search_term": "python"}
+        assert job["result"]["success"] is True
+        assert job["result"]["jobs"] == [{"title": "Engineer"}]
+        mock_scrape_jobs.assert_called_once_with(search_term="python", proxies=["p"])
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_job_fails(self, mock_scrape_jobs, test_app):
+        """Test a failing scrape is reported on the job."""
+        mock_scrape_jobs.side_effect = Exception("Network error")
+
+        with test_app.test_client() as client:
+            job_id = client.post("/scrape/jobs", json={"search_term": "a"}).get_json()[
+                "job_id"
+            ]
+            job = self.wait_for_job(client, job_id)
+
+        assert job["status"] == "failed"
+        assert job["error"] == "Network error"
+        assert "result" not in job
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_pending_jobs_capped(self, mock_scrape_jobs, test_app):
+        """Test new jobs are rejected with 429 while the process is at its cap."""
+        from jobscraper.app import job_heartbeat
+
+        release = threading.Event()
+
+        def slow_scrape(**kwargs):
+            release.wait(5)
+            return pd.DataFrame()
+
+        mock_scrape_jobs.side_effect = slow_scrape
+
+        with (
+            test_app.test_client() as client,
+            patch.object(job_heartbeat, "max_pending", 1),
+        ):
+            first = client.post("/scrape/jobs", json={"search_term": "a"})
+            second = client.post("/scrape/jobs", json={"search_term": "b"})
+            release.set()
+            self.wait_for_job(client, first.get_json()["job_id"])
+            third = client.post("/scrape/jobs", json={"search_term": "c"})
+
+        assert first.status_code == 202
+        assert second.status_code == 429
+        assert second.get_json()["error"] == "Too many requests"
+        assert third.status_code == 202
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_cancel_running_job(self, mock_scrape_jobs, test_app):
+        """Test a running job can be cancelled and its result is discarded."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_scrape(**kwargs):
+            started.set()
+            release.wait(5)
+            return pd.DataFrame({"title": ["Engineer"]})
+
+        mock_scrape_jobs.side_effect = slow_scrape
+
+        with test_app.test_client() as client:
+            job_id = client.post("/scrape/jobs", json={"search_term": "a"}).get_json()[
+                "job_id"
+            ]
+            assert started.wait(5)
+
+            response = client.delete(f"/scrape/jobs/{job_id}")
+            release.set()
+
+            assert response.status_code == 200
+            assert response.get_json()["status"] == "cancelled"
+            time.sleep(0.05)
+            assert client.get(f"/scrape/jobs/{job_id}").get_json()["status"] == (
+                "cancelled"
+            )
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_delete_finished_job(self, mock_scrape_jobs, test_app):
+        """Test deleting a finished job removes it."""
+        mock_scrape_jobs.return_value = pd.DataFrame()
+
+        with test_app.test_client() as client:
+            job_id = client.post("/scrape/jobs", json={"search_term": "a"}).get_json()[
+                "job_id"
+            ]
+            self.wait_for_job(client, job_id)
+
+            response = client.delete(f"/scrape/jobs/{job_id}")
+            assert response.get_json()["status"] == "deleted"
+            assert client.get(f"/scrape/jobs/{job_id}").status_code == 404
+            assert client.delete(f"/scrape/jobs/{job_id}").status_code == 404
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"json": {}},
+            {"data": "not json", "content_type": "application/json"},
+            {"json": ["search_term"]},
+            {"json": "python"},
+            {"json": {"search_term": "a", "cache": "sometimes"}},
+            {"json": {"search_term": "a", "deadline_ms": -1}},
+        ],
+    )
+    @patch("jobscraper.app.scrape_jobs")
+    def test_invalid_job_request(self, mock_scrape_jobs, test_app, kwargs):
+        """Test job requests are validated before anything is queued."""
+        with test_app.test_client() as client:
+            response = client.post("/scrape/jobs", **kwargs)
+
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Invalid request"
+        mock_scrape_jobs.assert_not_called()
+
+    def test_unknown_job(self, test_app):
+        """Test unknown job ids return 404."""
+        with test_app.test_client() as client:
+            response = client.get("/scrape/jobs/missing")
+
+            assert response.status_code == 404
+            assert response.get_json()["error"] == "Not found"
+
+
+class TestArchivedJobs:
+    """Test cases for the job archive and GET /jobs."""
+
+    @pytest.fixture
+    def writer(self):
+        """Enable the archive with a writer that flushes immediately."""
+        from jobscraper.app import job_archive
+        from jobscraper.archive import ArchiveWriter
+
+        writer = ArchiveWriter(
+            job_archive, batch_rows=1000, flush_interval=0, max_pending=10
+        )
+        with patch("jobscraper.app.archive_writer", writer):
+            yield writer
+
+    def test_disabled(self, test_app):
+        """Test GET /jobs is not found when the archive is disabled."""
+        with test_app.test_client() as client:
+            response = client.get("/jobs")
+
+            assert response.status_code == 404
+
+    @patch("jobscraper.app.scrape_jobs")
+    def test_scrapes_are_archived(self, mock_scrape_jobs, test_app, writer):
+        """Test fresh scrapes are archived and can be queried."""
+        mock_scrape_jobs.return_value = pd.DataFrame(
+            {
+                "id": ["in-1", "in-2"],
+                "site": ["indeed", "indeed"],
+                "title": ["Python Engineer", "Data Analyst"],
+                "description": ["Django", "SQL"],
+            }
+        )
+
+        with test_app.test_client() as client:
+            client.post("/scrape", json={"search_term": "a"})
+            # Cache hits are not archived again
+            client.post("/scrape", json={"search_term": "a"})
+            writer.flush()
+
+            response = client.get("/jobs?q=django")
+            data = response.get_json()
+
+            assert response.status_code == 200
+            assert data["count"] == 1
+            assert data["next_cursor"] is None
+            assert data["jobs"][0]["title"] == "Python Engineer"
+            assert writer.stats()["written"] == 2
+
+            page = client.get("/jobs?limit=1").get_json()
+            assert page["count"] == 1
+            following = client.get(f"/jobs?limit=1&cursor={page['next_cursor']}")
+            assert following.get_json()["count"] == 1
+
+    def test_invalid_query(self, test_app, writer):
+        """Test invalid query parameters are rejected."""
+        with test_app.test_client() as client:
+            response = client.get("/jobs?limit=0")
+
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Invalid request"
+
+
 class TestBeforeRequest:
     """Test cases for before_request handler."""
 
@@ -0,0 +1,252 @@
+"""
+Unit tests for the job archive and its write-behind writer.
+"""
+
+import datetime
+import json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from jobscraper.archive import (
+    ArchiveWriter,
+    JobArchive,
+    archive_rows,
+    encode_cursor,
+    parse_archive_query,
+)
+from jobscraper.params import InvalidRequestError
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Job archive in a temporary SQLite file."""
+    return JobArchive(str(tmp_path / "archive.sqlite3"))
+
+
+def make_jobs() -> pd.DataFrame:
+    """Jobs DataFrame shaped like jobspy output."""
+    return pd.DataFrame(
+        {
+            "id": ["in-1", "li-2", "in-3", None],
+            "site": ["indeed", "linkedin", "indeed", "indeed"],
+            "job_url": ["u1", "u2", "u3", None],
+            "title": ["Python Engineer", "Data Analyst", "Rust Engineer", "Orphan"],
+            "company": ["Acme", "Globex", "Acme", "Nobody"],
+            "location": ["Austin, TX", "New York, NY", "Austin, TX", None],
+            "date_posted": [
+                datetime.date(2026, 1, 3),
+                datetime.date(2026, 1, 2),
+                None,
+                datetime.date(2026, 1, 1),
+            ],
+            "is_remote": [True, False, True, False],
+            "min_amount": [100000.0, None, 90000.0, None],
+            "max_amount": [150000.0, None, None, None],
+            "description": ["Django and *asyncio*", "SQL", "Tokio", ""],
+        }
+    )
+
+
+def query(**params) -> dict:
+    """Parse GET /jobs query parameters."""
+    return parse_archive_query(MultiDict(params))
+
+
+def titles(records: list) -> list:
+    """Titles of encoded job records."""
+    return [json.loads(record)["title"] for record in records]
+
+
+class TestArchiveRows:
+    """Test cases for converting DataFrames into archive rows."""
+
+    def test_rows(self):
+        """Test keys, dates and flags are normalized and keyless jobs skipped."""
+        rows = archive_rows(make_jobs())
+
+        assert [row[0] for row in rows] == ["in-1", "li-2", "in-3"]
+        assert [row[5] for row in rows] == ["2026-01-03", "2026-01-02", ""]
+        assert [row[6] for row in rows] == [1, 0, 1]
+        assert [row[7] for row in rows] == [150000.0, None, 90000.0]
+        assert '"title":"Python Engineer"' in rows[0][-1]
+
+    def test_missing_columns(self):
+        """Test frames with only some columns are archived."""
+        rows = archive_rows(pd.DataFrame({"job_url": ["u1"]}))
+
+        assert rows[0][0] == "u1"
+        assert rows[0][5] == ""
+
+
+class TestParseArchiveQuery:
+    """Test cases for reading GET /jobs parameters."""
+
+    def test_defaults(self):
+        """Test a bare query returns the first default-sized page."""
+        assert parse_archive_query(MultiDict()) == {"limit": 50}
+
+    def test_options(self):
+        """Test every parameter is validated and converted."""
+        parsed = parse_archive_query(
+            MultiDict(
+                [
+                    ("q", "python OR django*"),
+                    ("site", "Indeed,linkedin"),
+                    ("site", "google"),
+                    ("company", " Acme "),
+                    ("posted_since", "2026-01-01"),
+                    ("is_remote", "true"),
+                    ("min_salary", "90000"),
+                    ("limit", "10"),
+                ]
+            )
+        )
+
+        assert parsed == {
+            "match": '"python" "OR" "django"',
+            "sites": ["indeed", "linkedin", "google"],
+            "company": "Acme",
+            "posted_since": "2026-01-01",
+            "is_remote": True,
+            "min_salary": 90000.0,
+            "limit": 10,
+        }
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"q": "***"},
+            {"posted_since": "yesterday"},
+            {"is_remote": "maybe"},
+            {"min_salary": "lots"},
+            {"limit": "0"},
+            {"limit": "501"},
+            {"cursor": "not-a-cursor"},
+        ],
+    )
+    def test_invalid(self, params):
+        """Test invalid parameters are rejected."""
+        with pytest.raises(InvalidRequestError):
+            query(**params)
+
+
+class TestJobArchive:
+    """Test cases for archiving and querying jobs."""
+
+    def test_upsert(self, archive):
+        """Test repeated scrapes refresh jobs instead of duplicating them."""
+        archive.insert(archive_rows(make_jobs()))
+        updated = make_jobs()
+        updated.loc[0, "title"] = "Senior Python Engineer"
+        archive.insert(archive_rows(updated))
+
+        assert len(archive) == 3
+        records, _ = archive.search(query(q="senior"))
+        assert titles(records) == ["Senior Python Engineer"]
+        assert archive.search(query(q="Python Engineer"))[0] == records
+
+    def test_newest_first(self, archive):
+        """Test jobs are ordered by posting date, undated ones last."""
+        archive.insert(archive_rows(make_jobs()))
+
+        records, next_cursor = archive.search(query())
+
+        assert titles(records) == ["Python Engineer", "Data Analyst", "Rust Engineer"]
+        assert next_cursor is None
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"q": "engineer"}, ["Python Engineer", "Rust Engineer"]),
+            ({"q": "asyncio"}, ["Python Engineer"]),
+            ({"site": "linkedin"}, ["Data Analyst"]),
+            ({"company": "acme"}, ["Python Engineer", "Rust Engineer"]),
+            ({"location": "new york"}, ["Data Analyst"]),
+            ({"location": "%"}, []),
+            ({"posted_since": "2026-01-03"}, ["Python Engineer"]),
+            ({"posted_until": "2026-01-02"}, ["Data Analyst"]),
+            ({"is_remote": "false"}, ["Data Analyst"]),
+            ({"min_salary": "95000"}, ["Python Engineer"]),
+            (
+                {"q": "engineer", "is_remote": "true", "site": "indeed"},
+                ["Python Engineer", "Rust Engineer"],
+            ),
+        ],
+    )
+    def test_filters(self, archive, params, expected):
+        """Test each filter narrows the results."""
+        archive.insert(archive_rows(make_jobs()))
+
+        records, _ = archive.search(query(**params))
+
+        assert titles(records) == expected
+
+    def test_min_salary_is_yearly(self, archive):
+        """Test hourly and monthly pay is annualized before the salary floor."""
+        jobs = make_jobs().head(3)
+        jobs["min_amount"] = [60.0, 5000.0, 120000.0]
+        jobs["max_amount"] = [None, 7000.0, None]
+        jobs["interval"] = ["hourly", "monthly", None]
+        archive.insert(archive_rows(jobs))
+
+        records, _ = archive.search(query(min_salary="100000"))
+
+        assert titles(records) == ["Python Engineer", "Rust Engineer"]
+
+    def test_keyset_pagination(self, archive):
+        """Test pages follow each other without gaps or repeats."""
+        archive.insert(archive_rows(make_jobs()))
+
+        first, cursor = archive.search(query(limit="2"))
+        second, last_cursor = archive.search(query(limit="2", cursor=cursor))
+
+        assert titles(first) == ["Python Engineer", "Data Analyst"]
+        assert titles(second) == ["Rust Engineer"]
+        assert last_cursor is None
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the position they were made from."""
+        cursor = encode_cursor("2026-01-02", 7)
+        assert query(cursor=cursor)["after"] == ("2026-01-02", 7)
+
+
+class TestArchiveWriter:
+    """Test cases for the write-behind writer."""
+
+    def test_writes_in_background(self, archive):
+        """Test queued results are written by the writer thread."""
+        writer = ArchiveWriter(
+            archive, batch_rows=100, flush_interval=0.01, max_pending=10
+        )
+
+        assert writer.submit(make_jobs()) is True
+        assert writer.submit(make_jobs().iloc[:1]) is True
+        writer.flush()
+
+        assert len(archive) == 3
+        assert writer.stats() == {"written": 4, "dropped": 0, "pending": 0}
+
+    def test_drops_when_full(self, archive):
+        """Test results are dropped instead of blocking when the queue is full."""
+        writer = ArchiveWriter(archive, batch_rows=100, flush_interval=0, max_pending=1)
+
+        with patch.object(writer, "_ensure_thread"):
+            assert writer.submit(make_jobs()) is True
+            assert writer.submit(make_jobs()) is False
+
+        assert writer.stats()["dropped"] == 1
+
+    def test_failed_batch_does_not_stop_writer(self, archive):
+        """Test a failing write is logged and later results still written."""
+        writer = ArchiveWriter(archive, batch_rows=1, flush_interval=0, max_pending=10)
+
+        with patch.object(archive, "insert", side_effect=[Exception("locked"), None]):
+            writer.submit(make_jobs())
+            writer.flush()
+            writer.submit(make_jobs())
+            writer.flush()
+
+        assert writer.written == 3
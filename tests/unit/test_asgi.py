@@ -0,0 +1,240 @@
+"""
+Unit tests for the ASGI serving mode.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+
+from jobscraper.asgi import BoundedAsgiApp, build_environ, run_wsgi
+
+
+def http_scope(method="GET", path="/health", headers=(), query_string=b""):
+    """ASGI scope of an HTTP request."""
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+async def call(app, scope, body=b""):
+    """Send one request to an ASGI app and collect what it sends back."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+def response_of(messages):
+    """Status, headers and body of the collected messages."""
+    start = messages[0]
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], headers, body
+
+
+class TestBuildEnviron:
+    """Test cases for translating ASGI scopes."""
+
+    def test_request_fields(self):
+        """Test method, path, query, headers and body are carried over."""
+        scope = http_scope(
+            "POST",
+            "/scrape/saved/café",
+            headers=[
+                ("Content-Type", "application/json"),
+                ("Content-Length", "999"),
+                ("Authorization", "Bearer t"),
+                ("Accept", "text/csv"),
+                ("Accept", "application/json"),
+            ],
+            query_string=b"profile=1",
+        )
+
+        environ = build_environ(scope, b'{"a": 1}')
+
+        assert environ["REQUEST_METHOD"] == "POST"
+        assert environ["PATH_INFO"].encode("latin-1").decode("utf-8") == (
+            "/scrape/saved/café"
+        )
+        assert environ["QUERY_STRING"] == "profile=1"
+        assert environ["CONTENT_TYPE"] == "application/json"
+        assert environ["CONTENT_LENGTH"] == "8"
+        assert environ["HTTP_AUTHORIZATION"] == "Bearer t"
+        assert environ["HTTP_ACCEPT"] == "text/csv,application/json"
+        assert environ["wsgi.input"].read() == b'{"a": 1}'
+
+
+class TestRunWsgi:
+    """Test cases for passing WSGI responses on."""
+
+    def test_streamed_body(self):
+        """Test each chunk is sent as it comes and the body is closed."""
+        closed = []
+
+        class Body:
+            def __iter__(self):
+                yield b""
+                yield b"first"
+                yield b"second"
+
+            def close(self):
+                closed.append(True)
+
+        def wsgi_app(environ, start_response):
+            start_response("201 Created", [("X-Test", "1")])
+            return Body()
+
+        messages = []
+        run_wsgi(wsgi_app, {}, messages.append)
+
+        assert [message["type"] for message in messages] == [
+            "http.response.start",
+            "http.response.body",
+            "http.response.body",
+            "http.response.body",
+        ]
+        assert messages[0]["status"] == 201
+        assert messages[0]["headers"] == [(b"x-test", b"1")]
+        assert messages[-1] == {
+            "type": "http.response.body",
+            "body": b"",
+            "more_body": False,
+        }
+        assert closed == [True]
+
+
+class TestBoundedAsgiApp:
+    """Test cases for serving the app with backpressure."""
+
+    def test_same_responses_as_wsgi(self, app):
+        """Test endpoints answer as they do under a WSGI server."""
+        asgi = BoundedAsgiApp(app, threads=2, queue_size=2)
+
+        with patch("jobscraper.app.scrape_jobs") as mock_scrape_jobs:
+            mock_scrape_jobs.return_value = pd.DataFrame({"title": ["Engineer"]})
+            messages = asyncio.run(
+                call(
+                    asgi,
+                    http_scope(
+                        "POST",
+                        "/scrape",
+                        headers=[("Content-Type", "application/json")],
+                    ),
+                    json.dumps({"site_name": "indeed"}).encode(),
+                )
+            )
+
+        status, headers, body = response_of(messages)
+        assert status == 200
+        assert headers["content-type"] == "application/json"
+        assert json.loads(body)["jobs"] == [{"title": "Engineer"}]
+
+    def test_health_answered_when_full(self, app):
+        """Test /health skips the pool and its queue."""
+        asgi = BoundedAsgiApp(app, threads=1, queue_size=0)
+        asgi.admitted = 1
+
+        status, _, body = response_of(asyncio.run(call(asgi, http_scope())))
+
+        assert status == 200
+        assert body == b"API is running"
+
+    def test_full_queue_rejected(self):
+        """Test requests beyond the threads and queue get 429 with Retry-After."""
+        release = threading.Event()
+
+        def slow_app(environ, start_response):
+            release.wait(5)
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"done"]
+
+        asgi = BoundedAsgiApp(slow_app, threads=1, queue_size=1)
+
+        async def scenario():
+            scope = http_scope("POST", "/scrape")
+            admitted = [asyncio.create_task(call(asgi, scope)) for _ in range(2)]
+            while asgi.admitted < 2:
+                await asyncio.sleep(0.01)
+            rejected = await call(asgi, scope)
+            release.set()
+            return rejected, await asyncio.gather(*admitted)
+
+        rejected, admitted = asyncio.run(scenario())
+
+        status, headers, body = response_of(rejected)
+        assert status == 429
+        assert int(headers["retry-after"]) >= 1
+        assert json.loads(body)["error"] == "Too many requests"
+        assert [response_of(messages)[0] for messages in admitted] == [200, 200]
+        assert asgi.admitted == 0
+
+    def test_retry_after_grows_with_queue(self):
+        """Test the estimate covers the requests waiting ahead."""
+        asgi = BoundedAsgiApp(None, threads=2, queue_size=10)
+        asgi._duration = 3.0
+
+        asgi.admitted = 2
+        assert asgi.retry_after() == 2
+        asgi.admitted = 6
+        assert asgi.retry_after() == 8
+
+    def test_lifespan(self):
+        """Test startup is acknowledged and shutdown stops the pool."""
+        asgi = BoundedAsgiApp(None, threads=1, queue_size=1)
+        events = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        sent = []
+
+        async def receive():
+            return next(events)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(asgi({"type": "lifespan"}, receive, send))
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        assert asgi.executor._shutdown
+
+
+def test_shared_cache_by_default(tmp_path):
+    """Test uvicorn workers default to the shared SQLite result cache."""
+    env = {
+        key: value for key, value in os.environ.items() if key != "RESULT_CACHE_BACKEND"
+    }
+    env["STATE_DIR"] = str(tmp_path)
+    env["PYTHONPATH"] = os.pathsep.join(["src", "tests/mocks"])
+    code = (
+        "import jobscraper.asgi, jobscraper.config; "
+        "print(jobscraper.config.RESULT_CACHE_BACKEND)"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.strip() == "sqlite"
@@ -14,7 +14,7 @@ with patch.dict("sys.modules", {"jobspy": None}):
     mock_config.API_ACCESS_TOKEN = "test-token"
 
     with patch.dict("sys.modules", {"jobscraper.config": mock_config}):
-        from jobscraper.auth import get_required_token, require_token
+        from jobscraper.auth import get_required_token, require_token, token_valid
 
 
 class TestGetRequiredToken:
@@ -119,3 +119,27 @@ class TestRequireTokenDecorator:
             result = test_endpoint()
             assert result[1] == 500
             assert "Server configuration error" in result[0].get_json()["error"]
+
+    @patch("jobscraper.auth.API_ACCESS_TOKEN", "valid-token")
+    def test_token_valid(self, mock_app):
+        """Test the token can be checked without producing a response."""
+        for header, expected in [
+            ("Bearer valid-token", True),
+            ("Bearer wrong-token", False),
+            ("valid-token", False),
+        ]:
+            headers = {"Authorization": header}
+            with mock_app.test_request_context("/test", headers=headers):
+                assert token_valid() is expected
+
+        with mock_app.test_request_context("/test"):
+            assert token_valid() is False
+
+    def test_require_token_marks_endpoint(self):
+        """Test protected endpoints can be recognized by request hooks."""
+
+        @require_token
+        def test_endpoint():
+            return "success"
+
+        assert test_endpoint.requires_token is True
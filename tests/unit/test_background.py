@@ -0,0 +1,169 @@
+"""
+Unit tests for the background scrape job store.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from jobscraper.background import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    BackgroundJobStore,
+    JobHeartbeat,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Job store in a temporary SQLite file."""
+    return BackgroundJobStore(str(tmp_path / "jobs.sqlite3"), retention=60)
+
+
+class TestBackgroundJobStore:
+    """Test cases for job state transitions and retention."""
+
+    def test_lifecycle(self, store):
+        """Test a job moves from queued to running to succeeded."""
+        job_id = store.create({"search_term": "python"})
+        job = store.get(job_id)
+        assert job["status"] == JOB_QUEUED
+        assert job["params"] == {"search_term": "python"}
+
+        assert store.start(job_id) is True
+        assert store.get(job_id)["status"] == JOB_RUNNING
+
+        assert store.finish(job_id, JOB_SUCCEEDED, result=b'{"count":1}', count=1)
+        job = store.get(job_id)
+        assert job["status"] == JOB_SUCCEEDED
+        assert job["count"] == 1
+        assert job["result"] == b'{"count":1}'
+        assert store.counts() == {JOB_SUCCEEDED: 1}
+
+    def test_failed_job(self, store):
+        """Test a failure message is kept for status requests."""
+        job_id = store.create({})
+        store.start(job_id)
+        store.finish(job_id, JOB_FAILED, error="boom")
+
+        job = store.get(job_id)
+        assert job["status"] == JOB_FAILED
+        assert job["error"] == "boom"
+        assert job["result"] is None
+
+    def test_cancel_before_start(self, store):
+        """Test a job cancelled while queued never starts."""
+        job_id = store.create({})
+
+        assert store.cancel(job_id) is True
+        assert store.start(job_id) is False
+        assert store.get(job_id)["status"] == JOB_CANCELLED
+
+    def test_cancel_while_running_discards_result(self, store):
+        """Test a job cancelled while running keeps its cancelled status."""
+        job_id = store.create({})
+        store.start(job_id)
+
+        assert store.cancel(job_id) is True
+        assert store.finish(job_id, JOB_SUCCEEDED, result=b"{}", count=0) is False
+        job = store.get(job_id)
+        assert job["status"] == JOB_CANCELLED
+        assert job["result"] is None
+
+    def test_cancel_finished_or_unknown(self, store):
+        """Test finished and unknown jobs cannot be cancelled."""
+        job_id = store.create({})
+        store.start(job_id)
+        store.finish(job_id, JOB_FAILED, error="boom")
+
+        assert store.cancel(job_id) is False
+        assert store.cancel("missing") is False
+
+    def test_delete(self, store):
+        """Test deleted jobs are gone."""
+        job_id = store.create({})
+
+        assert store.delete(job_id) is True
+        assert store.get(job_id) is None
+        assert store.delete(job_id) is False
+
+    def test_retention(self, store):
+        """Test finished jobs expire after the retention period."""
+        with patch("jobscraper.background.time.time", return_value=1000.0):
+            finished = store.create({})
+            store.start(finished)
+            store.finish(finished, JOB_SUCCEEDED, result=b"{}", count=0)
+            running = store.create({})
+            store.start(running)
+
+        with patch("jobscraper.background.time.time", return_value=1061.0):
+            assert store.get(finished) is None
+            assert store.get(running)["status"] == JOB_RUNNING
+
+            # Creating a job purges expired ones
+            store.create({})
+            assert store.counts() == {JOB_RUNNING: 1, JOB_QUEUED: 1}
+
+    def test_shared_between_instances(self, store):
+        """Test jobs are visible to other processes using the same file."""
+        other = BackgroundJobStore(store.path, retention=60)
+        job_id = store.create({})
+
+        assert other.cancel(job_id) is True
+        assert store.get(job_id)["status"] == JOB_CANCELLED
+
+    def test_stale_jobs_fail(self, store):
+        """Test pending jobs of a stopped worker are failed, live ones are kept."""
+        store.stale_after = 30
+        with patch("jobscraper.background.time.time", return_value=1000.0):
+            queued = store.create({})
+            running = store.create({})
+            store.start(running)
+            alive = store.create({})
+
+        with patch("jobscraper.background.time.time", return_value=1020.0):
+            assert store.heartbeat([alive, "unknown"]) == 1
+
+        with patch("jobscraper.background.time.time", return_value=1031.0):
+            for job_id in (queued, running):
+                job = store.get(job_id)
+                assert job["status"] == JOB_FAILED
+                assert job["error"] == "Worker stopped before the job finished"
+            assert store.get(alive)["status"] == JOB_QUEUED
+            assert store.counts() == {JOB_FAILED: 2, JOB_QUEUED: 1}
+            # A late result of a failed job is not stored
+            assert store.finish(running, JOB_SUCCEEDED, result=b"{}") is False
+
+
+class TestJobHeartbeat:
+    """Test cases for keeping a process's jobs alive."""
+
+    def test_beat_refreshes_tracked_jobs(self, store):
+        """Test only jobs still tracked are refreshed."""
+        heartbeat = JobHeartbeat(store, interval=60, max_pending=10)
+        with patch("jobscraper.background.time.time", return_value=1000.0):
+            kept = store.create({})
+            done = store.create({})
+        heartbeat.add(kept)
+        heartbeat.add(done)
+        heartbeat.discard(done)
+
+        with patch("jobscraper.background.time.time", return_value=1010.0):
+            assert heartbeat.beat() == 1
+
+        assert store.get(kept)["updated_at"] == 1010.0
+        assert store.get(done)["updated_at"] == 1000.0
+
+    def test_full(self, store):
+        """Test the cap counts tracked jobs until they are discarded."""
+        heartbeat = JobHeartbeat(store, interval=60, max_pending=2)
+
+        heartbeat.add("a")
+        assert not heartbeat.full()
+        heartbeat.add("b")
+        assert heartbeat.full()
+        heartbeat.discard("a")
+        assert not heartbeat.full()
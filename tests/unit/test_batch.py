@@ -0,0 +1,80 @@
+"""
+Unit tests for batch scrape helpers.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jobscraper.batch import group_searches, parse_batch_searches, run_batch
+from jobscraper.params import InvalidRequestError
+
+
+class TestParseBatchSearches:
+    """Test cases for reading the searches of a batch request."""
+
+    def test_parse_batch_searches_whitelists_params(self):
+        """Test each search goes through the /scrape parameter whitelist."""
+        data = {"searches": [{"search_term": "a", "stream": True}, {"location": "b"}]}
+
+        assert parse_batch_searches(data, 10) == [
+            {"search_term": "a"},
+            {"location": "b"},
+        ]
+
+    @pytest.mark.parametrize(
+        "searches", [None, [], "search", [{"search_term": "a"}, "b"]]
+    )
+    def test_parse_batch_searches_invalid(self, searches):
+        """Test anything but a non-empty list of objects is rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_batch_searches({"searches": searches}, 10)
+
+    @pytest.mark.parametrize("data", [["searches"], "searches", 1])
+    def test_parse_batch_searches_not_an_object(self, data):
+        """Test bodies other than JSON objects are rejected."""
+        with pytest.raises(InvalidRequestError, match="JSON object"):
+            parse_batch_searches(data, 10)
+
+    def test_parse_batch_searches_too_many(self):
+        """Test batches over the size limit are rejected."""
+        with pytest.raises(InvalidRequestError, match="at most 2"):
+            parse_batch_searches({"searches": [{}, {}, {}]}, 2)
+
+
+class TestRunBatch:
+    """Test cases for deduplicated concurrent batch execution."""
+
+    def test_group_searches_dedupes_equivalent(self):
+        """Test equivalent searches share one group in first-seen order."""
+        searches = [
+            {"site_name": ["indeed", "linkedin"]},
+            {"search_term": "b"},
+            {"site_name": ["linkedin", "indeed"], "results_wanted": 15},
+        ]
+
+        assert group_searches(searches) == [
+            ({"site_name": ["indeed", "linkedin"]}, [0, 2]),
+            ({"search_term": "b"}, [1]),
+        ]
+
+    def test_run_batch_outcomes(self):
+        """Test results and errors are yielded per unique search."""
+
+        def fn(params):
+            if params["search_term"] == "bad":
+                raise ValueError("boom")
+            return params["search_term"].upper()
+
+        groups = group_searches(
+            [{"search_term": "a"}, {"search_term": "bad"}, {"search_term": "a"}]
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            outcomes = list(run_batch(groups, fn, executor))
+
+        by_indices = {
+            tuple(indices): (value, error) for indices, value, error in outcomes
+        }
+        assert by_indices[(0, 2)] == ("A", None)
+        assert by_indices[(1,)][0] is None
+        assert str(by_indices[(1,)][1]) == "boom"
@@ -0,0 +1,136 @@
+"""
+Unit tests for the per-site circuit breakers.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from jobscraper.breaker import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    SiteBreakers,
+)
+
+
+@pytest.fixture
+def breakers(tmp_path):
+    """Breakers that open after 2 of 4 calls fail, with a 60s cooldown."""
+    return SiteBreakers(
+        str(tmp_path / "breakers.sqlite3"),
+        failure_threshold=0.5,
+        min_calls=4,
+        window=300,
+        cooldown=60,
+    )
+
+
+def at(seconds: float):
+    """Freeze the breakers' clock."""
+    return patch("jobscraper.breaker.time.time", return_value=seconds)
+
+
+def trip(breakers, site="linkedin", now=1000.0):
+    """Record enough failures to open a site's breaker."""
+    with at(now):
+        breakers.record(site, failed=False)
+        breakers.record(site, failed=False)
+        breakers.record(site, failed=True)
+        return breakers.record(site, failed=True)
+
+
+class TestSiteBreakers:
+    """Test cases for the breaker state machine."""
+
+    def test_opens_at_failure_rate(self, breakers):
+        """Test a breaker opens once enough calls within the window failed."""
+        with at(1000.0):
+            assert breakers.record("linkedin", failed=True) == BREAKER_CLOSED
+            assert breakers.record("linkedin", failed=False) == BREAKER_CLOSED
+            assert breakers.record("linkedin", failed=False) == BREAKER_CLOSED
+            assert breakers.allow("linkedin")
+            assert breakers.record("linkedin", failed=True) == BREAKER_OPEN
+            assert not breakers.allow("linkedin")
+            assert breakers.allow("indeed")
+
+    def test_old_calls_leave_the_window(self, breakers):
+        """Test failures older than the window no longer count."""
+        with at(1000.0):
+            for _ in range(3):
+                breakers.record("linkedin", failed=True)
+        with at(1400.0):
+            assert breakers.record("linkedin", failed=True) == BREAKER_CLOSED
+
+    def test_half_open_probe_closes(self, breakers):
+        """Test one probe is allowed after the cooldown and success closes."""
+        trip(breakers)
+
+        with at(1059.0):
+            assert not breakers.allow("linkedin")
+        with at(1061.0):
+            assert breakers.allow("linkedin")
+            # Other callers keep skipping the site while the probe runs
+            assert not breakers.allow("linkedin")
+            assert breakers.states()["linkedin"]["state"] == BREAKER_HALF_OPEN
+            assert breakers.record("linkedin", failed=False) == BREAKER_CLOSED
+            assert breakers.allow("linkedin")
+            # The failures before the probe are forgotten
+            assert breakers.record("linkedin", failed=True) == BREAKER_CLOSED
+
+    def test_half_open_probe_reopens(self, breakers):
+        """Test a failed probe opens the breaker for another cooldown."""
+        trip(breakers)
+
+        with at(1061.0):
+            assert breakers.allow("linkedin")
+            assert breakers.record("linkedin", failed=True) == BREAKER_OPEN
+        with at(1100.0):
+            assert not breakers.allow("linkedin")
+            assert breakers.retry_after("linkedin") == pytest.approx(21.0)
+        with at(1122.0):
+            assert breakers.allow("linkedin")
+
+    def test_lost_probe_is_replaced(self, breakers):
+        """Test a probe that never reports back is replaced after a cooldown."""
+        trip(breakers)
+
+        with at(1061.0):
+            assert breakers.allow("linkedin")
+        with at(1122.0):
+            assert breakers.allow("linkedin")
+
+    def test_shared_between_instances(self, breakers):
+        """Test every worker sees the same breaker state."""
+        other = SiteBreakers(
+            breakers.path, failure_threshold=0.5, min_calls=4, window=300, cooldown=60
+        )
+        trip(breakers)
+
+        with at(1010.0):
+            assert not other.allow("linkedin")
+
+    def test_states(self, breakers):
+        """Test the report lists calls, failures and the cooldown left."""
+        trip(breakers)
+        with at(1000.0):
+            breakers.record("indeed", failed=False)
+        with at(1030.0):
+            assert breakers.states() == {
+                "indeed": {"state": BREAKER_CLOSED, "calls": 1, "failures": 0},
+                "linkedin": {
+                    "state": BREAKER_OPEN,
+                    "calls": 4,
+                    "failures": 2,
+                    "retry_after": 30.0,
+                },
+            }
+
+    def test_reset(self, breakers):
+        """Test resetting closes a breaker and forgets its calls."""
+        trip(breakers)
+
+        assert breakers.reset("linkedin")
+        assert breakers.allow("linkedin")
+        assert breakers.states() == {}
+        assert not breakers.reset("linkedin")
@@ -0,0 +1,294 @@
+"""
+Unit tests for the result cache.
+"""
+
+import itertools
+import json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from jobscraper.cache import (
+    ResultCache,
+    ScrapeResult,
+    SQLiteResultCache,
+    create_result_cache,
+    dataframe_nbytes,
+    parse_cache_mode,
+)
+from jobscraper.params import InvalidRequestError
+
+
+def make_result(title: str = "Engineer", rows: int = 1) -> ScrapeResult:
+    """Build a small ScrapeResult for cache tests."""
+    return ScrapeResult(pd.DataFrame({"title": [title] * rows}))
+
+
+def result_size(result: ScrapeResult) -> int:
+    """Size the memory cache accounts for a result."""
+    return dataframe_nbytes(result.jobs) + len(result.jobs_json)
+
+
+class TestResultCache:
+    """Test cases for the in-process LRU/TTL cache."""
+
+    def test_get_set(self):
+        """Test stored results are returned and hits/misses counted."""
+        cache = ResultCache(ttl=60, max_entries=10, max_bytes=10**6)
+        result = make_result()
+
+        assert cache.get("a") is None
+        cache.set("a", result)
+
+        assert cache.get("a") is result
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.total_bytes == result_size(result)
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = ResultCache(ttl=60, max_entries=10, max_bytes=10**6)
+
+        with patch("jobscraper.cache.time.monotonic", return_value=100.0):
+            cache.set("a", make_result())
+        with patch("jobscraper.cache.time.monotonic", return_value=161.0):
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+    def test_stale_lookup(self):
+        """Test expired entries are returned as stale within the stale TTL."""
+        cache = ResultCache(ttl=60, max_entries=10, max_bytes=10**6, stale_ttl=30)
+        result = make_result()
+
+        with patch("jobscraper.cache.time.monotonic", return_value=100.0):
+            cache.set("a", result)
+        with patch("jobscraper.cache.time.monotonic", return_value=150.0):
+            assert cache.lookup("a") == (result, False)
+            assert cache.expires_in("a") == 10.0
+        with patch("jobscraper.cache.time.monotonic", return_value=170.0):
+            assert cache.get("a") is None
+            assert cache.lookup("a") == (result, True)
+            assert cache.expires_in("a") == -10.0
+        with patch("jobscraper.cache.time.monotonic", return_value=191.0):
+            assert cache.lookup("a") == (None, False)
+
+        assert (cache.hits, cache.stale_hits, cache.misses) == (1, 1, 2)
+        assert cache.expires_in("a") is None
+
+    def test_lru_eviction_by_entries(self):
+        """Test the least recently used entry is evicted first."""
+        cache = ResultCache(ttl=60, max_entries=2, max_bytes=10**6)
+        cache.set("a", make_result("a"))
+        cache.set("b", make_result("b"))
+        cache.get("a")
+        cache.set("c", make_result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_lru_eviction_by_bytes(self):
+        """Test entries are evicted to stay within the byte budget."""
+        size = result_size(make_result())
+        cache = ResultCache(ttl=60, max_entries=10, max_bytes=size * 3 // 2)
+        cache.set("a", make_result())
+        cache.set("b", make_result())
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.total_bytes == size
+
+    def test_oversized_value_not_cached(self):
+        """Test results larger than the byte budget are skipped."""
+        cache = ResultCache(ttl=60, max_entries=10, max_bytes=10)
+        cache.set("a", make_result())
+
+        assert len(cache) == 0
+
+    def test_disabled_cache(self):
+        """Test a zero TTL disables storing."""
+        cache = ResultCache(ttl=0, max_entries=10, max_bytes=10**6)
+        cache.set("a", make_result())
+
+        assert cache.enabled is False
+        assert len(cache) == 0
+
+
+class TestSQLiteResultCache:
+    """Test cases for the cross-worker SQLite cache."""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        """Path of a fresh cache database."""
+        return str(tmp_path / "state" / "cache.sqlite3")
+
+    def test_round_trip_between_instances(self, cache_path):
+        """Test a second instance (another worker) sees stored results."""
+        writer = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        reader = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        writer.set("a", make_result("Engineer", rows=2))
+
+        result = reader.get("a")
+
+        assert len(result) == 2
+        assert json.loads(result.jobs_json) == [{"title": "Engineer"}] * 2
+        assert result.jobs["title"].tolist() == ["Engineer", "Engineer"]
+        assert reader.hits == 1
+
+    def test_hit_skips_dataframe_conversion(self, cache_path):
+        """Test a hit serves the stored JSON without touching the DataFrame."""
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        cache.set("a", make_result())
+
+        with (
+            patch("jobscraper.cache.dataframe_to_json") as mock_encode,
+            patch("jobscraper.cache.pickle.loads") as mock_unpickle,
+        ):
+            jobs_json = cache.get("a").jobs_json
+
+        assert json.loads(jobs_json) == [{"title": "Engineer"}]
+        mock_encode.assert_not_called()
+        mock_unpickle.assert_not_called()
+
+    def test_hit_keeps_digest(self, cache_path):
+        """Test the content digest is stored, so hits never recompute it."""
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        stored = make_result()
+        cache.set("a", stored)
+
+        with (
+            patch("jobscraper.cache.content_digest") as mock_digest,
+            patch("jobscraper.cache.pickle.loads") as mock_unpickle,
+        ):
+            digest = cache.get("a").digest
+
+        assert digest == stored.digest
+        mock_digest.assert_not_called()
+        mock_unpickle.assert_not_called()
+
+    def test_drops_legacy_table(self, cache_path):
+        """Test entries of a cache file without digests are discarded."""
+        import os
+        import sqlite3
+
+        os.makedirs(os.path.dirname(cache_path))
+        conn = sqlite3.connect(cache_path)
+        conn.execute("CREATE TABLE results (key TEXT PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        cache.set("a", make_result())
+
+        assert cache.get("a") is not None
+        tables = cache.connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+        assert [name for (name,) in tables] == ["scrape_results"]
+
+    def test_ttl_expiry(self, cache_path):
+        """Test entries expire after the TTL."""
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+
+        with patch("jobscraper.cache.time.time", return_value=1000.0):
+            cache.set("a", make_result())
+        with patch("jobscraper.cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+
+    def test_stale_lookup(self, cache_path):
+        """Test expired entries are kept and returned as stale for a while."""
+        cache = SQLiteResultCache(
+            cache_path, ttl=60, max_entries=10, max_bytes=10**6, stale_ttl=30
+        )
+
+        with patch("jobscraper.cache.time.time", return_value=1000.0):
+            cache.set("a", make_result())
+        with patch("jobscraper.cache.time.time", return_value=1070.0):
+            assert cache.get("a") is None
+            result, stale = cache.lookup("a")
+            assert stale
+            assert result.jobs["title"].tolist() == ["Engineer"]
+            assert cache.expires_in("a") == -10.0
+            # Writing another entry keeps the stale one
+            cache.set("b", make_result())
+            assert len(cache) == 2
+        with patch("jobscraper.cache.time.time", return_value=1091.0):
+            assert cache.lookup("a") == (None, False)
+
+        assert cache.stale_hits == 1
+
+    def test_lru_eviction(self, cache_path):
+        """Test least recently used entries are evicted over the entry cap."""
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=2, max_bytes=10**6)
+
+        with patch("jobscraper.cache.time.time", side_effect=itertools.count(1)):
+            cache.set("a", make_result("a"))
+            cache.set("b", make_result("b"))
+            cache.get("a")
+            cache.set("c", make_result("c"))
+
+            assert len(cache) == 2
+            assert cache.get("b") is None
+            assert cache.get("a") is not None
+
+    def test_size_cap(self, cache_path):
+        """Test the byte budget is enforced across entries."""
+        probe = make_result()
+        size = len(probe.jobs_json) + len(probe.frame_blob)
+        cache = SQLiteResultCache(
+            cache_path, ttl=60, max_entries=10, max_bytes=size * 3 // 2
+        )
+
+        cache.set("a", make_result())
+        cache.set("b", make_result())
+
+        assert len(cache) == 1
+        assert cache.total_bytes == size
+        assert cache.get("b") is not None
+
+    def test_clear(self, cache_path):
+        """Test clear removes every entry."""
+        cache = SQLiteResultCache(cache_path, ttl=60, max_entries=10, max_bytes=10**6)
+        cache.set("a", make_result())
+        cache.clear()
+
+        assert len(cache) == 0
+
+
+class TestCacheHelpers:
+    """Test cases for cache helper functions."""
+
+    @pytest.mark.parametrize("mode", [None, "bypass", "refresh"])
+    def test_parse_cache_mode_valid(self, mode):
+        """Test known cache options are accepted."""
+        data = {} if mode is None else {"cache": mode}
+
+        assert parse_cache_mode(data) == mode
+
+    def test_parse_cache_mode_invalid(self):
+        """Test unknown cache options are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_cache_mode({"cache": "always"})
+
+    def test_dataframe_nbytes_counts_strings(self):
+        """Test string contents are included in the size estimate."""
+        small = pd.DataFrame({"description": ["x"] * 10})
+        large = pd.DataFrame({"description": ["x" * 1000] * 10})
+
+        assert dataframe_nbytes(large) > dataframe_nbytes(small) + 9000
+
+    def test_create_result_cache(self, tmp_path):
+        """Test backends are selected by name."""
+        path = str(tmp_path / "cache.sqlite3")
+
+        assert isinstance(create_result_cache("memory", path, 1, 1, 1), ResultCache)
+        assert isinstance(
+            create_result_cache("sqlite", path, 1, 1, 1), SQLiteResultCache
+        )
+        with pytest.raises(ValueError):
+            create_result_cache("redis", path, 1, 1, 1)
@@ -0,0 +1,171 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import threading
+import time
+
+import pytest
+
+from jobscraper.coalesce import HostLockTimeoutError, SingleFlight
+
+
+def wait_for(condition, timeout: float = 5.0):
+    """Poll until ``condition()`` is true or fail after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time")
+        time.sleep(0.005)
+
+
+class TestSingleFlight:
+    """Test cases for in-process coalescing."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test callers arriving during an execution share its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        def worker():
+            results.append(flight.do("key", slow))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: flight.stats()["coalesced"] == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(results) == [("value", False), ("value", True), ("value", True)]
+        assert flight.stats() == {
+            "executions": 1,
+            "coalesced": 2,
+            "host_coalesced": 0,
+            "in_flight": 0,
+        }
+
+    def test_errors_are_shared(self):
+        """Test followers receive the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait(5)
+            raise RuntimeError("upstream down")
+
+        def worker():
+            try:
+                flight.do("key", failing)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == ["upstream down", "upstream down"]
+
+    def test_waiting_caller_timeout(self):
+        """Test a waiting caller gives up after its timeout."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def leader():
+            flight.do("key", lambda: release.wait(5))
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        wait_for(lambda: flight.stats()["in_flight"] == 1)
+        try:
+            flight.do("key", lambda: None, timeout=0.05)
+        except TimeoutError as e:
+            errors.append(e)
+        release.set()
+        thread.join()
+
+        assert len(errors) == 1
+
+    def test_sequential_calls_execute_again(self):
+        """Test completed calls are not reused by later callers."""
+        flight = SingleFlight()
+
+        assert flight.do("key", lambda: 1) == (1, False)
+        assert flight.do("key", lambda: 2) == (2, False)
+
+    def test_different_keys_do_not_coalesce(self):
+        """Test calls with different keys run independently."""
+        flight = SingleFlight()
+
+        assert flight.do("a", lambda: "a") == ("a", False)
+        assert flight.do("b", lambda: "b") == ("b", False)
+        assert flight.stats()["coalesced"] == 0
+
+
+class TestHostLock:
+    """Test cases for the cross-process file lock."""
+
+    def test_host_lock_excludes_other_holders(self, tmp_path):
+        """Test a second holder (another worker) waits for the first."""
+        first = SingleFlight(str(tmp_path / "locks"))
+        second = SingleFlight(str(tmp_path / "locks"))
+        events = []
+
+        def other_worker():
+            with second.host_lock("key"):
+                events.append("second")
+
+        with first.host_lock("key"):
+            thread = threading.Thread(target=other_worker)
+            thread.start()
+            # Give the other worker time to block on the lock
+            time.sleep(0.1)
+            events.append("first")
+        thread.join()
+
+        assert events == ["first", "second"]
+
+    def test_host_lock_timeout(self, tmp_path):
+        """Test a waiter gives up at its timeout and gets the lock once free."""
+        first = SingleFlight(str(tmp_path / "locks"))
+        second = SingleFlight(str(tmp_path / "locks"))
+
+        with first.host_lock("key"):
+            start = time.monotonic()
+            with pytest.raises(HostLockTimeoutError):
+                with second.host_lock("key", timeout=0.1):
+                    pass
+            assert 0.1 <= time.monotonic() - start < 1.0
+
+        with second.host_lock("key", timeout=0.1):
+            pass
+
+    def test_host_lock_without_directory(self):
+        """Test the lock is a no-op when cross-process locking is disabled."""
+        flight = SingleFlight()
+
+        with flight.host_lock("key"):
+            with flight.host_lock("key"):
+                pass
+
+    def test_record_host_coalesced(self):
+        """Test calls answered by another worker are counted."""
+        flight = SingleFlight()
+        flight.record_host_coalesced()
+
+        assert flight.stats()["host_coalesced"] == 1
@@ -0,0 +1,103 @@
+"""
+Unit tests for response compression helpers.
+"""
+
+import gzip
+import zlib
+from unittest.mock import patch
+
+import pytest
+from werkzeug.datastructures import Accept
+
+from jobscraper.compression import (
+    GZIP_ENCODING,
+    ZSTD_ENCODING,
+    available_encodings,
+    compress_body,
+    compress_stream,
+    negotiate_encoding,
+)
+
+
+class TestNegotiateEncoding:
+    """Test cases for choosing the content encoding."""
+
+    @patch("jobscraper.compression.zstandard", object())
+    def test_prefers_zstd(self):
+        """Test zstd wins over gzip when both are accepted equally."""
+        accept = Accept([("gzip", 1), ("zstd", 1)])
+        assert negotiate_encoding(accept) == ZSTD_ENCODING
+
+    @patch("jobscraper.compression.zstandard", object())
+    def test_honors_quality(self):
+        """Test a higher client quality overrides the server preference."""
+        accept = Accept([("gzip", 1), ("zstd", 0.5)])
+        assert negotiate_encoding(accept) == GZIP_ENCODING
+
+    @patch("jobscraper.compression.zstandard", None)
+    def test_zstd_unavailable(self):
+        """Test gzip is used when zstandard is not installed."""
+        assert available_encodings() == [GZIP_ENCODING]
+        assert negotiate_encoding(Accept([("zstd", 1), ("gzip", 0.5)])) == "gzip"
+        assert negotiate_encoding(Accept([("zstd", 1)])) is None
+
+    def test_identity(self):
+        """Test no encoding is chosen when the client accepts none."""
+        assert negotiate_encoding(Accept([])) is None
+        assert negotiate_encoding(Accept([("br", 1)])) is None
+
+
+class TestCompress:
+    """Test cases for buffered and streamed compression."""
+
+    def test_gzip_body(self):
+        """Test buffered gzip bodies round-trip."""
+        body = b'{"jobs":[]}' * 100
+        compressed = compress_body(body, GZIP_ENCODING, 6)
+        assert len(compressed) < len(body)
+        assert gzip.decompress(compressed) == body
+
+    def test_gzip_stream_is_incremental(self):
+        """Test every chunk can be decoded as soon as it is received."""
+        chunks = [b'{"title":"Engineer %d"}\n' % i for i in range(5)]
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        received = b""
+        parts = compress_stream(iter(chunks), GZIP_ENCODING, 6)
+        for chunk in chunks:
+            received += decoder.decompress(next(parts))
+            assert received.endswith(chunk)
+        received += decoder.decompress(b"".join(parts))
+
+        assert received == b"".join(chunks)
+        assert decoder.eof
+
+    def test_stream_closes_source(self):
+        """Test the source generator is closed when the client disconnects."""
+        closed = []
+
+        def source():
+            try:
+                while True:
+                    yield b"line\n"
+            finally:
+                closed.append(True)
+
+        parts = compress_stream(source(), GZIP_ENCODING, 6)
+        next(parts)
+        parts.close()
+
+        assert closed == [True]
+
+    def test_zstd(self):
+        """Test buffered and streamed zstd round-trip."""
+        zstandard = pytest.importorskip("zstandard")
+        body = b'{"title":"Engineer"}\n' * 100
+
+        compressed = compress_body(body, ZSTD_ENCODING, 3)
+        assert zstandard.ZstdDecompressor().decompress(compressed) == body
+
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+        parts = compress_stream(iter([body[:50], body[50:]]), ZSTD_ENCODING, 3)
+        assert decoder.decompress(next(parts)) == body[:50]
+        assert decoder.decompress(b"".join(parts)) == body[50:]
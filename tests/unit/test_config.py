@@ -149,3 +149,440 @@ class TestConfig:
             importlib.reload(jobscraper.config)
 
             assert jobscraper.config.LOG_FILE_PATH == test_path
+
+    def test_stream_chunk_rows(self):
+        """Test STREAM_CHUNK_ROWS default and environment override."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("STREAM_CHUNK_ROWS", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.STREAM_CHUNK_ROWS == 500
+
+            m.setenv("STREAM_CHUNK_ROWS", "50")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.STREAM_CHUNK_ROWS == 50
+
+    def test_result_cache_settings(self):
+        """Test result cache defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in (
+                "RESULT_CACHE_TTL",
+                "RESULT_CACHE_MAX_ENTRIES",
+                "RESULT_CACHE_MAX_BYTES",
+            ):
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_TTL == 300
+            assert jobscraper.config.RESULT_CACHE_MAX_ENTRIES == 256
+            assert jobscraper.config.RESULT_CACHE_MAX_BYTES == 256 * 1024 * 1024
+
+            m.setenv("RESULT_CACHE_TTL", "0")
+            m.setenv("RESULT_CACHE_MAX_ENTRIES", "10")
+            m.setenv("RESULT_CACHE_MAX_BYTES", "1024")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_TTL == 0
+            assert jobscraper.config.RESULT_CACHE_MAX_ENTRIES == 10
+            assert jobscraper.config.RESULT_CACHE_MAX_BYTES == 1024
+
+    def test_refresh_ahead_settings(self):
+        """Test refresh-ahead and stale-while-revalidate settings."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in (
+                "RESULT_CACHE_STALE_TTL",
+                "REFRESH_AHEAD",
+                "REFRESH_AHEAD_PATH",
+                "REFRESH_AHEAD_TOP_N",
+                "REFRESH_AHEAD_SITE_BUDGET",
+            ):
+                m.delenv(name, raising=False)
+            m.setenv("STATE_DIR", "/var/lib/jobscraper")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_STALE_TTL == 0
+            assert jobscraper.config.REFRESH_AHEAD is False
+            assert jobscraper.config.REFRESH_AHEAD_PATH == (
+                "/var/lib/jobscraper/search-popularity.sqlite3"
+            )
+            assert jobscraper.config.REFRESH_AHEAD_TOP_N == 20
+            assert jobscraper.config.REFRESH_AHEAD_SITE_BUDGET == 60
+
+            m.setenv("RESULT_CACHE_STALE_TTL", "600")
+            m.setenv("REFRESH_AHEAD", "true")
+            m.setenv("REFRESH_AHEAD_TOP_N", "5")
+            m.setenv("REFRESH_AHEAD_SITE_BUDGET", "0")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_STALE_TTL == 600
+            assert jobscraper.config.REFRESH_AHEAD is True
+            assert jobscraper.config.REFRESH_AHEAD_TOP_N == 5
+            assert jobscraper.config.REFRESH_AHEAD_SITE_BUDGET == 0
+
+    def test_site_breaker_settings(self):
+        """Test circuit breaker defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in (
+                "SITE_BREAKERS",
+                "SITE_BREAKER_FAILURE_RATE",
+                "SITE_BREAKER_MIN_CALLS",
+                "SITE_BREAKER_COOLDOWN",
+            ):
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SITE_BREAKERS is True
+            assert jobscraper.config.SITE_BREAKER_FAILURE_RATE == 0.5
+            assert jobscraper.config.SITE_BREAKER_MIN_CALLS == 5
+            assert jobscraper.config.SITE_BREAKER_COOLDOWN == 120
+
+            m.setenv("SITE_BREAKERS", "false")
+            m.setenv("SITE_BREAKER_FAILURE_RATE", "0.8")
+            m.setenv("SITE_BREAKER_MIN_CALLS", "10")
+            m.setenv("SITE_BREAKER_COOLDOWN", "30")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SITE_BREAKERS is False
+            assert jobscraper.config.SITE_BREAKER_FAILURE_RATE == 0.8
+            assert jobscraper.config.SITE_BREAKER_MIN_CALLS == 10
+            assert jobscraper.config.SITE_BREAKER_COOLDOWN == 30
+
+    def test_metrics_settings(self):
+        """Test metrics defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("METRICS", raising=False)
+            m.delenv("METRICS_FLUSH_INTERVAL", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.METRICS is True
+            assert jobscraper.config.METRICS_FLUSH_INTERVAL == 5
+
+            m.setenv("METRICS", "false")
+            m.setenv("METRICS_FLUSH_INTERVAL", "30")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.METRICS is False
+            assert jobscraper.config.METRICS_FLUSH_INTERVAL == 30
+
+    def test_profiling_settings(self):
+        """Test Server-Timing and profiling defaults and overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in ("SERVER_TIMING", "PROFILE_ACCESS_TOKEN", "PROFILE_TOP_N"):
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SERVER_TIMING is True
+            assert jobscraper.config.PROFILE_ACCESS_TOKEN == ""
+            assert jobscraper.config.PROFILE_TOP_N == 30
+
+            m.setenv("SERVER_TIMING", "false")
+            m.setenv("PROFILE_ACCESS_TOKEN", "profile-secret")
+            m.setenv("PROFILE_TOP_N", "10")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SERVER_TIMING is False
+            assert jobscraper.config.PROFILE_ACCESS_TOKEN == "profile-secret"
+            assert jobscraper.config.PROFILE_TOP_N == 10
+
+    def test_proxy_pool_settings(self):
+        """Test proxy pool defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in (
+                "PROXY_POOL",
+                "PROXY_QUARANTINE_FAILURES",
+                "PROXY_QUARANTINE_SECONDS",
+            ):
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.PROXY_POOL == ""
+            assert jobscraper.config.PROXY_QUARANTINE_FAILURES == 3
+            assert jobscraper.config.PROXY_QUARANTINE_SECONDS == 300
+
+            m.setenv("PROXY_POOL", "user:pass@a:8080,b:3128")
+            m.setenv("PROXY_QUARANTINE_FAILURES", "5")
+            m.setenv("PROXY_QUARANTINE_SECONDS", "60")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.PROXY_POOL == "user:pass@a:8080,b:3128"
+            assert jobscraper.config.PROXY_QUARANTINE_FAILURES == 5
+            assert jobscraper.config.PROXY_QUARANTINE_SECONDS == 60
+
+    def test_asgi_settings(self):
+        """Test ASGI request pool defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("ASGI_REQUEST_THREADS", raising=False)
+            m.delenv("ASGI_QUEUE_SIZE", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.ASGI_REQUEST_THREADS == 16
+            assert jobscraper.config.ASGI_QUEUE_SIZE == 64
+
+            m.setenv("ASGI_REQUEST_THREADS", "32")
+            m.setenv("ASGI_QUEUE_SIZE", "0")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.ASGI_REQUEST_THREADS == 32
+            assert jobscraper.config.ASGI_QUEUE_SIZE == 0
+
+    def test_record_replay_settings(self):
+        """Test record and replay are off by default and configurable."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            for name in (
+                "SCRAPE_RECORD_DIR",
+                "SCRAPE_REPLAY_DIR",
+                "SCRAPE_REPLAY_LATENCY_SCALE",
+            ):
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_RECORD_DIR == ""
+            assert jobscraper.config.SCRAPE_REPLAY_DIR == ""
+            assert jobscraper.config.SCRAPE_REPLAY_LATENCY_SCALE == 1.0
+
+            m.setenv("SCRAPE_RECORD_DIR", "/data/fixtures")
+            m.setenv("SCRAPE_REPLAY_DIR", "/data/replay")
+            m.setenv("SCRAPE_REPLAY_LATENCY_SCALE", "0.5")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_RECORD_DIR == "/data/fixtures"
+            assert jobscraper.config.SCRAPE_REPLAY_DIR == "/data/replay"
+            assert jobscraper.config.SCRAPE_REPLAY_LATENCY_SCALE == 0.5
+
+    def test_result_cache_backend_settings(self):
+        """Test result cache backend and shared state path settings."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("RESULT_CACHE_BACKEND", raising=False)
+            m.delenv("RESULT_CACHE_PATH", raising=False)
+            m.setenv("STATE_DIR", "/var/lib/jobscraper")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_BACKEND == "memory"
+            assert jobscraper.config.RESULT_CACHE_PATH == (
+                "/var/lib/jobscraper/result-cache.sqlite3"
+            )
+
+            m.setenv("RESULT_CACHE_BACKEND", "SQLite")
+            m.setenv("RESULT_CACHE_PATH", "/tmp/cache.db")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESULT_CACHE_BACKEND == "sqlite"
+            assert jobscraper.config.RESULT_CACHE_PATH == "/tmp/cache.db"
+
+    def test_scrape_coalescing_settings(self):
+        """Test request coalescing settings."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("SCRAPE_COALESCING", raising=False)
+            m.delenv("SCRAPE_LOCK_DIR", raising=False)
+            m.delenv("SCRAPE_LOCK_TIMEOUT", raising=False)
+            m.setenv("STATE_DIR", "/var/lib/jobscraper")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_COALESCING is True
+            assert jobscraper.config.SCRAPE_LOCK_DIR == "/var/lib/jobscraper/locks"
+            assert jobscraper.config.SCRAPE_LOCK_TIMEOUT == 300.0
+
+            m.setenv("SCRAPE_COALESCING", "false")
+            m.setenv("SCRAPE_LOCK_TIMEOUT", "30")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_COALESCING is False
+            assert jobscraper.config.SCRAPE_LOCK_TIMEOUT == 30.0
+
+    def test_scrape_site_workers(self):
+        """Test SCRAPE_SITE_WORKERS default and environment override."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("SCRAPE_SITE_WORKERS", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_SITE_WORKERS == 8
+
+            m.setenv("SCRAPE_SITE_WORKERS", "2")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_SITE_WORKERS == 2
+
+    def test_scrape_deadline_settings(self):
+        """Test scrape deadline defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("SCRAPE_DEADLINE_MS", raising=False)
+            m.delenv("SCRAPE_MAX_DEADLINE_MS", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_DEADLINE_MS == 25000
+            assert jobscraper.config.SCRAPE_MAX_DEADLINE_MS == 25000
+
+            m.setenv("SCRAPE_DEADLINE_MS", "0")
+            m.setenv("SCRAPE_MAX_DEADLINE_MS", "150000")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_DEADLINE_MS == 0
+            assert jobscraper.config.SCRAPE_MAX_DEADLINE_MS == 150000
+
+    def test_scrape_job_settings(self):
+        """Test background scrape job defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("SCRAPE_JOB_WORKERS", raising=False)
+            m.delenv("SCRAPE_JOB_RETENTION", raising=False)
+            m.delenv("SCRAPE_JOBS_PATH", raising=False)
+            m.delenv("SCRAPE_JOB_MAX_PENDING", raising=False)
+            m.delenv("SCRAPE_JOB_STALE_AFTER", raising=False)
+            m.setenv("STATE_DIR", "/var/lib/jobscraper")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_JOB_WORKERS == 4
+            assert jobscraper.config.SCRAPE_JOB_RETENTION == 3600
+            assert jobscraper.config.SCRAPE_JOB_MAX_PENDING == 100
+            assert jobscraper.config.SCRAPE_JOB_STALE_AFTER == 300
+            assert (
+                jobscraper.config.SCRAPE_JOBS_PATH
+                == "/var/lib/jobscraper/scrape-jobs.sqlite3"
+            )
+
+            m.setenv("SCRAPE_JOB_WORKERS", "1")
+            m.setenv("SCRAPE_JOB_RETENTION", "60")
+            m.setenv("SCRAPE_JOB_MAX_PENDING", "5")
+            m.setenv("SCRAPE_JOB_STALE_AFTER", "30")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_JOB_WORKERS == 1
+            assert jobscraper.config.SCRAPE_JOB_RETENTION == 60
+            assert jobscraper.config.SCRAPE_JOB_MAX_PENDING == 5
+            assert jobscraper.config.SCRAPE_JOB_STALE_AFTER == 30
+
+    def test_scrape_batch_settings(self):
+        """Test batch scrape defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.delenv("SCRAPE_BATCH_WORKERS", raising=False)
+            m.delenv("SCRAPE_BATCH_MAX_SEARCHES", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_BATCH_WORKERS == 4
+            assert jobscraper.config.SCRAPE_BATCH_MAX_SEARCHES == 500
+
+            m.setenv("SCRAPE_BATCH_WORKERS", "16")
+            m.setenv("SCRAPE_BATCH_MAX_SEARCHES", "50")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SCRAPE_BATCH_WORKERS == 16
+            assert jobscraper.config.SCRAPE_BATCH_MAX_SEARCHES == 50
+
+    def test_response_compression_settings(self):
+        """Test response compression defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        names = (
+            "RESPONSE_COMPRESSION",
+            "RESPONSE_COMPRESSION_MIN_BYTES",
+            "RESPONSE_GZIP_LEVEL",
+            "RESPONSE_ZSTD_LEVEL",
+        )
+        with pytest.MonkeyPatch().context() as m:
+            for name in names:
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESPONSE_COMPRESSION is True
+            assert jobscraper.config.RESPONSE_COMPRESSION_MIN_BYTES == 1024
+            assert jobscraper.config.RESPONSE_GZIP_LEVEL == 6
+            assert jobscraper.config.RESPONSE_ZSTD_LEVEL == 3
+
+            m.setenv("RESPONSE_COMPRESSION", "false")
+            m.setenv("RESPONSE_COMPRESSION_MIN_BYTES", "0")
+            m.setenv("RESPONSE_GZIP_LEVEL", "1")
+            m.setenv("RESPONSE_ZSTD_LEVEL", "10")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.RESPONSE_COMPRESSION is False
+            assert jobscraper.config.RESPONSE_COMPRESSION_MIN_BYTES == 0
+            assert jobscraper.config.RESPONSE_GZIP_LEVEL == 1
+            assert jobscraper.config.RESPONSE_ZSTD_LEVEL == 10
+
+    def test_saved_search_settings(self):
+        """Test saved search defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        with pytest.MonkeyPatch().context() as m:
+            m.setenv("STATE_DIR", "/state")
+            m.delenv("SAVED_SEARCHES_PATH", raising=False)
+            m.delenv("SAVED_SEARCH_RETENTION", raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SAVED_SEARCHES_PATH == os.path.join(
+                "/state", "saved-searches.sqlite3"
+            )
+            assert jobscraper.config.SAVED_SEARCH_RETENTION == 30 * 24 * 3600
+
+            m.setenv("SAVED_SEARCHES_PATH", "/data/saved.sqlite3")
+            m.setenv("SAVED_SEARCH_RETENTION", "86400")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.SAVED_SEARCHES_PATH == "/data/saved.sqlite3"
+            assert jobscraper.config.SAVED_SEARCH_RETENTION == 86400
+
+    def test_job_archive_settings(self):
+        """Test job archive defaults and environment overrides."""
+        import importlib
+
+        import jobscraper.config
+
+        names = (
+            "JOB_ARCHIVE",
+            "JOB_ARCHIVE_PATH",
+            "JOB_ARCHIVE_BATCH_ROWS",
+            "JOB_ARCHIVE_FLUSH_MS",
+            "JOB_ARCHIVE_MAX_PENDING",
+        )
+        with pytest.MonkeyPatch().context() as m:
+            m.setenv("STATE_DIR", "/state")
+            for name in names:
+                m.delenv(name, raising=False)
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.JOB_ARCHIVE is False
+            assert jobscraper.config.JOB_ARCHIVE_PATH == os.path.join(
+                "/state", "job-archive.sqlite3"
+            )
+            assert jobscraper.config.JOB_ARCHIVE_BATCH_ROWS == 5000
+            assert jobscraper.config.JOB_ARCHIVE_FLUSH_MS == 1000
+            assert jobscraper.config.JOB_ARCHIVE_MAX_PENDING == 64
+
+            m.setenv("JOB_ARCHIVE", "true")
+            m.setenv("JOB_ARCHIVE_BATCH_ROWS", "100")
+            m.setenv("JOB_ARCHIVE_FLUSH_MS", "50")
+            m.setenv("JOB_ARCHIVE_MAX_PENDING", "8")
+            importlib.reload(jobscraper.config)
+            assert jobscraper.config.JOB_ARCHIVE is True
+            assert jobscraper.config.JOB_ARCHIVE_BATCH_ROWS == 100
+            assert jobscraper.config.JOB_ARCHIVE_FLUSH_MS == 50
+            assert jobscraper.config.JOB_ARCHIVE_MAX_PENDING == 8
@@ -0,0 +1,94 @@
+"""
+Unit tests for cross-site job deduplication.
+"""
+
+import pandas as pd
+
+from jobscraper.dedupe import dedupe_jobs
+
+
+def make_jobs(*rows) -> pd.DataFrame:
+    """Build a jobs frame from (site, title, company, location, job_url) rows."""
+    columns = ["site", "title", "company", "location", "job_url"]
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+class TestDedupeJobs:
+    """Test cases for collapsing duplicate postings."""
+
+    def test_same_posting_on_several_sites(self):
+        """Test formatting differences in title, company and location are ignored."""
+        jobs = make_jobs(
+            ("indeed", "Software Engineer", "Acme", "Austin, TX", "https://i/1"),
+            ("linkedin", "software  engineer!", "ACME", "austin tx", "https://l/2"),
+            ("google", "Data Scientist", "Acme", "Austin, TX", "https://g/3"),
+        )
+
+        deduped, removed = dedupe_jobs(jobs)
+
+        assert removed == 1
+        assert deduped["job_url"].tolist() == ["https://i/1", "https://g/3"]
+        assert deduped["sites"].tolist() == [["indeed", "linkedin"], ["google"]]
+
+    def test_same_url(self):
+        """Test rows with equivalent job URLs are duplicates."""
+        jobs = make_jobs(
+            ("indeed", "Engineer", "Acme", None, "https://www.indeed.com/job?jk=1"),
+            ("google", "Engineer II", "Acme Inc", None, "http://indeed.com/job?jk=1#a"),
+            ("indeed", "Engineer", "Globex", None, "https://www.indeed.com/job?jk=2"),
+        )
+
+        deduped, removed = dedupe_jobs(jobs)
+
+        assert removed == 1
+        assert deduped["sites"].tolist() == [["indeed", "google"], ["indeed"]]
+
+    def test_chained_duplicates(self):
+        """Test rows linked through another duplicate collapse together."""
+        jobs = make_jobs(
+            ("indeed", "Engineer", "Acme", None, "https://a/1"),
+            ("linkedin", "Engineer", "Acme", None, "https://b/2"),
+            ("google", "Lead Engineer", "Acme", None, "https://b/2/"),
+        )
+
+        deduped, removed = dedupe_jobs(jobs)
+
+        assert removed == 2
+        assert deduped["sites"].tolist() == [["indeed", "linkedin", "google"]]
+
+    def test_links_across_both_keys(self):
+        """Test a row matching one row's posting and another's URL joins them."""
+        jobs = make_jobs(
+            ("indeed", "Engineer", "Acme", None, "https://a/1"),
+            ("linkedin", "Developer", "Globex", None, "https://b/2"),
+            ("google", "Engineer", "Acme", None, "https://b/2"),
+        )
+
+        deduped, removed = dedupe_jobs(jobs)
+
+        assert removed == 2
+        assert deduped["job_url"].tolist() == ["https://a/1"]
+        assert deduped["sites"].tolist() == [["indeed", "linkedin", "google"]]
+
+    def test_missing_values_do_not_match(self):
+        """Test rows lacking a company or URL are not merged on those blanks."""
+        jobs = make_jobs(
+            ("indeed", "Engineer", None, None, None),
+            ("linkedin", "Engineer", None, None, None),
+        )
+
+        deduped, removed = dedupe_jobs(jobs)
+
+        assert removed == 0
+        assert len(deduped) == 2
+        assert deduped["sites"].tolist() == [["indeed"], ["linkedin"]]
+
+    def test_empty_and_partial_frames(self):
+        """Test frames without the key columns are returned unchanged."""
+        empty, removed = dedupe_jobs(pd.DataFrame())
+        assert empty.empty and removed == 0
+
+        jobs = pd.DataFrame({"description": ["a", "a"]})
+        deduped, removed = dedupe_jobs(jobs)
+        assert removed == 0
+        assert deduped.equals(jobs)
@@ -0,0 +1,70 @@
+"""
+Unit tests for response entity tags.
+"""
+
+import pandas as pd
+
+from jobscraper.etag import content_digest, result_etag
+
+
+def make_jobs(**overrides) -> pd.DataFrame:
+    """Build a small jobs DataFrame with optional column overrides."""
+    columns = {
+        "id": ["in-1", "li-2"],
+        "title": ["Engineer", "Analyst"],
+        "company": ["Acme", "Globex"],
+        "min_amount": [100000.0, None],
+        "description": ["Build things", "Analyze things"],
+    }
+    columns.update(overrides)
+    return pd.DataFrame(columns)
+
+
+class TestContentDigest:
+    """Test cases for the digest over job ids and key fields."""
+
+    def test_stable(self):
+        """Test equal results produce equal digests."""
+        assert content_digest(make_jobs()) == content_digest(make_jobs())
+
+    def test_key_field_change(self):
+        """Test a change in a key field changes the digest."""
+        changed = make_jobs(title=["Engineer", "Senior Analyst"])
+        assert content_digest(changed) != content_digest(make_jobs())
+
+    def test_job_set_change(self):
+        """Test added, removed and reordered jobs change the digest."""
+        jobs = make_jobs()
+        digest = content_digest(jobs)
+
+        assert content_digest(jobs.iloc[:1]) != digest
+        assert content_digest(jobs.iloc[::-1]) != digest
+
+    def test_ignores_other_fields(self):
+        """Test fields outside the key fields do not affect the digest."""
+        changed = make_jobs(description=["Edited", "Edited too"])
+        assert content_digest(changed) == content_digest(make_jobs())
+
+    def test_ignores_index(self):
+        """Test the DataFrame index does not affect the digest."""
+        reindexed = make_jobs().set_axis([10, 11])
+        assert content_digest(reindexed) == content_digest(make_jobs())
+
+    def test_empty(self):
+        """Test empty results have a digest."""
+        assert content_digest(pd.DataFrame()) == content_digest(pd.DataFrame())
+        assert content_digest(pd.DataFrame()) != content_digest(make_jobs())
+
+
+class TestResultEtag:
+    """Test cases for combining the digest with response options."""
+
+    def test_varies_with_response_options(self):
+        """Test stages, format and partial results change the ETag."""
+        etag = result_etag("abc", {}, "application/json", False)
+
+        assert etag == result_etag("abc", {}, "application/json", False)
+        assert etag != result_etag("abd", {}, "application/json", False)
+        assert etag != result_etag("abc", {"limit": 5}, "application/json", False)
+        assert etag != result_etag("abc", {}, "text/csv", False)
+        assert etag != result_etag("abc", {}, "application/json", True)
@@ -0,0 +1,140 @@
+"""
+Unit tests for server-side result filters.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jobscraper.filters import compile_keywords, filter_jobs, parse_filters
+from jobscraper.params import InvalidRequestError
+
+
+@pytest.fixture
+def jobs():
+    """Small jobs frame covering every filtered column."""
+    return pd.DataFrame(
+        {
+            "title": ["Python Developer", "Senior C++ Engineer", "Go Engineer", None],
+            "company": ["Acme", " ACME ", "Globex", None],
+            "description": [
+                "Django and SQL",
+                "Trading systems",
+                "python tooling",
+                None,
+            ],
+            "min_amount": [90000.0, 150000.0, np.nan, np.nan],
+            "max_amount": [110000.0, np.nan, np.nan, 200000.0],
+            "is_remote": [True, False, None, True],
+        }
+    )
+
+
+class TestParseFilters:
+    """Test cases for validating the filters section."""
+
+    def test_parse_filters(self):
+        """Test valid filters are normalized."""
+        data = {
+            "filters": {
+                "min_salary": 100000,
+                "exclude_companies": [" Acme "],
+                "keywords": ["python"],
+                "remote": True,
+            }
+        }
+
+        assert parse_filters(data) == {
+            "min_salary": 100000,
+            "exclude_companies": ["acme"],
+            "keywords": ["python"],
+            "remote": True,
+        }
+        assert parse_filters({}) is None
+        assert parse_filters({"filters": {}}) is None
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            [],
+            {"salary": 1},
+            {"min_salary": -1},
+            {"min_salary": "100k"},
+            {"keywords": []},
+            {"exclude_keywords": ["ok", ""]},
+            {"exclude_companies": "Acme"},
+            {"remote": "yes"},
+        ],
+    )
+    def test_parse_filters_invalid(self, filters):
+        """Test malformed filters are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_filters({"filters": filters})
+
+
+class TestFilterJobs:
+    """Test cases for applying filters to a jobs frame."""
+
+    def test_min_salary(self, jobs):
+        """Test the top of the salary range must reach the floor."""
+        filtered = filter_jobs(jobs, {"min_salary": 100000})
+
+        assert filtered.index.tolist() == [0, 1, 3]
+
+    def test_min_salary_is_yearly(self):
+        """Test hourly, weekly and monthly pay is annualized before comparing."""
+        jobs = pd.DataFrame(
+            {
+                "min_amount": [40.0, 45.0, 1500.0, 9000.0, 60000.0, 90000.0],
+                "max_amount": [50.0, np.nan, 2000.0, np.nan, np.nan, np.nan],
+                "interval": [
+                    "hourly",
+                    "hourly",
+                    "weekly",
+                    "Monthly",
+                    None,
+                    "per fortnight",
+                ],
+            }
+        )
+
+        filtered = filter_jobs(jobs, {"min_salary": 100000})
+
+        # 50 * 2080 = 104000, 45 * 2080 = 93600, 2000 * 52 = 104000,
+        # 9000 * 12 = 108000, 60000 without an interval is yearly
+        assert filtered.index.tolist() == [0, 2, 3]
+
+    def test_exclude_companies(self, jobs):
+        """Test company names are compared ignoring case and padding."""
+        filtered = filter_jobs(jobs, {"exclude_companies": ["acme"]})
+
+        assert filtered.index.tolist() == [2, 3]
+
+    def test_remote(self, jobs):
+        """Test remote-only and on-site-only filtering."""
+        assert filter_jobs(jobs, {"remote": True}).index.tolist() == [0, 3]
+        assert filter_jobs(jobs, {"remote": False}).index.tolist() == [1, 2]
+
+    def test_keywords(self, jobs):
+        """Test every keyword must appear as a whole word in title or description."""
+        assert filter_jobs(jobs, {"keywords": ["python"]}).index.tolist() == [0, 2]
+        assert filter_jobs(jobs, {"keywords": ["python", "sql"]}).index.tolist() == [0]
+        assert filter_jobs(jobs, {"keywords": ["c++"]}).index.tolist() == [1]
+        assert filter_jobs(jobs, {"keywords": ["pyth"]}).empty
+
+    def test_exclude_keywords(self, jobs):
+        """Test rows mentioning any excluded keyword are dropped."""
+        filtered = filter_jobs(jobs, {"exclude_keywords": ["senior", "GO"]})
+
+        assert filtered.index.tolist() == [0, 3]
+
+    def test_missing_columns(self):
+        """Test filters on columns the result lacks drop every row."""
+        jobs = pd.DataFrame({"title": ["a"]})
+
+        assert filter_jobs(jobs, {"min_salary": 1}).empty
+        assert filter_jobs(jobs, {"exclude_companies": ["x"]}).index.tolist() == [0]
+
+    def test_compile_keywords_is_cached(self):
+        """Test keyword patterns are compiled once and reused."""
+        assert compile_keywords(("python",)) is compile_keywords(("python",))
@@ -0,0 +1,271 @@
+"""
+Unit tests for the multiprocess Prometheus metrics.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from flask import Flask, request
+
+from jobscraper.metrics import (
+    ENDPOINT_ENVIRON_KEY,
+    STAGES_ENVIRON_KEY,
+    Metrics,
+    MetricsMiddleware,
+    record_stage,
+    site_label,
+    timed_stage,
+)
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    """Registry in a temporary file that only flushes when asked."""
+    return Metrics(str(tmp_path / "metrics.sqlite3"), flush_interval=0)
+
+
+def samples(text: str) -> dict:
+    """Map each sample line of an exposition body to its value."""
+    lines = [line for line in text.splitlines() if not line.startswith("#")]
+    return dict(line.rsplit(" ", 1) for line in lines)
+
+
+class TestMetrics:
+    """Test cases for recording and exporting metrics."""
+
+    def test_counters_and_gauges(self, metrics):
+        """Test counters and gauges are exported with their labels."""
+        metrics.inc("jobscraper_cache_requests_total", status="HIT")
+        metrics.inc("jobscraper_cache_requests_total", 2, status="HIT")
+        metrics.inc("jobscraper_requests_in_flight", 3)
+        metrics.inc("jobscraper_requests_in_flight", -1)
+
+        text = metrics.render()
+
+        assert "# TYPE jobscraper_cache_requests_total counter" in text
+        assert "# TYPE jobscraper_requests_in_flight gauge" in text
+        assert samples(text) == {
+            "jobscraper_requests_in_flight": "2",
+            'jobscraper_cache_requests_total{status="HIT"}': "3",
+        }
+
+    def test_histogram(self, metrics):
+        """Test buckets are cumulative and ordered, with sum and count."""
+        metrics.observe("jobscraper_stage_duration_seconds", 0.003, stage="auth")
+        metrics.observe("jobscraper_stage_duration_seconds", 0.5, stage="auth")
+        metrics.observe("jobscraper_stage_duration_seconds", 120.0, stage="auth")
+
+        lines = [
+            line
+            for line in metrics.render().splitlines()
+            if line.startswith("jobscraper_stage_duration_seconds")
+        ]
+        values = samples("\n".join(lines))
+
+        assert (
+            values['jobscraper_stage_duration_seconds_bucket{stage="auth",le="0.001"}']
+            == "0"
+        )
+        assert (
+            values['jobscraper_stage_duration_seconds_bucket{stage="auth",le="0.005"}']
+            == "1"
+        )
+        assert (
+            values['jobscraper_stage_duration_seconds_bucket{stage="auth",le="0.5"}']
+            == "2"
+        )
+        assert (
+            values['jobscraper_stage_duration_seconds_bucket{stage="auth",le="60.0"}']
+            == "2"
+        )
+        assert (
+            values['jobscraper_stage_duration_seconds_bucket{stage="auth",le="+Inf"}']
+            == "3"
+        )
+        assert values['jobscraper_stage_duration_seconds_count{stage="auth"}'] == "3"
+        assert (
+            values['jobscraper_stage_duration_seconds_sum{stage="auth"}'] == "120.503"
+        )
+        # Buckets come first, in increasing order
+        assert lines[0].endswith('le="0.001"} 0')
+        assert lines[15].startswith("jobscraper_stage_duration_seconds_bucket")
+        assert "+Inf" in lines[15]
+
+    def test_label_values_are_escaped(self, metrics):
+        """Test quotes, backslashes and newlines in labels are escaped."""
+        metrics.inc(
+            "jobscraper_scrape_errors_total", site="indeed", exception='a"b\\c\nd'
+        )
+
+        assert 'exception="a\\"b\\\\c\\nd",site="indeed"} 1' in metrics.render()
+
+    def test_workers_are_summed(self, metrics):
+        """Test every process's snapshot adds up in the export."""
+        other = Metrics(metrics.path, flush_interval=0)
+        with patch("jobscraper.metrics.os.getpid", return_value=4242):
+            other.inc("jobscraper_cache_requests_total", 5, status="MISS")
+            other.inc("jobscraper_requests_in_flight", 2)
+            other.flush()
+        metrics.inc("jobscraper_cache_requests_total", status="MISS")
+        metrics.inc("jobscraper_requests_in_flight")
+
+        with patch("jobscraper.metrics._process_alive", return_value=True):
+            values = samples(metrics.render())
+
+        assert values['jobscraper_cache_requests_total{status="MISS"}'] == "6"
+        assert values["jobscraper_requests_in_flight"] == "3"
+
+    def test_exited_workers_keep_counting(self, metrics):
+        """Test counters of exited workers are kept while gauges are dropped."""
+        for pid in (4242, 4343):
+            other = Metrics(metrics.path, flush_interval=0)
+            with patch("jobscraper.metrics.os.getpid", return_value=pid):
+                other.inc("jobscraper_cache_requests_total", status="MISS")
+                other.inc("jobscraper_requests_in_flight", 1)
+                other.flush()
+
+            with patch(
+                "jobscraper.metrics._process_alive", side_effect=lambda p: p < 4000
+            ):
+                values = samples(metrics.render())
+
+        assert values == {'jobscraper_cache_requests_total{status="MISS"}': "2"}
+        rows = (
+            metrics.connection()
+            .execute("SELECT process, value FROM metric_samples")
+            .fetchall()
+        )
+        assert rows == [("", 2.0)]
+
+    def test_disabled(self, tmp_path):
+        """Test nothing is recorded when metrics are disabled."""
+        disabled = Metrics(str(tmp_path / "m.sqlite3"), flush_interval=0, enabled=False)
+        disabled.inc("jobscraper_cache_requests_total", status="HIT")
+
+        disabled.flush()
+
+        assert not (tmp_path / "m.sqlite3").exists()
+
+    def test_clear(self, metrics):
+        """Test clearing forgets values in memory and in the shared file."""
+        metrics.inc("jobscraper_cache_requests_total", status="HIT")
+        metrics.flush()
+
+        metrics.clear()
+
+        assert metrics.render() == "\n"
+
+
+class TestScrapeMetrics:
+    """Test cases for instrumented jobspy calls."""
+
+    def test_rows_and_durations_by_site(self, metrics):
+        """Test successful calls count their rows under their site."""
+        scrape = metrics.wrap(MagicMock(return_value=pd.DataFrame({"a": [1, 2]})))
+
+        scrape(site_name="indeed")
+        scrape(site_name=["Indeed"])
+        scrape(search_term="x")
+
+        values = samples(metrics.render())
+        assert values['jobscraper_scrape_rows_total{site="indeed"}'] == "4"
+        assert values['jobscraper_scrape_rows_total{site="all"}'] == "2"
+        assert values['jobscraper_scrape_duration_seconds_count{site="indeed"}'] == "2"
+
+    def test_errors_by_exception_type(self, metrics):
+        """Test failed calls are counted by site and exception class."""
+        scrape = metrics.wrap(MagicMock(side_effect=ValueError("unknown site")))
+
+        with pytest.raises(ValueError):
+            scrape(site_name="monster")
+
+        values = samples(metrics.render())
+        assert (
+            values[
+                'jobscraper_scrape_errors_total{exception="ValueError",site="other"}'
+            ]
+            == "1"
+        )
+        assert values['jobscraper_scrape_duration_seconds_count{site="other"}'] == "1"
+
+    def test_site_label(self):
+        """Test unknown or several sites map to fixed label values."""
+        assert site_label({"site_name": "linkedin"}) == "linkedin"
+        assert site_label({"site_name": ["indeed", "linkedin"]}) == "all"
+        assert site_label({"site_name": "x" * 100}) == "other"
+
+
+class TestMetricsMiddleware:
+    """Test cases for request-level metrics."""
+
+    @pytest.fixture
+    def client(self, metrics):
+        """Client of a small app wrapped in the middleware."""
+        app = Flask(__name__)
+
+        @app.before_request
+        def label_endpoint():
+            if request.url_rule is not None:
+                request.environ[ENDPOINT_ENVIRON_KEY] = request.url_rule.rule
+
+        @app.route("/items/<name>")
+        def item(name):
+            record_stage("auth", 0.002)
+            with timed_stage("serialize"):
+                return name * 10
+
+        app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+        return app.test_client()
+
+    def test_requests_recorded(self, client, metrics):
+        """Test requests, bytes, stages and in-flight counts are recorded."""
+        # Requests are recorded once the server closes the response body
+        with client.get("/items/ab") as response:
+            assert response.status_code == 200
+        with client.get("/missing") as response:
+            assert response.status_code == 404
+
+        values = samples(metrics.render())
+        item = 'endpoint="/items/<name>"'
+        assert (
+            values[f'jobscraper_requests_total{{{item},method="GET",status="200"}}']
+            == "1"
+        )
+        assert (
+            values[
+                'jobscraper_requests_total{endpoint="unmatched",method="GET",status="404"}'
+            ]
+            == "1"
+        )
+        assert values[f"jobscraper_response_bytes_total{{{item}}}"] == "20"
+        assert values[f"jobscraper_request_duration_seconds_count{{{item}}}"] == "1"
+        assert values["jobscraper_requests_in_flight"] == "0"
+        stage_counts = {
+            stage: values[f'jobscraper_stage_duration_seconds_count{{stage="{stage}"}}']
+            for stage in ("auth", "serialize", "write")
+        }
+        assert stage_counts == {"auth": "1", "serialize": "1", "write": "2"}
+
+    def test_in_flight_until_closed(self, client, metrics):
+        """Test a request counts as in flight until its body is closed."""
+        response = client.get("/items/ab")
+
+        assert samples(metrics.render())["jobscraper_requests_in_flight"] == "1"
+        response.close()
+        assert samples(metrics.render())["jobscraper_requests_in_flight"] == "0"
+
+    def test_stages_need_a_request(self):
+        """Test stages are kept per request and ignored outside of one."""
+        record_stage("auth", 1.0)
+
+        app = Flask(__name__)
+        with app.test_request_context() as context:
+            with timed_stage("parse"):
+                pass
+            record_stage("auth", 0.5)
+            record_stage("auth", 0.25)
+            stages = context.request.environ[STAGES_ENVIRON_KEY]
+
+        assert stages["auth"] == 0.75
+        assert set(stages) == {"auth", "parse"}
@@ -0,0 +1,93 @@
+"""
+Unit tests for request parameter handling.
+"""
+
+import pytest
+
+from jobscraper.params import (
+    SCRAPE_PARAMS,
+    InvalidRequestError,
+    canonical_params,
+    extract_scrape_params,
+    params_key,
+    parse_deadline_ms,
+)
+
+
+class TestExtractScrapeParams:
+    """Test cases for whitelisted parameter extraction."""
+
+    def test_extract_scrape_params_only_whitelisted(self):
+        """Test unknown and response-only keys are not forwarded."""
+        data = {"search_term": "python", "stream": True, "cache": "bypass", "x": 1}
+
+        assert extract_scrape_params(data) == {"search_term": "python"}
+
+    def test_extract_scrape_params_all(self):
+        """Test every whitelisted parameter is forwarded."""
+        data = {param: f"value-{param}" for param in SCRAPE_PARAMS}
+
+        assert extract_scrape_params(data) == data
+        assert len(SCRAPE_PARAMS) == 20
+
+
+class TestParseDeadlineMs:
+    """Test cases for the request deadline option."""
+
+    def test_parse_deadline_ms_default(self):
+        """Test the server default applies when no deadline is requested."""
+        assert parse_deadline_ms({}, 25000, 25000) == 25000
+        assert parse_deadline_ms({}, 0, 25000) is None
+
+    def test_parse_deadline_ms_requested(self):
+        """Test requested deadlines are used and capped."""
+        assert parse_deadline_ms({"deadline_ms": 5000}, 25000, 25000) == 5000
+        assert parse_deadline_ms({"deadline_ms": 90000}, 25000, 25000) == 25000
+        assert parse_deadline_ms({"deadline_ms": 90000}, 25000, 0) == 90000
+
+    @pytest.mark.parametrize("value", [0, -1, "100", 1.5, True])
+    def test_parse_deadline_ms_invalid(self, value):
+        """Test non-positive or non-integer deadlines are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_deadline_ms({"deadline_ms": value}, 25000, 25000)
+
+
+class TestCanonicalParams:
+    """Test cases for canonical parameter forms and keys."""
+
+    def test_canonical_params_normalizes_site_lists(self):
+        """Test site order, case and single-string form do not matter."""
+        assert canonical_params({"site_name": ["LinkedIn", "indeed"]}) == {
+            "site_name": ["indeed", "linkedin"]
+        }
+        assert canonical_params({"site_name": "indeed"}) == {"site_name": ["indeed"]}
+
+    def test_canonical_params_drops_defaults(self):
+        """Test values equal to jobspy defaults are removed."""
+        params = {"search_term": "python", "results_wanted": 15, "distance": 50}
+
+        assert canonical_params(params) == {"search_term": "python"}
+
+    def test_canonical_params_excludes_secrets(self):
+        """Test proxies and ca_cert never reach the canonical form."""
+        params = {"search_term": "python", "proxies": ["u:p@h:1"], "ca_cert": "/c"}
+
+        assert canonical_params(params) == {"search_term": "python"}
+
+    def test_params_key_equivalent_searches(self):
+        """Test equivalent searches share a key and different ones do not."""
+        first = params_key(
+            {"site_name": ["indeed", "linkedin"], "search_term": "python"}
+        )
+        second = params_key(
+            {
+                "search_term": "python",
+                "site_name": ["linkedin", "indeed"],
+                "results_wanted": 15,
+                "proxies": ["a"],
+            }
+        )
+        other = params_key({"site_name": ["indeed"], "search_term": "python"})
+
+        assert first == second
+        assert first != other
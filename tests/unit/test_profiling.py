@@ -0,0 +1,87 @@
+"""
+Unit tests for Server-Timing headers and request profiling.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from jobscraper.profiling import ProfileStore, profile_authorized, server_timing
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Profile store in a temporary directory."""
+    return ProfileStore(str(tmp_path / "profiles"), top_n=5)
+
+
+def busy_work():
+    """Something for the profiler to see."""
+    return sum(i * i for i in range(10000))
+
+
+class TestServerTiming:
+    """Test cases for the Server-Timing header value."""
+
+    def test_stages_in_order_then_total(self):
+        """Test stages keep their order and durations are in milliseconds."""
+        value = server_timing({"parse": 0.0002, "scrape": 0.81234}, 0.815)
+
+        assert value == "parse;dur=0.2, scrape;dur=812.3, total;dur=815.0"
+
+    def test_total_only(self):
+        """Test requests without timed stages still report their total."""
+        assert server_timing({}, 0.0011) == "total;dur=1.1"
+
+
+class TestProfileAuthorized:
+    """Test cases for the profiling token check."""
+
+    def test_token_must_match(self):
+        """Test only the configured token allows profiling."""
+        assert profile_authorized("secret", "secret")
+        assert not profile_authorized("other", "secret")
+        assert not profile_authorized(None, "secret")
+
+    def test_disabled_without_token(self):
+        """Test profiling is off when no token is configured."""
+        assert not profile_authorized("", "")
+
+
+class TestProfileStore:
+    """Test cases for running and storing profiles."""
+
+    def test_save_and_report(self, store):
+        """Test a saved profile lists its hot functions."""
+        profiler = store.start()
+        busy_work()
+
+        profile_id = store.save(profiler, "POST /scrape? -> 200 OK")
+
+        report = store.report(profile_id)
+        assert report.startswith("POST /scrape? -> 200 OK\n")
+        assert "busy_work" in report
+        assert "function calls" in report
+
+    def test_one_profile_at_a_time(self, store):
+        """Test a second profile waits until the first one stopped."""
+        profiler = store.start()
+
+        assert store.start() is None
+        store.stop(profiler)
+        other = store.start()
+        assert other is not None
+        store.stop(other)
+
+    def test_unknown_or_invalid_id(self, store):
+        """Test ids that are unknown or not hex digests find nothing."""
+        assert store.report("0123456789abcdef") is None
+        assert store.report("../../etc/passwd") is None
+
+    def test_oldest_profiles_pruned(self, store):
+        """Test only the newest profiles are kept."""
+        with patch("jobscraper.profiling.MAX_PROFILES", 2):
+            ids = [store.save(store.start(), f"request {i}") for i in range(3)]
+
+        kept = [profile_id for profile_id in ids if store.report(profile_id)]
+        assert len(kept) == 2
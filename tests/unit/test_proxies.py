@@ -0,0 +1,168 @@
+"""
+Unit tests for the server-side proxy pool.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from jobscraper.proxies import ProxyPool, parse_proxy_list, proxy_id, proxy_label
+
+PROXIES = ["user:secret@fast:8080", "http://slow:3128", "bad:8000"]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Pool of three proxies quarantined after 2 failures for 60 seconds."""
+    return ProxyPool(
+        str(tmp_path / "proxies.sqlite3"),
+        PROXIES,
+        quarantine_failures=2,
+        quarantine_seconds=60,
+    )
+
+
+def at(seconds: float):
+    """Freeze the pool's wall clock."""
+    return patch("jobscraper.proxies.time.time", return_value=seconds)
+
+
+class TestProxyHelpers:
+    """Test cases for parsing and describing proxies."""
+
+    def test_parse_proxy_list(self):
+        """Test blanks and duplicates are dropped, order is kept."""
+        assert parse_proxy_list("a:1, b:2,,\nc:3\na:1") == ["a:1", "b:2", "c:3"]
+        assert parse_proxy_list("") == []
+
+    def test_proxy_label_hides_credentials(self):
+        """Test credentials are removed and the scheme kept."""
+        assert proxy_label("user:secret@host:8080") == "host:8080"
+        assert proxy_label("http://u:p@host:3128") == "http://host:3128"
+        assert proxy_label("host:1") == "host:1"
+
+    def test_proxy_id_is_stable(self):
+        """Test ids are short and do not contain the URL."""
+        assert proxy_id("user:secret@fast:8080") == proxy_id("user:secret@fast:8080")
+        assert "secret" not in proxy_id("user:secret@fast:8080")
+
+
+class TestProxyPool:
+    """Test cases for health tracking and proxy selection."""
+
+    def test_prefers_healthier_proxy(self, pool):
+        """Test the faster, more reliable of two candidates is picked."""
+        pool.record(PROXIES[0], "indeed", failed=False, latency=0.5)
+        pool.record(PROXIES[1], "indeed", failed=False, latency=5.0)
+        pool.record(PROXIES[2], "indeed", failed=True, latency=0.5)
+
+        with patch("jobscraper.proxies.random.sample", side_effect=lambda p, k: p):
+            assert pool.acquire("indeed") == PROXIES[0]
+        with patch("jobscraper.proxies.random.sample", return_value=PROXIES[1:]):
+            # 5s at 0% failures beats 0.5s at 100% failures
+            assert pool.acquire("indeed") == PROXIES[1]
+
+    def test_untried_proxies_are_explored(self, pool):
+        """Test proxies without calls to a site score best for it."""
+        pool.record(PROXIES[0], "indeed", failed=False, latency=0.1)
+
+        with patch("jobscraper.proxies.random.sample", return_value=PROXIES[:2]):
+            assert pool.acquire("indeed") == PROXIES[1]
+            # Health is tracked per site
+            pool.record(PROXIES[1], "linkedin", failed=False, latency=0.1)
+            assert pool.acquire("indeed") == PROXIES[1]
+
+    def test_quarantine_after_consecutive_failures(self, pool):
+        """Test a failing proxy is skipped until its quarantine ends."""
+        with at(1000.0):
+            pool.record(PROXIES[2], "indeed", failed=True, latency=1.0)
+            pool.record(PROXIES[2], "indeed", failed=False, latency=1.0)
+            pool.record(PROXIES[2], "indeed", failed=True, latency=1.0)
+            pool.record(PROXIES[2], "indeed", failed=True, latency=1.0)
+
+            picks = {pool.acquire("indeed") for _ in range(50)}
+            assert picks == set(PROXIES[:2])
+            assert pool.report()[2]["sites"]["indeed"]["quarantined"] is True
+
+        with at(1061.0):
+            assert pool.report()[2]["sites"]["indeed"]["quarantined"] is False
+
+    def test_all_quarantined_uses_first_released(self, pool):
+        """Test the proxy whose quarantine ends first is used as a last resort."""
+        for offset, proxy in ((10.0, PROXIES[0]), (0.0, PROXIES[1]), (5.0, PROXIES[2])):
+            with at(1000.0 + offset):
+                pool.record(proxy, "indeed", failed=True, latency=1.0)
+                pool.record(proxy, "indeed", failed=True, latency=1.0)
+
+        with at(1020.0):
+            assert pool.acquire("indeed") == PROXIES[1]
+
+    def test_wrap_assigns_and_records(self, pool):
+        """Test wrapped calls get one proxy and report their outcome."""
+        scrape = MagicMock(return_value=pd.DataFrame())
+        wrapped = pool.wrap(scrape)
+
+        wrapped(site_name="indeed", search_term="x")
+
+        kwargs = scrape.call_args.kwargs
+        assert kwargs["site_name"] == "indeed"
+        assert len(kwargs["proxies"]) == 1
+        assert kwargs["proxies"][0] in PROXIES
+        sites = [entry["sites"] for entry in pool.report()]
+        assert sum(site["indeed"]["calls"] for site in sites if site) == 1
+
+    def test_wrap_records_failures(self, pool):
+        """Test failed calls are recorded and the error re-raised."""
+        wrapped = pool.wrap(MagicMock(side_effect=ConnectionError("proxy refused")))
+
+        with pytest.raises(ConnectionError):
+            wrapped(search_term="x")
+
+        failures = [
+            entry["sites"]["all"]["failures"]
+            for entry in pool.report()
+            if entry["sites"]
+        ]
+        assert failures == [1]
+
+    def test_wrap_ignores_bad_parameters(self, pool):
+        """Test errors caused by the search leave every proxy's health unchanged."""
+        wrapped = pool.wrap(MagicMock(side_effect=ValueError("Invalid country")))
+
+        for _ in range(pool.quarantine_failures + 1):
+            with pytest.raises(ValueError):
+                wrapped(site_name="indeed", search_term="x")
+
+        assert all(not entry["sites"] for entry in pool.report())
+        assert pool.acquire("indeed") in PROXIES
+
+    def test_wrap_keeps_request_proxies(self, pool):
+        """Test proxies passed by the request override the pool."""
+        scrape = MagicMock(return_value=pd.DataFrame())
+
+        pool.wrap(scrape)(search_term="x", proxies=["mine:1"])
+
+        scrape.assert_called_once_with(search_term="x", proxies=["mine:1"])
+        assert all(not entry["sites"] for entry in pool.report())
+
+    def test_report_hides_credentials(self, pool):
+        """Test the report only carries ids and credential-free labels."""
+        pool.record(PROXIES[0], "indeed", failed=False, latency=0.25)
+
+        report = pool.report()
+
+        assert "secret" not in str(report)
+        assert report[0] == {
+            "id": proxy_id(PROXIES[0]),
+            "label": "fast:8080",
+            "sites": {
+                "indeed": {
+                    "calls": 1,
+                    "failures": 0,
+                    "latency_ms": 250.0,
+                    "failure_rate": 0.0,
+                    "quarantined": False,
+                }
+            },
+        }
@@ -0,0 +1,180 @@
+"""
+Unit tests for refresh-ahead scheduling and background refreshes.
+"""
+
+import threading
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from jobscraper.refresh import (
+    Refresher,
+    RefreshScheduler,
+    SearchPopularity,
+    search_sites,
+)
+
+
+@pytest.fixture
+def popularity(tmp_path):
+    """Popularity store in a temporary SQLite file."""
+    return SearchPopularity(str(tmp_path / "popularity.sqlite3"))
+
+
+def make_scheduler(tmp_path, popularity, cache=None, refresher=None, **options):
+    """Build a scheduler with test defaults that never starts its thread."""
+    settings = {
+        "top_n": 2,
+        "lead_time": 60,
+        "window": 3600,
+        "interval": 15,
+        "site_budget": 0,
+        **options,
+    }
+    scheduler = RefreshScheduler(
+        popularity,
+        cache or MagicMock(expires_in=MagicMock(return_value=None)),
+        refresher or MagicMock(submit=MagicMock(return_value=True)),
+        lock_path=str(tmp_path / "locks" / "refresh-ahead.lock"),
+        **settings,
+    )
+    scheduler._ensure_thread = lambda: None
+    return scheduler
+
+
+class TestSearchPopularity:
+    """Test cases for the shared request counts."""
+
+    def test_top_ranks_by_requests_in_window(self, popularity):
+        """Test searches are ranked by their requests within the window."""
+        searches = {"a": {"search_term": "a"}, "b": {"search_term": "b"}}
+        popularity.add({"a": 1, "b": 3}, searches, now=0.0)
+        popularity.add({"a": 5}, searches, now=600.0)
+
+        assert popularity.top(10, since=0.0) == [
+            ("a", {"search_term": "a"}, 6),
+            ("b", {"search_term": "b"}, 3),
+        ]
+        assert popularity.top(1, since=0.0) == [("a", {"search_term": "a"}, 6)]
+        assert popularity.top(10, since=600.0) == [("a", {"search_term": "a"}, 5)]
+
+    def test_counts_accumulate_per_bucket(self, popularity):
+        """Test counts from several workers add up."""
+        searches = {"a": {"search_term": "a"}}
+        popularity.add({"a": 2}, searches, now=10.0)
+        popularity.add({"a": 3}, searches, now=20.0)
+
+        assert popularity.top(10, since=0.0) == [("a", {"search_term": "a"}, 5)]
+
+    def test_purge(self, popularity):
+        """Test old counts and searches not requested since are deleted."""
+        searches = {"a": {"search_term": "a"}, "b": {"search_term": "b"}}
+        popularity.add({"a": 1, "b": 1}, searches, now=0.0)
+        popularity.add({"b": 1}, searches, now=600.0)
+
+        popularity.purge(before=300.0)
+
+        assert popularity.top(10, since=0.0) == [("b", {"search_term": "b"}, 1)]
+
+
+class TestRefresher:
+    """Test cases for background refreshes."""
+
+    def test_refreshes_in_background(self):
+        """Test a submitted search is refreshed and counted."""
+        refresh = MagicMock()
+        refresher = Refresher(refresh, workers=1)
+
+        assert refresher.submit("key", {"search_term": "a"}, recheck=True)
+
+        refresher._executor.shutdown(wait=True)
+        refresh.assert_called_once_with({"search_term": "a"}, "key", True)
+        assert refresher.stats() == {"refreshed": 1, "failed": 0, "pending": 0}
+
+    def test_pending_search_not_queued_twice(self):
+        """Test a search being refreshed is not queued again."""
+        release = threading.Event()
+        refresher = Refresher(lambda *args: release.wait(5), workers=1)
+
+        assert refresher.submit("key", {}, recheck=True)
+        assert not refresher.submit("key", {}, recheck=False)
+        release.set()
+
+    def test_failure_counted(self):
+        """Test a failed refresh is counted and no longer pending."""
+        refresher = Refresher(MagicMock(side_effect=RuntimeError("boom")), workers=1)
+
+        refresher.submit("key", {}, recheck=True)
+        refresher._executor.shutdown(wait=True)
+
+        assert refresher.stats() == {"refreshed": 0, "failed": 1, "pending": 0}
+
+
+class TestRefreshScheduler:
+    """Test cases for refresh-ahead scheduling."""
+
+    def test_refreshes_popular_searches_near_expiry(self, tmp_path, popularity):
+        """Test only the top searches that are missing or about to expire run."""
+        expiry = {"a": 10.0, "b": 300.0}
+        cache = MagicMock()
+        cache.expires_in.side_effect = lambda key: expiry.get(key)
+        scheduler = make_scheduler(tmp_path, popularity, cache=cache, top_n=3)
+
+        for key, requests in (("a", 4), ("b", 3), ("c", 2), ("d", 1)):
+            for _ in range(requests):
+                scheduler.track(key, {"search_term": key})
+        queued = scheduler.run_once(now=1000.0)
+
+        assert scheduler.refresher.submit.call_args_list == [
+            call("a", {"search_term": "a"}, recheck=False),
+            call("c", {"search_term": "c"}, recheck=False),
+        ]
+        assert queued == 2
+        assert scheduler.stats() == {
+            "leader": True,
+            "scheduled": 2,
+            "over_budget": 0,
+        }
+
+    def test_tracks_canonical_params(self, tmp_path, popularity):
+        """Test secrets are dropped and equivalent params stored canonically."""
+        scheduler = make_scheduler(tmp_path, popularity)
+
+        scheduler.track("k", {"site_name": "Indeed", "proxies": ["user:pw@host"]})
+        scheduler.run_once(now=1000.0)
+
+        assert popularity.top(10, since=0.0) == [("k", {"site_name": ["indeed"]}, 1)]
+
+    def test_site_budget(self, tmp_path, popularity):
+        """Test each site gets a limited number of refreshes per hour."""
+        scheduler = make_scheduler(tmp_path, popularity, top_n=10, site_budget=1)
+
+        scheduler.track("a", {"site_name": ["indeed"], "search_term": "a"})
+        scheduler.track("b", {"site_name": ["indeed", "linkedin"], "search_term": "b"})
+        scheduler.track("c", {"site_name": ["linkedin"], "search_term": "c"})
+        scheduler.track("a", {"site_name": ["indeed"], "search_term": "a"})
+        assert scheduler.run_once(now=1000.0) == 2
+        assert scheduler.over_budget == 1
+
+        # Budgets are restored after an hour
+        assert scheduler.run_once(now=1000.0 + 3600) == 2
+
+    def test_one_leader_per_host(self, tmp_path, popularity):
+        """Test only the holder of the lock schedules refreshes."""
+        leader = make_scheduler(tmp_path, popularity)
+        follower = make_scheduler(tmp_path, popularity)
+        follower.track("a", {"search_term": "a"})
+
+        assert leader.run_once(now=1000.0) == 0
+        assert follower.run_once(now=1000.0) == 0
+
+        assert leader.leader
+        assert not follower.leader
+        # The follower's counts still reach the leader
+        assert leader.run_once(now=1001.0) == 1
+        follower.refresher.submit.assert_not_called()
+
+    def test_search_sites(self):
+        """Test searches without sites use the shared budget."""
+        assert search_sites({"site_name": ["indeed"]}) == ["indeed"]
+        assert search_sites({"search_term": "a"}) == ["all"]
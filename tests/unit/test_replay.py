@@ -0,0 +1,159 @@
+"""
+Unit tests for recording and replaying jobspy results.
+"""
+
+import datetime
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Fixtures are Parquet files, so every test here needs pyarrow
+pytest.importorskip("pyarrow")
+
+from jobscraper.replay import (  # noqa: E402
+    ReplayMissError,
+    ScrapeRecorder,
+    ScrapeReplayer,
+    read_fixture,
+    read_fixture_metadata,
+)
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    """Recorder writing to a temporary directory."""
+    return ScrapeRecorder(str(tmp_path))
+
+
+def jobs(title: str) -> pd.DataFrame:
+    """One-row result with a recognizable title."""
+    return pd.DataFrame({"title": [title]})
+
+
+class TestFixtures:
+    """Test cases for the Parquet round trip."""
+
+    def test_dtypes_survive(self, recorder):
+        """Test dates, nullable integers, missing values and long text."""
+        df = pd.DataFrame(
+            {
+                "date_posted": [datetime.date(2024, 6, 1), None],
+                "min_amount": [50000.0, np.nan],
+                "vacancy_count": pd.array([3, None], dtype="Int64"),
+                "description": ["x" * 200_000, None],
+            }
+        )
+
+        path = recorder.save({"site_name": "indeed"}, df, 0.5)
+        replayed, metadata = read_fixture(path)
+
+        pd.testing.assert_frame_equal(replayed, df)
+        assert metadata["rows"] == 2
+        assert metadata["duration"] == 0.5
+
+    def test_mixed_object_columns(self, recorder):
+        """Test columns Arrow cannot type come back with their values."""
+        df = pd.DataFrame({"emails": [["a@example.com"], "b@example.com", 3, None]})
+
+        replayed, metadata = read_fixture(recorder.save({}, df, 0.1))
+
+        assert metadata["json_columns"] == ["emails"]
+        assert replayed["emails"].tolist() == [
+            ["a@example.com"],
+            "b@example.com",
+            3,
+            None,
+        ]
+
+    def test_params_are_canonical(self, recorder):
+        """Test proxies are not stored and sites are normalized."""
+        path = recorder.save(
+            {"site_name": ["LinkedIn", "indeed"], "proxies": ["user:pw@p:1"]},
+            jobs("a"),
+            0.1,
+        )
+
+        params = read_fixture_metadata(path)["params"]
+        assert params == {"site_name": ["indeed", "linkedin"]}
+
+
+class TestScrapeRecorder:
+    """Test cases for recording calls."""
+
+    def test_wrap_records_successful_calls(self, recorder, tmp_path):
+        """Test results are returned and saved, failures are not saved."""
+        scrape = recorder.wrap(MagicMock(return_value=jobs("a")))
+        failing = recorder.wrap(MagicMock(side_effect=ValueError("blocked")))
+
+        assert scrape(site_name="indeed")["title"].tolist() == ["a"]
+        with pytest.raises(ValueError):
+            failing(site_name="indeed")
+
+        assert len(list(tmp_path.glob("*.parquet"))) == 1
+
+    def test_write_errors_do_not_fail_the_call(self, recorder):
+        """Test a fixture that cannot be written is only logged."""
+        scrape = recorder.wrap(MagicMock(return_value=jobs("a")))
+
+        with patch("jobscraper.replay.write_fixture", side_effect=OSError("full")):
+            assert len(scrape(site_name="indeed")) == 1
+
+    def test_disabled_without_directory(self):
+        """Test an empty directory turns recording off."""
+        assert not ScrapeRecorder("").enabled
+
+
+class TestScrapeReplayer:
+    """Test cases for answering calls from fixtures."""
+
+    def test_same_search_preferred(self, recorder, tmp_path):
+        """Test the fixture of the search wins over others of its site."""
+        recorder.save({"site_name": "indeed", "search_term": "a"}, jobs("a"), 0)
+        recorder.save({"site_name": "indeed", "search_term": "b"}, jobs("b"), 0)
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0)
+
+        for _ in range(2):
+            df = replayer(site_name="Indeed", search_term="b", proxies=["p:1"])
+            assert df["title"].tolist() == ["b"]
+
+    def test_site_fallback_takes_turns(self, recorder, tmp_path):
+        """Test other searches get the site's fixtures in turn."""
+        recorder.save({"site_name": "indeed", "search_term": "a"}, jobs("a"), 0)
+        recorder.save({"site_name": "indeed", "search_term": "b"}, jobs("b"), 0)
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0)
+
+        titles = {replayer(site_name="indeed", search_term="c")["title"][0]}
+        titles.add(replayer(site_name="indeed", search_term="c")["title"][0])
+
+        assert titles == {"a", "b"}
+        assert len(replayer) == 2
+
+    def test_unknown_sites(self, recorder, tmp_path):
+        """Test calls for sites never recorded fail."""
+        recorder.save({"site_name": "indeed"}, jobs("a"), 0)
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0)
+
+        with pytest.raises(ReplayMissError):
+            replayer(site_name="linkedin")
+
+    def test_latency_scaled(self, recorder, tmp_path):
+        """Test the recorded duration is slept times the scale."""
+        recorder.save({"site_name": "indeed"}, jobs("a"), 2.0)
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0.25)
+
+        with patch("jobscraper.replay.time.sleep") as sleep:
+            replayer(site_name="indeed")
+
+        sleep.assert_called_once_with(0.5)
+
+    def test_callers_get_copies(self, recorder, tmp_path):
+        """Test changing a replayed frame does not change the next one."""
+        recorder.save({"site_name": "indeed"}, jobs("a"), 0)
+        replayer = ScrapeReplayer(str(tmp_path), latency_scale=0)
+
+        df = replayer(site_name="indeed")
+        df["title"] = "changed"
+
+        assert replayer(site_name="indeed")["title"].tolist() == ["a"]
@@ -0,0 +1,138 @@
+"""
+Unit tests for saved searches and the seen-jobs index.
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from jobscraper.params import InvalidRequestError
+from jobscraper.saved import SeenJobsIndex, job_keys, parse_saved_search
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Seen-jobs index in a temporary SQLite file."""
+    return SeenJobsIndex(str(tmp_path / "saved.sqlite3"), retention=60)
+
+
+def keys(*values) -> pd.Series:
+    """Job keys as produced by job_keys."""
+    return pd.Series(values, dtype="string")
+
+
+class TestParseSavedSearch:
+    """Test cases for reading the saved search options."""
+
+    def test_valid(self):
+        """Test the name and optional cursor are returned."""
+        assert parse_saved_search({}) is None
+        assert parse_saved_search({"saved_search": "py-remote"}) == ("py-remote", None)
+        assert parse_saved_search({"saved_search": "a", "since": 3}) == ("a", 3)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"saved_search": ""},
+            {"saved_search": "has space"},
+            {"saved_search": 5},
+            {"saved_search": "a", "since": -1},
+            {"saved_search": "a", "since": True},
+            {"since": 1},
+        ],
+    )
+    def test_invalid(self, data):
+        """Test invalid names and cursors are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_saved_search(data)
+
+
+class TestJobKeys:
+    """Test cases for identifying jobs."""
+
+    def test_id_with_url_fallback(self):
+        """Test ids are used, with the job URL when the id is missing."""
+        jobs = pd.DataFrame({"id": ["in-1", None, None], "job_url": ["u1", "u2", None]})
+
+        result = job_keys(jobs)
+
+        assert result.tolist()[:2] == ["in-1", "u2"]
+        assert pd.isna(result.iloc[2])
+
+
+class TestSeenJobsIndex:
+    """Test cases for the shared seen-jobs index."""
+
+    def test_unseen_and_record(self, index):
+        """Test recorded jobs are no longer unseen and cursors advance."""
+        assert index.unseen("s", keys("a", "b")).tolist() == [True, True]
+
+        assert index.record("s", keys("a", "b"), keys("a", "b")) == 1
+        assert index.unseen("s", keys("a", "b", "c")).tolist() == [False, False, True]
+
+        assert index.record("s", keys("c"), keys("a", "b", "c")) == 2
+        assert index.get("s")["cursor"] == 2
+        assert index.get("s")["seen"] == 3
+
+    def test_searches_are_independent(self, index):
+        """Test each saved search has its own index."""
+        index.record("s", keys("a"), keys("a"))
+
+        assert index.unseen("other", keys("a")).tolist() == [True]
+
+    def test_missing_keys_always_unseen(self, index):
+        """Test jobs without an id or URL are returned and never recorded."""
+        index.record("s", keys("a", None), keys("a", None))
+
+        assert index.unseen("s", keys(None, "a")).tolist() == [True, False]
+        assert index.get("s")["seen"] == 1
+
+    def test_since(self, index):
+        """Test jobs first returned after the cursor are returned again."""
+        index.record("s", keys("a"), keys("a"))
+        index.record("s", keys("b"), keys("a", "b"))
+
+        assert index.unseen("s", keys("a", "b"), since=1).tolist() == [False, True]
+        assert index.unseen("s", keys("a", "b"), since=0).tolist() == [True, True]
+
+        # Returning a job again keeps the run it was first returned by
+        index.record("s", keys("b"), keys("a", "b"))
+        assert index.unseen("s", keys("a", "b"), since=1).tolist() == [False, True]
+
+    def test_empty_run_keeps_cursor(self, index):
+        """Test runs without new jobs do not advance the cursor."""
+        index.record("s", keys("a"), keys("a"))
+
+        assert index.record("s", keys(), keys("a")) == 1
+
+    def test_pruning(self, index):
+        """Test jobs absent for the retention period are forgotten."""
+        with patch("jobscraper.saved.time.time", return_value=1000.0):
+            index.record("s", keys("a", "b"), keys("a", "b"))
+        with patch("jobscraper.saved.time.time", return_value=1050.0):
+            # "a" is still in the results, "b" has disappeared
+            index.record("s", keys(), keys("a"))
+        with patch("jobscraper.saved.time.time", return_value=1070.0):
+            index.record("other", keys("x"), keys("x"))
+            assert index.unseen("s", keys("a", "b")).tolist() == [False, True]
+        with patch("jobscraper.saved.time.time", return_value=1200.0):
+            index.record("other", keys("x"), keys("x"))
+            assert index.get("s") is None
+            assert index.unseen("s", keys("a")).tolist() == [True]
+
+    def test_delete(self, index):
+        """Test deleting a saved search forgets its jobs."""
+        index.record("s", keys("a"), keys("a"))
+
+        assert index.delete("s") is True
+        assert index.get("s") is None
+        assert index.unseen("s", keys("a")).tolist() == [True]
+        assert index.delete("s") is False
+
+    def test_shared_between_instances(self, index):
+        """Test other processes using the same file see recorded jobs."""
+        other = SeenJobsIndex(index.path, retention=60)
+        index.record("s", keys("a"), keys("a"))
+
+        assert other.unseen("s", keys("a")).tolist() == [False]
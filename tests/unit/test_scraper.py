@@ -0,0 +1,279 @@
+"""
+Unit tests for scrape execution and per-site fan-out.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, call
+
+import pandas as pd
+import pytest
+
+from jobscraper.breaker import CircuitOpenError
+from jobscraper.scraper import (
+    ScrapeTimeoutError,
+    merge_frames,
+    remaining_seconds,
+    scrape_single,
+    scrape_sites,
+    single_site,
+    split_sites,
+)
+
+
+@pytest.fixture
+def executor():
+    """Provide a small thread pool for per-site tasks."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture
+def breakers():
+    """Breakers with LinkedIn's circuit open for 42 seconds."""
+    mock = MagicMock()
+    mock.allow.side_effect = lambda site: site != "linkedin"
+    mock.retry_after.return_value = 42.0
+    return mock
+
+
+@pytest.fixture
+def release():
+    """Event that unblocks slow scrapes once the test is done."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+class TestSplitSites:
+    """Test cases for deciding when to fan out."""
+
+    def test_split_sites_multiple(self):
+        """Test multi-site lists are split, dropping duplicates."""
+        params = {"site_name": ["indeed", "linkedin", "indeed"]}
+
+        assert split_sites(params) == ["indeed", "linkedin"]
+
+    @pytest.mark.parametrize(
+        "params", [{}, {"site_name": "indeed"}, {"site_name": ["indeed"]}]
+    )
+    def test_split_sites_single_call(self, params):
+        """Test searches without several sites run as one call."""
+        assert split_sites(params) == []
+
+
+class TestMergeFrames:
+    """Test cases for merging per-site DataFrames."""
+
+    def test_merge_frames_skips_empty(self):
+        """Test empty site results do not affect the merged frame."""
+        first = pd.DataFrame({"title": ["a"]})
+        second = pd.DataFrame({"title": ["b"]})
+
+        merged = merge_frames([first, pd.DataFrame(), second])
+
+        assert merged["title"].tolist() == ["a", "b"]
+        assert merged.index.tolist() == [0, 1]
+
+    def test_merge_frames_all_empty(self):
+        """Test merging only empty results returns an empty frame."""
+        assert merge_frames([pd.DataFrame(), pd.DataFrame()]).empty
+
+
+class TestScrapeSites:
+    """Test cases for concurrent per-site scraping."""
+
+    def test_scrape_sites_passes_one_site_per_call(self, executor):
+        """Test each task receives a single site and the other parameters."""
+        calls = []
+
+        def scrape(**kwargs):
+            calls.append(kwargs)
+            return pd.DataFrame({"site": [kwargs["site_name"]]})
+
+        jobs, report, errors = scrape_sites(
+            scrape, {"search_term": "x"}, ["indeed", "google"], executor
+        )
+
+        assert jobs["site"].tolist() == ["indeed", "google"]
+        assert sorted(c["site_name"] for c in calls) == ["google", "indeed"]
+        assert all(c["search_term"] == "x" for c in calls)
+        assert report["indeed"]["count"] == 1
+        assert errors == []
+
+    def test_scrape_sites_partial_failure(self, executor):
+        """Test a failing site is reported and the others are kept."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "glassdoor":
+                raise ValueError("captcha")
+            return pd.DataFrame({"site": [kwargs["site_name"]]})
+
+        jobs, report, errors = scrape_sites(
+            scrape, {}, ["indeed", "glassdoor"], executor
+        )
+
+        assert jobs["site"].tolist() == ["indeed"]
+        assert report["glassdoor"]["error"] == "captcha"
+        assert "count" not in report["glassdoor"]
+        assert errors == [{"site": "glassdoor", "error": "captcha"}]
+
+    def test_scrape_sites_all_fail(self, executor):
+        """Test the first error is raised when every site fails."""
+
+        def scrape(**kwargs):
+            raise ValueError(f"{kwargs['site_name']} down")
+
+        with pytest.raises(ValueError, match="indeed down"):
+            scrape_sites(scrape, {}, ["indeed", "linkedin"], executor)
+
+    def test_scrape_sites_skips_open_circuits(self, executor, breakers):
+        """Test sites with an open breaker are reported without calling them."""
+        scrape = MagicMock(return_value=pd.DataFrame({"title": ["a"]}))
+
+        jobs, report, errors = scrape_sites(
+            scrape, {}, ["indeed", "linkedin"], executor, breakers=breakers
+        )
+
+        assert len(jobs) == 1
+        scrape.assert_called_once_with(site_name="indeed")
+        assert report["linkedin"] == {
+            "elapsed_ms": 0.0,
+            "error": "Circuit open",
+            "circuit_open": True,
+            "retry_after": 42.0,
+        }
+        assert errors == [{"site": "linkedin", "error": "Circuit open"}]
+        breakers.record.assert_called_once_with("indeed", failed=False)
+
+    def test_scrape_sites_records_failures(self, executor, breakers):
+        """Test failed calls are recorded on their site's breaker."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "glassdoor":
+                raise ConnectionError("429")
+            return pd.DataFrame()
+
+        scrape_sites(scrape, {}, ["indeed", "glassdoor"], executor, breakers=breakers)
+
+        assert sorted(breakers.record.call_args_list) == [
+            call("glassdoor", failed=True),
+            call("indeed", failed=False),
+        ]
+
+    def test_scrape_sites_bad_parameters_not_recorded(self, executor, breakers):
+        """Test errors caused by the search itself do not count against a site."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "glassdoor":
+                raise ValueError("Glassdoor is not available for Antarctica")
+            return pd.DataFrame()
+
+        scrape_sites(scrape, {}, ["indeed", "glassdoor"], executor, breakers=breakers)
+
+        breakers.record.assert_called_once_with("indeed", failed=False)
+
+    def test_scrape_sites_all_circuits_open(self, executor, breakers):
+        """Test a circuit error is raised when every site is skipped."""
+        breakers.allow.side_effect = None
+        breakers.allow.return_value = False
+        scrape = MagicMock()
+
+        with pytest.raises(CircuitOpenError) as excinfo:
+            scrape_sites(
+                scrape, {}, ["indeed", "linkedin"], executor, breakers=breakers
+            )
+
+        assert excinfo.value.sites == ["indeed", "linkedin"]
+        assert excinfo.value.retry_after == 42.0
+        scrape.assert_not_called()
+
+    def test_scrape_sites_deadline_returns_finished_sites(self, executor, release):
+        """Test sites still running at the deadline are reported as timed out."""
+
+        def scrape(**kwargs):
+            if kwargs["site_name"] == "linkedin":
+                release.wait(5)
+            return pd.DataFrame({"site": [kwargs["site_name"]]})
+
+        deadline = time.monotonic() + 0.2
+        jobs, report, errors = scrape_sites(
+            scrape, {}, ["indeed", "linkedin"], executor, deadline
+        )
+
+        assert jobs["site"].tolist() == ["indeed"]
+        assert report["linkedin"]["timed_out"] is True
+        assert errors == [{"site": "linkedin", "error": "Deadline exceeded"}]
+
+    def test_scrape_sites_deadline_nothing_finished(self, executor, release):
+        """Test a timeout error is raised when no site finished in time."""
+
+        def scrape(**kwargs):
+            release.wait(5)
+            return pd.DataFrame()
+
+        with pytest.raises(ScrapeTimeoutError):
+            scrape_sites(
+                scrape, {}, ["indeed", "linkedin"], executor, time.monotonic() + 0.1
+            )
+
+
+class TestScrapeSingle:
+    """Test cases for single scrape calls with a deadline."""
+
+    def test_scrape_single_without_deadline(self, executor):
+        """Test calls without a deadline run directly."""
+        df = pd.DataFrame({"title": ["a"]})
+
+        assert scrape_single(lambda **kwargs: df, {}, executor) is df
+
+    def test_scrape_single_within_deadline(self, executor):
+        """Test calls finishing in time return their jobs."""
+        df = pd.DataFrame({"title": ["a"]})
+        deadline = time.monotonic() + 5
+
+        result = scrape_single(lambda **kwargs: df, {"x": 1}, executor, deadline)
+
+        assert result is df
+
+    def test_scrape_single_deadline_exceeded(self, executor, release):
+        """Test calls overrunning the deadline raise a timeout error."""
+
+        def scrape(**kwargs):
+            release.wait(5)
+
+        with pytest.raises(ScrapeTimeoutError):
+            scrape_single(scrape, {}, executor, time.monotonic() + 0.1)
+
+    def test_scrape_single_circuit_open(self, executor, breakers):
+        """Test single-site searches fail fast while the breaker is open."""
+        scrape = MagicMock()
+
+        with pytest.raises(CircuitOpenError, match="Circuit open for linkedin"):
+            scrape_single(scrape, {"site_name": "linkedin"}, executor, None, breakers)
+
+        scrape.assert_not_called()
+
+    def test_scrape_single_records_outcome(self, executor, breakers):
+        """Test the outcome of a named site is recorded, with a deadline too."""
+        scrape = MagicMock(return_value=pd.DataFrame())
+        deadline = time.monotonic() + 5
+
+        scrape_single(scrape, {"site_name": ["indeed"]}, executor, deadline, breakers)
+        scrape_single(scrape, {"search_term": "x"}, executor, None, breakers)
+
+        breakers.record.assert_called_once_with("indeed", failed=False)
+
+    def test_single_site(self):
+        """Test the site of a search is only known when exactly one is named."""
+        assert single_site({"site_name": "indeed"}) == "indeed"
+        assert single_site({"site_name": ["indeed", "indeed"]}) == "indeed"
+        assert single_site({"site_name": ["indeed", "linkedin"]}) is None
+        assert single_site({}) is None
+
+    def test_remaining_seconds(self):
+        """Test remaining time is never negative and None without a deadline."""
+        assert remaining_seconds(None) is None
+        assert remaining_seconds(time.monotonic() - 10) == 0.0
+        assert 9 < remaining_seconds(time.monotonic() + 10) <= 10
@@ -0,0 +1,245 @@
+"""
+Unit tests for serialization module.
+"""
+
+import datetime
+import io
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jobscraper.serialization import (
+    ARROW_STREAM_MIMETYPE,
+    CSV_MIMETYPE,
+    PARQUET_MIMETYPE,
+    dataframe_to_arrow,
+    dataframe_to_csv,
+    dataframe_to_json,
+    dataframe_to_ndjson,
+    dataframe_to_parquet,
+    dataframe_to_serializable_dict,
+    format_available,
+    render_json_payload,
+)
+
+
+def make_columnar_frame() -> pd.DataFrame:
+    """Frame with the awkward column types jobspy returns."""
+    return pd.DataFrame(
+        {
+            "title": ["Engineer", None],
+            "date_posted": [datetime.date(2024, 1, 2), None],
+            "min_amount": [100000.0, np.nan],
+            "vacancy_count": pd.array([3, None], dtype="Int64"),
+            "mixed": ["a", 1],
+        }
+    )
+
+
+class TestDataframeToJson:
+    """Test cases for the columnar JSON serializer."""
+
+    def test_dataframe_to_json_empty_frame(self):
+        """Test an empty DataFrame encodes as an empty array."""
+        assert dataframe_to_json(pd.DataFrame()) == b"[]"
+
+    def test_dataframe_to_json_nulls(self):
+        """Test NaN, NaT, None and infinity are encoded as null."""
+        df = pd.DataFrame(
+            {
+                "amount": [1.5, np.nan, np.inf],
+                "posted": pd.to_datetime(
+                    ["2024-01-01 10:30", None, "2024-01-02 00:00"]
+                ),
+                "title": ["a", None, "c"],
+            }
+        )
+
+        records = json.loads(dataframe_to_json(df))
+
+        assert records[0] == {
+            "amount": 1.5,
+            "posted": "2024-01-01T10:30:00.000000",
+            "title": "a",
+        }
+        assert records[1] == {"amount": None, "posted": None, "title": None}
+        assert records[2]["amount"] is None
+
+    def test_dataframe_to_json_precision(self):
+        """Test sub-second timestamps survive and floats keep 15 digits."""
+        df = pd.DataFrame(
+            {
+                "posted": pd.to_datetime(["2024-01-01 10:30:00.123456"]),
+                "amount": [52.5],
+                "ratio": [0.1 + 0.2],
+            }
+        )
+
+        records = json.loads(dataframe_to_json(df))
+
+        assert records[0]["posted"] == "2024-01-01T10:30:00.123456"
+        assert records[0]["amount"] == 52.5
+        # Unlike json.dumps, which wrote 0.30000000000000004, the encoder
+        # rounds to 15 digits
+        assert records[0]["ratio"] == 0.3
+
+    def test_dataframe_to_json_date_objects(self):
+        """Test date objects are written as ISO dates without a time part."""
+        df = pd.DataFrame(
+            {
+                "date_posted": [
+                    datetime.date(2024, 5, 1),
+                    None,
+                    datetime.date(2024, 5, 3),
+                ]
+            }
+        )
+
+        records = json.loads(dataframe_to_json(df))
+
+        assert [r["date_posted"] for r in records] == ["2024-05-01", None, "2024-05-03"]
+        # The caller's frame is left untouched
+        assert df["date_posted"].iloc[0] == datetime.date(2024, 5, 1)
+
+    def test_dataframe_to_json_numpy_scalars(self):
+        """Test numpy and nullable integer values become plain JSON numbers."""
+        df = pd.DataFrame(
+            {
+                "count": pd.array([1, None], dtype="Int64"),
+                "flag": np.array([True, False]),
+                "mixed": [np.int64(3), np.float64(0.1)],
+            }
+        )
+
+        records = json.loads(dataframe_to_json(df))
+
+        assert records == [
+            {"count": 1, "flag": True, "mixed": 3},
+            {"count": None, "flag": False, "mixed": 0.1},
+        ]
+
+    def test_dataframe_to_json_matches_legacy_conversion(self):
+        """Test the columnar output agrees with the row-by-row conversion."""
+        df = pd.DataFrame(
+            {
+                "title": ["Engineer", "Analyst"],
+                "min_amount": [100000.0, np.nan],
+                "is_remote": [True, False],
+                "description": ['Unicode ✓ "quoted"', None],
+            }
+        )
+
+        assert json.loads(dataframe_to_json(df)) == dataframe_to_serializable_dict(df)
+
+
+class TestDataframeToNdjson:
+    """Test cases for the streaming NDJSON serializer."""
+
+    def test_dataframe_to_ndjson_lines_and_trailer(self):
+        """Test one line per job is produced followed by a trailer line."""
+        df = pd.DataFrame({"title": ["a", "b", "c"], "amount": [1.0, np.nan, 3.0]})
+
+        chunks = list(dataframe_to_ndjson(df, {"errors": []}, chunk_rows=2))
+        lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+        # Two chunks of rows plus the trailer
+        assert len(chunks) == 3
+        assert lines[:3] == [
+            {"title": "a", "amount": 1.0},
+            {"title": "b", "amount": None},
+            {"title": "c", "amount": 3.0},
+        ]
+        assert lines[3] == {"trailer": True, "success": True, "count": 3, "errors": []}
+
+    def test_dataframe_to_ndjson_empty_frame(self):
+        """Test an empty frame yields only the trailer."""
+        chunks = list(dataframe_to_ndjson(pd.DataFrame(), {}))
+
+        assert [json.loads(c) for c in chunks] == [
+            {"trailer": True, "success": True, "count": 0}
+        ]
+
+    def test_dataframe_to_ndjson_encoding_error(self):
+        """Test encoding failures are reported in the trailer."""
+        df = pd.DataFrame({"title": ["a"]})
+
+        with patch.object(pd.DataFrame, "to_json", side_effect=ValueError("boom")):
+            chunks = list(dataframe_to_ndjson(df, {}))
+
+        trailer = json.loads(chunks[-1])
+        assert trailer["success"] is False
+        assert trailer["error"] == "boom"
+        assert trailer["count"] == 0
+
+
+class TestRenderJsonPayload:
+    """Test cases for response envelope rendering."""
+
+    def test_render_json_payload(self):
+        """Test fields and the jobs array are combined into one object."""
+        body = render_json_payload({"success": True, "count": 1}, b'[{"a":1}]')
+
+        assert json.loads(body) == {"success": True, "count": 1, "jobs": [{"a": 1}]}
+
+    def test_render_json_payload_without_fields(self):
+        """Test an empty envelope still produces valid JSON."""
+        assert json.loads(render_json_payload({}, b"[]")) == {"jobs": []}
+
+    def test_render_json_payload_custom_key(self):
+        """Test an encoded value can be nested under another key."""
+        body = render_json_payload({"status": "succeeded"}, b'{"count":0}', "result")
+
+        assert json.loads(body) == {"status": "succeeded", "result": {"count": 0}}
+
+
+class TestColumnarFormats:
+    """Test cases for Arrow IPC, Parquet and CSV encoding."""
+
+    def test_dataframe_to_arrow_round_trip(self):
+        """Test an Arrow stream loads back with types and nulls intact."""
+        pa = pytest.importorskip("pyarrow")
+
+        table = pa.ipc.open_stream(dataframe_to_arrow(make_columnar_frame())).read_all()
+
+        assert table.column_names == [
+            "title",
+            "date_posted",
+            "min_amount",
+            "vacancy_count",
+            "mixed",
+        ]
+        assert table.column("date_posted").to_pylist() == [
+            datetime.date(2024, 1, 2),
+            None,
+        ]
+        assert table.column("vacancy_count").to_pylist() == [3, None]
+        # Columns Arrow cannot type fall back to strings
+        assert table.column("mixed").to_pylist() == ["a", "1"]
+
+    def test_dataframe_to_parquet_round_trip(self):
+        """Test a Parquet body loads back into pandas."""
+        pytest.importorskip("pyarrow")
+
+        df = pd.read_parquet(io.BytesIO(dataframe_to_parquet(make_columnar_frame())))
+
+        assert df["title"].tolist()[0] == "Engineer"
+        assert df["min_amount"].tolist()[0] == 100000.0
+        assert len(df) == 2
+
+    def test_dataframe_to_csv(self):
+        """Test CSV has a header, ISO dates and empty missing values."""
+        df = make_columnar_frame()[["title", "date_posted", "min_amount"]]
+
+        assert dataframe_to_csv(df) == (
+            b"title,date_posted,min_amount\nEngineer,2024-01-02,100000.0\n,,\n"
+        )
+
+    def test_format_available_without_pyarrow(self):
+        """Test Arrow-based formats are unavailable without pyarrow."""
+        with patch("jobscraper.serialization.pa", None):
+            assert format_available(ARROW_STREAM_MIMETYPE) is False
+            assert format_available(PARQUET_MIMETYPE) is False
+            assert format_available(CSV_MIMETYPE) is True
@@ -0,0 +1,151 @@
+"""
+Unit tests for per-request result stages.
+"""
+
+import pandas as pd
+import pytest
+
+from jobscraper.cache import ScrapeResult
+from jobscraper.params import InvalidRequestError
+from jobscraper.saved import SavedSearchRun, SeenJobsIndex
+from jobscraper.stages import apply_stages, parse_stages
+
+
+class TestStages:
+    """Test cases for parsing and applying result stages."""
+
+    def test_parse_stages(self):
+        """Test stages are only enabled when requested."""
+        assert parse_stages({}) == {}
+        assert parse_stages({"dedupe": False}) == {}
+        assert parse_stages({"dedupe": True}) == {"dedupe": True}
+
+    def test_parse_stages_invalid(self):
+        """Test non-boolean dedupe values are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_stages({"dedupe": "yes"})
+
+    def test_parse_fields(self):
+        """Test field lists are validated and de-duplicated."""
+        assert parse_stages({"fields": ["title", "id", "title"]}) == {
+            "fields": ["title", "id"]
+        }
+        assert parse_stages({"exclude_fields": ["description"]}) == {
+            "exclude_fields": ["description"]
+        }
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"fields": ["title", "salary"]},
+            {"exclude_fields": ["nope"]},
+            {"fields": []},
+            {"fields": "title"},
+            {"fields": ["title"], "exclude_fields": ["description"]},
+            {"sort": "salary"},
+            {"sort": ["-title", 1]},
+            {"limit": 0},
+            {"limit": True},
+        ],
+    )
+    def test_parse_fields_invalid(self, data):
+        """Test unknown, empty, malformed and conflicting field lists are rejected."""
+        with pytest.raises(InvalidRequestError):
+            parse_stages(data)
+
+    def test_parse_sort_and_limit(self):
+        """Test sort keys accept a single field or a list with - prefixes."""
+        assert parse_stages({"sort": "date_posted", "limit": 5}) == {
+            "sort": [("date_posted", True)],
+            "limit": 5,
+        }
+        assert parse_stages({"sort": ["-max_amount", "title"]}) == {
+            "sort": [("max_amount", False), ("title", True)]
+        }
+
+    def test_apply_no_stages(self):
+        """Test the result is passed through untouched without stages."""
+        result = ScrapeResult(pd.DataFrame({"title": ["a"]}))
+
+        assert apply_stages(result, {}) is result
+
+    def test_apply_dedupe(self):
+        """Test deduplication keeps site errors and reports removed rows."""
+        jobs = pd.DataFrame(
+            {
+                "site": ["indeed", "linkedin"],
+                "title": ["Engineer", "Engineer"],
+                "company": ["Acme", "Acme"],
+            }
+        )
+        errors = [{"site": "google", "error": "boom"}]
+        result = ScrapeResult(jobs, errors=errors)
+
+        deduped = apply_stages(result, {"dedupe": True})
+
+        assert len(deduped) == 1
+        assert deduped.errors == errors
+        assert deduped.stages == {"duplicates_removed": 1}
+
+    def test_apply_fields(self):
+        """Test only the requested columns are kept, in the requested order."""
+        jobs = pd.DataFrame({"id": [1], "title": ["a"], "description": ["long"]})
+        result = ScrapeResult(jobs)
+
+        projected = apply_stages(result, {"fields": ["title", "id", "company"]})
+
+        assert list(projected.jobs.columns) == ["title", "id"]
+        assert projected.jobs_json == b'[{"title":"a","id":1}]'
+
+    def test_apply_exclude_fields(self):
+        """Test excluded columns are dropped after dedupe has used them."""
+        jobs = pd.DataFrame(
+            {
+                "site": ["indeed", "linkedin"],
+                "title": ["Engineer", "Engineer"],
+                "company": ["Acme", "Acme"],
+                "description": ["long", "long"],
+            }
+        )
+        stages = {"dedupe": True, "exclude_fields": ["company", "description"]}
+
+        projected = apply_stages(ScrapeResult(jobs), stages)
+
+        assert list(projected.jobs.columns) == ["site", "title", "sites"]
+        assert len(projected) == 1
+
+    def test_apply_filters_sort_limit(self):
+        """Test filters, sort and limit combine and report removed rows."""
+        jobs = pd.DataFrame(
+            {
+                "title": ["a", "b", "c", "d"],
+                "max_amount": [100.0, None, 300.0, 200.0],
+                "is_remote": [True, True, False, True],
+            }
+        )
+        stages = {
+            "filters": {"remote": True},
+            "sort": [("max_amount", False)],
+            "limit": 2,
+        }
+
+        result = apply_stages(ScrapeResult(jobs), stages)
+
+        assert result.jobs["title"].tolist() == ["d", "a"]
+        assert result.jobs.index.tolist() == [0, 1]
+        assert result.stages == {"filtered_out": 1}
+
+    def test_apply_saved_search(self, tmp_path):
+        """Test only unseen jobs are returned and only returned jobs recorded."""
+        index = SeenJobsIndex(str(tmp_path / "saved.sqlite3"), retention=60)
+        jobs = pd.DataFrame({"id": ["a", "b", "c"], "title": ["x", "y", "z"]})
+        index.record("s", pd.Series(["a"]), pd.Series(["a"]))
+
+        stages = {"limit": 1, "fields": ["title"]}
+        first = apply_stages(ScrapeResult(jobs), stages, SavedSearchRun(index, "s"))
+        second = apply_stages(ScrapeResult(jobs), stages, SavedSearchRun(index, "s"))
+
+        assert first.jobs["title"].tolist() == ["y"]
+        assert first.stages == {"already_seen": 1, "cursor": 2}
+        assert second.jobs["title"].tolist() == ["z"]
+        assert second.stages == {"already_seen": 2, "cursor": 3}